@@ -0,0 +1,132 @@
+import importlib
+import pkgutil
+import threading
+from types import ModuleType
+from typing import Type
+
+from google.protobuf.message import Message
+
+import proto
+
+# Suffix of the module names generated by protoc for python
+GENERATED_MODULE_SUFFIX = "_pb2"
+
+
+class ProtoRegistry:
+    """Maps full proto names (e.g. TbotsProto.Primitive) to their generated classes.
+
+    Unlike proto.import_all_protos, which imports every generated module up front, the
+    registry only imports generated modules when a lookup misses. Modules are imported
+    one at a time until the requested proto is found, and every message class in an
+    imported module is cached, so repeated lookups are a single dict access.
+    """
+
+    def __init__(self, *packages: ModuleType) -> None:
+        """Creates a registry over the generated modules in the given packages.
+        No modules are imported until the first lookup.
+
+        :param packages: the packages containing generated protobuf modules
+        """
+        self.classes_by_full_name: dict[str, Type[Message]] = {}
+        self.classes_by_name: dict[str, Type[Message]] = {}
+
+        self.unimported_module_names = [
+            package.__name__ + "." + name
+            for package in packages
+            for _, name, _ in pkgutil.walk_packages(package.__path__)
+            if name.endswith(GENERATED_MODULE_SUFFIX)
+        ]
+        self.registered_modules = set()
+        self.lock = threading.Lock()
+
+    def register_module(self, module: ModuleType) -> None:
+        """Caches every message class (including nested messages) defined in an
+        already imported generated module.
+
+        :param module: the generated protobuf module to register
+        """
+        with self.lock:
+            self.__register_module(module)
+
+    def lookup(self, full_name: str) -> Type[Message]:
+        """Returns the class of the proto with the given full name, importing
+        generated modules as needed until it is found.
+
+        :param full_name: the full name of the proto, as given by
+                          proto.DESCRIPTOR.full_name (e.g. TbotsProto.Primitive)
+        :raises KeyError: if no generated module defines the proto
+        :return: the class of the proto
+        """
+        proto_class = self.classes_by_full_name.get(full_name)
+        if proto_class is not None:
+            return proto_class
+
+        with self.lock:
+            while (
+                full_name not in self.classes_by_full_name
+                and self.unimported_module_names
+            ):
+                self.__register_module(
+                    importlib.import_module(self.unimported_module_names.pop(0))
+                )
+
+            if full_name in self.classes_by_full_name:
+                return self.classes_by_full_name[full_name]
+
+            # Fall back to matching on the class name alone, which is how
+            # protos used to be resolved
+            name = full_name.split(".")[-1]
+            if name in self.classes_by_name:
+                return self.classes_by_name[name]
+
+        raise KeyError(f"Unknown proto type: '{full_name}'")
+
+    def __register_module(self, module: ModuleType) -> None:
+        """Caches every message class defined in the given module. The lock
+        must be held by the caller.
+
+        :param module: the generated protobuf module to register
+        """
+        if module.__name__ in self.registered_modules:
+            return
+
+        self.registered_modules.add(module.__name__)
+
+        if module.__name__ in self.unimported_module_names:
+            self.unimported_module_names.remove(module.__name__)
+
+        file_descriptor = getattr(module, "DESCRIPTOR", None)
+        if file_descriptor is None:
+            return
+
+        for name in file_descriptor.message_types_by_name:
+            self.__register_class(getattr(module, name))
+
+    def __register_class(self, proto_class: Type[Message]) -> None:
+        """Caches the given message class and all of its nested message classes.
+        The lock must be held by the caller.
+
+        :param proto_class: the message class to register
+        """
+        self.classes_by_full_name[proto_class.DESCRIPTOR.full_name] = proto_class
+        self.classes_by_name.setdefault(proto_class.DESCRIPTOR.name, proto_class)
+
+        for nested_type in proto_class.DESCRIPTOR.nested_types:
+            # Map entries are generated as nested types but don't have a class
+            if not nested_type.GetOptions().map_entry:
+                self.__register_class(getattr(proto_class, nested_type.name))
+
+
+# The registry over all the protobuf modules that are generated into the proto library
+proto_registry = ProtoRegistry(proto)
+
+
+def lookup(full_name: str) -> Type[Message]:
+    """Returns the class of the proto with the given full name from the registry
+    of all generated protos.
+
+    :param full_name: the full name of the proto (e.g. TbotsProto.Primitive)
+    :raises KeyError: if no generated module defines the proto
+    :return: the class of the proto
+    """
+    return proto_registry.lookup(full_name)
@@ -99,8 +99,9 @@ def setup_pass_and_robots(
     # generate the best pass on the world 100 times
     # this improves the passes generated over time
     robots_to_ignore = [0]  # Avoid sampling passes around the attacker robot
-    for index in range(0, 100):
-        best_pass_with_score = pass_generator.getBestPass(world, robots_to_ignore)
+    best_pass_with_score = pass_generator.getBestPassAfterIterations(
+        world, robots_to_ignore, 100
+    )
 
     best_pass = best_pass_with_score.pass_value
     kick_vec = best_pass.receiverPoint() - best_pass.passerPoint()
@@ -59,6 +59,36 @@ PassWithRating PassGenerator::getBestPass(const World& world,
     return best_pass;
 }
 
+PassWithRating PassGenerator::getBestPassAfterIterations(
+    const World& world, const std::vector<RobotId>& robots_to_ignore,
+    unsigned int num_iterations)
+{
+    PassWithRating best_pass{Pass(Point(), Point(), 1.0), 0};
+    for (unsigned int i = 0; i < num_iterations; i++)
+    {
+        best_pass = getBestPass(world, robots_to_ignore);
+    }
+
+    return best_pass;
+}
+
+std::vector<PassWithRating> PassGenerator::getBestPassesForWorlds(
+    const std::vector<World>& worlds, const std::vector<RobotId>& robots_to_ignore,
+    unsigned int num_iterations) const
+{
+    std::vector<PassWithRating> best_passes;
+    best_passes.reserve(worlds.size());
+
+    for (const World& world : worlds)
+    {
+        PassGenerator pass_generator(passing_config_);
+        best_passes.push_back(pass_generator.getBestPassAfterIterations(
+            world, robots_to_ignore, num_iterations));
+    }
+
+    return best_passes;
+}
+
 std::map<RobotId, std::vector<Point>> PassGenerator::sampleReceivingPositionsPerRobot(
     const World& world, const std::vector<RobotId>& robots_to_ignore)
 {
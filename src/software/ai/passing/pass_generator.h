@@ -32,6 +32,38 @@ class PassGenerator
     PassWithRating getBestPass(const World& world,
                                const std::vector<RobotId>& robots_to_ignore = {});
 
+    /**
+     * Runs the pass generator on the same world for the given number of iterations,
+     * warm starting each iteration from the best receiving positions found by the
+     * previous one
+     *
+     * @param world The state of the world
+     * @param robots_to_ignore A list of robot ids to ignore when generating passes
+     * @param num_iterations The number of times to run the pass generator on the world
+     *
+     * @return The best pass found in the last iteration and its rating
+     */
+    PassWithRating getBestPassAfterIterations(
+        const World& world, const std::vector<RobotId>& robots_to_ignore,
+        unsigned int num_iterations);
+
+    /**
+     * Generates the best pass for each of the given worlds. Each world is evaluated by
+     * a fresh pass generator with this generator's config, so the worlds are
+     * independent of each other and of the state of this generator
+     *
+     * @param worlds The worlds to generate passes on
+     * @param robots_to_ignore A list of robot ids to ignore when generating passes
+     * @param num_iterations The number of pass generator iterations to run on each
+     * world
+     *
+     * @return The best pass and its rating for each world, in the same order as the
+     * given worlds
+     */
+    std::vector<PassWithRating> getBestPassesForWorlds(
+        const std::vector<World>& worlds, const std::vector<RobotId>& robots_to_ignore,
+        unsigned int num_iterations) const;
+
    private:
     /**
      * Randomly sample receiving points around friendly robots not included in the ignore
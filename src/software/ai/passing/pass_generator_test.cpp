@@ -308,3 +308,36 @@ TEST_F(PassGeneratorTest, test_robots_ignore_list)
                  world->friendlyTeam().getRobotById(2)->position())
                     .length() < 0.3);
 }
+
+TEST_F(PassGeneratorTest, test_batch_matches_individual_pass_generators)
+{
+    // Each world in a batch should get the same pass as a fresh pass generator that
+    // was stepped on only that world
+    std::shared_ptr<World> first_world = ::TestUtil::createBlankTestingWorld();
+    first_world->updateBall(Ball({0, 0}, {0, 0}, Timestamp::fromSeconds(0)));
+    first_world->updateFriendlyTeamState(
+        Team({Robot(1, {2, 1}, {0, 0}, Angle::zero(), AngularVelocity::zero(),
+                    Timestamp::fromSeconds(0))},
+             Duration::fromSeconds(10)));
+
+    std::shared_ptr<World> second_world = ::TestUtil::createBlankTestingWorld();
+    second_world->updateBall(Ball({1, -1}, {0, 0}, Timestamp::fromSeconds(0)));
+    second_world->updateFriendlyTeamState(
+        Team({Robot(1, {-2, -1}, {0, 0}, Angle::zero(), AngularVelocity::zero(),
+                    Timestamp::fromSeconds(0))},
+             Duration::fromSeconds(10)));
+
+    std::vector<PassWithRating> batch_passes =
+        pass_generator.getBestPassesForWorlds({*first_world, *second_world}, {}, 20);
+    ASSERT_EQ(batch_passes.size(), 2);
+
+    PassWithRating first_pass =
+        PassGenerator(passing_config).getBestPassAfterIterations(*first_world, {}, 20);
+    PassWithRating second_pass =
+        PassGenerator(passing_config).getBestPassAfterIterations(*second_world, {}, 20);
+
+    EXPECT_EQ(batch_passes[0].pass.receiverPoint(), first_pass.pass.receiverPoint());
+    EXPECT_DOUBLE_EQ(batch_passes[0].rating, first_pass.rating);
+    EXPECT_EQ(batch_passes[1].pass.receiverPoint(), second_pass.pass.receiverPoint());
+    EXPECT_DOUBLE_EQ(batch_passes[1].rating, second_pass.rating);
+}
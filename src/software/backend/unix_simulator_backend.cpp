@@ -64,6 +64,11 @@ UnixSimulatorBackend::UnixSimulatorBackend(
             runtime_dir + REPLAY_BOOKMARK_PATH, [](TbotsProto::ReplayBookmark& v) {},
             proto_logger));
 
+    robot_link_statistics_listener.reset(
+        new ThreadedProtoUnixListener<RobotLinkStatistics>(
+            runtime_dir + ROBOT_LINK_STATISTICS_PATH, [](RobotLinkStatistics& v) {},
+            proto_logger));
+
     // Protobuf Outputs
     world_output.reset(new ThreadedProtoUnixSender<TbotsProto::World>(
         runtime_dir + WORLD_PATH, proto_logger));
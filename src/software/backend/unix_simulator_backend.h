@@ -6,6 +6,7 @@
 #include "proto/replay_bookmark.pb.h"
 #include "proto/robot_crash_msg.pb.h"
 #include "proto/robot_log_msg.pb.h"
+#include "proto/robot_statistic.pb.h"
 #include "proto/robot_status_msg.pb.h"
 #include "proto/sensor_msg.pb.h"
 #include "proto/tbots_software_msgs.pb.h"
@@ -56,6 +57,8 @@ class UnixSimulatorBackend : public Backend, public Subject<TbotsProto::Thunderb
         robot_crash_listener;
     std::unique_ptr<ThreadedProtoUnixListener<TbotsProto::ReplayBookmark>>
         replay_bookmark_listener;
+    std::unique_ptr<ThreadedProtoUnixListener<RobotLinkStatistics>>
+        robot_link_statistics_listener;
 
     // Outputs
     std::unique_ptr<ThreadedProtoUnixSender<TbotsProto::World>> world_output;
@@ -33,6 +33,8 @@ const std::string VALIDATION_PROTO_SET_PATH              = "/validation_proto_se
 const std::string ROBOT_LOG_PATH                         = "/robot_log";
 const std::string ROBOT_CRASH_PATH                       = "/robot_crash";
 const std::string REPLAY_BOOKMARK_PATH                   = "/replay_bookmark";
+const std::string START_REPLAY_LOG_PATH                  = "/start_replay_log";
+const std::string ROBOT_LINK_STATISTICS_PATH             = "/robot_link_statistics";
 const std::string DYNAMIC_PARAMETER_UPDATE_REQUEST_PATH  = "/dynamic_parameter_request";
 const std::string DYNAMIC_PARAMETER_UPDATE_RESPONSE_PATH = "/dynamic_parameter_response";
 const std::string WORLD_STATE_RECEIVED_TRIGGER_PATH = "/world_state_received_trigger";
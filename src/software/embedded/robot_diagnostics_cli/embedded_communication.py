@@ -1,9 +1,11 @@
 from proto.import_all_protos import *
 from embedded_data import EmbeddedData
+from primitive_sequence import PrimitiveSequenceStep, PrimitiveSequenceTrace
 from google.protobuf.message import Message
 from software.embedded.constants.py_constants import get_estop_config, EstopMode
 from rich.progress import track
 from threading import Thread
+import math
 import software.python_bindings as tbots_cpp
 from software.py_constants import *
 import time
@@ -29,6 +31,11 @@ class EmbeddedCommunication:
         self.command_duration_seconds = 2.0
         self.send_primitive_interval_s = 0.01
 
+        # The trace of the primitive sequence being run, if it is being traced,
+        # and when the sequence started according to the monotonic clock
+        self.sequence_trace: PrimitiveSequenceTrace | None = None
+        self.sequence_start_time_s = 0.0
+
         # Localhost IP Broadcaster
         self.fullsystem_ip_broadcaster = tbots_cpp.FullsystemIpBroadcastProtoUdpSender(
             getRobotMulticastChannel(int(self.embedded_data.get_channel_id())),
@@ -66,6 +73,12 @@ class EmbeddedCommunication:
             robot_status.thunderloop_status.primitive_executor_step_time_ms
         )
 
+        sequence_trace = self.sequence_trace
+        if sequence_trace is not None:
+            sequence_trace.record_robot_status(
+                time.monotonic() - self.sequence_start_time_s, robot_status
+            )
+
     def __should_send_packet(self) -> bool:
         """Returns whether we should send a packet or not
         :return: True if a proto should be sent, False otherwise
@@ -120,6 +133,70 @@ class EmbeddedCommunication:
             self.run_primitive(primitive)
             time.sleep(self.send_primitive_interval_s)
 
+    def run_primitive_sequence(
+        self,
+        steps: list[PrimitiveSequenceStep],
+        trace: PrimitiveSequenceTrace | None = None,
+    ) -> list[float]:
+        """Executes a primitive sequence synchronously. Each step's primitive is sent
+        every send_primitive_interval_s from the step's time until the next step's
+        time, and the last step's primitive is sent once.
+
+        Send times are scheduled as deadlines from the start of the sequence on the
+        monotonic clock, so delays in sending one primitive don't push back the
+        rest of the sequence. If sending falls more than an interval behind,
+        the missed sends are skipped.
+
+        :param steps: the steps of the sequence, in order
+        :param trace: if given, records the primitives sent and the robot statuses
+                      received while running the sequence
+        :return: how late each primitive was sent compared to its deadline, in seconds
+        """
+        send_lateness_s = []
+
+        self.sequence_start_time_s = time.monotonic()
+        self.sequence_trace = trace
+
+        try:
+            for step_index, step in enumerate(steps):
+                step_end_s = (
+                    steps[step_index + 1].time_s
+                    if step_index + 1 < len(steps)
+                    else step.time_s
+                )
+                deadline_s = step.time_s
+
+                while True:
+                    sleep_s = self.sequence_start_time_s + deadline_s - time.monotonic()
+                    if sleep_s > 0:
+                        time.sleep(sleep_s)
+
+                    self.run_primitive(step.primitive)
+                    sent_s = time.monotonic() - self.sequence_start_time_s
+                    send_lateness_s.append(sent_s - deadline_s)
+
+                    if trace is not None:
+                        trace.record_sent_primitive(
+                            step_index,
+                            step.primitive.sequence_number,
+                            deadline_s,
+                            sent_s,
+                        )
+
+                    # The next deadline in this step that hasn't passed yet
+                    num_intervals_elapsed = math.floor(
+                        (sent_s - step.time_s) / self.send_primitive_interval_s
+                    )
+                    deadline_s = step.time_s + self.send_primitive_interval_s * (
+                        max(num_intervals_elapsed, 0) + 1
+                    )
+                    if deadline_s >= step_end_s:
+                        break
+        finally:
+            self.sequence_trace = None
+
+        return send_lateness_s
+
     def __broadcast_fullsystem_ip(self) -> None:
         while self.running:
             self.fullsystem_ip_broadcaster.send_proto(
@@ -156,3 +233,4 @@ class EmbeddedCommunication:
         self.running = False
         self.receive_robot_status.close()
         self.broadcast_ip.join()
+        self.embedded_data.close()
@@ -1,4 +1,5 @@
 import math
+import time
 import redis
 from software.py_constants import *
 from proto.import_all_protos import *
@@ -12,8 +13,33 @@ from software.embedded.constants.py_constants import (
 class EmbeddedData:
     """Model class responsible for interfacing with onboard disk data on the robot.
     This class manages static data on the robot as well as the operations necessary with mutating data for use
+
+    The robot's redis values are fetched together in one round trip and cached,
+    since the CLI reads all of them every time it draws a table. The cache is
+    dropped when redis notifies us that one of the keys changed, which requires
+    keyspace notifications to be enabled on the redis server (notify-keyspace-events).
+    Otherwise, cached values are refetched after REDIS_CACHE_TTL_S.
     """
 
+    # The robot's redis keys, fetched together into a snapshot
+    REDIS_KEYS = [
+        ROBOT_ID_REDIS_KEY,
+        ROBOT_MULTICAST_CHANNEL_REDIS_KEY,
+        ROBOT_NETWORK_INTERFACE_REDIS_KEY,
+        ROBOT_KICK_CONSTANT_REDIS_KEY,
+        ROBOT_KICK_EXP_COEFF_REDIS_KEY,
+        ROBOT_CHIP_PULSE_WIDTH_REDIS_KEY,
+        ROBOT_CURRENT_DRAW_REDIS_KEY,
+        ROBOT_BATTERY_VOLTAGE_REDIS_KEY,
+        ROBOT_CAPACITOR_VOLTAGE_REDIS_KEY,
+    ]
+
+    # How long a snapshot of the redis values is reused for
+    REDIS_CACHE_TTL_S = 1.0
+
+    # How long the thread listening for keyspace notifications blocks waiting for one
+    REDIS_NOTIFICATION_TIMEOUT_S = 1.0
+
     def __init__(self) -> None:
         # Initializes the redis cache connection
         self.redis = redis.StrictRedis(
@@ -27,32 +53,107 @@ class EmbeddedData:
         self.primitive_packet_loss_percentage = 0
         self.primitive_executor_step_time_ms = 0
 
+        # The latest snapshot of the redis values, and when it was fetched.
+        # Set to None to force the next read to fetch a new snapshot.
+        self.redis_snapshot: dict[str, str] | None = None
+        self.redis_snapshot_time = 0.0
+
+        # Listens for changes to the keys. Started on the first read rather
+        # than here, so that EmbeddedData can be created while redis is down.
+        self.redis_pubsub = None
+        self.redis_notification_thread = None
+
+    def close(self) -> None:
+        """Stops listening for changes to the redis values and closes the connection"""
+        if self.redis_notification_thread is not None:
+            self.redis_notification_thread.stop()
+        if self.redis_pubsub is not None:
+            self.redis_pubsub.close()
+        self.redis.close()
+
+    def __listen_for_redis_changes(self) -> None:
+        """Subscribes to changes to the robot's redis keys, so that the snapshot
+        is dropped whenever one of them is changed. If redis can't be reached,
+        we subscribe again on the next read.
+        """
+        db = self.redis.connection_pool.connection_kwargs.get("db", 0)
+        redis_pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            redis_pubsub.subscribe(
+                **{
+                    f"__keyspace@{db}__:{key}": self.__invalidate_redis_snapshot
+                    for key in EmbeddedData.REDIS_KEYS
+                }
+            )
+        except redis.ConnectionError:
+            redis_pubsub.close()
+            return
+
+        self.redis_pubsub = redis_pubsub
+        self.redis_notification_thread = redis_pubsub.run_in_thread(
+            sleep_time=EmbeddedData.REDIS_NOTIFICATION_TIMEOUT_S, daemon=True
+        )
+
+    def __invalidate_redis_snapshot(self, message: dict) -> None:
+        """Drops the cached snapshot when a redis key changes
+
+        :param message: the keyspace notification
+        """
+        self.redis_snapshot = None
+
+    def get_redis_snapshot(self) -> dict[str, str]:
+        """Returns the robot's redis values, fetching them all in one round trip
+        if the cached snapshot is missing or older than REDIS_CACHE_TTL_S
+
+        :return: a map of each of the robot's redis keys to its value
+        """
+        redis_snapshot = self.redis_snapshot
+        if (
+            redis_snapshot is not None
+            and time.monotonic() - self.redis_snapshot_time
+            < EmbeddedData.REDIS_CACHE_TTL_S
+        ):
+            return redis_snapshot
+
+        if self.redis_notification_thread is None:
+            self.__listen_for_redis_changes()
+
+        redis_snapshot = {
+            key: str(value)
+            for key, value in zip(
+                EmbeddedData.REDIS_KEYS, self.redis.mget(EmbeddedData.REDIS_KEYS)
+            )
+        }
+        self.redis_snapshot = redis_snapshot
+        self.redis_snapshot_time = time.monotonic()
+        return redis_snapshot
+
     def get_robot_id(self) -> str:
-        return str(self.redis.get(ROBOT_ID_REDIS_KEY))
+        return self.get_redis_snapshot()[ROBOT_ID_REDIS_KEY]
 
     def get_network_interface(self) -> str:
-        return str(self.redis.get(ROBOT_NETWORK_INTERFACE_REDIS_KEY))
+        return self.get_redis_snapshot()[ROBOT_NETWORK_INTERFACE_REDIS_KEY]
 
     def get_channel_id(self) -> str:
-        return str(self.redis.get(ROBOT_MULTICAST_CHANNEL_REDIS_KEY))
+        return self.get_redis_snapshot()[ROBOT_MULTICAST_CHANNEL_REDIS_KEY]
 
     def get_kick_constant(self) -> str:
-        return str(self.redis.get(ROBOT_KICK_CONSTANT_REDIS_KEY))
+        return self.get_redis_snapshot()[ROBOT_KICK_CONSTANT_REDIS_KEY]
 
     def get_kick_coeff(self) -> str:
-        return str(self.redis.get(ROBOT_KICK_EXP_COEFF_REDIS_KEY))
+        return self.get_redis_snapshot()[ROBOT_KICK_EXP_COEFF_REDIS_KEY]
 
     def get_chip_pulse_width(self) -> str:
-        return str(self.redis.get(ROBOT_CHIP_PULSE_WIDTH_REDIS_KEY))
+        return self.get_redis_snapshot()[ROBOT_CHIP_PULSE_WIDTH_REDIS_KEY]
 
     def get_current_draw(self) -> str:
-        return str(self.redis.get(ROBOT_CURRENT_DRAW_REDIS_KEY))
+        return self.get_redis_snapshot()[ROBOT_CURRENT_DRAW_REDIS_KEY]
 
     def get_battery_volt(self) -> str:
-        return str(self.redis.get(ROBOT_BATTERY_VOLTAGE_REDIS_KEY))
+        return self.get_redis_snapshot()[ROBOT_BATTERY_VOLTAGE_REDIS_KEY]
 
     def get_cap_volt(self) -> str:
-        return str(self.redis.get(ROBOT_CAPACITOR_VOLTAGE_REDIS_KEY))
+        return self.get_redis_snapshot()[ROBOT_CAPACITOR_VOLTAGE_REDIS_KEY]
 
     def __clamp(self, val: float, min_val: float, max_val: float) -> float:
         """Simple Math Clamp function (Faster than numpy & fewer dependencies)
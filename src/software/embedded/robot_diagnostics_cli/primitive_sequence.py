@@ -0,0 +1,200 @@
+import json
+import os
+import struct
+import threading
+from dataclasses import dataclass
+from google.protobuf import json_format
+from proto.import_all_protos import *
+
+
+@dataclass
+class PrimitiveSequenceStep:
+    """A primitive in a primitive sequence, and when to start sending it"""
+
+    # When to start sending the primitive, in seconds since the sequence started
+    time_s: float
+
+    primitive: Primitive
+
+
+def load_primitive_sequence(path: os.PathLike) -> list[PrimitiveSequenceStep]:
+    """Loads a primitive sequence from a JSON file containing a list of steps:
+
+    [
+        {"time_s": 0.0, "primitive": {"direct_control": {...}}},
+        {"time_s": 1.5, "primitive": {"direct_control": {...}}},
+        {"time_s": 2.0, "primitive": {"stop": {}}}
+    ]
+
+    Each primitive is written in the protobuf JSON format, and is sent from its
+    time until the time of the next step. The last step is sent once, so
+    sequences should usually end with a stop primitive.
+
+    :param path: the path to the sequence file
+    :return: the steps of the sequence, in order
+    """
+    with open(path) as sequence_file:
+        steps_json = json.load(sequence_file)
+
+    steps = [
+        PrimitiveSequenceStep(
+            time_s=float(step_json["time_s"]),
+            primitive=json_format.ParseDict(step_json["primitive"], Primitive()),
+        )
+        for step_json in steps_json
+    ]
+
+    if not steps:
+        raise ValueError(f"Primitive sequence {path} has no steps")
+
+    for previous_step, step in zip(steps, steps[1:]):
+        if step.time_s <= previous_step.time_s:
+            raise ValueError(
+                f"Primitive sequence {path} has steps out of order at {step.time_s} s"
+            )
+
+    if steps[0].time_s < 0:
+        raise ValueError(f"Primitive sequence {path} starts before 0 s")
+
+    return steps
+
+
+@dataclass
+class SentPrimitiveRecord:
+    """A primitive sent while running a primitive sequence"""
+
+    step_index: int
+    sequence_number: int
+
+    # When the primitive was scheduled to be sent and when it was actually sent,
+    # in seconds since the sequence started
+    deadline_s: float
+    sent_s: float
+
+
+@dataclass
+class RobotStatusRecord:
+    """A robot status received while running a primitive sequence"""
+
+    # When the robot status was received, in seconds since the sequence started
+    received_s: float
+
+    last_handled_primitive_set: int
+    battery_voltage: float
+    primitive_packet_loss_percentage: float
+    primitive_executor_step_time_ms: float
+
+
+class PrimitiveSequenceTrace:
+    """Writes the primitives sent and robot statuses received while running a
+    primitive sequence to a compact binary trace file.
+
+    The file starts with FILE_MAGIC, followed by fixed size little endian
+    records, each starting with a byte giving the type of the record.
+    Records can be written from multiple threads.
+    """
+
+    FILE_MAGIC = b"TBPSEQ01"
+
+    SENT_PRIMITIVE_RECORD_TYPE = 0
+    ROBOT_STATUS_RECORD_TYPE = 1
+
+    # type, step index, sequence number, deadline, sent time
+    SENT_PRIMITIVE_RECORD = struct.Struct("<BIQdd")
+
+    # type, received time, last handled primitive, battery voltage,
+    # primitive packet loss percentage, primitive executor step time
+    ROBOT_STATUS_RECORD = struct.Struct("<BdQfff")
+
+    def __init__(self, path: os.PathLike) -> None:
+        """Creates the trace file, overwriting it if it exists
+
+        :param path: the path to write the trace to
+        """
+        self.trace_file = open(path, "wb")
+        self.trace_file.write(PrimitiveSequenceTrace.FILE_MAGIC)
+        self.lock = threading.Lock()
+
+    def record_sent_primitive(
+        self, step_index: int, sequence_number: int, deadline_s: float, sent_s: float
+    ) -> None:
+        """Records that a primitive was sent
+
+        :param step_index: the index of the sequence step the primitive is from
+        :param sequence_number: the sequence number the primitive was sent with
+        :param deadline_s: when the primitive was scheduled to be sent
+        :param sent_s: when the primitive was sent
+        """
+        record = PrimitiveSequenceTrace.SENT_PRIMITIVE_RECORD.pack(
+            PrimitiveSequenceTrace.SENT_PRIMITIVE_RECORD_TYPE,
+            step_index,
+            sequence_number,
+            deadline_s,
+            sent_s,
+        )
+        with self.lock:
+            self.trace_file.write(record)
+
+    def record_robot_status(self, received_s: float, robot_status: RobotStatus) -> None:
+        """Records that a robot status was received
+
+        :param received_s: when the robot status was received
+        :param robot_status: the robot status
+        """
+        record = PrimitiveSequenceTrace.ROBOT_STATUS_RECORD.pack(
+            PrimitiveSequenceTrace.ROBOT_STATUS_RECORD_TYPE,
+            received_s,
+            robot_status.last_handled_primitive_set,
+            robot_status.power_status.battery_voltage,
+            robot_status.network_status.primitive_packet_loss_percentage,
+            robot_status.thunderloop_status.primitive_executor_step_time_ms,
+        )
+        with self.lock:
+            self.trace_file.write(record)
+
+    def close(self) -> None:
+        """Flushes and closes the trace file"""
+        with self.lock:
+            self.trace_file.close()
+
+    @staticmethod
+    def read(
+        path: os.PathLike,
+    ) -> tuple[list[SentPrimitiveRecord], list[RobotStatusRecord]]:
+        """Reads a trace file
+
+        :param path: the path to the trace file
+        :return: a tuple of the sent primitive records and the robot status records
+        """
+        with open(path, "rb") as trace_file:
+            data = trace_file.read()
+
+        if not data.startswith(PrimitiveSequenceTrace.FILE_MAGIC):
+            raise ValueError(f"{path} is not a primitive sequence trace")
+
+        sent_primitive_records = []
+        robot_status_records = []
+
+        offset = len(PrimitiveSequenceTrace.FILE_MAGIC)
+        while offset < len(data):
+            record_type = data[offset]
+
+            if record_type == PrimitiveSequenceTrace.SENT_PRIMITIVE_RECORD_TYPE:
+                record_struct = PrimitiveSequenceTrace.SENT_PRIMITIVE_RECORD
+                records, record_class = sent_primitive_records, SentPrimitiveRecord
+            elif record_type == PrimitiveSequenceTrace.ROBOT_STATUS_RECORD_TYPE:
+                record_struct = PrimitiveSequenceTrace.ROBOT_STATUS_RECORD
+                records, record_class = robot_status_records, RobotStatusRecord
+            else:
+                raise ValueError(
+                    f"{path} has an unknown record type {record_type} at byte {offset}"
+                )
+
+            # A trace that wasn't closed properly may end with a partial record
+            if offset + record_struct.size > len(data):
+                break
+
+            records.append(record_class(*record_struct.unpack_from(data, offset)[1:]))
+            offset += record_struct.size
+
+        return sent_primitive_records, robot_status_records
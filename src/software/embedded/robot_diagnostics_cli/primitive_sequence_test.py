@@ -0,0 +1,199 @@
+"""Tests for loading primitive sequences and for writing and reading back the
+traces recorded while running them.
+"""
+
+import json
+
+import pytest
+from google.protobuf import json_format
+
+from proto.import_all_protos import *
+from software.embedded.robot_diagnostics_cli.primitive_sequence import (
+    PrimitiveSequenceTrace,
+    RobotStatusRecord,
+    SentPrimitiveRecord,
+    load_primitive_sequence,
+)
+from software.simulated_tests.simulated_test_fixture import pytest_main
+
+MOVE_PRIMITIVE_JSON = {
+    "direct_control": {
+        "motor_control": {
+            "direct_velocity_control": {
+                "velocity": {"x_component_meters": 1.0, "y_component_meters": 0.5}
+            }
+        }
+    }
+}
+STOP_PRIMITIVE_JSON = {"stop": {}}
+
+
+def write_sequence(tmp_path, steps_json) -> str:
+    """Writes a primitive sequence file
+
+    :param tmp_path: the directory to write the file to
+    :param steps_json: the JSON of the sequence
+    :return: the path to the sequence file
+    """
+    sequence_path = str(tmp_path / "sequence.json")
+    with open(sequence_path, "w") as sequence_file:
+        json.dump(steps_json, sequence_file)
+    return sequence_path
+
+
+def test_load_primitive_sequence(tmp_path):
+    sequence_path = write_sequence(
+        tmp_path,
+        [
+            {"time_s": 0, "primitive": MOVE_PRIMITIVE_JSON},
+            {"time_s": 1.5, "primitive": STOP_PRIMITIVE_JSON},
+        ],
+    )
+
+    steps = load_primitive_sequence(sequence_path)
+
+    assert [step.time_s for step in steps] == [0.0, 1.5]
+    assert steps[0].primitive == json_format.ParseDict(MOVE_PRIMITIVE_JSON, Primitive())
+    assert steps[1].primitive.HasField("stop")
+
+
+@pytest.mark.parametrize(
+    "steps_json",
+    [
+        # No steps
+        [],
+        # Steps out of order
+        [
+            {"time_s": 1.0, "primitive": MOVE_PRIMITIVE_JSON},
+            {"time_s": 0.5, "primitive": STOP_PRIMITIVE_JSON},
+        ],
+        # Two steps at the same time
+        [
+            {"time_s": 1.0, "primitive": MOVE_PRIMITIVE_JSON},
+            {"time_s": 1.0, "primitive": STOP_PRIMITIVE_JSON},
+        ],
+        # Starts before 0 s
+        [{"time_s": -1.0, "primitive": STOP_PRIMITIVE_JSON}],
+    ],
+)
+def test_invalid_sequence_rejected(tmp_path, steps_json):
+    with pytest.raises(ValueError):
+        load_primitive_sequence(write_sequence(tmp_path, steps_json))
+
+
+def test_malformed_primitive_rejected(tmp_path):
+    sequence_path = write_sequence(
+        tmp_path, [{"time_s": 0.0, "primitive": {"not_a_primitive": {}}}]
+    )
+
+    with pytest.raises(json_format.ParseError):
+        load_primitive_sequence(sequence_path)
+
+
+def test_malformed_json_rejected(tmp_path):
+    sequence_path = str(tmp_path / "sequence.json")
+    with open(sequence_path, "w") as sequence_file:
+        sequence_file.write('[{"time_s": 0.0, "primitive": ')
+
+    with pytest.raises(json.JSONDecodeError):
+        load_primitive_sequence(sequence_path)
+
+
+def get_robot_status(record: RobotStatusRecord) -> RobotStatus:
+    """Creates the robot status that a robot status record is written from
+
+    :param record: the robot status record
+    :return: the robot status
+    """
+    return RobotStatus(
+        last_handled_primitive_set=record.last_handled_primitive_set,
+        power_status=PowerStatus(battery_voltage=record.battery_voltage),
+        network_status=NetworkStatus(
+            primitive_packet_loss_percentage=int(
+                record.primitive_packet_loss_percentage
+            )
+        ),
+        thunderloop_status=ThunderloopStatus(
+            primitive_executor_step_time_ms=record.primitive_executor_step_time_ms
+        ),
+    )
+
+
+def test_trace_read_back(tmp_path):
+    trace_path = str(tmp_path / "trace.bin")
+
+    # The robot status values are exact as 32 bit floats, since they're
+    # written as floats
+    sent_primitive_records = [
+        SentPrimitiveRecord(0, 100, 0.0, 0.0004),
+        SentPrimitiveRecord(0, 101, 0.01, 0.0103),
+        SentPrimitiveRecord(1, 2**40, 1.5, 1.5002),
+    ]
+    robot_status_records = [
+        RobotStatusRecord(0.005, 100, 24.5, 0.0, 1.25),
+        RobotStatusRecord(1.6, 2**40, 24.25, 12.0, 2.0),
+    ]
+
+    # Records of both types are written interleaved, as they are while running
+    trace = PrimitiveSequenceTrace(trace_path)
+    for sent_primitive_record in sent_primitive_records:
+        trace.record_sent_primitive(
+            sent_primitive_record.step_index,
+            sent_primitive_record.sequence_number,
+            sent_primitive_record.deadline_s,
+            sent_primitive_record.sent_s,
+        )
+        for robot_status_record in robot_status_records:
+            if robot_status_record.last_handled_primitive_set == (
+                sent_primitive_record.sequence_number
+            ):
+                trace.record_robot_status(
+                    robot_status_record.received_s,
+                    get_robot_status(robot_status_record),
+                )
+    trace.close()
+
+    assert PrimitiveSequenceTrace.read(trace_path) == (
+        sent_primitive_records,
+        robot_status_records,
+    )
+
+
+def test_trace_ending_with_partial_record_read(tmp_path):
+    trace_path = str(tmp_path / "trace.bin")
+
+    trace = PrimitiveSequenceTrace(trace_path)
+    trace.record_sent_primitive(0, 1, 0.0, 0.001)
+    trace.record_sent_primitive(0, 2, 0.01, 0.011)
+    trace.close()
+
+    # Cut the last record short, as if the CLI was killed while writing it
+    with open(trace_path, "r+b") as trace_file:
+        trace_file.truncate(
+            len(PrimitiveSequenceTrace.FILE_MAGIC)
+            + 2 * PrimitiveSequenceTrace.SENT_PRIMITIVE_RECORD.size
+            - 1
+        )
+
+    assert PrimitiveSequenceTrace.read(trace_path) == (
+        [SentPrimitiveRecord(0, 1, 0.0, 0.001)],
+        [],
+    )
+
+
+def test_invalid_trace_rejected(tmp_path):
+    trace_path = str(tmp_path / "trace.bin")
+
+    with open(trace_path, "wb") as trace_file:
+        trace_file.write(b"not a trace")
+    with pytest.raises(ValueError):
+        PrimitiveSequenceTrace.read(trace_path)
+
+    with open(trace_path, "wb") as trace_file:
+        trace_file.write(PrimitiveSequenceTrace.FILE_MAGIC + bytes([7]))
+    with pytest.raises(ValueError):
+        PrimitiveSequenceTrace.read(trace_path)
+
+
+if __name__ == "__main__":
+    pytest_main(__file__)
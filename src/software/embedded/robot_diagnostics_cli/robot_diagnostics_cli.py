@@ -1,5 +1,6 @@
 import subprocess
 import logging
+import time
 import typer as Typer
 from rich import print
 from rich.live import Live
@@ -12,6 +13,7 @@ from functools import wraps
 from typing import List, Optional
 from typing_extensions import Annotated
 from embedded_communication import EmbeddedCommunication
+from primitive_sequence import load_primitive_sequence, PrimitiveSequenceTrace
 from proto.import_all_protos import *
 from software.embedded.constants.py_constants import (
     DEFAULT_PRIMITIVE_DURATION,
@@ -24,6 +26,22 @@ from software.embedded.constants.py_constants import (
 class RobotDiagnosticsCLI:
     """Onboard lightweight Diagnostics CLI interface running on the robots. UI and Main class"""
 
+    # How many times per second the stats table is redrawn
+    STATS_REFRESH_PER_SECOND = 4
+
+    # The name and key of each row of the redis table
+    REDIS_TABLE_ROWS = [
+        ("Robot ID", ROBOT_ID_REDIS_KEY),
+        ("Channel ID", ROBOT_MULTICAST_CHANNEL_REDIS_KEY),
+        ("Network Interface", ROBOT_NETWORK_INTERFACE_REDIS_KEY),
+        ("Kick Constant", ROBOT_KICK_CONSTANT_REDIS_KEY),
+        ("Kick Coefficient", ROBOT_KICK_EXP_COEFF_REDIS_KEY),
+        ("Chip Pulse Width", ROBOT_CHIP_PULSE_WIDTH_REDIS_KEY),
+        ("Battery Voltage", ROBOT_BATTERY_VOLTAGE_REDIS_KEY),
+        ("Battery Current Draw", ROBOT_CURRENT_DRAW_REDIS_KEY),
+        ("Capacitor Voltage", ROBOT_CAPACITOR_VOLTAGE_REDIS_KEY),
+    ]
+
     def __init__(self, embedded_communication: EmbeddedCommunication) -> None:
         """Setup constructor for the Shell CLI
         :param embedded_communication: Communication object with open connection to robots for sending protos
@@ -45,6 +63,9 @@ class RobotDiagnosticsCLI:
         self.app.command(short_help="Spins the dribbler")(self.dribble)
         self.app.command(short_help="Chips the chipper")(self.chip)
         self.app.command(short_help="Kicks the kicker")(self.kick)
+        self.app.command(short_help="Runs a timed sequence of primitives")(
+            self.sequence
+        )
         self.app.command(short_help="Show Robot Status Info")(self.stats)
         self.app.command(short_help="Shows Redis Values")(self.redis)
         self.app.command(short_help="Prints Thunderloop Logs")(self.log)
@@ -100,6 +121,7 @@ class RobotDiagnosticsCLI:
 
     def __generate_stats_table(self) -> Table:
         """Make a new table with robot status information."""
+        redis_snapshot = self.embedded_data.get_redis_snapshot()
         table = Table()
         table.add_column("Robot ID")
         table.add_column("Battery (V)")
@@ -116,7 +138,7 @@ class RobotDiagnosticsCLI:
             status = "[green]ONLINE"
 
         table.add_row(
-            self.embedded_data.get_robot_id(),
+            redis_snapshot[ROBOT_ID_REDIS_KEY],
             f"{self.embedded_data.battery_voltage}",
             status,
             f"{self.embedded_data.epoch_timestamp_seconds}",
@@ -130,55 +152,21 @@ class RobotDiagnosticsCLI:
         table.add_column("Key", style="dim")
         table.add_column("Value")
 
-        table.add_row(
-            "Robot ID", f"{ROBOT_ID_REDIS_KEY}", self.embedded_data.get_robot_id()
-        )
-        table.add_row(
-            "Channel ID",
-            f"{ROBOT_MULTICAST_CHANNEL_REDIS_KEY}",
-            self.embedded_data.get_channel_id(),
-        )
-        table.add_row(
-            "Network Interface",
-            f"{ROBOT_NETWORK_INTERFACE_REDIS_KEY}",
-            self.embedded_data.get_network_interface(),
-        )
-        table.add_row(
-            "Kick Constant",
-            f"{ROBOT_KICK_CONSTANT_REDIS_KEY}",
-            self.embedded_data.get_kick_constant(),
-        )
-        table.add_row(
-            "Kick Coefficient",
-            f"{ROBOT_KICK_EXP_COEFF_REDIS_KEY}",
-            self.embedded_data.get_kick_coeff(),
-        )
-        table.add_row(
-            "Chip Pulse Width",
-            f"{ROBOT_CHIP_PULSE_WIDTH_REDIS_KEY}",
-            self.embedded_data.get_chip_pulse_width(),
-        )
-        table.add_row(
-            "Battery Voltage",
-            f"{ROBOT_BATTERY_VOLTAGE_REDIS_KEY}",
-            self.embedded_data.get_battery_volt(),
-        )
-        table.add_row(
-            "Battery Current Draw",
-            f"{ROBOT_CURRENT_DRAW_REDIS_KEY}",
-            self.embedded_data.get_current_draw(),
-        )
-        table.add_row(
-            "Capacitor Voltage",
-            f"{ROBOT_CAPACITOR_VOLTAGE_REDIS_KEY}",
-            self.embedded_data.get_cap_volt(),
-        )
+        redis_snapshot = self.embedded_data.get_redis_snapshot()
+        for name, key in RobotDiagnosticsCLI.REDIS_TABLE_ROWS:
+            table.add_row(name, f"{key}", redis_snapshot[key])
+
         return table
 
     def stats(self) -> None:
         """CLI Command to generate Incoming RobotStatus Proto information"""
-        with Live(self.__generate_stats_table(), refresh_per_second=4) as live:
+        with Live(
+            self.__generate_stats_table(),
+            refresh_per_second=RobotDiagnosticsCLI.STATS_REFRESH_PER_SECOND,
+        ) as live:
             while True:
+                # Only regenerate the table as often as it is drawn
+                time.sleep(1 / RobotDiagnosticsCLI.STATS_REFRESH_PER_SECOND)
                 live.update(self.__generate_stats_table())
 
     def redis(self):
@@ -388,6 +376,42 @@ class RobotDiagnosticsCLI:
             description,
         )
 
+    @catch_interrupt_exception()
+    def sequence(
+        self,
+        sequence_path: Annotated[
+            str, Typer.Argument(help="JSON file of timestamped primitives to run")
+        ],
+        trace_path: Annotated[
+            Optional[str],
+            Typer.Option(help="File to record sent primitives and robot statuses to"),
+        ] = None,
+    ) -> None:
+        """CLI Command to run a timed sequence of primitives, e.g. a drive profile
+        or a kick after driving, for repeatable motion characterization
+
+        :param sequence_path: The JSON file of timestamped primitives to run
+        :param trace_path: The file to record sent primitives and robot statuses to
+        """
+        steps = load_primitive_sequence(sequence_path)
+        trace = PrimitiveSequenceTrace(trace_path) if trace_path else None
+
+        print(f"Running {len(steps)} steps over {steps[-1].time_s} seconds")
+        try:
+            send_lateness_s = self.embedded_communication.run_primitive_sequence(
+                steps, trace
+            )
+        finally:
+            if trace is not None:
+                trace.close()
+
+        sorted_lateness_ms = sorted(lateness * 1000 for lateness in send_lateness_s)
+        print(
+            f"Sent {len(sorted_lateness_ms)} primitives, "
+            f"lateness p50 {sorted_lateness_ms[len(sorted_lateness_ms) // 2]:.2f} ms, "
+            f"max {sorted_lateness_ms[-1]:.2f} ms"
+        )
+
     def emote(self):
         # TODO (#3434): Add an emote function!
         return
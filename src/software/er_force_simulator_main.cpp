@@ -127,12 +127,12 @@ int main(int argc, char **argv)
 
 
         // World State Received Trigger as Simulator Output
+        // Sent every time a world state has been applied, so that clients can wait
+        // for the world state to take effect before ticking the simulation
         auto world_state_received_trigger =
             ThreadedProtoUnixSender<TbotsProto::WorldStateReceivedTrigger>(
                 runtime_dir + WORLD_STATE_RECEIVED_TRIGGER_PATH);
 
-        bool has_sent_world_state_trigger = false;
-
         // Inputs
         // World State Input: Configures the ERForceSimulator
         auto world_state_input = ThreadedProtoUnixListener<TbotsProto::WorldState>(
@@ -142,14 +142,9 @@ int main(int argc, char **argv)
                 std::scoped_lock lock(simulator_mutex);
                 er_force_sim->setWorldState(input);
 
-                if (!has_sent_world_state_trigger)
-                {
-                    auto world_state_received_trigger_msg =
-                        *createWorldStateReceivedTrigger();
-                    world_state_received_trigger.sendProto(
-                        world_state_received_trigger_msg);
-                    has_sent_world_state_trigger = true;
-                }
+                auto world_state_received_trigger_msg =
+                    *createWorldStateReceivedTrigger();
+                world_state_received_trigger.sendProto(world_state_received_trigger_msg);
             });
 
         // World Input: Buffer vision until we have primitives to tick
@@ -19,6 +19,7 @@ from software.logger.logger import create_logger
 
 from software.thunderscope.thunderscope_config import configure_field_test_view
 from software.simulated_tests.tbots_test_runner import TbotsTestRunner
+from software.field_tests.world_telemetry import WorldTelemetry
 from software.thunderscope.robot_communication import RobotCommunication
 from software.thunderscope.estop_helpers import get_estop_config
 from software.py_constants import *
@@ -31,6 +32,10 @@ PAUSE_AFTER_FAIL_DELAY_S = 3
 LAUNCH_DELAY_S = 0.1
 TEST_END_DELAY = 0.3
 
+# Enough worlds to validate every world in order even if validation
+# falls a few seconds behind
+WORLD_BUFFER_SIZE = 500
+
 
 class FieldTestRunner(TbotsTestRunner):
     """Run a field test"""
@@ -62,6 +67,7 @@ class FieldTestRunner(TbotsTestRunner):
             yellow_full_system_proto_unix_io,
             gamecontroller,
             is_yellow_friendly,
+            world_buffer_size=WORLD_BUFFER_SIZE,
         )
         self.publish_validation_protos = publish_validation_protos
         self.is_yellow_friendly = is_yellow_friendly
@@ -108,16 +114,65 @@ class FieldTestRunner(TbotsTestRunner):
         always_validation_sequence_set=[[]],
         eventually_validation_sequence_set=[[]],
         test_timeout_s=3,
+        validate_newest_world_only=False,
     ):
         """Run a test. In a field test this means beginning validation.
 
+        At the end of the test, a summary of how fresh the validated worlds were
+        and how many worlds were not validated is logged.
+
         :param always_validation_sequence_set: Validation functions that should
                                 hold on every tick
         :param eventually_validation_sequence_set: Validation that should
                                 eventually be true, before the test ends
         :param test_timeout_s: The timeout for the test, if any eventually_validations
                                 remain after the timeout, the test fails.
+        :param validate_newest_world_only: If true, only the newest world is validated
+                                and older worlds waiting in the buffer are skipped,
+                                so validation never falls behind. If false, every
+                                world is validated in the order it was received.
         """
+        telemetry = WorldTelemetry()
+        num_worlds_overrun_at_start = self.world_buffer.protos_dropped
+
+        def get_next_world():
+            """Gets the next world to validate, skipping the older worlds in the
+            buffer if only the newest world is validated
+
+            :return: the world to validate
+            """
+            try:
+                world = self.world_buffer.get(
+                    block=True, timeout=WORLD_BUFFER_TIMEOUT, return_cached=False
+                )
+            except queue.Empty:
+                # The same world would be validated again and again, so the
+                # test can't pass or fail on the robots' behaviour anymore
+                raise Exception(
+                    f"No World was received for {WORLD_BUFFER_TIMEOUT} seconds. Ending test early."
+                )
+
+            telemetry.record_received(world)
+
+            if validate_newest_world_only:
+                while (
+                    newer_world := self.world_buffer.get(
+                        block=False, return_cached=False
+                    )
+                ) is not None:
+                    telemetry.record_received(newer_world)
+                    telemetry.record_skipped(world)
+                    world = newer_world
+
+            return world
+
+        def log_telemetry():
+            logger.info(
+                f"World telemetry for {self.test_name}:\n"
+                + telemetry.summary(
+                    self.world_buffer.protos_dropped - num_worlds_overrun_at_start
+                )
+            )
 
         def stop_test(delay):
             time.sleep(delay)
@@ -129,48 +184,44 @@ class FieldTestRunner(TbotsTestRunner):
 
             test_end_time = time.time() + test_timeout_s
 
-            while time.time() < test_end_time:
-                while True:
-                    try:
-                        world = self.world_buffer.get(
-                            block=True, timeout=WORLD_BUFFER_TIMEOUT
-                        )
-                        break
-                    except queue.Empty:
-                        # If we timeout, that means full_system missed the last
-                        # wrapper and robot status, lets resend it.
-                        logger.warning(
-                            f"No World was received for {WORLD_BUFFER_TIMEOUT} seconds. Ending test early."
-                        )
+            try:
+                while time.time() < test_end_time:
+                    world = get_next_world()
+
+                    # Validate
+                    (
+                        eventually_validation_proto_set,
+                        always_validation_proto_set,
+                    ) = validation.run_validation_sequence_sets(
+                        world,
+                        eventually_validation_sequence_set,
+                        always_validation_sequence_set,
+                    )
+                    telemetry.record_validated(world)
 
-                # Validate
-                (
-                    eventually_validation_proto_set,
-                    always_validation_proto_set,
-                ) = validation.run_validation_sequence_sets(
-                    world,
-                    eventually_validation_sequence_set,
-                    always_validation_sequence_set,
-                )
+                    if self.publish_validation_protos:
+                        # Set the test name
+                        eventually_validation_proto_set.test_name = self.test_name
+                        always_validation_proto_set.test_name = self.test_name
 
-                if self.publish_validation_protos:
-                    # Set the test name
-                    eventually_validation_proto_set.test_name = self.test_name
-                    always_validation_proto_set.test_name = self.test_name
+                        # Send out the validation proto to thunderscope
+                        self.blue_full_system_proto_unix_io.send_proto(
+                            ValidationProtoSet, eventually_validation_proto_set
+                        )
+                        self.blue_full_system_proto_unix_io.send_proto(
+                            ValidationProtoSet, always_validation_proto_set
+                        )
 
-                    # Send out the validation proto to thunderscope
-                    self.blue_full_system_proto_unix_io.send_proto(
-                        ValidationProtoSet, eventually_validation_proto_set
-                    )
-                    self.blue_full_system_proto_unix_io.send_proto(
-                        ValidationProtoSet, always_validation_proto_set
-                    )
+                    # Check that all always validations are always valid
+                    validation.check_validation(always_validation_proto_set)
 
-                # Check that all always validations are always valid
-                validation.check_validation(always_validation_proto_set)
+                # Check that all eventually validations are eventually valid
+                validation.check_validation(eventually_validation_proto_set)
+            finally:
+                # Log the telemetry even if validation failed, since stale
+                # worlds can cause validation failures
+                log_telemetry()
 
-            # Check that all eventually validations are eventually valid
-            validation.check_validation(eventually_validation_proto_set)
             stop_test(TEST_END_DELAY)
 
         def excepthook(args):
@@ -431,6 +482,4 @@ def field_test_runner():
             is_yellow_friendly=args.run_yellow,
         )
 
-        friendly_proto_unix_io.register_observer(World, runner.world_buffer)
-
         yield runner
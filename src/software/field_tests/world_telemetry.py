@@ -0,0 +1,133 @@
+import math
+import time
+from typing import Optional
+
+from proto.import_all_protos import *
+
+
+class WorldTelemetry:
+    """Measures how fresh the worlds validated by a field test are, and how many
+    worlds never got validated.
+
+    Every world received by the test runner is recorded, so that worlds lost
+    before reaching the runner can be counted from gaps in the world sequence
+    numbers. Worlds that are validated also record their latency:
+
+    - vision latency: from the vision camera capturing the ball to validation
+    - full system latency: from full system sending the world to validation
+
+    The vision latency compares clocks on the vision computer and this computer,
+    so it is only meaningful if their clocks are synchronized.
+    """
+
+    # Worlds with a vision latency above this are counted as stale
+    STALE_WORLD_THRESHOLD_S = 0.1
+
+    def __init__(self) -> None:
+        """Creates telemetry with nothing recorded"""
+        self.num_worlds_received = 0
+        self.num_worlds_validated = 0
+        self.num_worlds_skipped = 0
+        self.num_worlds_dropped = 0
+        self.num_worlds_out_of_order = 0
+        self.num_stale_worlds = 0
+
+        self.last_sequence_number: Optional[int] = None
+
+        self.vision_latencies_s: list[float] = []
+        self.full_system_latencies_s: list[float] = []
+
+    def record_received(self, world: World) -> None:
+        """Records that the runner received a world
+
+        :param world: the world that was received
+        """
+        self.num_worlds_received += 1
+
+        if not world.HasField("sequence_number"):
+            return
+
+        if self.last_sequence_number is not None:
+            if world.sequence_number <= self.last_sequence_number:
+                self.num_worlds_out_of_order += 1
+                return
+
+            self.num_worlds_dropped += (
+                world.sequence_number - self.last_sequence_number - 1
+            )
+
+        self.last_sequence_number = world.sequence_number
+
+    def record_skipped(self, world: World) -> None:
+        """Records that a received world was not validated because a newer world
+        was available
+
+        :param world: the world that was skipped
+        """
+        self.num_worlds_skipped += 1
+
+    def record_validated(self, world: World) -> None:
+        """Records that a world was validated, measuring its latency
+
+        :param world: the world that was validated
+        """
+        validation_time_s = time.time()
+        self.num_worlds_validated += 1
+
+        full_system_time_s = world.time_sent.epoch_timestamp_seconds
+        if full_system_time_s > 0:
+            self.full_system_latencies_s.append(validation_time_s - full_system_time_s)
+
+        vision_time_s = world.ball.timestamp.epoch_timestamp_seconds
+        if vision_time_s > 0:
+            vision_latency_s = validation_time_s - vision_time_s
+            self.vision_latencies_s.append(vision_latency_s)
+
+            if vision_latency_s > WorldTelemetry.STALE_WORLD_THRESHOLD_S:
+                self.num_stale_worlds += 1
+
+    def summary(self, num_worlds_overrun: int = 0) -> str:
+        """Returns a human readable summary of the recorded telemetry
+
+        :param num_worlds_overrun: the number of worlds dropped because the
+                                   runner's world buffer was full
+        :return: the summary
+        """
+        lines = [
+            f"Worlds received: {self.num_worlds_received}, "
+            f"validated: {self.num_worlds_validated}, "
+            f"skipped for a newer world: {self.num_worlds_skipped}",
+            f"Worlds dropped: {self.num_worlds_dropped} (sequence gaps), "
+            f"{num_worlds_overrun} (world buffer full), "
+            f"out of order: {self.num_worlds_out_of_order}",
+            self.__latency_summary("Vision latency", self.vision_latencies_s),
+            self.__latency_summary("Full system latency", self.full_system_latencies_s),
+            f"Stale worlds (vision latency > "
+            f"{WorldTelemetry.STALE_WORLD_THRESHOLD_S * 1000:.0f} ms): "
+            f"{self.num_stale_worlds}",
+        ]
+        return "\n".join(lines)
+
+    @staticmethod
+    def __latency_summary(name: str, latencies_s: list[float]) -> str:
+        """Returns a one line summary of the distribution of the given latencies
+
+        :param name: the name of the latency
+        :param latencies_s: the latencies in seconds
+        :return: the summary
+        """
+        if not latencies_s:
+            return f"{name}: no samples"
+
+        sorted_latencies_s = sorted(latencies_s)
+
+        def percentile_ms(percentile: float) -> float:
+            index = math.ceil(percentile / 100 * len(sorted_latencies_s)) - 1
+            return sorted_latencies_s[max(index, 0)] * 1000
+
+        return (
+            f"{name}: p50 {percentile_ms(50):.1f} ms, "
+            f"p95 {percentile_ms(95):.1f} ms, "
+            f"p99 {percentile_ms(99):.1f} ms, "
+            f"max {sorted_latencies_s[-1] * 1000:.1f} ms"
+        )
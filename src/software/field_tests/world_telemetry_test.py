@@ -0,0 +1,137 @@
+"""Tests for the WorldTelemetry recorded by field tests.
+
+Worlds are validated at a fixed time, so the latencies of the validated worlds are known exactly.
+"""
+
+import pytest
+
+from proto.import_all_protos import *
+from software.field_tests import world_telemetry
+from software.field_tests.world_telemetry import WorldTelemetry
+from software.simulated_tests.simulated_test_fixture import pytest_main
+
+# The time worlds are validated at
+VALIDATION_TIME_S = 1000.0
+
+
+@pytest.fixture
+def telemetry(monkeypatch) -> WorldTelemetry:
+    """Telemetry with nothing recorded, validating worlds at VALIDATION_TIME_S"""
+    monkeypatch.setattr(world_telemetry.time, "time", lambda: VALIDATION_TIME_S)
+    return WorldTelemetry()
+
+
+def create_world(
+    sequence_number: int = None,
+    time_sent_s: float = 0.0,
+    ball_timestamp_s: float = 0.0,
+) -> World:
+    """Creates a world with the fields the telemetry reads
+
+    :param sequence_number: the sequence number of the world, or None to leave it unset
+    :param time_sent_s: the time full system sent the world, 0 if unknown
+    :param ball_timestamp_s: the time vision captured the ball, 0 if unknown
+    :return: the world
+    """
+    world = World()
+    if sequence_number is not None:
+        world.sequence_number = sequence_number
+    world.time_sent.epoch_timestamp_seconds = time_sent_s
+    world.ball.timestamp.epoch_timestamp_seconds = ball_timestamp_s
+    return world
+
+
+def test_sequence_gaps_counted_as_dropped(telemetry):
+    for sequence_number in [1, 2, 5, 6, 10]:
+        telemetry.record_received(create_world(sequence_number))
+
+    assert telemetry.num_worlds_received == 5
+    assert telemetry.num_worlds_dropped == 2 + 3
+    assert telemetry.num_worlds_out_of_order == 0
+
+
+def test_out_of_order_worlds_not_counted_as_dropped(telemetry):
+    for sequence_number in [1, 4, 3, 4, 5]:
+        telemetry.record_received(create_world(sequence_number))
+
+    # The gap before 4 is counted when 4 arrives, and isn't undone by 3
+    assert telemetry.num_worlds_dropped == 2
+    assert telemetry.num_worlds_out_of_order == 2
+
+
+def test_worlds_without_sequence_numbers_not_counted_as_dropped(telemetry):
+    telemetry.record_received(create_world(1))
+    telemetry.record_received(create_world())
+    telemetry.record_received(create_world(2))
+
+    assert telemetry.num_worlds_received == 3
+    assert telemetry.num_worlds_dropped == 0
+    assert telemetry.num_worlds_out_of_order == 0
+
+
+def test_skipped_worlds_counted(telemetry):
+    worlds = [create_world(sequence_number) for sequence_number in range(3)]
+    for world in worlds:
+        telemetry.record_received(world)
+
+    telemetry.record_skipped(worlds[0])
+    telemetry.record_skipped(worlds[1])
+    telemetry.record_validated(worlds[2])
+
+    assert telemetry.num_worlds_skipped == 2
+    assert telemetry.num_worlds_validated == 1
+
+
+def test_latencies_measured_from_world_timestamps(telemetry):
+    telemetry.record_validated(
+        create_world(
+            time_sent_s=VALIDATION_TIME_S - 0.01,
+            ball_timestamp_s=VALIDATION_TIME_S - 0.05,
+        )
+    )
+
+    assert telemetry.full_system_latencies_s == [pytest.approx(0.01)]
+    assert telemetry.vision_latencies_s == [pytest.approx(0.05)]
+    assert telemetry.num_stale_worlds == 0
+
+
+def test_unknown_timestamps_not_measured(telemetry):
+    telemetry.record_validated(create_world())
+
+    assert telemetry.num_worlds_validated == 1
+    assert telemetry.full_system_latencies_s == []
+    assert telemetry.vision_latencies_s == []
+    assert telemetry.num_stale_worlds == 0
+
+
+def test_stale_worlds_counted(telemetry):
+    for vision_latency_s in [0.05, 0.099, 0.101, 0.5]:
+        telemetry.record_validated(
+            create_world(ball_timestamp_s=VALIDATION_TIME_S - vision_latency_s)
+        )
+
+    assert telemetry.num_stale_worlds == 2
+
+
+def test_summary(telemetry):
+    for latency_ms in range(100):
+        world = create_world(
+            sequence_number=latency_ms + 1,
+            ball_timestamp_s=VALIDATION_TIME_S - latency_ms / 1000,
+        )
+        telemetry.record_received(world)
+        telemetry.record_validated(world)
+
+    summary = telemetry.summary(num_worlds_overrun=7).splitlines()
+
+    assert summary == [
+        "Worlds received: 100, validated: 100, skipped for a newer world: 0",
+        "Worlds dropped: 0 (sequence gaps), 7 (world buffer full), out of order: 0",
+        "Vision latency: p50 49.0 ms, p95 94.0 ms, p99 98.0 ms, max 99.0 ms",
+        "Full system latency: no samples",
+        "Stale worlds (vision latency > 100 ms): 0",
+    ]
+
+
+if __name__ == "__main__":
+    pytest_main(__file__)
@@ -20,18 +20,12 @@ ProtoLogger::ProtoLogger(const std::string& log_path,
     : log_path_(log_path),
       time_provider_(time_provider),
       friendly_colour_yellow_(friendly_colour_yellow),
+      log_number_(0),
       stop_logging_(false),
       buffer_(PROTOBUF_BUFFER_SIZE, true)
 {
     start_time_ = time_provider_();
-
-    // Create a folder for the logs with the formatted current time
-    std::time_t t = std::time(nullptr);
-    std::tm tm    = *std::localtime(&t);
-    std::stringstream ss;
-    ss << std::put_time(&tm, REPLAY_FILE_TIME_FORMAT.data());
-    log_folder_ = log_path_ + "/" + REPLAY_FILE_PREFIX + ss.str() + "/";
-    std::experimental::filesystem::create_directories(log_folder_);
+    createLogFolder();
 
     // Start logging in a separate thread
     log_thread_ = std::thread(&ProtoLogger::logProtobufs, this);
@@ -48,16 +42,52 @@ void ProtoLogger::saveSerializedProto(const std::string& protobuf_type_full_name
     buffer_.push({
         .protobuf_type_full_name = protobuf_type_full_name,
         .serialized_proto        = serialized_proto,
-        .receive_time_sec        = time_provider_() - start_time_,
+        .receive_time_sec        = time_provider_(),
+        .log_number              = log_number_.load(),
     });
 }
 
+void ProtoLogger::startNewLog(const std::string& log_path)
+{
+    std::scoped_lock lock(new_log_path_mutex_);
+    new_log_path_ = log_path;
+    log_number_++;
+}
+
+void ProtoLogger::createLogFolder()
+{
+    // Create a folder for the logs with the formatted current time
+    std::time_t t = std::time(nullptr);
+    std::tm tm    = *std::localtime(&t);
+    std::stringstream ss;
+    ss << std::put_time(&tm, REPLAY_FILE_TIME_FORMAT.data());
+    log_folder_ = log_path_ + "/" + REPLAY_FILE_PREFIX + ss.str() + "/";
+    std::experimental::filesystem::create_directories(log_folder_);
+}
+
 void ProtoLogger::logProtobufs()
 {
-    unsigned int replay_index = 0;
+    unsigned int replay_index       = 0;
+    unsigned int current_log_number = 0;
+
+    // The first protobuf of a new log, taken from the buffer while writing the
+    // previous log
+    std::optional<SerializedProtoLog> new_log_first_proto;
 
     while (!shouldStopLogging())
     {
+        if (new_log_first_proto.has_value())
+        {
+            {
+                std::scoped_lock lock(new_log_path_mutex_);
+                log_path_ = new_log_path_;
+            }
+            createLogFolder();
+            start_time_        = new_log_first_proto->receive_time_sec;
+            current_log_number = new_log_first_proto->log_number;
+            replay_index       = 0;
+        }
+
         std::string log_file_path =
             log_folder_ + std::to_string(replay_index) + "." + REPLAY_FILE_EXTENSION;
 
@@ -83,6 +113,12 @@ void ProtoLogger::logProtobufs()
                       << log_file_path << std::endl;
         }
 
+        if (new_log_first_proto.has_value())
+        {
+            writeLogEntry(gz_file, log_file_path, new_log_first_proto.value());
+            new_log_first_proto.reset();
+        }
+
         while (!shouldStopLogging())
         {
             auto serialized_proto_opt =
@@ -93,31 +129,15 @@ void ProtoLogger::logProtobufs()
                 continue;
             }
 
-            const auto& [proto_full_name, serialized_proto, receive_time_sec] =
-                serialized_proto_opt.value();
-
-            // Write the log entry to the file with the format:
-            std::string log_entry =
-                createLogEntry(proto_full_name, serialized_proto, receive_time_sec);
-            num_bytes_written = gzwrite(gz_file, log_entry.c_str(),
-                                        static_cast<unsigned>(log_entry.size()));
-
-            // Check if write was successful
-            if (num_bytes_written != static_cast<int>(log_entry.size()))
+            // Protobufs saved after a new log was started belong to the new log
+            if (serialized_proto_opt->log_number != current_log_number)
             {
-                // Only log every FAILED_LOG_PRINT_FREQUENCY times to avoid
-                // spamming the console if the error persists.
-                if (failed_logs_frequency_counter_ == 0)
-                {
-                    std::cerr << "ProtoLogger: Failed to write " << proto_full_name
-                              << " to log file: " << log_file_path << " "
-                              << std::to_string(failed_logs_frequency_counter_)
-                              << " times" << std::endl;
-                }
-                failed_logs_frequency_counter_ =
-                    (failed_logs_frequency_counter_ + 1) % FAILED_LOG_PRINT_FREQUENCY;
+                new_log_first_proto = serialized_proto_opt;
+                break;
             }
 
+            writeLogEntry(gz_file, log_file_path, serialized_proto_opt.value());
+
             // Limit the size of each replay chunk
             if (gzoffset(gz_file) > REPLAY_MAX_CHUNK_SIZE_BYTES)
             {
@@ -135,6 +155,35 @@ void ProtoLogger::logProtobufs()
     }
 }
 
+void ProtoLogger::writeLogEntry(gzFile gz_file, const std::string& log_file_path,
+                                const SerializedProtoLog& serialized_proto_log)
+{
+    const std::string& proto_full_name = serialized_proto_log.protobuf_type_full_name;
+
+    // Write the log entry to the file with the format:
+    std::string log_entry =
+        createLogEntry(proto_full_name, serialized_proto_log.serialized_proto,
+                       serialized_proto_log.receive_time_sec - start_time_);
+    int num_bytes_written =
+        gzwrite(gz_file, log_entry.c_str(), static_cast<unsigned>(log_entry.size()));
+
+    // Check if write was successful
+    if (num_bytes_written != static_cast<int>(log_entry.size()))
+    {
+        // Only log every FAILED_LOG_PRINT_FREQUENCY times to avoid
+        // spamming the console if the error persists.
+        if (failed_logs_frequency_counter_ == 0)
+        {
+            std::cerr << "ProtoLogger: Failed to write " << proto_full_name
+                      << " to log file: " << log_file_path << " "
+                      << std::to_string(failed_logs_frequency_counter_) << " times"
+                      << std::endl;
+        }
+        failed_logs_frequency_counter_ =
+            (failed_logs_frequency_counter_ + 1) % FAILED_LOG_PRINT_FREQUENCY;
+    }
+}
+
 std::string ProtoLogger::createLogEntry(const std::string& proto_full_name,
                                         const std::string& serialized_proto,
                                         const double receive_time_sec)
@@ -1,8 +1,11 @@
 #pragma once
 
 #include <google/protobuf/message.h>
+#include <zlib.h>
 
+#include <atomic>
 #include <functional>
+#include <mutex>
 #include <string>
 #include <thread>
 
@@ -41,6 +44,8 @@ class ProtoLogger
         std::string protobuf_type_full_name;
         std::string serialized_proto;
         double receive_time_sec;
+        // The number of new logs started before the protobuf was saved
+        unsigned int log_number;
     };
 
    public:
@@ -96,6 +101,15 @@ class ProtoLogger
      */
     void updateTimeProvider(std::function<double()> time_provider);
 
+    /**
+     * Starts a new log in a new folder under the given directory. Protobufs saved
+     * before this is called are still written to the current log, and protobufs
+     * saved after it are written to the new log.
+     *
+     * @param log_path The path to the directory where the new log will be saved
+     */
+    void startNewLog(const std::string& log_path);
+
     /**
      * Flushes the buffer and stops the logging thread.
      *
@@ -130,6 +144,20 @@ class ProtoLogger
      */
     bool shouldStopLogging() const;
 
+    /**
+     * Creates a folder for a new log under log_path_, named after the current time
+     */
+    void createLogFolder();
+
+    /**
+     * Writes a log entry to the current log file
+     * @param gz_file The current log file
+     * @param log_file_path The path to the current log file
+     * @param serialized_proto_log The protobuf to write
+     */
+    void writeLogEntry(gzFile gz_file, const std::string& log_file_path,
+                       const SerializedProtoLog& serialized_proto_log);
+
     std::string log_path_;
     std::string log_folder_;
     std::function<double()> time_provider_;
@@ -137,6 +165,12 @@ class ProtoLogger
     bool friendly_colour_yellow_;
     unsigned int failed_logs_frequency_counter_ = 0;
 
+    // The number of new logs started by startNewLog, and the directory of the
+    // latest one
+    std::atomic<unsigned int> log_number_;
+    std::mutex new_log_path_mutex_;
+    std::string new_log_path_;
+
     std::thread log_thread_;
     std::atomic<bool> stop_logging_;
     double destructor_called_time_sec_;
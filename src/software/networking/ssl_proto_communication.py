@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import socket
+from typing import Iterator
+
 import google.protobuf.internal.encoder as encoder
-import google.protobuf.internal.decoder as decoder
 import google.protobuf.message as protobuf_message
 
 
@@ -14,8 +15,10 @@ class SslSocket:
     """The SSL Socket class is responsible for communication with SSL protos from SSL binaries. The encoding that SSL uses
     is slightly different from our encoding when we send protobufs between different processes (and robots).
 
-    Each SSL Proto message is preceded by an uvarint containing the message size in bytes, so we must read a certain
-    buffered amount, and then read the rest of the message as necessary.
+    Each SSL Proto message is preceded by an uvarint containing the message size in bytes. Since TCP is a stream, a
+    single recv can return any number of complete messages followed by a partial one, so we keep a persistent receive
+    buffer and only hand out a message once all of its bytes have arrived. The buffer is filled in place with
+    recv_into and messages are parsed straight out of a memoryview, so no bytes objects are created per read.
 
     Encoding details can be seen here:
     https://github.com/RoboCup-SSL/ssl-game-controller/blob/master/cmd/ssl-auto-ref-client/README.md
@@ -23,22 +26,45 @@ class SslSocket:
 
     RECEIVE_BUFFER_SIZE = 9000
 
-    def __init__(self, port: int) -> None:
+    # A uvarint32 is encoded in at most 5 bytes
+    MAX_VARINT32_BYTES = 5
+
+    def __init__(self, port: int, blocking: bool = True) -> None:
         """Open a TCP socket with the given port, to communicate with other processes. It binds the socket to INADDR_ANY
         which binds the socket to all local interfaces, meaning that it will listen to traffic on the specified port on
         ethernet, wifi,...
 
         :param port the port to bind to
+        :param blocking true to block in receive until a message arrives, false to only return messages that are
+                        already available. In non-blocking mode, the socket can be passed to select() through fileno()
         """
         try:
             # bind to all local interfaces, TCP
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.socket.connect(("", port))
         except ConnectionRefusedError:
+            self.socket.close()
             raise ConnectionRefusedError(
                 f"SSL Socket connection refused on port {port}. Is binary already running in a separate process?"
             )
 
+        self.blocking = blocking
+        self.socket.setblocking(blocking)
+
+        # Bytes in [read_offset, write_offset) have been received but not yet consumed as a message
+        self.receive_buffer = bytearray(SslSocket.RECEIVE_BUFFER_SIZE)
+        self.receive_buffer_view = memoryview(self.receive_buffer)
+        self.read_offset = 0
+        self.write_offset = 0
+        self.connection_closed = False
+
+    def fileno(self) -> int:
+        """Returns the file descriptor of the underlying socket, so that this object can be used with select()
+
+        :return: the socket file descriptor
+        """
+        return self.socket.fileno()
+
     def send(self, proto: protobuf_message.Message) -> None:
         """Send the proto through the socket.
 
@@ -51,12 +77,16 @@ class SslSocket:
         size = proto.ByteSize()
 
         # Send a request to the host with the size of the message
-        self.socket.send(encoder._VarintBytes(size) + proto.SerializeToString())
+        self.socket.sendall(encoder._VarintBytes(size) + proto.SerializeToString())
 
     def receive(
         self, proto_type: type[protobuf_message.Message]
     ) -> list[protobuf_message.Message]:
-        """Receives proto(s) on the socket and returns them, given the proto type to expect. This function is blocking
+        """Receives proto(s) on the socket and returns them, given the proto type to expect.
+
+        In blocking mode, this blocks until at least one complete message has been received (or the connection is
+        closed), then returns every complete message that is buffered. In non-blocking mode, this returns the complete
+        messages that are available right now, which may be none.
 
         :param proto_type the proto type to parse received data as
 
@@ -65,27 +95,124 @@ class SslSocket:
         :raises TypeError:                      if the given proto_type isn't a known proto type
         :raises SslSocketProtoParseException:   if the received data from the socket isn't parseable as the given proto
         """
+        self.__check_proto_type(proto_type)
+
         responses = list()
 
+        while not responses:
+            responses.extend(self.__parse_buffered_messages(proto_type))
+
+            if responses or not self.__fill_receive_buffer():
+                break
+
+        # Drain anything else that has already arrived without blocking again
+        responses.extend(self.__parse_buffered_messages(proto_type))
+
+        return responses
+
+    def receive_iter(
+        self, proto_type: type[protobuf_message.Message]
+    ) -> Iterator[protobuf_message.Message]:
+        """Generator that yields protos of the given type as soon as each one has been fully received.
+
+        In blocking mode, the generator runs until the connection is closed. In non-blocking mode, it stops once no
+        more complete messages can be read without blocking.
+
+        :param proto_type the proto type to parse received data as
+
+        :return: an iterator over the received protos
+
+        :raises TypeError:                      if the given proto_type isn't a known proto type
+        :raises SslSocketProtoParseException:   if the received data from the socket isn't parseable as the given proto
+        """
+        self.__check_proto_type(proto_type)
+
+        while True:
+            yield from self.__parse_buffered_messages(proto_type)
+
+            if not self.__fill_receive_buffer():
+                return
+
+    def close(self) -> None:
+        """Closes the socket associated with this object."""
+        self.receive_buffer_view.release()
+        self.socket.close()
+
+    @staticmethod
+    def __check_proto_type(proto_type: type[protobuf_message.Message]) -> None:
+        """Checks that the given proto type can be instantiated
+
+        :param proto_type the proto type to check
+
+        :raises TypeError: if the given proto_type isn't a known proto type
+        """
         try:
             proto_type()
         except NameError:
             raise TypeError(f"Unknown proto type: '{proto_type}'")
 
-        response_data = self.socket.recv(SslSocket.RECEIVE_BUFFER_SIZE)
+    def __decode_varint(self, offset: int) -> tuple[int, int] | None:
+        """Decodes the uvarint32 size prefix starting at the given offset in the receive buffer
 
-        offset = 0
-        while offset < len(response_data):
-            msg_len, new_pos = decoder._DecodeVarint32(response_data, offset)
-            offset = new_pos
-            ci_output = proto_type()
+        :param offset the offset of the first byte of the varint
+
+        :return: a tuple of the decoded value and the offset right after the varint, or None if the varint hasn't
+                 been fully received yet
+
+        :raises SslSocketProtoParseException: if the varint is longer than a uvarint32 can be
+        """
+        result = 0
+        shift = 0
+        position = offset
 
-            # we didn't receive enough data to parse this message, to get more
-            if offset + msg_len > len(response_data):
-                response_data += self.socket.recv(offset + msg_len - len(response_data))
+        while position < self.write_offset:
+            byte = self.receive_buffer[position]
+            result |= (byte & 0x7F) << shift
+            position += 1
+
+            if not byte & 0x80:
+                return result, position
+
+            shift += 7
+            if position - offset >= SslSocket.MAX_VARINT32_BYTES:
+                raise SslSocketProtoParseException(
+                    "Error parsing proto: message size prefix is too long"
+                )
+
+        return None
+
+    def __parse_buffered_messages(
+        self, proto_type: type[protobuf_message.Message]
+    ) -> Iterator[protobuf_message.Message]:
+        """Yields every complete message currently in the receive buffer, consuming it from the buffer.
+
+        A message is consumed before it is parsed, so a message that fails to parse is dropped and the stream stays
+        aligned on the next size prefix.
+
+        :param proto_type the proto type to parse received data as
+
+        :return: an iterator over the complete messages in the buffer
+
+        :raises SslSocketProtoParseException: if a buffered message isn't parseable as the given proto
+        """
+        while self.read_offset < self.write_offset:
+            decoded = self.__decode_varint(self.read_offset)
+            if decoded is None:
+                return
+
+            msg_len, msg_start = decoded
+            msg_end = msg_start + msg_len
+
+            # we haven't received this whole message yet
+            if msg_end > self.write_offset:
+                self.__reserve(msg_end - self.read_offset)
+                return
+
+            self.read_offset = msg_end
+            ci_output = proto_type()
 
             try:
-                ci_output.ParseFromString(response_data[offset : offset + msg_len])
+                ci_output.ParseFromString(self.receive_buffer_view[msg_start:msg_end])
             except protobuf_message.DecodeError as err:
                 raise SslSocketProtoParseException(
                     "Error parsing proto: {}".format(err)
@@ -96,11 +223,64 @@ class SslSocket:
                     f"Improper proto of type '{proto_type}' parsed"
                 )
 
-            offset += msg_len
-            responses.append(ci_output)
+            yield ci_output
 
-        return responses
+        # Everything was consumed, so the next read can start at the front of the buffer
+        self.read_offset = 0
+        self.write_offset = 0
 
-    def close(self) -> None:
-        """Closes the socket associated with this object."""
-        self.socket.close()
+    def __reserve(self, num_bytes: int) -> None:
+        """Makes sure that a message of the given total size (including its size prefix) fits in the receive buffer
+        starting at the read offset, by moving the unconsumed bytes to the front of the buffer and growing it if needed
+
+        :param num_bytes the number of bytes needed from the read offset onwards
+        """
+        if self.read_offset + num_bytes <= len(self.receive_buffer):
+            return
+
+        unconsumed = self.write_offset - self.read_offset
+        self.receive_buffer_view[:unconsumed] = self.receive_buffer_view[
+            self.read_offset : self.write_offset
+        ]
+        self.read_offset = 0
+        self.write_offset = unconsumed
+
+        if num_bytes > len(self.receive_buffer):
+            # The buffer can't be resized while a memoryview of it exists
+            self.receive_buffer_view.release()
+            self.receive_buffer.extend(
+                bytes(
+                    max(
+                        num_bytes - len(self.receive_buffer),
+                        SslSocket.RECEIVE_BUFFER_SIZE,
+                    )
+                )
+            )
+            self.receive_buffer_view = memoryview(self.receive_buffer)
+
+    def __fill_receive_buffer(self) -> bool:
+        """Receives as many bytes as are available and fit into the free space at the end of the receive buffer.
+        In blocking mode, this waits until at least one byte arrives.
+
+        :return: True if any bytes were received, False if the connection was closed or, in non-blocking mode, if no
+                 data is available right now
+        """
+        if self.connection_closed:
+            return False
+
+        if self.write_offset == len(self.receive_buffer):
+            self.__reserve(self.write_offset - self.read_offset + 1)
+
+        try:
+            num_received = self.socket.recv_into(
+                self.receive_buffer_view[self.write_offset :]
+            )
+        except BlockingIOError:
+            return False
+
+        if num_received == 0:
+            self.connection_closed = True
+            return False
+
+        self.write_offset += num_received
+        return True
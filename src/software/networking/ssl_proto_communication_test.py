@@ -0,0 +1,105 @@
+"""Tests for the varint-delimited framing done by the SslSocket.
+
+A TCP stream can split a message across any number of reads, or deliver several messages in one read, so these tests
+write delimited messages from a local server in arbitrarily sized pieces and check that the SslSocket hands back
+exactly the messages that were sent.
+"""
+
+import socket
+import threading
+
+import google.protobuf.internal.encoder as encoder
+from proto.ssl_gc_common_pb2 import RobotId
+from proto.ssl_gc_state_pb2 import TeamInfo
+from software.networking.ssl_proto_communication import SslSocket
+from software.simulated_tests.simulated_test_fixture import pytest_main
+
+
+def create_server() -> socket.socket:
+    """Creates a local TCP server on a free port for the SslSocket to connect to
+
+    :return: the listening server socket
+    """
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("", 0))
+    server.listen(1)
+    return server
+
+
+def delimit(protos: list) -> bytes:
+    """Encodes the given protos the same way the SSL binaries do
+
+    :param protos: the protos to encode
+    :return: the size-prefixed serialized protos
+    """
+    return b"".join(
+        encoder._VarintBytes(proto.ByteSize()) + proto.SerializeToString()
+        for proto in protos
+    )
+
+
+def send_in_pieces(server: socket.socket, data: bytes, piece_size: int) -> None:
+    """Accepts one connection and writes the data to it piece_size bytes at a time, then closes the connection
+
+    :param server: the listening server socket
+    :param data: the data to write
+    :param piece_size: the number of bytes to write per send
+    """
+    connection, _ = server.accept()
+    with connection:
+        for offset in range(0, len(data), piece_size):
+            connection.sendall(data[offset : offset + piece_size])
+
+
+def test_messages_split_across_reads():
+    protos = [RobotId(id=id) for id in range(100)]
+    server = create_server()
+
+    writer = threading.Thread(
+        target=send_in_pieces, args=(server, delimit(protos), 1), daemon=True
+    )
+    writer.start()
+
+    ssl_socket = SslSocket(server.getsockname()[1])
+    received = list(ssl_socket.receive_iter(RobotId))
+
+    writer.join()
+    ssl_socket.close()
+    server.close()
+
+    assert received == protos
+
+
+def test_message_larger_than_receive_buffer():
+    proto = TeamInfo(name="a" * (3 * SslSocket.RECEIVE_BUFFER_SIZE))
+    server = create_server()
+
+    writer = threading.Thread(
+        target=send_in_pieces, args=(server, delimit([proto, proto]), 1000), daemon=True
+    )
+    writer.start()
+
+    ssl_socket = SslSocket(server.getsockname()[1])
+    received = list(ssl_socket.receive_iter(TeamInfo))
+
+    writer.join()
+    ssl_socket.close()
+    server.close()
+
+    assert received == [proto, proto]
+
+
+def test_non_blocking_receive_returns_without_data():
+    server = create_server()
+    ssl_socket = SslSocket(server.getsockname()[1], blocking=False)
+    connection, _ = server.accept()
+
+    assert ssl_socket.receive(RobotId) == []
+
+    connection.close()
+    ssl_socket.close()
+    server.close()
+
+
+if __name__ == "__main__":
+    pytest_main(__file__)
@@ -0,0 +1,229 @@
+import atexit
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Optional
+
+# Environment variable that turns on tracing of the instrumented Python code.
+# Set it to "tracy" to send zones to the Tracy profiler (requires the Tracy
+# Python bindings, tracy_client), or to a path to write a Chrome trace JSON file
+# that can be opened in Perfetto (https://ui.perfetto.dev) or chrome://tracing.
+TRACE_ENVIRONMENT_VARIABLE = "TBOTS_PYTHON_TRACE"
+
+
+class Tracer:
+    """Records timed zones and counters from Python code, so that the time
+    spent in Python threads, such as Thunderscope's, can be seen on a timeline
+    next to the C++ binaries profiled with Tracy.
+
+    Zones are recorded with the `zone` context manager or the `traced`
+    decorator, and counters with `counter`. Tracing is decided when the tracer
+    is created, from TRACE_ENVIRONMENT_VARIABLE. While tracing is disabled,
+    `traced` returns the function undecorated and `zone` returns a shared no-op
+    context manager, so the instrumentation can be left in hot paths.
+
+    Zones are sent to Tracy if it was requested and the Tracy Python bindings
+    are installed. Otherwise, they are written to a Chrome trace file.
+    """
+
+    # Number of events buffered before they are written to the trace file
+    EVENTS_PER_WRITE = 1000
+
+    DEFAULT_TRACE_PATH = "/tmp/tbots/python_trace.json"
+
+    def __init__(self, trace_setting: Optional[str] = None) -> None:
+        """Creates a tracer
+
+        :param trace_setting: "tracy" to trace to Tracy, a path to trace to a
+                              Chrome trace file, or None to disable tracing
+        """
+        self.enabled = False
+        self.tracy = None
+
+        self.trace_file = None
+        self.events: list[dict[str, Any]] = []
+        self.named_thread_ids: set[int] = set()
+        self.lock = threading.Lock()
+
+        if trace_setting == "tracy":
+            try:
+                import tracy_client
+
+                self.tracy = tracy_client
+                self.plot_ids: dict[str, int] = {}
+            except ImportError:
+                logging.warning(
+                    "Tracy Python bindings not found, writing the Python trace "
+                    f"to {Tracer.DEFAULT_TRACE_PATH} instead"
+                )
+                trace_setting = Tracer.DEFAULT_TRACE_PATH
+
+        if self.tracy is None and trace_setting:
+            try:
+                os.makedirs(os.path.dirname(trace_setting) or ".", exist_ok=True)
+                self.trace_file = open(trace_setting, "w")
+            except OSError as e:
+                logging.warning(
+                    f"Could not open Python trace file {trace_setting}: {e}"
+                )
+                return
+
+            # The closing bracket is optional in the Chrome trace format, so the
+            # trace can still be loaded if we exit without closing it
+            self.trace_file.write("[\n")
+            atexit.register(self.close)
+
+        self.enabled = self.tracy is not None or self.trace_file is not None
+
+    def zone(self, name: str) -> ContextManager:
+        """Returns a context manager that records the enclosed code as a zone
+
+        :param name: the name of the zone
+        :return: the context manager
+        """
+        if not self.enabled:
+            return _NULL_ZONE
+
+        if self.tracy is not None:
+            return self.tracy.ScopedZone(name=name)
+
+        return _ChromeTraceZone(self, name)
+
+    def traced(self, name: Optional[str] = None) -> Callable[[Callable], Callable]:
+        """Decorator that records every call to the decorated function as a zone
+
+        :param name: the name of the zone, defaults to the function's qualified name
+        :return: the decorator
+        """
+
+        def decorator(func: Callable) -> Callable:
+            if not self.enabled:
+                return func
+
+            zone_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.zone(zone_name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def counter(self, name: str, value: float) -> None:
+        """Records the value of a counter, shown as a graph over time
+
+        :param name: the name of the counter
+        :param value: the value of the counter
+        """
+        if not self.enabled:
+            return
+
+        if self.tracy is not None:
+            if name not in self.plot_ids:
+                self.plot_ids[name] = self.tracy.plot_config(name)
+            self.tracy.plot(self.plot_ids[name], value)
+            return
+
+        self.record_event(
+            {"name": name, "ph": "C", "ts": _now_us(), "args": {name: value}}
+        )
+
+    def record_event(self, event: dict[str, Any]) -> None:
+        """Adds an event to the Chrome trace, tagged with the current thread
+
+        :param event: the Chrome trace event
+        """
+        thread_id = threading.get_ident()
+        event["pid"] = os.getpid()
+        event["tid"] = thread_id
+
+        with self.lock:
+            if thread_id not in self.named_thread_ids:
+                self.named_thread_ids.add(thread_id)
+                self.events.append(
+                    {
+                        "name": "thread_name",
+                        "ph": "M",
+                        "pid": event["pid"],
+                        "tid": thread_id,
+                        "args": {"name": threading.current_thread().name},
+                    }
+                )
+
+            self.events.append(event)
+
+            if len(self.events) >= Tracer.EVENTS_PER_WRITE:
+                self.__write_events()
+
+    def close(self) -> None:
+        """Writes any buffered events and closes the trace file"""
+        with self.lock:
+            if self.trace_file is None:
+                return
+
+            self.__write_events()
+            self.trace_file.write("{}]\n")
+            self.trace_file.close()
+            self.trace_file = None
+            self.enabled = False
+
+    def __write_events(self) -> None:
+        """Writes the buffered events to the trace file. The lock must be held
+        by the caller.
+        """
+        if self.trace_file is not None:
+            self.trace_file.writelines(
+                json.dumps(event) + ",\n" for event in self.events
+            )
+
+        self.events.clear()
+
+
+class _ChromeTraceZone:
+    """Records the time spent in a with block as a Chrome trace complete event"""
+
+    __slots__ = ("tracer", "name", "start_us")
+
+    def __init__(self, tracer: Tracer, name: str) -> None:
+        """Creates the zone
+
+        :param tracer: the tracer to record the zone to
+        :param name: the name of the zone
+        """
+        self.tracer = tracer
+        self.name = name
+        self.start_us = 0.0
+
+    def __enter__(self) -> None:
+        self.start_us = _now_us()
+
+    def __exit__(self, type, value, traceback) -> None:
+        self.tracer.record_event(
+            {
+                "name": self.name,
+                "ph": "X",
+                "ts": self.start_us,
+                "dur": _now_us() - self.start_us,
+            }
+        )
+
+
+def _now_us() -> float:
+    """Returns the time on the monotonic clock in microseconds, the unit of
+    timestamps in the Chrome trace format
+
+    :return: the current time in microseconds
+    """
+    return time.monotonic_ns() / 1000
+
+
+_NULL_ZONE = nullcontext()
+
+# The tracer shared by all the instrumented code
+tracer = Tracer(os.environ.get(TRACE_ENVIRONMENT_VARIABLE))
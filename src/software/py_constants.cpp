@@ -65,12 +65,14 @@ PYBIND11_MODULE(py_constants, m)
     m.attr("ROBOT_LOG_PATH")            = ROBOT_LOG_PATH;
     m.attr("ROBOT_CRASH_PATH")          = ROBOT_CRASH_PATH;
     m.attr("REPLAY_BOOKMARK_PATH")      = REPLAY_BOOKMARK_PATH;
+    m.attr("START_REPLAY_LOG_PATH")     = START_REPLAY_LOG_PATH;
     m.attr("UNIX_BUFFER_SIZE")          = UNIX_BUFFER_SIZE;
     m.attr("DYNAMIC_PARAMETER_UPDATE_REQUEST_PATH") =
         DYNAMIC_PARAMETER_UPDATE_REQUEST_PATH;
     m.attr("DYNAMIC_PARAMETER_UPDATE_RESPONSE_PATH") =
         DYNAMIC_PARAMETER_UPDATE_RESPONSE_PATH;
     m.attr("WORLD_STATE_RECEIVED_TRIGGER_PATH") = WORLD_STATE_RECEIVED_TRIGGER_PATH;
+    m.attr("ROBOT_LINK_STATISTICS_PATH")        = ROBOT_LINK_STATISTICS_PATH;
 
     // Multicast Channels
     m.def("getRobotMulticastChannel",
@@ -1,5 +1,6 @@
 #include <pybind11/embed.h>
 #include <pybind11/functional.h>
+#include <pybind11/numpy.h>
 #include <pybind11/operators.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
@@ -71,7 +72,7 @@ void declareThreadedProtoUdpSender(py::module& m, std::string name)
         .def("get_interface", &Class::getInterface)
         .def("get_ip_address", &Class::getIpAddress)
         .def("send_proto", &Class::sendProto, py::arg("message"),
-             py::arg("async") = false);
+             py::arg("async") = false, py::call_guard<py::gil_scoped_release>());
 }
 
 /**
@@ -110,6 +111,42 @@ void declareThreadedProtoUdpListener(py::module& m, std::string name)
         .def("close", &Class::close);
 }
 
+/**
+ * Creates a Team from a numpy array of robot states, so that worlds can be built
+ * without constructing a Robot object per robot in Python
+ *
+ * @param robot_states An (N, 2) array of robot positions, or an (N, 3) array of robot
+ * positions and orientations in radians. The robot ids are the row indices
+ *
+ * @throws std::invalid_argument if the array doesn't have 2 or 3 columns
+ * @return A team with a stationary robot for each row of the array
+ */
+Team createTeamFromArray(
+    const py::array_t<double, py::array::c_style | py::array::forcecast>& robot_states)
+{
+    if (robot_states.ndim() != 2 ||
+        (robot_states.shape(1) != 2 && robot_states.shape(1) != 3))
+    {
+        throw std::invalid_argument(
+            "Robot states must be an array of shape (N, 2) or (N, 3)");
+    }
+
+    auto states             = robot_states.unchecked<2>();
+    const bool has_rotation = states.shape(1) == 3;
+
+    std::vector<Robot> robots;
+    robots.reserve(static_cast<size_t>(states.shape(0)));
+    for (py::ssize_t i = 0; i < states.shape(0); i++)
+    {
+        robots.emplace_back(
+            static_cast<RobotId>(i), Point(states(i, 0), states(i, 1)), Vector(),
+            Angle::fromRadians(has_rotation ? states(i, 2) : 0.0),
+            AngularVelocity::zero(), Timestamp());
+    }
+
+    return Team(robots);
+}
+
 template <typename T>
 void declareReceiverPositionGenerator(py::module& m, std::string name)
 {
@@ -415,6 +452,21 @@ PYBIND11_MODULE(python_bindings, m)
         .def("ball", &World::ball)
         .def("field", &World::field);
 
+    m.def(
+        "createWorldFromArrays",
+        [](const Field& field, const Point& ball_position, const Vector& ball_velocity,
+           const py::array_t<double, py::array::c_style | py::array::forcecast>&
+               friendly_robot_states,
+           const py::array_t<double, py::array::c_style | py::array::forcecast>&
+               enemy_robot_states)
+        {
+            return World(field, Ball(ball_position, ball_velocity, Timestamp()),
+                         createTeamFromArray(friendly_robot_states),
+                         createTeamFromArray(enemy_robot_states));
+        },
+        py::arg("field"), py::arg("ball_position"), py::arg("ball_velocity"),
+        py::arg("friendly_robot_states"), py::arg("enemy_robot_states"));
+
     // Listeners
     declareThreadedProtoUdpListener<SSLProto::Referee>(m, "SSLReferee");
     declareThreadedProtoUdpListener<TbotsProto::RobotStatus>(m, "RobotStatus");
@@ -448,7 +500,17 @@ PYBIND11_MODULE(python_bindings, m)
 
     py::class_<PassGenerator>(m, "PassGenerator")
         .def(py::init<const TbotsProto::PassingConfig&>())
-        .def("getBestPass", &PassGenerator::getBestPass);
+        // The pass generator doesn't touch any Python objects, so we release the GIL
+        // to let passes be generated from multiple Python threads at once
+        .def("getBestPass", &PassGenerator::getBestPass, py::arg("world"),
+             py::arg("robots_to_ignore") = std::vector<RobotId>(),
+             py::call_guard<py::gil_scoped_release>())
+        .def("getBestPassAfterIterations", &PassGenerator::getBestPassAfterIterations,
+             py::arg("world"), py::arg("robots_to_ignore"), py::arg("num_iterations"),
+             py::call_guard<py::gil_scoped_release>())
+        .def("getBestPassesForWorlds", &PassGenerator::getBestPassesForWorlds,
+             py::arg("worlds"), py::arg("robots_to_ignore"), py::arg("num_iterations"),
+             py::call_guard<py::gil_scoped_release>());
 
     py::class_<PassWithRating, std::unique_ptr<PassWithRating>>(m, "PassWithRating")
         .def_readwrite("pass_value", &PassWithRating::pass)
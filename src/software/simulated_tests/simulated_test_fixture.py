@@ -1,34 +1,46 @@
+from __future__ import annotations
+
 import threading
 import queue
 import argparse
+import atexit
+import contextlib
 import time
 import sys
 import os
 
 import pytest
 from proto.import_all_protos import *
+from google.protobuf.message import Message
 
 
 from software.simulated_tests import validation
 from software.simulated_tests.tbots_test_runner import TbotsTestRunner
 from software.thunderscope.thunderscope import Thunderscope
 from software.thunderscope.proto_unix_io import ProtoUnixIO
+from software.thunderscope.thread_safe_buffer import ThreadSafeBuffer
 from software.py_constants import MILLISECONDS_PER_SECOND
 from software.thunderscope.binary_context_managers.full_system import FullSystem
 from software.thunderscope.binary_context_managers.simulator import Simulator
 from software.thunderscope.binary_context_managers.game_controller import Gamecontroller
 from software.thunderscope.thunderscope_config import configure_simulated_test_view
+from proto.ssl_gc_common_pb2 import Division
 
 from software.logger.logger import create_logger
 
 logger = create_logger(__name__)
 
-LAUNCH_DELAY_S = 0.1
 WORLD_BUFFER_TIMEOUT = 0.5
+WORLD_STATE_RECEIVED_TIMEOUT_S = 1
+WORLD_STATE_BUFFER_SIZE = 100
 PROCESS_BUFFER_DELAY_S = 0.01
-TEST_START_DELAY_S = 0.01
 PAUSE_AFTER_FAIL_DELAY_S = 3
 
+# How long to wait for both full systems to respond after the binaries are
+# reset for the next test, and how long each tick of the simulator is meanwhile
+RESET_TIMEOUT_S = 2
+RESET_TICK_DURATION_S = 0.0166
+
 
 class SimulatedTestRunner(TbotsTestRunner):
     """Run a simulated test"""
@@ -60,6 +72,27 @@ class SimulatedTestRunner(TbotsTestRunner):
         )
         self.simulator_proto_unix_io = simulator_proto_unix_io
 
+        # The simulator sends a trigger every time it has applied a world state.
+        # We count the world states sent to the simulator and the triggers
+        # received back, so we can wait for the world states to be applied.
+        self.world_state_buffer = ThreadSafeBuffer(
+            buffer_size=WORLD_STATE_BUFFER_SIZE, protobuf_type=WorldState
+        )
+        self.world_state_received_buffer = ThreadSafeBuffer(
+            buffer_size=WORLD_STATE_BUFFER_SIZE,
+            protobuf_type=WorldStateReceivedTrigger,
+        )
+        self.register_observer(
+            self.simulator_proto_unix_io, WorldState, self.world_state_buffer
+        )
+        self.register_observer(
+            self.simulator_proto_unix_io,
+            WorldStateReceivedTrigger,
+            self.world_state_received_buffer,
+        )
+        self.num_world_states_sent = 0
+        self.num_world_states_received = 0
+
     def set_worldState(self, worldstate: WorldState):
         """Sets the simulation worldstate
 
@@ -67,6 +100,30 @@ class SimulatedTestRunner(TbotsTestRunner):
         """
         self.simulator_proto_unix_io.send_proto(WorldState, worldstate)
 
+    def __wait_for_world_state(self):
+        """Waits until the simulator has applied all the world states sent to it.
+        Otherwise, the first SimulatorTick may be received before the initial world
+        state, causing the world to be empty and failing some AlwaysValidations.
+        """
+        while self.world_state_buffer.get(block=False, return_cached=False) is not None:
+            self.num_world_states_sent += 1
+
+        deadline = time.time() + WORLD_STATE_RECEIVED_TIMEOUT_S
+
+        while self.num_world_states_received < self.num_world_states_sent:
+            try:
+                self.world_state_received_buffer.get(
+                    block=True,
+                    timeout=max(deadline - time.time(), 0),
+                    return_cached=False,
+                )
+                self.num_world_states_received += 1
+            except queue.Empty:
+                logger.warning(
+                    "Simulator did not confirm receiving the world state, starting test anyway"
+                )
+                self.num_world_states_received = self.num_world_states_sent
+
     def excepthook(self, args):
         """This function is _critical_ for show_thunderscope to work.
         If the test Thread will raises an exception we won't be able to close
@@ -81,12 +138,13 @@ class SimulatedTestRunner(TbotsTestRunner):
     def __stopper(self, delay=PROCESS_BUFFER_DELAY_S):
         """Stop running the test
 
-        :param delay: How long to wait before closing everything, defaults
-                      to PROCESS_BUFFER_DELAY_S to minimize buffer warnings
+        :param delay: How long to wait before closing Thunderscope, defaults
+                      to PROCESS_BUFFER_DELAY_S to minimize buffer warnings.
+                      Nothing needs to be closed without Thunderscope, so
+                      there is no wait in that case.
         """
-        time.sleep(delay)
-
         if self.thunderscope:
+            time.sleep(delay)
             self.thunderscope.close()
 
     def runner(
@@ -251,13 +309,9 @@ class SimulatedTestRunner(TbotsTestRunner):
             test_timeout_s[index] if type(test_timeout_s) == list else test_timeout_s
         )
 
-        # Start the test with a delay to allow the simulator to receive
-        # the initial world state. Without this delay, the SimulatorTick
-        # message may be received before the initial world state, causing
-        # the world to be empty, failing some AlwaysValidations
-        # TODO (#2858): Replace delay with an actual feedback from the simulator
-        #  for when it has received the initial world state
-        time.sleep(TEST_START_DELAY_S)
+        # Make sure the simulator has received the initial world state
+        # before we start ticking it
+        self.__wait_for_world_state()
 
         # If thunderscope is enabled, run the test in a thread and show
         # thunderscope on this thread. The excepthook is setup to catch
@@ -384,6 +438,291 @@ class AggregateTestRunner(SimulatedTestRunner):
         assert failed_tests == 0
 
 
+class SimulatedTestBinaries:
+    """The simulator, full systems and gamecontroller that simulated tests run
+    against, along with the proto unix ios connected to them.
+
+    The binaries are launched together when entering the context manager and
+    stopped together when exiting it.
+    """
+
+    def __init__(self, args: argparse.Namespace, runtime_dir_suffix: str) -> None:
+        """Initialize the binaries, without launching them
+
+        :param args: the command line arguments of the test
+        :param runtime_dir_suffix: the subdirectory of the runtime directories
+                                   given in the args to run the binaries in
+        """
+        self.args = args
+        self.runtime_dir_suffix = runtime_dir_suffix
+
+        self.simulator_proto_unix_io = ProtoUnixIO()
+        self.blue_full_system_proto_unix_io = ProtoUnixIO()
+        self.yellow_full_system_proto_unix_io = ProtoUnixIO()
+
+        self.simulator = None
+        self.blue_full_system = None
+        self.yellow_full_system = None
+        self.gamecontroller = None
+
+        self.exit_stack = contextlib.ExitStack()
+
+    def __enter__(self) -> SimulatedTestBinaries:
+        """Launch all the binaries and connect them to the proto unix ios
+
+        :return: the launched binaries
+        """
+        args = self.args
+
+        with self.exit_stack:
+            self.simulator = self.exit_stack.enter_context(
+                Simulator(
+                    f"{args.simulator_runtime_dir}/{self.runtime_dir_suffix}",
+                    args.debug_simulator,
+                    args.enable_realism,
+                )
+            )
+            self.blue_full_system = self.exit_stack.enter_context(
+                FullSystem(
+                    f"{args.blue_full_system_runtime_dir}/{self.runtime_dir_suffix}",
+                    args.debug_blue_full_system,
+                    False,
+                    should_restart_on_crash=False,
+                    running_in_realtime=args.enable_thunderscope,
+                )
+            )
+            self.yellow_full_system = self.exit_stack.enter_context(
+                FullSystem(
+                    f"{args.yellow_full_system_runtime_dir}/{self.runtime_dir_suffix}",
+                    args.debug_yellow_full_system,
+                    True,
+                    should_restart_on_crash=False,
+                    running_in_realtime=args.enable_thunderscope,
+                )
+            )
+            self.gamecontroller = self.exit_stack.enter_context(
+                Gamecontroller(suppress_logs=(not args.show_gamecontroller_logs))
+            )
+
+            self.blue_full_system.setup_proto_unix_io(
+                self.blue_full_system_proto_unix_io
+            )
+            self.yellow_full_system.setup_proto_unix_io(
+                self.yellow_full_system_proto_unix_io
+            )
+            self.simulator.setup_proto_unix_io(
+                self.simulator_proto_unix_io,
+                self.blue_full_system_proto_unix_io,
+                self.yellow_full_system_proto_unix_io,
+                ProtoUnixIO(),
+            )
+            self.gamecontroller.setup_proto_unix_io(
+                blue_full_system_proto_unix_io=self.blue_full_system_proto_unix_io,
+                yellow_full_system_proto_unix_io=self.yellow_full_system_proto_unix_io,
+                simulator_proto_unix_io=self.simulator_proto_unix_io,
+            )
+
+            # Everything launched, so keep the binaries running until we exit
+            self.exit_stack = self.exit_stack.pop_all()
+
+        return self
+
+    def __exit__(self, type, value, traceback) -> None:
+        """Stop all the binaries, in the reverse order they were launched
+
+        :param type: The type of exception that was raised
+        :param value: The exception that was raised
+        :param traceback: The traceback of the exception
+        """
+        self.exit_stack.close()
+
+    def is_running(self) -> bool:
+        """Returns whether all the binaries are still running
+
+        :return: True if all the binaries are running
+        """
+        return all(
+            binary.is_running()
+            for binary in (
+                self.simulator,
+                self.blue_full_system,
+                self.yellow_full_system,
+                self.gamecontroller,
+            )
+        )
+
+    def reset(self) -> None:
+        """Reset the binaries so that the next test starts from the same state as
+        freshly launched binaries. Tests set up their own world state, so only the
+        state the binaries keep between tests is reset:
+
+        - the AI is rebuilt from the default config, which also clears any play
+          or tactic overrides
+        - sensor fusion is rebuilt, which clears its filters and game state
+        - the gamecontroller match is reset
+        """
+        for proto_unix_io, friendly_colour_yellow in (
+            (self.blue_full_system_proto_unix_io, False),
+            (self.yellow_full_system_proto_unix_io, True),
+        ):
+            config = ThunderbotsConfig()
+            self.__set_default_values(config)
+
+            # Sensor fusion is only rebuilt when its config changes, so send a
+            # config for the other team first to force it to be rebuilt
+            config.sensor_fusion_config.friendly_color_yellow = (
+                not friendly_colour_yellow
+            )
+            proto_unix_io.send_proto(ThunderbotsConfig, config)
+            config.sensor_fusion_config.friendly_color_yellow = friendly_colour_yellow
+            proto_unix_io.send_proto(ThunderbotsConfig, config)
+
+        self.gamecontroller.reset_team_info(Division.DIV_B)
+
+        self.__wait_for_config_applied()
+
+    def start_new_replay_logs(self, runtime_dir_suffix: str) -> None:
+        """Have both full systems close their replay logs and continue logging
+        to new ones, so that each test run against the binaries gets its own
+        replay logs
+
+        :param runtime_dir_suffix: the subdirectory of the runtime directories
+                                   given in the args to save the new logs in
+        """
+        for proto_unix_io, runtime_dir in (
+            (
+                self.blue_full_system_proto_unix_io,
+                self.args.blue_full_system_runtime_dir,
+            ),
+            (
+                self.yellow_full_system_proto_unix_io,
+                self.args.yellow_full_system_runtime_dir,
+            ),
+        ):
+            proto_unix_io.send_proto(
+                StartReplayLog,
+                StartReplayLog(log_path=f"{runtime_dir}/{runtime_dir_suffix}"),
+            )
+
+    def __wait_for_config_applied(self) -> None:
+        """The AI only applies a new config when it next runs, so an override sent
+        by the next test before then would be cleared. Tick the simulator until
+        both full systems have run their AI.
+        """
+        full_system_proto_unix_ios = [
+            self.blue_full_system_proto_unix_io,
+            self.yellow_full_system_proto_unix_io,
+        ]
+        primitive_set_buffers = [
+            ThreadSafeBuffer(buffer_size=1, protobuf_type=PrimitiveSet)
+            for _ in full_system_proto_unix_ios
+        ]
+        for proto_unix_io, buffer in zip(
+            full_system_proto_unix_ios, primitive_set_buffers
+        ):
+            proto_unix_io.register_observer(PrimitiveSet, buffer)
+
+        deadline = time.time() + RESET_TIMEOUT_S
+        pending_buffers = list(primitive_set_buffers)
+
+        while pending_buffers and time.time() < deadline:
+            self.simulator_proto_unix_io.send_proto(
+                SimulatorTick,
+                SimulatorTick(
+                    milliseconds=RESET_TICK_DURATION_S * MILLISECONDS_PER_SECOND
+                ),
+            )
+
+            for buffer in list(pending_buffers):
+                try:
+                    buffer.get(
+                        block=True, timeout=RESET_TICK_DURATION_S, return_cached=False
+                    )
+                    pending_buffers.remove(buffer)
+                except queue.Empty:
+                    pass
+
+        if pending_buffers:
+            logger.warning(
+                "Full system did not respond after being reset, starting test anyway"
+            )
+
+        for proto_unix_io, buffer in zip(
+            full_system_proto_unix_ios, primitive_set_buffers
+        ):
+            proto_unix_io.unregister_observer(PrimitiveSet, buffer)
+
+    @staticmethod
+    def __set_default_values(message: Message) -> None:
+        """Explicitly set every field of the message to its default value.
+        Protobuf won't serialize a message if any required fields are not set,
+        even if they have a default.
+
+        :param message: the message to set the fields of
+        """
+        for descriptor in message.DESCRIPTOR.fields:
+            if descriptor.label == descriptor.LABEL_REPEATED:
+                continue
+
+            if descriptor.type == descriptor.TYPE_MESSAGE:
+                SimulatedTestBinaries.__set_default_values(
+                    getattr(message, descriptor.name)
+                )
+            else:
+                setattr(message, descriptor.name, getattr(message, descriptor.name))
+
+
+class SimulatedTestBinariesPool:
+    """Keeps one set of binaries running across all the tests in this process, so
+    that the binaries don't have to be launched for every test.
+
+    The binaries are reset between tests, and relaunched if any of them crashed.
+    The binaries share a runtime directory, but the full systems start a new
+    replay log for each test, in the directory it would have run in had it
+    launched its own binaries.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty pool"""
+        self.binaries = None
+
+    def acquire(
+        self, args: argparse.Namespace, runtime_dir_suffix: str
+    ) -> SimulatedTestBinaries:
+        """Get binaries ready to run the next test
+
+        :param args: the command line arguments of the test
+        :param runtime_dir_suffix: the subdirectory of the runtime directories
+                                   given in the args to save the test's replay
+                                   logs in
+        :return: the running binaries, reset to their initial state
+        """
+        if self.binaries is not None and not self.binaries.is_running():
+            logger.warning("A simulated test binary has stopped, relaunching them all")
+            self.close()
+
+        if self.binaries is None:
+            self.binaries = SimulatedTestBinaries(args, "test/pooled").__enter__()
+            self.binaries.start_new_replay_logs(runtime_dir_suffix)
+        else:
+            # Start the new logs first, so that they include the reset
+            self.binaries.start_new_replay_logs(runtime_dir_suffix)
+            self.binaries.reset()
+
+        return self.binaries
+
+    def close(self) -> None:
+        """Stop the binaries in the pool, if any"""
+        if self.binaries is not None:
+            self.binaries.__exit__(None, None, None)
+            self.binaries = None
+
+
+# The binaries shared by the tests in this process when reusing binaries
+binaries_pool = SimulatedTestBinariesPool()
+atexit.register(binaries_pool.close)
+
+
 def load_command_line_arguments(allow_unrecognized: bool = False):
     """Load in command-line arguments using argparse
 
@@ -466,6 +805,14 @@ def load_command_line_arguments(allow_unrecognized: bool = False):
         default=False,
         help="Use realism in the simulator",
     )
+    parser.add_argument(
+        "--reuse_binaries",
+        action="store_true",
+        default=False,
+        help="Launch the simulator, full systems and gamecontroller once and reset "
+        + "them between tests instead of relaunching them for every test. "
+        + "Ignored if thunderscope is enabled",
+    )
     return parser.parse_known_args()[0] if allow_unrecognized else parser.parse_args()
 
 
@@ -492,10 +839,6 @@ def simulated_test_runner():
 
     aggregate = args.aggregate
 
-    simulator_proto_unix_io = ProtoUnixIO()
-    yellow_full_system_proto_unix_io = ProtoUnixIO()
-    blue_full_system_proto_unix_io = ProtoUnixIO()
-
     # Grab the current test name to store the proto log for the test case
     current_test = os.environ.get("PYTEST_CURRENT_TEST").split(":")[-1].split(" ")[0]
     current_test = current_test.replace("]", "")
@@ -503,75 +846,43 @@ def simulated_test_runner():
 
     test_name = current_test.split("-")[0]
 
-    # Launch all binaries
-    with Simulator(
-        f"{args.simulator_runtime_dir}/test/{test_name}",
-        args.debug_simulator,
-        args.enable_realism,
-    ) as simulator, FullSystem(
-        f"{args.blue_full_system_runtime_dir}/test/{test_name}",
-        args.debug_blue_full_system,
-        False,
-        should_restart_on_crash=False,
-        running_in_realtime=args.enable_thunderscope,
-    ) as blue_fs, FullSystem(
-        f"{args.yellow_full_system_runtime_dir}/test/{test_name}",
-        args.debug_yellow_full_system,
-        True,
-        should_restart_on_crash=False,
-        running_in_realtime=args.enable_thunderscope,
-    ) as yellow_fs:
-        with Gamecontroller(
-            suppress_logs=(not args.show_gamecontroller_logs)
-        ) as gamecontroller:
-            blue_fs.setup_proto_unix_io(blue_full_system_proto_unix_io)
-            yellow_fs.setup_proto_unix_io(yellow_full_system_proto_unix_io)
-            simulator.setup_proto_unix_io(
-                simulator_proto_unix_io,
-                blue_full_system_proto_unix_io,
-                yellow_full_system_proto_unix_io,
-                ProtoUnixIO(),
-            )
-            gamecontroller.setup_proto_unix_io(
-                blue_full_system_proto_unix_io=blue_full_system_proto_unix_io,
-                yellow_full_system_proto_unix_io=yellow_full_system_proto_unix_io,
-                simulator_proto_unix_io=simulator_proto_unix_io,
-            )
+    # Thunderscope is shown for one test at a time, so there is no point in
+    # keeping the binaries around when it is enabled
+    reuse_binaries = args.reuse_binaries and not args.enable_thunderscope
 
-            # If we want to run thunderscope, inject the proto unix ios
-            # and start the test
-            if args.enable_thunderscope:
-                tscope = Thunderscope(
-                    configure_simulated_test_view(
-                        blue_full_system_proto_unix_io=blue_full_system_proto_unix_io,
-                        yellow_full_system_proto_unix_io=yellow_full_system_proto_unix_io,
-                        simulator_proto_unix_io=simulator_proto_unix_io,
-                    ),
-                    layout_path=args.layout,
-                )
+    with contextlib.ExitStack() as stack:
+        # Launch all binaries, or reuse the running ones
+        if reuse_binaries:
+            binaries = binaries_pool.acquire(args, f"test/{test_name}")
+        else:
+            binaries = stack.enter_context(
+                SimulatedTestBinaries(args, f"test/{test_name}")
+            )
 
-            time.sleep(LAUNCH_DELAY_S)
+        # If we want to run thunderscope, inject the proto unix ios
+        # and start the test
+        if args.enable_thunderscope:
+            tscope = Thunderscope(
+                configure_simulated_test_view(
+                    blue_full_system_proto_unix_io=binaries.blue_full_system_proto_unix_io,
+                    yellow_full_system_proto_unix_io=binaries.yellow_full_system_proto_unix_io,
+                    simulator_proto_unix_io=binaries.simulator_proto_unix_io,
+                ),
+                layout_path=args.layout,
+            )
 
-            runner = None
+        # Initialise the right runner based on which testing mode is selected
+        runner_class = AggregateTestRunner if aggregate else InvariantTestRunner
+        runner = runner_class(
+            current_test,
+            tscope,
+            binaries.simulator_proto_unix_io,
+            binaries.blue_full_system_proto_unix_io,
+            binaries.yellow_full_system_proto_unix_io,
+            binaries.gamecontroller,
+        )
 
-            # Initialise the right runner based on which testing mode is selected
-            if aggregate:
-                runner = AggregateTestRunner(
-                    current_test,
-                    tscope,
-                    simulator_proto_unix_io,
-                    blue_full_system_proto_unix_io,
-                    yellow_full_system_proto_unix_io,
-                    gamecontroller,
-                )
-            else:
-                runner = InvariantTestRunner(
-                    current_test,
-                    tscope,
-                    simulator_proto_unix_io,
-                    blue_full_system_proto_unix_io,
-                    yellow_full_system_proto_unix_io,
-                    gamecontroller,
-                )
+        yield runner
 
-            yield runner
+        # The proto unix ios outlive this test when the binaries are reused
+        runner.unregister_observers()
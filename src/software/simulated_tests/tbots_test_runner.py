@@ -2,7 +2,10 @@ from proto.import_all_protos import *
 from software.logger.logger import create_logger
 from software.thunderscope.thread_safe_buffer import ThreadSafeBuffer
 from proto.ssl_gc_common_pb2 import Team
+from software.thunderscope.proto_unix_io import ProtoUnixIO
 from abc import abstractmethod
+from typing import Type
+from google.protobuf.message import Message
 
 logger = create_logger(__name__)
 
@@ -18,6 +21,7 @@ class TbotsTestRunner:
         yellow_full_system_proto_unix_io,
         gamecontroller,
         is_yellow_friendly=False,
+        world_buffer_size=20,
     ):
         """Initialize the TestRunner.
 
@@ -27,6 +31,7 @@ class TbotsTestRunner:
         :param yellow_full_system_proto_unix_io: The yellow full system proto unix io to use
         :param gamecontroller: The gamecontroller context managed instance
         :param: is_yellow_friendly: if yellow is the friendly team
+        :param world_buffer_size: how many worlds to buffer for the test to validate
         """
         self.test_name = test_name
         self.thunderscope = thunderscope
@@ -34,7 +39,9 @@ class TbotsTestRunner:
         self.yellow_full_system_proto_unix_io = yellow_full_system_proto_unix_io
         self.gamecontroller = gamecontroller
         self.is_yellow_friendly = is_yellow_friendly
-        self.world_buffer = ThreadSafeBuffer(buffer_size=20, protobuf_type=World)
+        self.world_buffer = ThreadSafeBuffer(
+            buffer_size=world_buffer_size, protobuf_type=World
+        )
         self.primitive_set_buffer = ThreadSafeBuffer(
             buffer_size=1, protobuf_type=PrimitiveSet
         )
@@ -47,28 +54,62 @@ class TbotsTestRunner:
             buffer_size=1, protobuf_type=RobotStatus
         )
 
-        self.blue_full_system_proto_unix_io.register_observer(
-            SSL_WrapperPacket, self.ssl_wrapper_buffer
+        # Observers registered by this runner, as (proto unix io, proto class, buffer)
+        self.registered_observers = []
+
+        self.register_observer(
+            self.blue_full_system_proto_unix_io,
+            SSL_WrapperPacket,
+            self.ssl_wrapper_buffer,
         )
-        self.blue_full_system_proto_unix_io.register_observer(
-            RobotStatus, self.robot_status_buffer
+        self.register_observer(
+            self.blue_full_system_proto_unix_io, RobotStatus, self.robot_status_buffer
         )
         if self.is_yellow_friendly:
-            self.yellow_full_system_proto_unix_io.register_observer(
-                World, self.world_buffer
+            self.register_observer(
+                self.yellow_full_system_proto_unix_io, World, self.world_buffer
             )
-            self.yellow_full_system_proto_unix_io.register_observer(
-                PrimitiveSet, self.primitive_set_buffer
+            self.register_observer(
+                self.yellow_full_system_proto_unix_io,
+                PrimitiveSet,
+                self.primitive_set_buffer,
             )
         # Only validate on the blue worlds
         else:
-            self.blue_full_system_proto_unix_io.register_observer(
-                World, self.world_buffer
+            self.register_observer(
+                self.blue_full_system_proto_unix_io, World, self.world_buffer
             )
-            self.blue_full_system_proto_unix_io.register_observer(
-                PrimitiveSet, self.primitive_set_buffer
+            self.register_observer(
+                self.blue_full_system_proto_unix_io,
+                PrimitiveSet,
+                self.primitive_set_buffer,
             )
 
+    def register_observer(
+        self,
+        proto_unix_io: ProtoUnixIO,
+        proto_class: Type[Message],
+        buffer: ThreadSafeBuffer,
+    ):
+        """Registers a buffer of this runner to observe a proto unix io, so that it
+        can be unregistered when the runner is done
+
+        :param proto_unix_io: the proto unix io to observe
+        :param proto_class: the class of protobuf to observe
+        :param buffer: the buffer to place the protobufs in
+        """
+        proto_unix_io.register_observer(proto_class, buffer)
+        self.registered_observers.append((proto_unix_io, proto_class, buffer))
+
+    def unregister_observers(self):
+        """Unregisters all the buffers registered by this runner. Needed when the
+        proto unix ios outlive the runner, e.g. when binaries are reused across tests
+        """
+        for proto_unix_io, proto_class, buffer in self.registered_observers:
+            proto_unix_io.unregister_observer(proto_class, buffer)
+
+        self.registered_observers = []
+
     def send_gamecontroller_command(
         self,
         gc_command: proto.ssl_gc_state_pb2.Command,
@@ -3,20 +3,41 @@ from __future__ import annotations
 import os
 import logging
 import time
-import threading
 
-from subprocess import Popen, TimeoutExpired
 from software.thunderscope.gl.layers.gl_obstacle_layer import ObstacleList
 from software.thunderscope.proto_unix_io import ProtoUnixIO
 from software.python_bindings import *
 from proto.import_all_protos import *
 from software.py_constants import *
-from software.thunderscope.binary_context_managers.util import is_cmd_running
+from software.thunderscope.binary_context_managers.util import (
+    is_unix_socket_listening,
+    wait_for_unix_sockets,
+)
+from software.thunderscope.binary_context_managers.process_supervisor import (
+    CrashStats,
+    ProcessSupervisor,
+)
 
 
 class FullSystem:
     """Full System Binary Context Manager"""
 
+    # The unix sockets full system listens on. Full system is ready to be used
+    # once it is listening on all of them.
+    INPUT_SOCKET_PATHS = [
+        ROBOT_STATUS_PATH,
+        SSL_WRAPPER_PATH,
+        SSL_REFEREE_PATH,
+        SENSOR_PROTO_PATH,
+        DYNAMIC_PARAMETER_UPDATE_REQUEST_PATH,
+        TACTIC_OVERRIDE_PATH,
+        PLAY_OVERRIDE_PATH,
+        START_REPLAY_LOG_PATH,
+    ]
+
+    # How long to wait for full system to start listening on its sockets
+    READY_TIMEOUT_S = 10
+
     def __init__(
         self,
         full_system_runtime_dir: os.PathLike = None,
@@ -38,13 +59,11 @@ class FullSystem:
         self.full_system_runtime_dir = full_system_runtime_dir
         self.debug_full_system = debug_full_system
         self.friendly_colour_yellow = friendly_colour_yellow
-        self.full_system_proc = None
+        self.full_system_supervisor = None
         self.should_restart_on_crash = should_restart_on_crash
         self.should_run_under_sudo = run_sudo
         self.running_in_realtime = running_in_realtime
 
-        self.thread = threading.Thread(target=self.__restart__, daemon=True)
-
     def __enter__(self) -> FullSystem:
         """Enter the full_system context manager.
 
@@ -52,6 +71,9 @@ class FullSystem:
         command to debug under gdb is printed. The  context manager will then
         wait for the binary to be launched before continuing.
 
+        Returns once full system is listening on all of its input sockets, so
+        protos sent right after entering are not dropped.
+
         :return: full_system context managed instance
 
         """
@@ -68,12 +90,7 @@ class FullSystem:
         )
 
         if self.should_run_under_sudo:
-            if not is_cmd_running(
-                [
-                    "unix_full_system",
-                    "--runtime_dir={}".format(self.full_system_runtime_dir),
-                ]
-            ):
+            if not self.__is_running_externally():
                 logging.info(
                     (
                         f"""
@@ -97,13 +114,9 @@ sudo bazel-bin/{self.full_system}
 
         elif self.debug_full_system:
             # We don't want to check the exact command because this binary could
-            # be debugged from clion or somewhere other than gdb
-            if not is_cmd_running(
-                [
-                    "unix_full_system",
-                    "--runtime_dir={}".format(self.full_system_runtime_dir),
-                ]
-            ):
+            # be debugged from clion or somewhere other than gdb, so we check if
+            # a full system is listening in our runtime directory instead
+            if not self.__is_running_externally():
                 logging.info(
                     (
                         f"""
@@ -127,25 +140,60 @@ gdb --args bazel-bin/{self.full_system}
                     time.sleep(1)
 
         else:
-            self.full_system_proc = Popen(self.full_system.split(" "))
-            if self.should_restart_on_crash:
-                self.thread.start()
+            self.full_system_supervisor = ProcessSupervisor(
+                "FullSystem",
+                self.full_system.split(" "),
+                should_restart_on_crash=self.should_restart_on_crash,
+            )
+            self.full_system_supervisor.start()
+
+        if self.full_system_supervisor or self.debug_full_system:
+            self.__wait_until_ready()
 
         return self
 
-    def __restart__(self) -> None:
-        """Restarts full system."""
-        while self.should_restart_on_crash:
-            if not is_cmd_running(
-                [
-                    "unix_full_system",
-                    "--runtime_dir={}".format(self.full_system_runtime_dir),
-                ]
-            ):
-                self.full_system_proc = Popen(self.full_system.split(" "))
-                logging.info("FullSystem has restarted.")
+    def __is_running_externally(self) -> bool:
+        """Check if a full system that we didn't launch (e.g. under gdb or sudo)
+        is running in our runtime directory, by checking if it is listening on
+        its sockets. This avoids scanning every process on the host.
 
-            time.sleep(1)
+        :return: whether full system is running in our runtime directory
+        """
+        return is_unix_socket_listening(self.full_system_runtime_dir + SSL_WRAPPER_PATH)
+
+    def __wait_until_ready(self) -> None:
+        """Waits until full system is listening on all of its input sockets"""
+        if not wait_for_unix_sockets(
+            self.full_system_runtime_dir,
+            FullSystem.INPUT_SOCKET_PATHS,
+            FullSystem.READY_TIMEOUT_S,
+            self.full_system_supervisor.process
+            if self.full_system_supervisor
+            else None,
+        ):
+            logging.warning(
+                f"FullSystem was not ready after {FullSystem.READY_TIMEOUT_S} s, continuing anyway"
+            )
+
+    def get_crash_stats(self) -> CrashStats:
+        """Returns the crash statistics of the full system we launched
+
+        :return: the crash statistics, empty if we didn't launch full system
+        """
+        if self.full_system_supervisor is None:
+            return CrashStats()
+
+        return self.full_system_supervisor.get_crash_stats()
+
+    def is_running(self) -> bool:
+        """Returns whether full system is running, whether we launched it or not
+
+        :return: True if full system is running
+        """
+        if self.full_system_supervisor is None:
+            return self.__is_running_externally()
+
+        return self.full_system_supervisor.is_running()
 
     def __exit__(self, type, value, traceback) -> None:
         """Exit the full_system context manager.
@@ -154,20 +202,13 @@ gdb --args bazel-bin/{self.full_system}
         :param value: The exception that was raised
         :param traceback: The traceback of the exception
         """
-        self.should_restart_on_crash = False
-
-        if self.full_system_proc:
+        if self.full_system_supervisor:
             # It's important to terminate full system instead of killing
-            # it to allow it to clean up its resources.
-            self.full_system_proc.terminate()
-
-            # Kill the process if it doesn't exit in the given time plus some buffer.
-            try:
-                self.full_system_proc.wait(
-                    timeout=MAX_TIME_TO_EXIT_FULL_SYSTEM_SEC + 0.1
-                )
-            except TimeoutExpired:
-                self.full_system_proc.kill()
+            # it to allow it to clean up its resources. It is killed if it
+            # doesn't exit in the given time plus some buffer.
+            self.full_system_supervisor.stop(
+                terminate_timeout_s=MAX_TIME_TO_EXIT_FULL_SYSTEM_SEC + 0.1
+            )
 
     def setup_proto_unix_io(self, proto_unix_io: ProtoUnixIO) -> None:
         """Helper to run full system and attach the appropriate unix senders/listeners
@@ -219,5 +260,7 @@ gdb --args bazel-bin/{self.full_system}
             (ROBOT_CRASH_PATH, RobotCrash),
             (VIRTUAL_OBSTACLES_UNIX_PATH, VirtualObstacles),
             (REPLAY_BOOKMARK_PATH, ReplayBookmark),
+            (START_REPLAY_LOG_PATH, StartReplayLog),
+            (ROBOT_LINK_STATISTICS_PATH, RobotLinkStatistics),
         ]:
             proto_unix_io.attach_unix_sender(self.full_system_runtime_dir, *arg)
@@ -29,7 +29,10 @@ import itertools
 class Gamecontroller:
     """Gamecontroller Context Manager"""
 
-    CI_MODE_LAUNCH_DELAY_S = 0.3
+    # How long to wait for the gamecontroller to start accepting connections
+    # on its ci port, and how often to try connecting until then
+    CI_MODE_READY_TIMEOUT_S = 10
+    CI_MODE_CONNECT_RETRY_INTERVAL_S = 0.01
     REFEREE_IP = "224.5.23.1"
     CI_MODE_OUTPUT_RECEIVE_BUFFER_SIZE = 9000
 
@@ -80,6 +83,8 @@ class Gamecontroller:
     def __enter__(self) -> Gamecontroller:
         """Enter the gamecontroller context manager.
 
+        Returns once the gamecontroller accepts connections on its ci port.
+
         :return: gamecontroller context managed instance
         """
         command = ["/opt/tbotspython/gamecontroller", "--timeAcquisitionMode", "ci"]
@@ -94,13 +99,37 @@ class Gamecontroller:
         else:
             self.gamecontroller_proc = Popen(command)
 
-        # We can't connect to the ci port right away, it takes
-        # CI_MODE_LAUNCH_DELAY_S to start up the gamecontroller
-        time.sleep(Gamecontroller.CI_MODE_LAUNCH_DELAY_S)
-        self.ci_socket = SslSocket(self.ci_port)
+        self.ci_socket = self.__connect_ci_socket()
 
         return self
 
+    def __connect_ci_socket(self) -> SslSocket:
+        """Connects to the ci port of the gamecontroller. We can't connect right
+        away since the gamecontroller takes some time to start up, so we keep
+        retrying until it accepts the connection.
+
+        :raises RuntimeError: if the gamecontroller exits before accepting
+        :raises ConnectionRefusedError: if the gamecontroller doesn't accept the
+                                        connection within CI_MODE_READY_TIMEOUT_S
+        :return: the socket connected to the ci port
+        """
+        deadline = time.monotonic() + Gamecontroller.CI_MODE_READY_TIMEOUT_S
+
+        while True:
+            try:
+                return SslSocket(self.ci_port)
+            except ConnectionRefusedError:
+                if self.gamecontroller_proc.poll() is not None:
+                    raise RuntimeError(
+                        "Gamecontroller exited with code "
+                        f"{self.gamecontroller_proc.returncode} before it was ready"
+                    )
+
+                if time.monotonic() > deadline:
+                    raise
+
+            time.sleep(Gamecontroller.CI_MODE_CONNECT_RETRY_INTERVAL_S)
+
     def __exit__(self, type, value, traceback) -> None:
         """Exit the gamecontroller context manager.
 
@@ -112,6 +141,13 @@ class Gamecontroller:
         self.gamecontroller_proc.wait()
         self.ci_socket.close()
 
+    def is_running(self) -> bool:
+        """Returns whether the gamecontroller process is running
+
+        :return: True if the gamecontroller is running
+        """
+        return self.gamecontroller_proc.poll() is None
+
     def refresh(self):
         """Gets any manual gamecontroller commands from the buffer and executes them"""
         manual_command = self.command_override_buffer.get(return_cached=False)
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import dataclasses
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from subprocess import Popen
+from typing import Any, Optional
+
+
+@dataclass
+class CrashStats:
+    """Statistics about the crashes of a supervised process"""
+
+    # Number of times the process exited without being stopped
+    num_crashes: int = 0
+
+    # Number of times the process was restarted after a crash
+    num_restarts: int = 0
+
+    # Exit code of the last crash, negative if the process was killed by a signal
+    last_exit_code: Optional[int] = None
+
+    # Time of the last crash, in seconds since epoch
+    last_crash_time: Optional[float] = None
+
+    # How long the process ran before the last crash
+    last_uptime_s: Optional[float] = None
+
+
+class ProcessSupervisor:
+    """Launches a process and watches it for crashes, restarting it with
+    exponential backoff if requested.
+
+    A watcher thread blocks on the process exiting (waitpid), so crashes are
+    noticed as soon as they happen without scanning the processes on the host.
+    """
+
+    # Delay before the first restart after a crash. Every crash that happens
+    # soon after a restart doubles the delay, up to MAX_RESTART_DELAY_S.
+    INITIAL_RESTART_DELAY_S = 0.1
+    MAX_RESTART_DELAY_S = 5
+
+    # A process that runs this long before crashing is considered to have
+    # been healthy, so the restart delay goes back to INITIAL_RESTART_DELAY_S
+    STABLE_UPTIME_S = 30
+
+    def __init__(
+        self,
+        name: str,
+        command: list[str],
+        should_restart_on_crash: bool = False,
+        **popen_kwargs: Any,
+    ) -> None:
+        """Creates a supervisor for the given command. The process is not
+        launched until start is called.
+
+        :param name: the name of the process, used for logging
+        :param command: the command to launch the process with
+        :param should_restart_on_crash: whether to restart the process when it
+                                        exits without being stopped
+        :param popen_kwargs: extra arguments to pass to Popen
+        """
+        self.name = name
+        self.command = command
+        self.should_restart_on_crash = should_restart_on_crash
+        self.popen_kwargs = popen_kwargs
+
+        self.process: Optional[Popen] = None
+        self.process_start_time = 0.0
+        self.restart_delay_s = ProcessSupervisor.INITIAL_RESTART_DELAY_S
+        self.crash_stats = CrashStats()
+
+        # Guards process and crash_stats, so that a restart can't race with stop
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.watcher_thread = threading.Thread(target=self.__watch, daemon=True)
+
+    def start(self) -> Popen:
+        """Launches the process and starts watching it
+
+        :return: the launched process
+        """
+        with self.lock:
+            self.__launch()
+
+        self.watcher_thread.start()
+        return self.process
+
+    def stop(self, terminate_timeout_s: Optional[float] = None) -> None:
+        """Stops the process and stops restarting it
+
+        :param terminate_timeout_s: if given, the process is asked to terminate
+                                    and only killed if it hasn't exited after this
+                                    many seconds. Otherwise, it is killed right away.
+        """
+        with self.lock:
+            self.stop_event.set()
+            process = self.process
+
+        if process is None:
+            return
+
+        if terminate_timeout_s is None:
+            process.kill()
+        else:
+            process.terminate()
+
+        # The watcher thread returns once the process has exited
+        self.watcher_thread.join(timeout=terminate_timeout_s)
+
+        if self.watcher_thread.is_alive():
+            process.kill()
+            self.watcher_thread.join()
+
+    def is_running(self) -> bool:
+        """Returns whether the process is currently running
+
+        :return: True if the process is running
+        """
+        with self.lock:
+            return self.process is not None and self.process.poll() is None
+
+    def get_crash_stats(self) -> CrashStats:
+        """Returns a snapshot of the crash statistics of the process
+
+        :return: the crash statistics
+        """
+        with self.lock:
+            return dataclasses.replace(self.crash_stats)
+
+    def __launch(self) -> None:
+        """Launches the process. The lock must be held by the caller."""
+        self.process = Popen(self.command, **self.popen_kwargs)
+        self.process_start_time = time.monotonic()
+
+    def __watch(self) -> None:
+        """Waits for the process to exit, and records and recovers from crashes
+        until the supervisor is stopped
+        """
+        while True:
+            exit_code = self.process.wait()
+
+            with self.lock:
+                if self.stop_event.is_set():
+                    return
+
+                uptime_s = time.monotonic() - self.process_start_time
+                self.crash_stats.num_crashes += 1
+                self.crash_stats.last_exit_code = exit_code
+                self.crash_stats.last_crash_time = time.time()
+                self.crash_stats.last_uptime_s = uptime_s
+
+            logging.warning(
+                f"{self.name} exited with code {exit_code} after running for {uptime_s:.1f} s"
+            )
+
+            if not self.should_restart_on_crash:
+                return
+
+            if uptime_s > ProcessSupervisor.STABLE_UPTIME_S:
+                self.restart_delay_s = ProcessSupervisor.INITIAL_RESTART_DELAY_S
+
+            # Returns early if the supervisor is stopped while we back off
+            if self.stop_event.wait(self.restart_delay_s):
+                return
+
+            self.restart_delay_s = min(
+                2 * self.restart_delay_s, ProcessSupervisor.MAX_RESTART_DELAY_S
+            )
+
+            with self.lock:
+                if self.stop_event.is_set():
+                    return
+
+                self.__launch()
+                self.crash_stats.num_restarts += 1
+
+            logging.info(f"{self.name} has restarted.")
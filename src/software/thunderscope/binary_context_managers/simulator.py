@@ -4,18 +4,35 @@ import os
 import logging
 import time
 
-from subprocess import Popen
 from software.python_bindings import *
 from proto.import_all_protos import *
 from software.py_constants import *
 from software.thunderscope.proto_unix_io import ProtoUnixIO
 from extlibs.er_force_sim.src.protobuf.world_pb2 import SimulatorState
 from software.thunderscope.binary_context_managers.util import *
+from software.thunderscope.binary_context_managers.process_supervisor import (
+    CrashStats,
+    ProcessSupervisor,
+)
 
 
 class Simulator:
     """Simulator Context Manager"""
 
+    # The unix sockets the simulator listens on. The simulator is ready to be
+    # used once it is listening on all of them.
+    INPUT_SOCKET_PATHS = [
+        WORLD_STATE_PATH,
+        BLUE_WORLD_PATH,
+        YELLOW_WORLD_PATH,
+        YELLOW_PRIMITIVE_SET,
+        BLUE_PRIMITIVE_SET,
+        SIMULATION_TICK_PATH,
+    ]
+
+    # How long to wait for the simulator to start listening on its sockets
+    READY_TIMEOUT_S = 10
+
     def __init__(
         self,
         simulator_runtime_dir: os.PathLike = None,
@@ -33,7 +50,7 @@ class Simulator:
         """
         self.simulator_runtime_dir = simulator_runtime_dir
         self.debug_simulator = debug_simulator
-        self.er_force_simulator_proc = None
+        self.er_force_simulator_supervisor = None
         self.enable_realism = enable_realism
 
     def __enter__(self) -> Simulator:
@@ -42,6 +59,9 @@ class Simulator:
         If the debug mode is enabled then the binary is _not_ run and the
         command to debug under gdb is printed.
 
+        Returns once the simulator is listening on all of its input sockets, so
+        protos sent right after entering are not dropped.
+
         :return: simulator context managed instance
         """
         # Setup unix socket directory
@@ -59,12 +79,10 @@ class Simulator:
 
         if self.debug_simulator:
             # We don't want to check the exact command because this binary could
-            # be debugged from clion or somewhere other than gdb
-            if not is_cmd_running(
-                [
-                    "er_force_simulator_main",
-                    "--runtime_dir={}".format(self.simulator_runtime_dir),
-                ]
+            # be debugged from clion or somewhere other than gdb, so we check if
+            # a simulator is listening in our runtime directory instead
+            if not is_unix_socket_listening(
+                self.simulator_runtime_dir + SIMULATION_TICK_PATH
             ):
                 logging.info(
                     (
@@ -87,7 +105,22 @@ gdb --args bazel-bin/{simulator_command}
                 while True:
                     time.sleep(1)
         else:
-            self.er_force_simulator_proc = Popen(simulator_command.split(" "))
+            self.er_force_simulator_supervisor = ProcessSupervisor(
+                "Simulator", simulator_command.split(" ")
+            )
+            self.er_force_simulator_supervisor.start()
+
+        if not wait_for_unix_sockets(
+            self.simulator_runtime_dir,
+            Simulator.INPUT_SOCKET_PATHS,
+            Simulator.READY_TIMEOUT_S,
+            self.er_force_simulator_supervisor.process
+            if self.er_force_simulator_supervisor
+            else None,
+        ):
+            logging.warning(
+                f"Simulator was not ready after {Simulator.READY_TIMEOUT_S} s, continuing anyway"
+            )
 
         return self
 
@@ -98,9 +131,30 @@ gdb --args bazel-bin/{simulator_command}
         :param value: The exception that was raised
         :param traceback: The traceback of the exception
         """
-        if self.er_force_simulator_proc:
-            self.er_force_simulator_proc.kill()
-            self.er_force_simulator_proc.wait()
+        if self.er_force_simulator_supervisor:
+            self.er_force_simulator_supervisor.stop()
+
+    def get_crash_stats(self) -> CrashStats:
+        """Returns the crash statistics of the simulator we launched
+
+        :return: the crash statistics, empty if we didn't launch the simulator
+        """
+        if self.er_force_simulator_supervisor is None:
+            return CrashStats()
+
+        return self.er_force_simulator_supervisor.get_crash_stats()
+
+    def is_running(self) -> bool:
+        """Returns whether the simulator is running, whether we launched it or not
+
+        :return: True if the simulator is running
+        """
+        if self.er_force_simulator_supervisor is None:
+            return is_unix_socket_listening(
+                self.simulator_runtime_dir + SIMULATION_TICK_PATH
+            )
+
+        return self.er_force_simulator_supervisor.is_running()
 
     def setup_proto_unix_io(
         self,
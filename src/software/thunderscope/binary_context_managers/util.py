@@ -1,23 +1,65 @@
-import psutil as util
+import os
+import socket
+import time
+from subprocess import Popen
+
 from software.python_bindings import *
 from proto.import_all_protos import *
 from software.py_constants import *
 
+# How often to check whether a binary has started serving
+READY_POLL_INTERVAL_S = 0.005
+
+
+def is_unix_socket_listening(path: os.PathLike) -> bool:
+    """Check if a process is listening on the unix datagram socket at the given path.
 
-def is_cmd_running(command: list[str]) -> bool:
-    """Check if there is any running process that was launched with the given command.
+    Our binaries unlink and rebind their listener sockets on startup, so a socket
+    file can be left over from a previous run. Connecting to the socket only succeeds
+    if a process has bound it, so stale socket files are not mistaken for listeners.
 
-    :param command: Command that was used to launch the process. List of strings.
-    :return: whether there is a running process that was launched with the given command
+    :param path: the path of the unix socket
+    :return: whether a process is listening on the socket
     """
-    for proc in util.process_iter():
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
         try:
-            for string in command:
-                if string not in "".join(proc.cmdline()):
-                    break
-            else:
-                return True
-        except (util.NoSuchProcess, util.AccessDenied, util.ZombieProcess):
-            pass
-
-    return False
+            sock.connect(path)
+            return True
+        except OSError:
+            return False
+
+
+def wait_for_unix_sockets(
+    runtime_dir: os.PathLike,
+    socket_paths: list[str],
+    timeout_s: float,
+    process: Popen = None,
+) -> bool:
+    """Wait until a binary is listening on all of the given unix sockets, which
+    means it is ready to receive protos.
+
+    :param runtime_dir: the runtime directory the binary was launched with
+    :param socket_paths: the paths of the sockets the binary listens on, relative
+                         to the runtime directory
+    :param timeout_s: the maximum time to wait for the binary
+    :param process: the process running the binary, if it was launched by us.
+                    Waiting stops early if the process exits.
+    :return: True if the binary is ready, False if it was not ready in time
+    """
+    deadline = time.monotonic() + timeout_s
+    remaining_paths = [runtime_dir + socket_path for socket_path in socket_paths]
+
+    while True:
+        remaining_paths = [
+            path for path in remaining_paths if not is_unix_socket_listening(path)
+        ]
+
+        if not remaining_paths:
+            return True
+
+        if (
+            process is not None and process.poll() is not None
+        ) or time.monotonic() > deadline:
+            return False
+
+        time.sleep(READY_POLL_INTERVAL_S)
@@ -221,6 +221,146 @@ class ToggleableButton(QPushButton):
         )
 
 
+class TableDataModel(QtCore.QAbstractTableModel):
+    """A table model for widgets that show the same table with new values many
+    times a second. New data is compared with the data already shown, and the
+    views are only told about the cells that changed, so unchanged data doesn't
+    cause repainting or relayout.
+    """
+
+    def __init__(
+        self,
+        column_names: list[str],
+        header_size_hint_width_expansion: int,
+        item_size_hint_width_expansion: int,
+    ) -> None:
+        """Creates an empty table
+
+        :param column_names: the names of the columns, shown as headers
+        :param header_size_hint_width_expansion: the factor multiplied by the length of the header
+        :param item_size_hint_width_expansion: the factor multiplied by the length of the item
+        """
+        super().__init__()
+        self.column_names = column_names
+        self.header_size_hint_width_expansion = header_size_hint_width_expansion
+        self.item_size_hint_width_expansion = item_size_hint_width_expansion
+
+        # The text of the cells, indexed by [row][column]
+        self.rows: list[list[str]] = []
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        """Returns the number of rows
+
+        :param parent: unused, since this is a table
+        :return: the number of rows
+        """
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        """Returns the number of columns
+
+        :param parent: unused, since this is a table
+        :return: the number of columns
+        """
+        return 0 if parent.isValid() else len(self.column_names)
+
+    def data(self, index: QtCore.QModelIndex, role: int) -> object:
+        """Returns the text or size hint of a cell
+
+        :param index: the index of the cell
+        :param role: the data to return
+        :return: the data, or None if the model doesn't have it
+        """
+        if not index.isValid():
+            return None
+
+        text = self.rows[index.row()][index.column()]
+
+        if role == QtCore.Qt.ItemDataRole.DisplayRole:
+            return text
+
+        if role == QtCore.Qt.ItemDataRole.SizeHintRole:
+            return QtCore.QSize(
+                max(
+                    len(self.column_names[index.column()])
+                    * self.header_size_hint_width_expansion,
+                    len(text) * self.item_size_hint_width_expansion,
+                ),
+                1,
+            )
+
+        return None
+
+    def headerData(
+        self,
+        section: int,
+        orientation: QtCore.Qt.Orientation,
+        role: int = QtCore.Qt.ItemDataRole.DisplayRole,
+    ) -> object:
+        """Returns the column names as the horizontal headers
+
+        :param section: the index of the column or row
+        :param orientation: whether the header is horizontal or vertical
+        :param role: the data to return
+        :return: the data, or None if the model doesn't have it
+        """
+        if (
+            orientation == QtCore.Qt.Orientation.Horizontal
+            and role == QtCore.Qt.ItemDataRole.DisplayRole
+        ):
+            return self.column_names[section]
+
+        return None
+
+    def set_data(self, data: dict) -> bool:
+        """Sets the data in the table, only updating the cells that changed
+
+        :param data: dict containing {"column_name": [column_items]} for every
+                     column. Columns shorter than the longest column are
+                     padded with empty cells.
+        :return: True if any cell changed
+        """
+        columns = [[str(item) for item in data[name]] for name in self.column_names]
+        num_rows = max((len(column) for column in columns), default=0)
+        new_rows = [
+            [column[row] if row < len(column) else "" for column in columns]
+            for row in range(num_rows)
+        ]
+
+        changed = False
+        num_old_rows = len(self.rows)
+
+        if num_rows < num_old_rows:
+            self.beginRemoveRows(QtCore.QModelIndex(), num_rows, num_old_rows - 1)
+            del self.rows[num_rows:]
+            self.endRemoveRows()
+            changed = True
+
+        for row, (old_row, new_row) in enumerate(zip(self.rows, new_rows)):
+            changed_columns = [
+                column
+                for column, (old_text, new_text) in enumerate(zip(old_row, new_row))
+                if old_text != new_text
+            ]
+            if not changed_columns:
+                continue
+
+            self.rows[row] = new_row
+            self.dataChanged.emit(
+                self.index(row, changed_columns[0]),
+                self.index(row, changed_columns[-1]),
+            )
+            changed = True
+
+        if num_rows > num_old_rows:
+            self.beginInsertRows(QtCore.QModelIndex(), num_old_rows, num_rows - 1)
+            self.rows.extend(new_rows[num_old_rows:])
+            self.endInsertRows()
+            changed = True
+
+        return changed
+
+
 def create_buttons(text: list):
     """Creates QPushButton objects inside a QGroupBox object.
     The default color of button will be white with black background.
@@ -345,38 +485,6 @@ def create_float_slider(text, decimals, min_val, max_val, tick_spacing):
     return create_slider_abs(slider, text, min_val, max_val, tick_spacing)
 
 
-def set_table_data(
-    data, table, header_size_hint_width_expansion, item_size_hint_width_expansion
-):
-    """Set data in a table
-
-    :param data: dict containing {"column_name": [column_items]}
-    :param table: table widget that will contain the data
-    :param header_size_hint_width_expansion: the factor multiplied by the length of the header
-    :param item_size_hint_width_expansion: the factor multiplied by the length of the item
-    """
-    horizontal_headers = []
-
-    for n, key in enumerate(data.keys()):
-        horizontal_headers.append(key)
-
-        for m, item in enumerate(data[key]):
-            str_item = str(item)
-            newitem = QTableWidgetItem(str_item)
-            newitem.setSizeHint(
-                QtCore.QSize(
-                    max(
-                        len(key) * header_size_hint_width_expansion,
-                        len(str_item) * item_size_hint_width_expansion,
-                    ),
-                    1,
-                )
-            )
-            table.setItem(m, n, newitem)
-
-    table.setHorizontalHeaderLabels(horizontal_headers)
-
-
 def disconnect_signal(signal: QtCore.Signal):
     """Helper function to disconnect all connections for a Qt signal.
     Suppresses TypeErrors thrown by Signal.disconnect() if there are no connections.
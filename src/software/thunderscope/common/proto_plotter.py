@@ -1,9 +1,10 @@
 from random import randint
+import math
 import time
-from collections import deque
 from typing import Type, Callable
 from google.protobuf.message import Message
 
+import numpy as np
 import pyqtgraph as pg
 from pyqtgraph.Qt.QtWidgets import *
 from pyqtgraph.Qt import QtGui
@@ -11,6 +12,72 @@ from pyqtgraph.Qt import QtGui
 from software.thunderscope.thread_safe_buffer import ThreadSafeBuffer
 
 
+class TimeSeriesRingBuffer:
+    """Fixed capacity buffer of (x, y) points backed by preallocated numpy arrays
+
+    Every point is written twice, at index i and i + capacity, so the most
+    recent points are always available as one contiguous view without copying:
+
+               │        capacity         │        capacity         │
+               ├─────────────────────────┼─────────────────────────┤
+               ┌────┬────┬────┬────┬─────┬────┬────┬────┬────┬─────┐
+               │ 5  │ 6  │ 2  │ 3  │  4  │ 5  │ 6  │ 2  │ 3  │  4  │
+               └────┴────┴────┴────┴─────┴────┴────┴────┴────┴─────┘
+                         └──────── oldest to newest ───────┘
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """Creates an empty ring buffer
+
+        :param capacity: the maximum number of points stored
+        """
+        self.capacity = capacity
+        self.x = np.zeros(2 * capacity, dtype=np.float64)
+        self.y = np.zeros(2 * capacity, dtype=np.float64)
+
+        # Index of the next point to write, in [0, capacity)
+        self.write_index = 0
+        self.size = 0
+
+    def extend(self, x: np.ndarray, y: np.ndarray) -> None:
+        """Appends the given points, overwriting the oldest points if full
+
+        :param x: the x values of the points to append
+        :param y: the y values of the points to append
+        """
+        # Only the newest points that fit in the buffer matter
+        x = x[-self.capacity :]
+        y = y[-self.capacity :]
+        num_points = len(x)
+
+        first_len = min(num_points, self.capacity - self.write_index)
+        for start, values_start, length in (
+            (self.write_index, 0, first_len),
+            (0, first_len, num_points - first_len),
+        ):
+            if length == 0:
+                continue
+
+            values_end = values_start + length
+            for data, values in ((self.x, x), (self.y, y)):
+                data[start : start + length] = values[values_start:values_end]
+                data[start + self.capacity : start + self.capacity + length] = values[
+                    values_start:values_end
+                ]
+
+        self.write_index = (self.write_index + num_points) % self.capacity
+        self.size = min(self.size + num_points, self.capacity)
+
+    def view(self) -> tuple[np.ndarray, np.ndarray]:
+        """Returns views of the stored points, from oldest to newest.
+        The views are invalidated by the next call to extend.
+
+        :return: a tuple of the x values and y values
+        """
+        end = self.write_index + self.capacity
+        return self.x[end - self.size : end], self.y[end - self.size : end]
+
+
 class ProtoPlotter(QWidget):
     """Plot the protobuf data in a pyqtgraph plot
 
@@ -72,10 +139,8 @@ class ProtoPlotter(QWidget):
         self.win.disableAutoRange()
         self.win.setYRange(min_y, max_y)
 
-        self.data = {}
         self.plots = {}
-        self.data_x = {}
-        self.data_y = {}
+        self.series: dict[str, TimeSeriesRingBuffer] = {}
         self.legend = pg.LegendItem((80, 60), offset=(70, 20))
         self.legend.setParentItem(self.win.graphicsItem())
         self.window_secs = window_secs
@@ -88,7 +153,6 @@ class ProtoPlotter(QWidget):
 
         self.time = time.time()
         self.last_update_time = time.time()
-        self.last_incoming_value = {}
         self.update_interval = 1.0 / plot_rate_hz
         self.buffer_size = buffer_size
 
@@ -97,49 +161,108 @@ class ProtoPlotter(QWidget):
 
     def refresh(self) -> None:
         """Refreshes ProtoPlotter and updates data in the respective plots."""
-        # Dump the entire buffer into a deque. This operation is fast because
-        # its just consuming data from the buffer and appending it to a deque.
+        # Every protobuf drained in this refresh is plotted at the same time,
+        # so the clock is only read once per refresh
+        refresh_time = time.time()
+        timestamp = refresh_time - self.time
+
+        # Drain the buffers into lists first, then append each series to its
+        # ring buffer in one vectorized operation
+        new_data: dict[str, tuple[list[float], list[float]]] = {}
+
         for proto_class, buffer in self.buffers.items():
+            extract_data = self.configuration[proto_class]
+
             for _ in range(buffer.size()):
-                data = self.configuration[proto_class](buffer.get(block=False))
-
-                # If named_value is new, create a plot and for the new value and
-                # add it to necessary maps
-                for name, value in data.items():
-                    if name not in self.plots:
-                        self.data_x[name] = deque([], self.buffer_size)
-                        self.data_y[name] = deque([], self.buffer_size)
-
-                        # Ensure hue has sufficient contrast
-                        self.color_hue = (self.color_hue + randint(100, 260)) % 360
-                        self.plots[name] = self.win.plot(
-                            pen=QtGui.QColor.fromHsl(
-                                self.color_hue, 255, round(255 * 0.8)
-                            ),
-                            name=name,
-                            disableAutoRange=True,
-                            brush=None,
-                        )
-
-                        self.plots[name].setDownsampling(method="peak")
-                        self.legend.addItem(self.plots[name], name)
-
-                    # Add incoming data to existing deques of data
-                    self.data_x[name].append(time.time() - self.time)
-                    self.data_y[name].append(value)
-
-        if self.last_update_time + self.update_interval > time.time():
+                proto = buffer.get(block=False)
+
+                for name, value in extract_data(proto).items():
+                    if name not in new_data:
+                        new_data[name] = ([], [])
+
+                    new_data[name][0].append(timestamp)
+                    new_data[name][1].append(value)
+
+        for name, (data_x, data_y) in new_data.items():
+            if name not in self.plots:
+                self.__add_plot(name)
+
+            self.series[name].extend(
+                np.asarray(data_x, dtype=np.float64),
+                np.asarray(data_y, dtype=np.float64),
+            )
+
+        if self.last_update_time + self.update_interval > refresh_time:
             return
 
-        self.last_update_time = time.time()
+        self.last_update_time = refresh_time
+
+        window_end = self.last_update_time - self.time
+        window_start = window_end - self.window_secs
+        num_pixels = max(int(self.win.getPlotItem().getViewBox().width()), 1)
+
+        for name, plot in self.plots.items():
+            data_x, data_y = self.series[name].view()
+
+            # Only plot the points that are in the window, plus the point right
+            # before it so that the line reaches the edge of the plot
+            first_visible = max(np.searchsorted(data_x, window_start) - 1, 0)
+            plot.setData(
+                *self.__decimate(
+                    data_x[first_visible:], data_y[first_visible:], num_pixels
+                )
+            )
+
+        self.win.setRange(xRange=[window_start, window_end])
 
-        for named_value, plot in self.plots.items():
-            # Update the data
-            plot.setData(self.data_x[named_value], self.data_y[named_value])
+    def __add_plot(self, name: str) -> None:
+        """Creates a plot and a ring buffer for a new named value
 
-        self.win.setRange(
-            xRange=[
-                time.time() - self.time - self.window_secs,
-                time.time() - self.time,
-            ],
+        :param name: the name of the value
+        """
+        self.series[name] = TimeSeriesRingBuffer(self.buffer_size)
+
+        # Ensure hue has sufficient contrast
+        self.color_hue = (self.color_hue + randint(100, 260)) % 360
+        self.plots[name] = self.win.plot(
+            pen=QtGui.QColor.fromHsl(self.color_hue, 255, round(255 * 0.8)),
+            name=name,
+            disableAutoRange=True,
+            brush=None,
         )
+        self.legend.addItem(self.plots[name], name)
+
+    @staticmethod
+    def __decimate(
+        data_x: np.ndarray, data_y: np.ndarray, num_pixels: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Reduces the points to at most two per pixel column by keeping the
+        minimum and maximum of each group of points, so spikes stay visible.
+
+        :param data_x: the x values of the points, in increasing order
+        :param data_y: the y values of the points
+        :param num_pixels: the width of the plot in pixels
+        :return: a tuple of the decimated x values and y values
+        """
+        num_points = len(data_x)
+        if num_points <= 2 * num_pixels:
+            return data_x, data_y
+
+        group_size = math.ceil(num_points / num_pixels)
+        num_groups = num_points // group_size
+        grouped_len = num_groups * group_size
+
+        groups_y = data_y[:grouped_len].reshape(num_groups, group_size)
+        group_offsets = np.arange(num_groups) * group_size
+
+        # Keep the min and max of each group in the order they occurred
+        min_indices = group_offsets + np.argmin(groups_y, axis=1)
+        max_indices = group_offsets + np.argmax(groups_y, axis=1)
+        indices = np.empty(2 * num_groups, dtype=np.intp)
+        indices[0::2] = np.minimum(min_indices, max_indices)
+        indices[1::2] = np.maximum(min_indices, max_indices)
+
+        # The leftover points don't fill a group, so they are kept as is
+        indices = np.concatenate((indices, np.arange(grouped_len, num_points)))
+
+        return data_x[indices], data_y[indices]
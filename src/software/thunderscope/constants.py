@@ -87,9 +87,24 @@ BALL_HEIGHT_EFFECT_MULTIPLIER = 3
 # in robot communications
 ROBOT_COMMUNICATIONS_TIMEOUT_S = 0.02
 
+# How often (in seconds) robot communications publishes the statistics of
+# the link to each robot
+LINK_STATISTICS_PUBLISH_PERIOD_S = 1.0
+
+# How often (in seconds) robot communications reads the physical estop. The
+# estop reader reads the estop every 5 ms, so we check for changes as often.
+ESTOP_POLL_PERIOD_S = 0.005
+
+# How often (in seconds) robot communications republishes the estop state
+# when it hasn't changed, so that late subscribers still receive it
+ESTOP_HEARTBEAT_PERIOD_S = 1.0
+
 # time between each refresh of thunderscope in milliseconds
 THUNDERSCOPE_REFRESH_INTERVAL_MS = 10
 
+# How long the warning shown when a binary launched by thunderscope crashes stays up
+CRASH_WARNING_TIMEOUT_MS = 5000
+
 ROBOT_FATAL_TIMEOUT_S = 5
 # Max time (in seconds) tolerated between repeated crash protos until
 # crash alert occurs
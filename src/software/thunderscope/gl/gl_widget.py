@@ -7,8 +7,10 @@ from pyqtgraph.Qt.QtWidgets import *
 from pyqtgraph.opengl import *
 
 import numpy as np
-from typing import Optional
+from typing import Callable, Optional
 from software.thunderscope.common.frametime_counter import FrameTimeCounter
+from software.thunderscope.startup_profiler import startup_profiler
+from software.networking.tracing import tracer
 
 from software.thunderscope.constants import *
 from software.thunderscope.proto_unix_io import ProtoUnixIO
@@ -239,6 +241,37 @@ class GLWidget(QWidget):
             lambda: layer.setVisible(layer_checkbox.isChecked())
         )
 
+    def add_lazy_layer(self, name: str, layer_factory: Callable[[], GLLayer]) -> None:
+        """Add a layer to the Layer menu that is hidden on startup, without
+        constructing it. The layer is constructed and added to the scene the
+        first time it is made visible from the menu.
+
+        :param name: The displayed name of the layer
+        :param layer_factory: Function that constructs the GLLayer
+        """
+        (layer_checkbox, layer_action) = self.__setup_menu_checkbox(
+            name, self.layers_menu, False
+        )
+        self.layers_menu_actions[name] = layer_action
+        self.layers_menu.addAction(layer_action)
+
+        def __on_first_checked() -> None:
+            if not layer_checkbox.isChecked():
+                return
+
+            layer_checkbox.stateChanged.disconnect(__on_first_checked)
+
+            with startup_profiler.span(f"Construct layer {name}"):
+                layer = layer_factory()
+
+            self.layers.append(layer)
+            self.gl_view_widget.addItem(layer)
+            layer_checkbox.stateChanged.connect(
+                lambda: layer.setVisible(layer_checkbox.isChecked())
+            )
+
+        layer_checkbox.stateChanged.connect(__on_first_checked)
+
     def remove_layer(self, layer: GLLayer) -> None:
         """Remove a layer from this GLWidget
 
@@ -272,7 +305,8 @@ class GLWidget(QWidget):
         if simulation_state.is_playing:
             for layer in self.layers:
                 if layer.visible():
-                    layer.refresh_graphics()
+                    with tracer.zone(layer.name):
+                        layer.refresh_graphics()
 
     def set_camera_view(self, camera_view: CameraView) -> None:
         """Set the camera position to a preset camera view
@@ -116,6 +116,11 @@ class GLCostVisLayer(GLLayer):
             self.timeout = time.time() + GLCostVisLayer.COST_VISUALIZATION_TIMEOUT_S
             self.cached_cost_vis = cost_vis
 
+        # Nothing to draw until a cost visualization has been received
+        if not cost_vis.cost:
+            self.heatmap_graphic.hide()
+            return
+
         # Cost vis data is in column-major order; reshape into 2D matrix
         data = np.array(cost_vis.cost).reshape(
             cost_vis.num_rows, cost_vis.num_cols, order="F"
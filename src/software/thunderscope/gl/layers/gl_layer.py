@@ -4,6 +4,7 @@ from pyqtgraph.opengl.GLGraphicsItem import GLGraphicsItem
 from software.thunderscope.gl.helpers.observable_list import Change, ChangeAction
 from software.thunderscope.gl.helpers.extended_gl_view_widget import MouseInSceneEvent
 from software.thunderscope.gl.helpers.gl_patches import *
+from software.thunderscope.thread_safe_buffer import ThreadSafeBuffer
 
 
 class GLLayer(GLGraphicsItem):
@@ -30,6 +31,41 @@ class GLLayer(GLGraphicsItem):
         """Updates the GLGraphicsItems in this layer"""
         raise NotImplementedError("Subclasses must implement this method!")
 
+    def get_buffers(self) -> dict[str, ThreadSafeBuffer]:
+        """Returns the ThreadSafeBuffers this layer receives protos through.
+
+        The layer's attributes are searched, along with the dicts, lists, tuples
+        and sets in them. Subclasses that keep their buffers elsewhere should
+        override this method.
+
+        :return: the buffers by name, where the name of a buffer in a container
+                 is the attribute name followed by its key or index, e.g. "buffers[3]"
+        """
+        buffers = {}
+        visited_containers = set()
+
+        def find_buffers(name: str, value: object) -> None:
+            if isinstance(value, ThreadSafeBuffer):
+                buffers[name] = value
+                return
+
+            if not isinstance(value, (dict, list, tuple, set)):
+                return
+
+            # Containers can hold references to themselves or each other
+            if id(value) in visited_containers:
+                return
+            visited_containers.add(id(value))
+
+            items = value.items() if isinstance(value, dict) else enumerate(value)
+            for key, item in items:
+                find_buffers(f"{name}[{key}]", item)
+
+        for name, value in vars(self).items():
+            find_buffers(name, value)
+
+        return buffers
+
     def keyPressEvent(self, event: QtGui.QKeyEvent) -> None:
         """Detect when a key has been pressed
 
@@ -57,6 +57,11 @@ class GLPassingLayer(GLLayer):
 
             self.cached_pass_vis = pass_vis
 
+        # Nothing to draw until a pass has been received
+        if not pass_vis.best_passes:
+            self.pass_graphics.clear()
+            return
+
         # Ensure we have the same number of graphics as protos
         self.pass_graphics.resize(
             1,
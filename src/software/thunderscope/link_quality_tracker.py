@@ -0,0 +1,181 @@
+import bisect
+import math
+import threading
+from collections import deque
+
+from proto.import_all_protos import *
+from software.py_constants import MAX_ROBOT_IDS_PER_SIDE
+
+
+class LinkQualityTracker:
+    """Measures the quality of the link used to send primitives to each robot.
+
+    Every primitive sent is recorded with its sequence number. Robots report the
+    sequence number of the last primitive they handled in their RobotStatus, so
+    matching the acknowledged sequence numbers to the primitives sent gives the
+    round trip time, loss and jitter of each robot's link over a sliding window.
+    """
+
+    # How far back the statistics look
+    WINDOW_DURATION_S = 10.0
+
+    # A primitive is lost if neither it nor a newer primitive is acknowledged
+    # within this long of sending it. Robots don't acknowledge every primitive,
+    # since they only report the last one handled when sending their status.
+    ACK_TIMEOUT_S = 0.5
+
+    # The round trip time histogram covers 0 to 100 ms
+    HISTOGRAM_BIN_WIDTH_S = 0.002
+    NUM_HISTOGRAM_BINS = 50
+
+    def __init__(self) -> None:
+        """Creates a tracker with nothing recorded"""
+        # Per robot, a map of the sequence numbers of the primitives sent in the
+        # window to the time they were sent. Sequence numbers increase with time.
+        self.sent_primitives: list[dict[int, float]] = [
+            {} for _ in range(MAX_ROBOT_IDS_PER_SIDE)
+        ]
+
+        # Per robot, the (sequence number, time received, round trip time) of
+        # the acknowledgements received in the window, oldest first
+        self.acknowledgements: list[deque[tuple[int, float, float]]] = [
+            deque() for _ in range(MAX_ROBOT_IDS_PER_SIDE)
+        ]
+
+        self.lock = threading.Lock()
+
+    def record_sent(self, robot_id: int, sequence_number: int, time_s: float) -> None:
+        """Records that a primitive was sent to a robot
+
+        :param robot_id: the id of the robot the primitive was sent to
+        :param sequence_number: the sequence number of the primitive
+        :param time_s: the time the primitive was sent, in seconds since epoch
+        """
+        with self.lock:
+            self.sent_primitives[robot_id][sequence_number] = time_s
+            self.__remove_old_records(robot_id, time_s)
+
+    def record_acknowledged(
+        self,
+        robot_id: int,
+        sequence_number: int,
+        round_trip_time_s: float,
+        time_s: float,
+    ) -> None:
+        """Records that a robot reported handling a primitive. Only the first
+        report of each primitive we sent is counted.
+
+        :param robot_id: the id of the robot
+        :param sequence_number: the sequence number of the primitive handled
+        :param round_trip_time_s: the round trip time of the primitive
+        :param time_s: the time the report was received, in seconds since epoch
+        """
+        with self.lock:
+            acknowledgements = self.acknowledgements[robot_id]
+
+            if acknowledgements and sequence_number <= acknowledgements[-1][0]:
+                return
+
+            if sequence_number not in self.sent_primitives[robot_id]:
+                return
+
+            acknowledgements.append((sequence_number, time_s, round_trip_time_s))
+            self.__remove_old_records(robot_id, time_s)
+
+    def get_statistics(self, robot_id: int, time_s: float) -> RobotLinkStatistics:
+        """Computes the link statistics of a robot over the window ending now
+
+        :param robot_id: the id of the robot
+        :param time_s: the current time, in seconds since epoch
+        :return: the link statistics
+        """
+        with self.lock:
+            self.__remove_old_records(robot_id, time_s)
+            sent_primitives = list(self.sent_primitives[robot_id].items())
+            acknowledgements = list(self.acknowledgements[robot_id])
+
+        statistics = RobotLinkStatistics(
+            robot_id=robot_id,
+            window_duration_seconds=LinkQualityTracker.WINDOW_DURATION_S,
+            num_primitives_sent=len(sent_primitives),
+            histogram_bin_width_seconds=LinkQualityTracker.HISTOGRAM_BIN_WIDTH_S,
+        )
+
+        # Primitives sent within the ack timeout may still be acknowledged,
+        # so they aren't counted as lost yet
+        acknowledged_sequence_numbers = [ack[0] for ack in acknowledgements]
+        num_expired = 0
+        num_lost = 0
+        for sequence_number, sent_time_s in sent_primitives:
+            if sent_time_s > time_s - LinkQualityTracker.ACK_TIMEOUT_S:
+                break
+
+            num_expired += 1
+
+            # The first acknowledgement of this or a newer primitive is the
+            # earliest one, since sequence numbers increase with time
+            index = bisect.bisect_left(acknowledged_sequence_numbers, sequence_number)
+            if (
+                index == len(acknowledgements)
+                or acknowledgements[index][1]
+                > sent_time_s + LinkQualityTracker.ACK_TIMEOUT_S
+            ):
+                num_lost += 1
+
+        if num_expired > 0:
+            statistics.loss_rate = num_lost / num_expired
+
+        round_trip_times_s = [ack[2] for ack in acknowledgements]
+        statistics.num_round_trip_times = len(round_trip_times_s)
+        statistics.round_trip_time_histogram.extend(
+            [0] * LinkQualityTracker.NUM_HISTOGRAM_BINS
+        )
+
+        if not round_trip_times_s:
+            return statistics
+
+        for round_trip_time_s in round_trip_times_s:
+            bin_index = int(
+                max(round_trip_time_s, 0) / LinkQualityTracker.HISTOGRAM_BIN_WIDTH_S
+            )
+            statistics.round_trip_time_histogram[
+                min(bin_index, LinkQualityTracker.NUM_HISTOGRAM_BINS - 1)
+            ] += 1
+
+        statistics.jitter_seconds = sum(
+            abs(current - previous)
+            for previous, current in zip(round_trip_times_s, round_trip_times_s[1:])
+        ) / max(len(round_trip_times_s) - 1, 1)
+
+        sorted_round_trip_times_s = sorted(round_trip_times_s)
+
+        def percentile(percent: float) -> float:
+            index = math.ceil(percent / 100 * len(sorted_round_trip_times_s)) - 1
+            return sorted_round_trip_times_s[max(index, 0)]
+
+        statistics.round_trip_time_p50_seconds = percentile(50)
+        statistics.round_trip_time_p95_seconds = percentile(95)
+        statistics.round_trip_time_p99_seconds = percentile(99)
+        statistics.round_trip_time_max_seconds = sorted_round_trip_times_s[-1]
+
+        return statistics
+
+    def __remove_old_records(self, robot_id: int, time_s: float) -> None:
+        """Removes the records of a robot that are older than the window.
+        The lock must be held by the caller.
+
+        :param robot_id: the id of the robot
+        :param time_s: the current time, in seconds since epoch
+        """
+        window_start_s = time_s - LinkQualityTracker.WINDOW_DURATION_S
+
+        sent_primitives = self.sent_primitives[robot_id]
+        while sent_primitives:
+            oldest_sequence_number = next(iter(sent_primitives))
+            if sent_primitives[oldest_sequence_number] >= window_start_s:
+                break
+            del sent_primitives[oldest_sequence_number]
+
+        acknowledgements = self.acknowledgements[robot_id]
+        while acknowledgements and acknowledgements[0][1] < window_start_s:
+            acknowledgements.popleft()
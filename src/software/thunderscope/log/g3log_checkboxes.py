@@ -1,9 +1,10 @@
 from pyqtgraph.Qt.QtWidgets import QWidget, QGridLayout, QCheckBox
+from software.py_constants import MAX_ROBOT_IDS_PER_SIDE
 
 
 class g3logCheckboxes(QWidget):
     def __init__(self):
-        """Check boxes to filter g3log levels"""
+        """Check boxes to filter g3log levels and robots"""
         QWidget.__init__(self)
         layout = QGridLayout()
         self.setLayout(layout)
@@ -24,3 +25,23 @@ class g3logCheckboxes(QWidget):
         self.fatal_checkbox = QCheckBox("FATAL")
         self.fatal_checkbox.setChecked(True)
         layout.addWidget(self.fatal_checkbox, 0, 3)
+
+        # Creates a checkbox per robot, in rows of 4
+        self.robot_checkboxes = []
+        for robot_id in range(MAX_ROBOT_IDS_PER_SIDE):
+            robot_checkbox = QCheckBox(f"R{robot_id}")
+            robot_checkbox.setChecked(True)
+            layout.addWidget(robot_checkbox, 1 + robot_id // 4, robot_id % 4)
+            self.robot_checkboxes.append(robot_checkbox)
+
+    def get_checkboxes(self) -> list[QCheckBox]:
+        """Returns all the checkboxes
+
+        :return: the level checkboxes followed by the robot checkboxes
+        """
+        return [
+            self.debug_checkbox,
+            self.info_checkbox,
+            self.warning_checkbox,
+            self.fatal_checkbox,
+        ] + self.robot_checkboxes
@@ -1,25 +1,143 @@
+import numpy as np
+from pyqtgraph.Qt import QtCore, QtGui
 from pyqtgraph.Qt.QtWidgets import *
 from software.py_constants import *
-import pyqtgraph.console as pg_console
 from proto.robot_log_msg_pb2 import RobotLog, LogLevel
 from proto.import_all_protos import *
 
-import software.thunderscope.constants as constants
 from software.thunderscope.log.g3log_checkboxes import g3logCheckboxes
+from software.thunderscope.log.robot_log_store import RobotLogStore
 from software.thunderscope.thread_safe_buffer import ThreadSafeBuffer
 
 
+class RobotLogListModel(QtCore.QAbstractListModel):
+    """A list model of the logs in a RobotLogStore that match the log widget's
+    filters. Only the sequence numbers of the matching logs are kept, and their
+    text is looked up in the store when the view draws them, so the view only
+    does work for the rows on screen.
+    """
+
+    LEVEL_COLOURS = {
+        LogLevel.WARNING: QtGui.QColor("#f5c211"),
+        LogLevel.FATAL: QtGui.QColor("#ff5555"),
+        LogLevel.CONTRACT: QtGui.QColor("#ff5555"),
+    }
+
+    def __init__(self, log_store: RobotLogStore) -> None:
+        """Creates an empty model
+
+        :param log_store: the store holding the logs shown
+        """
+        super().__init__()
+        self.log_store = log_store
+        self.sequence_numbers = np.zeros(0, dtype=np.int64)
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        """Returns the number of logs shown
+
+        :param parent: unused, since this is a list
+        :return: the number of rows
+        """
+        return 0 if parent.isValid() else len(self.sequence_numbers)
+
+    def data(self, index: QtCore.QModelIndex, role: int) -> object:
+        """Returns the text or colour of a log
+
+        :param index: the index of the row of the log
+        :param role: the data to return
+        :return: the data, or None if the model doesn't have it
+        """
+        if not index.isValid():
+            return None
+
+        sequence_number = int(self.sequence_numbers[index.row()])
+
+        if role == QtCore.Qt.ItemDataRole.DisplayRole:
+            return self.log_store.get_text(sequence_number)
+
+        if role == QtCore.Qt.ItemDataRole.ForegroundRole:
+            return RobotLogListModel.LEVEL_COLOURS.get(
+                self.log_store.get_level(sequence_number)
+            )
+
+        return None
+
+    def set_logs(self, sequence_numbers: np.ndarray) -> None:
+        """Replaces the logs shown
+
+        :param sequence_numbers: the sequence numbers of the logs to show, oldest first
+        """
+        self.beginResetModel()
+        self.sequence_numbers = sequence_numbers
+        self.endResetModel()
+
+    def append_logs(self, sequence_numbers: np.ndarray) -> None:
+        """Shows more logs after the logs already shown
+
+        :param sequence_numbers: the sequence numbers of the logs to add, which
+                                 must be newer than the logs shown
+        """
+        if len(sequence_numbers) == 0:
+            return
+
+        num_rows = len(self.sequence_numbers)
+        self.beginInsertRows(
+            QtCore.QModelIndex(), num_rows, num_rows + len(sequence_numbers) - 1
+        )
+        self.sequence_numbers = np.concatenate(
+            (self.sequence_numbers, sequence_numbers)
+        )
+        self.endInsertRows()
+
+    def remove_logs_before(self, sequence_number: int) -> None:
+        """Stops showing the logs older than the given sequence number, because
+        they have been evicted from the store
+
+        :param sequence_number: the sequence number of the oldest log to keep
+        """
+        num_removed = int(np.searchsorted(self.sequence_numbers, sequence_number))
+        if num_removed == 0:
+            return
+
+        self.beginRemoveRows(QtCore.QModelIndex(), 0, num_removed - 1)
+        self.sequence_numbers = self.sequence_numbers[num_removed:]
+        self.endRemoveRows()
+
+
 class g3logWidget(QWidget):
-    def __init__(self, buffer_size: int = 10):
-        """The g3log widget is a console widget that displays g3log messages
+    def __init__(
+        self,
+        buffer_size: int = 1000,
+        log_capacity: int = RobotLogStore.DEFAULT_CAPACITY,
+    ):
+        """The g3log widget shows the g3log messages from robots, filtered by
+        level, robot, file and text. Logs are kept in a bounded store, so the
+        newest log_capacity logs can be filtered and searched, and the filters
+        apply to all of them.
 
-        :param buffer_size: The buffer size, set higher for smoother plots.
-                            Set lower for more realtime plots. Default is arbitrary
+        :param buffer_size: The buffer size, the number of logs that can arrive
+                            between refreshes without being dropped
+        :param log_capacity: The number of logs to keep
         """
         QWidget.__init__(self)
 
-        self.console_widget = pg_console.ConsoleWidget()
-        self.console_widget.setStyleSheet(
+        self.log_buffer = ThreadSafeBuffer(buffer_size, RobotLog)
+        self.log_store = RobotLogStore(log_capacity)
+        self.log_model = RobotLogListModel(self.log_store)
+
+        # Rows all have the same height, so the view can lay out only the
+        # rows on screen instead of measuring every log
+        self.log_view = QListView()
+        self.log_view.setModel(self.log_model)
+        self.log_view.setUniformItemSizes(True)
+        self.log_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.log_view.setSelectionMode(
+            QAbstractItemView.SelectionMode.ExtendedSelection
+        )
+        self.log_view.setFont(
+            QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.SystemFont.FixedFont)
+        )
+        self.log_view.setStyleSheet(
             """
             border: none;
             border-radius: 5px;
@@ -27,70 +145,126 @@ class g3logWidget(QWidget):
             """
         )
 
-        self.layout = QVBoxLayout()
+        # Creates checkbox widget
+        self.checkbox_widget = g3logCheckboxes()
+        for checkbox in self.checkbox_widget.get_checkboxes():
+            checkbox.stateChanged.connect(self.__update_masks)
 
-        # disable input and buttons
-        self.console_widget.input.hide()
-        self.console_widget.exceptionBtn.hide()
-        self.console_widget.historyBtn.hide()
+        self.file_combo_box = QComboBox()
+        self.file_combo_box.addItem("All files")
+        self.file_combo_box.currentIndexChanged.connect(self.__refilter)
 
-        # _lastCommandRow is initialized to None, which causes errors
-        # when writing to ReplWidget
-        self.console_widget.repl._lastCommandRow = 0
+        self.search_line_edit = QLineEdit()
+        self.search_line_edit.setPlaceholderText("Search logs")
+        self.search_line_edit.setClearButtonEnabled(True)
+        self.search_line_edit.textChanged.connect(self.__search)
 
-        # Creates checkbox widget
-        self.checkbox_widget = g3logCheckboxes()
-        self.log_buffer = ThreadSafeBuffer(buffer_size, RobotLog)
+        self.filter_layout = QHBoxLayout()
+        self.filter_layout.addWidget(self.file_combo_box)
+        self.filter_layout.addWidget(self.search_line_edit)
 
-        self.layout.addWidget(self.console_widget)
+        self.layout = QVBoxLayout()
+        self.layout.addWidget(self.log_view)
         self.layout.addWidget(self.checkbox_widget)
+        self.layout.addLayout(self.filter_layout)
         self.setLayout(self.layout)
 
-        self.robot_last_fatal_time_s = []
-        for id in range(MAX_ROBOT_IDS_PER_SIDE):
-            self.robot_last_fatal_time_s.append(0)
-
-        # LogLevel to string conversion map
-        self.log_level_str_map = {
-            LogLevel.DEBUG: "DEBUG",
-            LogLevel.INFO: "INFO",
-            LogLevel.WARNING: "WARNING",
-            LogLevel.FATAL: "FATAL",
-            LogLevel.CONTRACT: "CONTRACT",
-        }
+        self.level_mask = np.ones(RobotLogStore.NUM_LOG_LEVELS, dtype=bool)
+        self.robot_mask = np.ones(RobotLogStore.OTHER_ROBOT_ID + 1, dtype=bool)
+        self.search_text = ""
+        self.__update_masks()
 
     def refresh(self) -> None:
-        """Update the log widget with another log message"""
-        # Need to make sure the message is new before logging it
+        """Adds all the logs received since the last refresh"""
+        first_new_sequence_number = self.log_store.num_added
+
+        while (
+            log := self.log_buffer.get(block=False, return_cached=False)
+        ) is not None:
+            self.log_store.add(log)
 
-        log = self.log_buffer.get(block=False, return_cached=False)
-        if log is None:
+        if self.log_store.num_added == first_new_sequence_number:
             return
 
-        # Checks whether this type of log is enabled from checkboxes
-        if (
-            (
-                log.log_level == LogLevel.DEBUG
-                and self.checkbox_widget.debug_checkbox.isChecked()
-            )
-            or (
-                log.log_level == LogLevel.INFO
-                and self.checkbox_widget.info_checkbox.isChecked()
-            )
-            or (
-                log.log_level == LogLevel.WARNING
-                and self.checkbox_widget.warning_checkbox.isChecked()
-            )
-            or (
-                log.log_level == LogLevel.CONTRACT
-                and self.checkbox_widget.fatal_checkbox.isChecked()
+        for file_name in self.log_store.file_names[self.file_combo_box.count() - 1 :]:
+            self.file_combo_box.addItem(file_name)
+
+        scroll_bar = self.log_view.verticalScrollBar()
+        follow_new_logs = scroll_bar.value() == scroll_bar.maximum()
+
+        self.log_model.remove_logs_before(self.log_store.oldest_sequence_number)
+        self.log_model.append_logs(
+            self.log_store.filter_range(
+                first_new_sequence_number,
+                self.level_mask,
+                self.robot_mask,
+                self.__get_file_id(),
+                self.search_text,
             )
-            or (
-                log.log_level == LogLevel.FATAL
-                and self.checkbox_widget.fatal_checkbox.isChecked()
+        )
+
+        if follow_new_logs:
+            self.log_view.scrollToBottom()
+
+    def __get_file_id(self) -> int | None:
+        """Returns the id of the file selected to filter logs by
+
+        :return: the file id, or None if logs from all files are shown
+        """
+        index = self.file_combo_box.currentIndex()
+        return index - 1 if index > 0 else None
+
+    def __update_masks(self) -> None:
+        """Updates the level and robot masks from the checkboxes, and refilters
+        the logs
+        """
+        levels_enabled = {
+            LogLevel.DEBUG: self.checkbox_widget.debug_checkbox.isChecked(),
+            LogLevel.INFO: self.checkbox_widget.info_checkbox.isChecked(),
+            LogLevel.WARNING: self.checkbox_widget.warning_checkbox.isChecked(),
+            LogLevel.FATAL: self.checkbox_widget.fatal_checkbox.isChecked(),
+            LogLevel.CONTRACT: self.checkbox_widget.fatal_checkbox.isChecked(),
+        }
+        for level, enabled in levels_enabled.items():
+            self.level_mask[level] = enabled
+
+        for robot_id, checkbox in enumerate(self.checkbox_widget.robot_checkboxes):
+            self.robot_mask[robot_id] = checkbox.isChecked()
+
+        self.__refilter()
+
+    def __search(self, search_text: str) -> None:
+        """Filters the logs by the search text. If the search text extends the
+        previous search text, only the logs already shown can match, so only
+        they are searched.
+
+        :param search_text: the text logs must contain
+        """
+        previous_search_text = self.search_text
+        self.search_text = search_text.lower()
+
+        if previous_search_text in self.search_text:
+            self.log_model.set_logs(
+                self.log_store.filter(
+                    self.log_model.sequence_numbers,
+                    self.level_mask,
+                    self.robot_mask,
+                    self.__get_file_id(),
+                    self.search_text,
+                )
             )
-        ):
-            log_str = f"R{log.robot_id} {log.created_timestamp.epoch_timestamp_seconds} {constants.LOG_LEVEL_STR_MAP[log.log_level]} [{log.file_name}->{log.line_number}] {log.log_msg}\n"
-            self.console_widget.repl.write(log_str, style="output")
         else:
-            return
+            self.__refilter()
+
+    def __refilter(self) -> None:
+        """Filters all the logs in the store again, after a filter changed"""
+        self.log_model.set_logs(
+            self.log_store.filter_range(
+                self.log_store.oldest_sequence_number,
+                self.level_mask,
+                self.robot_mask,
+                self.__get_file_id(),
+                self.search_text,
+            )
+        )
+        self.log_view.scrollToBottom()
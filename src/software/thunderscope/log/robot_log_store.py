@@ -0,0 +1,178 @@
+import numpy as np
+from typing import Optional
+
+from proto.robot_log_msg_pb2 import RobotLog, LogLevel
+from software.py_constants import MAX_ROBOT_IDS_PER_SIDE
+
+import software.thunderscope.constants as constants
+
+
+class RobotLogStore:
+    """A bounded ring buffer of formatted robot logs.
+
+    Every log added gets a sequence number, starting at 0 and increasing by one
+    with each log. Once the store is full, adding a log evicts the oldest one,
+    so the store holds the logs with sequence numbers from
+    oldest_sequence_number up to (but excluding) num_added.
+
+    The level, robot id and file of every log are kept in numpy arrays, so that
+    the logs matching a filter can be found for the whole history at once.
+    """
+
+    DEFAULT_CAPACITY = 100000
+
+    # The size of level masks, which are indexed by LogLevel
+    NUM_LOG_LEVELS = max(LogLevel.values()) + 1
+
+    # Robot ids out of range share the last robot slot, which always matches
+    OTHER_ROBOT_ID = MAX_ROBOT_IDS_PER_SIDE
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        """Creates an empty store
+
+        :param capacity: the maximum number of logs to keep
+        """
+        self.capacity = capacity
+        self.num_added = 0
+
+        self.levels = np.zeros(capacity, dtype=np.uint8)
+        self.robot_ids = np.zeros(capacity, dtype=np.uint8)
+        self.file_ids = np.zeros(capacity, dtype=np.int32)
+        self.texts: list[str] = [""] * capacity
+
+        # Lower case copies of the texts, for case insensitive search
+        self.search_texts: list[str] = [""] * capacity
+
+        # The names of the files logs have come from, indexed by file id
+        self.file_names: list[str] = []
+        self.file_name_to_id: dict[str, int] = {}
+
+    @property
+    def oldest_sequence_number(self) -> int:
+        """The sequence number of the oldest log still in the store"""
+        return max(self.num_added - self.capacity, 0)
+
+    def add(self, log: RobotLog) -> int:
+        """Formats a log and adds it to the store, evicting the oldest log if the
+        store is full
+
+        :param log: the log to add
+        :return: the sequence number of the log
+        """
+        sequence_number = self.num_added
+        index = sequence_number % self.capacity
+
+        file_id = self.file_name_to_id.get(log.file_name)
+        if file_id is None:
+            file_id = len(self.file_names)
+            self.file_name_to_id[log.file_name] = file_id
+            self.file_names.append(log.file_name)
+
+        text = (
+            f"R{log.robot_id} {log.created_timestamp.epoch_timestamp_seconds} "
+            f"{constants.LOG_LEVEL_STR_MAP.get(log.log_level, log.log_level)} "
+            f"[{log.file_name}->{log.line_number}] {log.log_msg}"
+        )
+
+        self.levels[index] = log.log_level
+        self.robot_ids[index] = (
+            log.robot_id
+            if 0 <= log.robot_id < MAX_ROBOT_IDS_PER_SIDE
+            else RobotLogStore.OTHER_ROBOT_ID
+        )
+        self.file_ids[index] = file_id
+        self.texts[index] = text
+        self.search_texts[index] = text.lower()
+
+        self.num_added += 1
+        return sequence_number
+
+    def get_text(self, sequence_number: int) -> str:
+        """Returns the formatted text of a log in the store
+
+        :param sequence_number: the sequence number of the log
+        :return: the formatted log
+        """
+        return self.texts[sequence_number % self.capacity]
+
+    def get_level(self, sequence_number: int) -> int:
+        """Returns the level of a log in the store
+
+        :param sequence_number: the sequence number of the log
+        :return: the LogLevel of the log
+        """
+        return int(self.levels[sequence_number % self.capacity])
+
+    def filter(
+        self,
+        sequence_numbers: np.ndarray,
+        level_mask: np.ndarray,
+        robot_mask: np.ndarray,
+        file_id: Optional[int] = None,
+        search_text: str = "",
+    ) -> np.ndarray:
+        """Returns the logs that match a filter
+
+        :param sequence_numbers: the sequence numbers of the logs to filter,
+                                 which must be in the store
+        :param level_mask: boolean array indexed by LogLevel, True for the
+                           levels to match
+        :param robot_mask: boolean array indexed by robot id, with an extra slot
+                           at OTHER_ROBOT_ID, True for the robots to match
+        :param file_id: the id of the file to match, or None to match all files
+        :param search_text: lower case text the logs must contain, or an empty
+                            string to match all logs
+        :return: the sequence numbers of the matching logs, in the given order
+        """
+        indices = sequence_numbers % self.capacity
+
+        matches = level_mask[self.levels[indices]] & robot_mask[self.robot_ids[indices]]
+        if file_id is not None:
+            matches &= self.file_ids[indices] == file_id
+
+        sequence_numbers = sequence_numbers[matches]
+
+        if search_text:
+            search_texts = self.search_texts
+            sequence_numbers = np.fromiter(
+                (
+                    sequence_number
+                    for sequence_number in sequence_numbers.tolist()
+                    if search_text in search_texts[sequence_number % self.capacity]
+                ),
+                dtype=np.int64,
+            )
+
+        return sequence_numbers
+
+    def filter_range(
+        self,
+        start_sequence_number: int,
+        level_mask: np.ndarray,
+        robot_mask: np.ndarray,
+        file_id: Optional[int] = None,
+        search_text: str = "",
+    ) -> np.ndarray:
+        """Returns the logs that match a filter, out of the logs in the store
+        from the given sequence number onwards
+
+        :param start_sequence_number: the sequence number of the first log to
+                                      filter, older logs that have been evicted
+                                      are skipped
+        :param level_mask: see filter
+        :param robot_mask: see filter
+        :param file_id: see filter
+        :param search_text: see filter
+        :return: the sequence numbers of the matching logs, oldest first
+        """
+        return self.filter(
+            np.arange(
+                max(start_sequence_number, self.oldest_sequence_number),
+                self.num_added,
+                dtype=np.int64,
+            ),
+            level_mask,
+            robot_mask,
+            file_id,
+            search_text,
+        )
@@ -1,14 +1,13 @@
 from proto.play_info_msg_pb2 import PlayInfo
 from pyqtgraph.Qt.QtWidgets import *
 from proto.import_all_protos import *
-from software.thunderscope.common.common_widgets import set_table_data
+from software.thunderscope.common.common_widgets import TableDataModel
 
 from software.thunderscope.thread_safe_buffer import ThreadSafeBuffer
 
 
 class PlayInfoWidget(QWidget):
-    NUM_ROWS = 6
-    NUM_COLS = 4
+    COLUMNS = ["Play", "Robot ID", "Tactic Name", "Tactic FSM State"]
 
     # empirically makes even bolded items fit within columns
     HEADER_SIZE_HINT_WIDTH_EXPANSION = 12
@@ -22,7 +21,13 @@ class PlayInfoWidget(QWidget):
         """
         QWidget.__init__(self)
 
-        self.play_table = QTableWidget(PlayInfoWidget.NUM_ROWS, PlayInfoWidget.NUM_COLS)
+        self.play_model = TableDataModel(
+            PlayInfoWidget.COLUMNS,
+            PlayInfoWidget.HEADER_SIZE_HINT_WIDTH_EXPANSION,
+            PlayInfoWidget.ITEM_SIZE_HINT_WIDTH_EXPANSION,
+        )
+        self.play_table = QTableView()
+        self.play_table.setModel(self.play_model)
 
         self.playinfo_buffer = ThreadSafeBuffer(buffer_size, PlayInfo, False)
         self.play_table.verticalHeader().setVisible(False)
@@ -50,14 +55,6 @@ class PlayInfoWidget(QWidget):
         if not playinfo.robot_tactic_assignment:
             return
 
-        num_rows = max(
-            len(playinfo.robot_tactic_assignment),
-            len(playinfo.play.play_state),
-        )
-
-        # setting table size dynamically
-        self.play_table.setRowCount(num_rows)
-
         for state in playinfo.play.play_state:
             play_name.append(state)
 
@@ -68,17 +65,18 @@ class PlayInfoWidget(QWidget):
             )
 
             tactic_names.append(playinfo.robot_tactic_assignment[robot_id].tactic_name)
-        set_table_data(
+
+        # Only the cells that changed are updated, and the table is only
+        # resized if any did
+        if not self.play_model.set_data(
             {
                 "Play": play_name,
                 "Robot ID": robot_ids,
                 "Tactic Name": tactic_names,
                 "Tactic FSM State": tactic_fsm_states,
-            },
-            self.play_table,
-            PlayInfoWidget.HEADER_SIZE_HINT_WIDTH_EXPANSION,
-            PlayInfoWidget.ITEM_SIZE_HINT_WIDTH_EXPANSION,
-        )
+            }
+        ):
+            return
 
         self.play_table.resizeColumnsToContents()
         self.play_table.resizeRowsToContents()
@@ -2,13 +2,12 @@ from collections import defaultdict
 from pyqtgraph.Qt.QtWidgets import *
 from proto.import_all_protos import *
 from software.py_constants import SECONDS_PER_MICROSECOND, SECONDS_PER_MINUTE
-from software.thunderscope.common.common_widgets import set_table_data
+from software.thunderscope.common.common_widgets import TableDataModel
 from software.thunderscope.thread_safe_buffer import ThreadSafeBuffer
 
 
 class RefereeInfoWidget(QWidget):
-    NUM_ROWS = 13
-    NUM_COLS = 3
+    COLUMNS = ["Team Info", "Blue", "Yellow"]
 
     # empirically makes even bolded items fit within columns
     HEADER_SIZE_HINT_WIDTH_EXPANSION = 12
@@ -22,9 +21,13 @@ class RefereeInfoWidget(QWidget):
         """
         QWidget.__init__(self)
 
-        self.referee_table = QTableWidget(
-            RefereeInfoWidget.NUM_ROWS, RefereeInfoWidget.NUM_COLS
+        self.referee_model = TableDataModel(
+            RefereeInfoWidget.COLUMNS,
+            RefereeInfoWidget.HEADER_SIZE_HINT_WIDTH_EXPANSION,
+            RefereeInfoWidget.ITEM_SIZE_HINT_WIDTH_EXPANSION,
         )
+        self.referee_table = QTableView()
+        self.referee_table.setModel(self.referee_model)
         self.referee_info = QLabel()
         self.referee_buffer = ThreadSafeBuffer(buffer_size, Referee, False)
         self.referee_table.verticalHeader().setVisible(False)
@@ -37,6 +40,11 @@ class RefereeInfoWidget(QWidget):
         # Team info table data, indexed by [field_name]["blue" | "yellow"]
         self.team_info = defaultdict(dict)
 
+        # The team info of the last referee message shown, so the table is
+        # only updated when it changes
+        self.last_blue_team_info = None
+        self.last_yellow_team_info = None
+
     def refresh(self) -> None:
         """Update the referee info widget with new referee information"""
         referee = self.referee_buffer.get(block=False, return_cached=False)
@@ -46,7 +54,7 @@ class RefereeInfoWidget(QWidget):
             return
 
         stage_time_left_s = referee.stage_time_left * SECONDS_PER_MICROSECOND
-        self.referee_info.setText(
+        referee_info_text = (
             f"Packet Timestamp: {round(referee.packet_timestamp * SECONDS_PER_MICROSECOND, 3)}\n"
             + f"Stage Time Left: {int(stage_time_left_s / SECONDS_PER_MINUTE):02d}"
             + f":{int(stage_time_left_s % SECONDS_PER_MINUTE):02d}\n"
@@ -54,6 +62,17 @@ class RefereeInfoWidget(QWidget):
             + f"Command: {Referee.Command.Name(referee.command)}\n"
             + f"Blue Team on Positive Half: {referee.blue_team_on_positive_half}\n"
         )
+        if referee_info_text != self.referee_info.text():
+            self.referee_info.setText(referee_info_text)
+
+        if (
+            referee.blue == self.last_blue_team_info
+            and referee.yellow == self.last_yellow_team_info
+        ):
+            return
+
+        self.last_blue_team_info = referee.blue
+        self.last_yellow_team_info = referee.yellow
 
         for field_descriptor, field_val in referee.blue.ListFields():
             self.team_info[field_descriptor.name]["blue"] = field_val
@@ -61,16 +80,14 @@ class RefereeInfoWidget(QWidget):
         for field_descriptor, field_val in referee.yellow.ListFields():
             self.team_info[field_descriptor.name]["yellow"] = field_val
 
-        set_table_data(
+        if not self.referee_model.set_data(
             {
                 "Team Info": self.team_info.keys(),
-                "Blue": [val["blue"] for val in self.team_info.values()],
-                "Yellow": [val["yellow"] for val in self.team_info.values()],
-            },
-            self.referee_table,
-            RefereeInfoWidget.HEADER_SIZE_HINT_WIDTH_EXPANSION,
-            RefereeInfoWidget.ITEM_SIZE_HINT_WIDTH_EXPANSION,
-        )
+                "Blue": [val.get("blue", "") for val in self.team_info.values()],
+                "Yellow": [val.get("yellow", "") for val in self.team_info.values()],
+            }
+        ):
+            return
 
         self.referee_table.resizeColumnsToContents()
         self.referee_table.resizeRowsToContents()
@@ -6,6 +6,7 @@ import os
 from software.networking.unix.threaded_unix_listener import ThreadedUnixListener
 from software.networking.unix.threaded_unix_sender import ThreadedUnixSender
 from software.thunderscope.thread_safe_buffer import ThreadSafeBuffer
+from software.networking.tracing import tracer
 from typing import Type
 from google.protobuf.message import Message
 
@@ -96,6 +97,22 @@ class ProtoUnixIO:
         else:
             self.proto_observers[proto_class.DESCRIPTOR.full_name] = [buffer]
 
+    def unregister_observer(
+        self, proto_class: Type[Message], buffer: ThreadSafeBuffer
+    ) -> None:
+        """Stop sending protobufs of the given class to a registered buffer
+
+        :param proto_class: Class of protobuf the buffer was registered for
+        :param buffer: the buffer to unregister
+        """
+        observers = self.proto_observers.get(proto_class.DESCRIPTOR.full_name, [])
+
+        # Replace the list instead of modifying it, since other threads may be
+        # iterating over it to send protos
+        self.proto_observers[proto_class.DESCRIPTOR.full_name] = [
+            observer for observer in observers if observer is not buffer
+        ]
+
     def register_to_observe_everything(self, buffer: ThreadSafeBuffer) -> None:
         """Register a buffer to observe all incoming protobufs
 
@@ -103,6 +120,7 @@ class ProtoUnixIO:
         """
         self.all_proto_observers.append(buffer)
 
+    @tracer.traced("ProtoUnixIO.send_proto")
     def send_proto(
         self,
         proto_class: Type[Message],
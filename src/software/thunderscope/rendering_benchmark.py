@@ -0,0 +1,366 @@
+import argparse
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+
+# Render offscreen unless a platform was chosen, so the benchmark can run on
+# machines without a display. Must be set before Qt is imported.
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+import pyqtgraph
+
+from software.thunderscope.gl.gl_widget import GLWidget
+from software.thunderscope.proto_unix_io import ProtoUnixIO
+from software.thunderscope.replay.proto_player import ProtoPlayer
+from software.thunderscope.widget_setup_functions import setup_gl_widget
+
+DEFAULT_FRAME_RATE_HZ = 60.0
+DEFAULT_VISUALIZATION_BUFFER_SIZE = 5
+DEFAULT_WARMUP_FRAMES = 30
+DEFAULT_VIEWPORT_SIZE = (1280, 720)
+
+# The percentiles of the frame times in the report
+REPORTED_PERCENTILES = [50, 90, 99]
+
+
+@dataclass
+class RenderingBenchmarkResults:
+    """The times measured for each frame rendered after the warmup, in seconds"""
+
+    # The time to play the frame's log entries into the layers' buffers
+    play_times: list[float] = field(default_factory=list)
+
+    # The time to refresh each layer, by layer name
+    layer_refresh_times: dict[str, list[float]] = field(default_factory=dict)
+
+    # The time to draw the scene after the layers were refreshed
+    render_times: list[float] = field(default_factory=list)
+
+    # The total time of each frame
+    frame_times: list[float] = field(default_factory=list)
+
+    num_log_entries_played: int = 0
+
+
+class RenderingBenchmark:
+    """Benchmarks rendering a replay log in a GLWidget with the standard layers.
+
+    The log is played back with a ProtoPlayer that isn't started. Each frame,
+    the benchmark advances the log by a fixed amount of log time, plays the
+    log entries up to that time into the layers' buffers, refreshes every
+    visible layer and draws the scene. Every frame sees the same protos on
+    every run, however long the frames take, so runs of the same log can be
+    compared to find performance regressions. Frames are either rendered as
+    fast as possible, or paced at the frame rate like Thunderscope's refresh
+    timer.
+    """
+
+    def __init__(
+        self,
+        replay_log: os.PathLike,
+        friendly_colour_yellow: bool = False,
+        visualization_buffer_size: int = DEFAULT_VISUALIZATION_BUFFER_SIZE,
+        viewport_size: tuple[int, int] = DEFAULT_VIEWPORT_SIZE,
+        show_all_layers: bool = False,
+    ) -> None:
+        """Sets up the GLWidget and the player of the log
+
+        :param replay_log: the replay log folder to play back
+        :param friendly_colour_yellow: whether the log is from the yellow team's FullSystem
+        :param visualization_buffer_size: the size of the layers' buffers
+        :param viewport_size: the width and height of the rendered scene in pixels
+        :param show_all_layers: whether to also benchmark the layers that are
+                                hidden on startup
+        """
+        self.app = pyqtgraph.mkQApp("Thunderscope Rendering Benchmark")
+
+        self.sim_proto_unix_io = ProtoUnixIO()
+        self.full_system_proto_unix_io = ProtoUnixIO()
+
+        self.player = ProtoPlayer(
+            replay_log, self.full_system_proto_unix_io, start_playback=False
+        )
+
+        self.gl_widget: GLWidget = setup_gl_widget(
+            sim_proto_unix_io=self.sim_proto_unix_io,
+            full_system_proto_unix_io=self.full_system_proto_unix_io,
+            friendly_colour_yellow=friendly_colour_yellow,
+            visualization_buffer_size=visualization_buffer_size,
+        )
+        self.gl_widget.resize(*viewport_size)
+        self.gl_widget.show()
+
+        if show_all_layers:
+            # Checking a layer in the Layer menu shows it, constructing it
+            # first if it's a lazy layer
+            for layer_action in self.gl_widget.layers_menu_actions.values():
+                layer_action.defaultWidget().setChecked(True)
+
+        self.layers = [layer for layer in self.gl_widget.layers if layer.visible()]
+
+    def run(
+        self,
+        frame_rate_hz: float = DEFAULT_FRAME_RATE_HZ,
+        playback_speed: float = 1.0,
+        start_time: float = 0.0,
+        duration_s: float | None = None,
+        paced: bool = False,
+        warmup_frames: int = DEFAULT_WARMUP_FRAMES,
+    ) -> RenderingBenchmarkResults:
+        """Renders the log
+
+        :param frame_rate_hz: the number of frames rendered per second of
+                              playback, which sets the log time between frames
+        :param playback_speed: how many seconds of log time pass per second of playback
+        :param start_time: the log time to start rendering from
+        :param duration_s: how many seconds of log time to render, or None to
+                           render until the end of the log
+        :param paced: whether to wait between frames to render at the frame
+                      rate, instead of rendering as fast as possible
+        :param warmup_frames: the number of frames rendered before the times
+                              are measured
+        :return: the times measured
+        """
+        results = RenderingBenchmarkResults(
+            layer_refresh_times={layer.name: [] for layer in self.layers}
+        )
+
+        end_time = self.player.end_time
+        if duration_s is not None:
+            end_time = min(start_time + duration_s, end_time)
+
+        frame_period_s = 1.0 / frame_rate_hz
+        log_time_per_frame_s = frame_period_s * playback_speed
+        num_frames = int((end_time - start_time) / log_time_per_frame_s) + 1
+
+        self.player.seek(start_time)
+
+        next_frame_start = time.perf_counter()
+        for frame in range(num_frames):
+            if paced:
+                time.sleep(max(next_frame_start - time.perf_counter(), 0.0))
+                next_frame_start += frame_period_s
+
+            frame_start = time.perf_counter()
+
+            num_log_entries_played = self.player.play_until(
+                start_time + frame * log_time_per_frame_s
+            )
+            play_end = time.perf_counter()
+
+            layer_refresh_times = []
+            for layer in self.layers:
+                layer_refresh_start = time.perf_counter()
+                layer.refresh_graphics()
+                layer_refresh_times.append(time.perf_counter() - layer_refresh_start)
+
+            # Draws the scene into the widget's framebuffer right away, instead
+            # of waiting for a repaint that may never happen offscreen
+            render_start = time.perf_counter()
+            self.gl_widget.gl_view_widget.grabFramebuffer()
+            frame_end = time.perf_counter()
+
+            # Handle the events posted while rendering, like Thunderscope's
+            # event loop would between frames
+            self.app.processEvents()
+
+            if frame < warmup_frames:
+                continue
+
+            results.play_times.append(play_end - frame_start)
+            for layer, layer_refresh_time in zip(self.layers, layer_refresh_times):
+                results.layer_refresh_times[layer.name].append(layer_refresh_time)
+            results.render_times.append(frame_end - render_start)
+            results.frame_times.append(frame_end - frame_start)
+            results.num_log_entries_played += num_log_entries_played
+
+        return results
+
+    def get_protos_dropped(self) -> dict[str, dict[str, int]]:
+        """Returns the number of protos dropped by the buffers of each layer,
+        because more protos were played into them in a frame than they can hold.
+        Hidden layers are included, but since they aren't refreshed, their
+        buffers drop every proto once they're full.
+
+        :return: the protos dropped by each buffer, by layer name and buffer name
+        """
+        return {
+            layer.name: {
+                buffer_name: buffer.protos_dropped
+                for buffer_name, buffer in layer.get_buffers().items()
+            }
+            for layer in self.gl_widget.layers
+        }
+
+
+def get_time_stats_ms(times: list[float]) -> dict[str, float]:
+    """Returns the statistics of a list of times
+
+    :param times: the times in seconds
+    :return: the mean, percentiles and maximum of the times in milliseconds
+    """
+    if not times:
+        return {}
+
+    times_ms = np.array(times) * 1000
+    stats = {"mean": float(np.mean(times_ms))}
+    for percentile in REPORTED_PERCENTILES:
+        stats[f"p{percentile}"] = float(np.percentile(times_ms, percentile))
+    stats["max"] = float(np.max(times_ms))
+
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmarks rendering a replay log in Thunderscope's GLWidget "
+        "and writes the results to a JSON report"
+    )
+    parser.add_argument(
+        "--replay_log",
+        action="store",
+        help="Replay folder to render",
+        required=True,
+        type=os.path.abspath,
+    )
+    parser.add_argument(
+        "--report",
+        action="store",
+        help="Path to write the JSON report to",
+        required=True,
+        type=os.path.abspath,
+    )
+    parser.add_argument(
+        "--friendly_colour_yellow",
+        action="store_true",
+        default=False,
+        help="Whether the log is from the yellow team's FullSystem",
+    )
+    parser.add_argument(
+        "--frame_rate_hz",
+        action="store",
+        help="Frames rendered per second of playback",
+        default=DEFAULT_FRAME_RATE_HZ,
+        type=float,
+    )
+    parser.add_argument(
+        "--playback_speed",
+        action="store",
+        help="Seconds of log time per second of playback",
+        default=1.0,
+        type=float,
+    )
+    parser.add_argument(
+        "--start_time",
+        action="store",
+        help="Log time to start rendering from, in seconds",
+        default=0.0,
+        type=float,
+    )
+    parser.add_argument(
+        "--duration",
+        action="store",
+        help="Seconds of log time to render, defaults to the rest of the log",
+        default=None,
+        type=float,
+    )
+    parser.add_argument(
+        "--paced",
+        action="store_true",
+        default=False,
+        help="Render at the frame rate instead of as fast as possible",
+    )
+    parser.add_argument(
+        "--warmup_frames",
+        action="store",
+        help="Frames rendered before measuring",
+        default=DEFAULT_WARMUP_FRAMES,
+        type=int,
+    )
+    parser.add_argument(
+        "--visualization_buffer_size",
+        action="store",
+        help="Size of the layers' buffers",
+        default=DEFAULT_VISUALIZATION_BUFFER_SIZE,
+        type=int,
+    )
+    parser.add_argument(
+        "--viewport_size",
+        action="store",
+        nargs=2,
+        help="Width and height of the rendered scene in pixels",
+        default=DEFAULT_VIEWPORT_SIZE,
+        type=int,
+    )
+    parser.add_argument(
+        "--show_all_layers",
+        action="store_true",
+        default=False,
+        help="Also render the layers that are hidden on startup",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    benchmark = RenderingBenchmark(
+        args.replay_log,
+        friendly_colour_yellow=args.friendly_colour_yellow,
+        visualization_buffer_size=args.visualization_buffer_size,
+        viewport_size=tuple(args.viewport_size),
+        show_all_layers=args.show_all_layers,
+    )
+
+    benchmark_start = time.perf_counter()
+    results = benchmark.run(
+        frame_rate_hz=args.frame_rate_hz,
+        playback_speed=args.playback_speed,
+        start_time=args.start_time,
+        duration_s=args.duration,
+        paced=args.paced,
+        warmup_frames=args.warmup_frames,
+    )
+    benchmark_duration_s = time.perf_counter() - benchmark_start
+
+    report = {
+        "config": {
+            "replay_log": args.replay_log,
+            "frame_rate_hz": args.frame_rate_hz,
+            "playback_speed": args.playback_speed,
+            "start_time_s": args.start_time,
+            "duration_s": args.duration,
+            "paced": args.paced,
+            "warmup_frames": args.warmup_frames,
+            "visualization_buffer_size": args.visualization_buffer_size,
+            "viewport_size": list(args.viewport_size),
+            "qt_platform": os.environ["QT_QPA_PLATFORM"],
+        },
+        "num_frames": len(results.frame_times),
+        "num_log_entries_played": results.num_log_entries_played,
+        "wall_time_s": benchmark_duration_s,
+        "frame_time_ms": get_time_stats_ms(results.frame_times),
+        "play_time_ms": get_time_stats_ms(results.play_times),
+        "render_time_ms": get_time_stats_ms(results.render_times),
+        "layers": {
+            layer_name: {
+                "refresh_graphics_time_ms": get_time_stats_ms(
+                    results.layer_refresh_times.get(layer_name, [])
+                ),
+                "protos_dropped": protos_dropped,
+            }
+            for layer_name, protos_dropped in benchmark.get_protos_dropped().items()
+        },
+    }
+
+    os.makedirs(os.path.dirname(args.report), exist_ok=True)
+    with open(args.report, "w") as report_file:
+        json.dump(report, report_file, indent=4)
+
+    frame_time_ms = report["frame_time_ms"]
+    print(
+        f"Rendered {report['num_frames']} frames: "
+        + ", ".join(f"{name} {value:.2f} ms" for name, value in frame_time_ms.items())
+    )
+    print(f"Wrote report to {args.report}")
@@ -0,0 +1,327 @@
+import heapq
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, replace
+
+from software.thunderscope.constants import ProtoPlayerFlags
+from software.thunderscope.proto_unix_io import ProtoUnixIO
+from software.thunderscope.replay.proto_player import ProtoPlayer
+
+
+@dataclass
+class ReplaySource:
+    """A proto log folder to play back, and where to send its protos"""
+
+    log_folder_path: os.PathLike
+    proto_unix_io: ProtoUnixIO
+
+    # Added to the timestamps of the log to line it up with the other logs.
+    # Timestamps in a log are relative to when its logger started.
+    time_offset_s: float = 0.0
+
+
+class MultiProtoPlayer:
+    """Plays back several proto log folders (e.g. the blue and yellow FullSystem
+    logs of the same game) on one shared timeline, with one set of playback
+    controls and one worker thread.
+
+    Each log is read with its own ProtoPlayer, which is not started and is only
+    used to load the log's chunks and to seek through them using its chunk
+    index. The player keeps a min heap with the timestamp of the next entry of
+    every log, and plays back the entries of all the logs in time order by
+    repeatedly popping the earliest one (a k-way merge). Only the entry that is
+    sent is deserialized, and each log only loads its next chunk once its
+    current chunk has been played.
+
+    The player has the same playback interface as ProtoPlayer, so it can be
+    controlled with ReplayControls.
+    """
+
+    PLAY_PAUSE_POLL_INTERVAL_SECONDS = 0.1
+
+    def __init__(self, sources: list[ReplaySource]) -> None:
+        """Creates a player that plays back all the given logs
+
+        :param sources: the logs to play back
+        """
+        self.sources = sources
+        self.readers = [
+            ProtoPlayer(
+                source.log_folder_path, source.proto_unix_io, start_playback=False
+            )
+            for source in sources
+        ]
+
+        self.end_time = max(
+            reader.end_time + source.time_offset_s
+            for source, reader in zip(self.sources, self.readers)
+        )
+        self.bookmark_indices = sorted(
+            bookmark + source.time_offset_s
+            for source, reader in zip(self.sources, self.readers)
+            for bookmark in reader.bookmark_indices
+        )
+
+        # The logs are of the same game, so the summary track of the first log
+        # that has one is shown for all of them
+        self.summary = next(
+            (
+                [
+                    replace(sample, timestamp=sample.timestamp + source.time_offset_s)
+                    for sample in reader.summary
+                ]
+                for source, reader in zip(self.sources, self.readers)
+                if reader.summary
+            ),
+            [],
+        )
+
+        logging.info(
+            "Loaded {} logs with total runtime of {:.2f} seconds".format(
+                len(self.sources), self.end_time
+            )
+        )
+
+        # Playback controls, see __play_protobufs
+        self.is_playing = True
+        self.playback_speed = 1.0
+        self.replay_controls_mutex = threading.RLock()
+        self.seek_offset_time = 0.0
+        self.current_packet_time = 0.0
+        self.start_playback_time = time.time()
+
+        # Min heap of (timestamp, source index) of the next entry to play
+        # from every log that hasn't ended
+        self.next_entries: list[tuple[float, int]] = []
+
+        self.error_bit_flag = ProtoPlayerFlags.NO_ERROR_FLAG
+
+        # Start playing thread
+        self.seek(0.0)
+        self.thread = threading.Thread(
+            target=self.__play_protobufs_wrapper, daemon=True
+        )
+        self.thread.start()
+
+    def is_proto_player_playing(self) -> bool:
+        """Return whether or not the player is being played.
+
+        :return: True if the player is playing, False otherwise.
+        """
+        return self.is_playing
+
+    def get_error_bit_flag(self) -> ProtoPlayerFlags:
+        """Returns the error bit flags, see ProtoPlayer.get_error_bit_flag
+
+        :return: the error bit flags.
+        """
+        return self.error_bit_flag
+
+    def play(self) -> None:
+        """Plays back the logs."""
+        # Protection from spamming the play button
+        if self.is_playing:
+            return
+
+        with self.replay_controls_mutex:
+            self.start_playback_time = time.time()
+            self.is_playing = True
+
+    def pause(self) -> None:
+        """Pauses the player."""
+        with self.replay_controls_mutex:
+            self.is_playing = False
+            self.seek_offset_time = self.current_packet_time
+
+    def toggle_play_pause(self) -> None:
+        """Toggles the play/pause state."""
+        with self.replay_controls_mutex:
+            if not self.is_playing:
+                self.play()
+            else:
+                self.pause()
+
+    def set_playback_speed(self, speed: str) -> None:
+        """Sets the playback speed.
+
+        :param speed: The speed to set the playback to.
+        """
+        with self.replay_controls_mutex:
+            self.pause()
+            self.playback_speed = 1.0 / float(speed)
+            self.play()
+
+    def single_step_forward(self) -> None:
+        """Pauses the player and plays the next log entry of any of the logs"""
+        self.pause()
+
+        with self.replay_controls_mutex:
+            if not self.next_entries:
+                return
+
+            source_index, log_entry = self.__pop_next_entry()
+            self.seek_offset_time = self.current_packet_time
+            self.__send_log_entry(source_index, log_entry)
+
+    def seek(self, seek_time: float) -> None:
+        """Seeks all the logs to a specific time on the shared timeline, using
+        the chunk index of each log to load only the chunk containing the time.
+
+        :param seek_time: The time to seek to.
+        """
+        with self.replay_controls_mutex:
+            self.next_entries = []
+
+            for source_index, (source, reader) in enumerate(
+                zip(self.sources, self.readers)
+            ):
+                reader.seek(max(seek_time - source.time_offset_s, 0.0))
+                self.__push_next_entry(source_index)
+
+            # The playback continues from the earliest entry we seeked to
+            self.current_packet_time = (
+                self.next_entries[0][0] if self.next_entries else seek_time
+            )
+            self.seek_offset_time = self.current_packet_time
+            self.start_playback_time = time.time()
+
+    def save_clip(self, filename: str, start_time: float, end_time: float) -> None:
+        """Saves a clip of every log in the background, each to its own folder
+        in the clip folder, see ProtoPlayer.extract_clip
+
+        :param filename: The file to save to
+        :param start_time: the start time for the clip
+        :param end_time: the end time for the clip
+        """
+        if not filename:
+            print("No filename selected")
+            return
+
+        directory = filename
+        if "." in filename:
+            directory = filename[: filename.rfind(".")]
+
+        for source_index, (source, reader) in enumerate(
+            zip(self.sources, self.readers)
+        ):
+            log_folder_name = os.path.basename(os.path.normpath(source.log_folder_path))
+            reader.save_clip(
+                os.path.join(directory, f"{source_index}_{log_folder_name}"),
+                start_time - source.time_offset_s,
+                end_time - source.time_offset_s,
+            )
+
+    def __push_next_entry(self, source_index: int) -> None:
+        """Pushes the timestamp of the next entry of a log onto the heap,
+        loading the log's next chunk if its current chunk has been played.
+        The mutex must be held by the caller.
+
+        :param source_index: the index of the log
+        """
+        reader = self.readers[source_index]
+
+        while reader.current_entry_index >= len(reader.current_chunk):
+            reader.current_chunk_index += 1
+            if reader.current_chunk_index >= len(reader.sorted_chunks):
+                return
+
+            reader.current_chunk = ProtoPlayer.load_replay_chunk(
+                reader.sorted_chunks[reader.current_chunk_index], reader.version
+            )
+            reader.current_entry_index = 0
+
+        timestamp = ProtoPlayer.get_log_entry_timestamp(
+            reader.current_chunk[reader.current_entry_index]
+        )
+        heapq.heappush(
+            self.next_entries,
+            (timestamp + self.sources[source_index].time_offset_s, source_index),
+        )
+
+    def __pop_next_entry(self) -> tuple[int, bytes]:
+        """Pops the earliest entry of all the logs and moves its log on to the
+        next entry. The mutex must be held by the caller.
+
+        :return: the index of the log the entry is from, and the entry
+        """
+        self.current_packet_time, source_index = heapq.heappop(self.next_entries)
+
+        reader = self.readers[source_index]
+        log_entry = reader.current_chunk[reader.current_entry_index]
+        reader.current_entry_index += 1
+        self.__push_next_entry(source_index)
+
+        return source_index, log_entry
+
+    def __send_log_entry(self, source_index: int, log_entry: bytes) -> None:
+        """Deserializes a log entry and sends it to its log's proto unix io.
+        The mutex must be held by the caller.
+
+        :param source_index: the index of the log the entry is from
+        :param log_entry: the log entry
+        """
+        try:
+            _, proto_class, proto = ProtoPlayer.unpack_log_entry(
+                log_entry, self.readers[source_index].version
+            )
+        except Exception:
+            logging.error("[MultiProtoPlayer] Error parsing log entry")
+            return
+
+        self.sources[source_index].proto_unix_io.send_proto(proto_class, proto)
+
+    def __play_protobufs_wrapper(self) -> None:
+        """Runs __play_protobufs, flagging any uncaught exception, see
+        ProtoPlayer.__play_protobufs_wrapper
+        """
+        try:
+            self.__play_protobufs()
+        except Exception as e:
+            logging.exception(
+                "there is an uncaught exception when playing protobufs: {}".format(e)
+            )
+            self.error_bit_flag |= ProtoPlayerFlags.UNCAUGHT_EXCEPTION_FLAG
+            self.is_playing = False
+
+    def __play_protobufs(self) -> None:
+        """Plays the entries of all the logs in chronological order.
+
+        Playback controls:
+            - Play/Pause through self.is_playing
+            - Seek to a specific time through self.seek
+            - Set playback speed through self.playback_speed
+        """
+        while True:
+            # Only play if we are playing
+            if not self.is_playing:
+                time.sleep(MultiProtoPlayer.PLAY_PAUSE_POLL_INTERVAL_SECONDS)
+                continue
+
+            with self.replay_controls_mutex:
+                # Check if replay has ended and stop playing if so
+                if not self.next_entries:
+                    self.is_playing = False
+                    continue
+
+                time_elapsed = self.seek_offset_time + (
+                    (time.time() - self.start_playback_time) / self.playback_speed
+                )
+                time_until_next_entry = self.next_entries[0][0] - time_elapsed
+
+                # The entry is sent before the mutex is released, so that an
+                # entry from before a seek can't be sent after it
+                if time_until_next_entry <= 0:
+                    source_index, log_entry = self.__pop_next_entry()
+                    self.__send_log_entry(source_index, log_entry)
+                    continue
+
+            # Sleep without holding the mutex until the next entry needs to be
+            # sent, waking up regularly so seeking and pausing take effect
+            time.sleep(
+                min(
+                    time_until_next_entry * self.playback_speed,
+                    MultiProtoPlayer.PLAY_PAUSE_POLL_INTERVAL_SECONDS,
+                )
+            )
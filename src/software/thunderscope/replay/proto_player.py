@@ -1,21 +1,35 @@
+import bisect
 import logging
 import time
 import threading
 import base64
+import io
 import os
 import gzip
 import glob
-from proto.import_all_protos import *
-from extlibs.er_force_sim.src.protobuf.world_pb2 import *
+import lzma
+import zlib
+from proto.proto_registry import proto_registry
+from proto.replay_bookmark_pb2 import ReplayBookmark
+from extlibs.er_force_sim.src.protobuf import world_pb2
 from software.py_constants import *
 
 from software.thunderscope.constants import ProtoPlayerFlags
 from software.thunderscope.proto_unix_io import ProtoUnixIO
-import software.python_bindings as tbots_cpp
+from software.thunderscope.replay.replay_log_writer import ReplayLogWriter
+from software.thunderscope.replay.replay_summary import (
+    ReplaySummaryBuilder,
+    ReplaySummarySample,
+)
+from software.networking.tracing import tracer
 from google.protobuf.message import Message
 from typing import Callable, Type, List
 import pickle
 
+# The simulator protos live outside of the proto library, so they have to be
+# registered explicitly for their log entries to be decoded
+proto_registry.register_module(world_pb2)
+
 
 class ProtoPlayer:
     """Plays back a proto log folder. All the playback is handled by a worker
@@ -49,13 +63,27 @@ class ProtoPlayer:
     CHUNK_INDEX_FILE_VERSION = 1
     BOOKMARK_INDEX_FILE_VERSION = 1
 
+    # The first bytes of a file compressed with xz
+    XZ_MAGIC = b"\xfd7zXZ\x00"
+
+    # Raised when reading a chunk that is truncated or corrupted, e.g. because
+    # the logger was killed while writing it. Nothing after the error can be
+    # read, so reading the chunk has to stop.
+    CORRUPT_CHUNK_ERRORS = (EOFError, gzip.BadGzipFile, zlib.error, lzma.LZMAError)
+
     def __init__(
-        self, log_folder_path: os.PathLike, proto_unix_io: ProtoUnixIO
+        self,
+        log_folder_path: os.PathLike,
+        proto_unix_io: ProtoUnixIO,
+        start_playback: bool = True,
     ) -> None:
         """Creates a proto player that plays back all protos
 
         :param log_folder_path: The path to the log file.
         :param proto_unix_io: The proto_unix_io to send the protos to.
+        :param start_playback: Whether to start the playback thread. Players
+                               that aren't started can still be used to read
+                               and seek through the log.
         """
         self.log_folder_path = log_folder_path
         self.proto_unix_io = proto_unix_io
@@ -86,6 +114,8 @@ class ProtoPlayer:
         # build or load index for chunks
         self.bookmark_indices = list()
         self.chunks_indices = dict()
+        self.summary: list[ReplaySummarySample] = []
+        self.summary_builder = None
         self.load_or_build_index()
 
         # We can get the total runtime of the log from the last entry in the last chunk
@@ -95,15 +125,21 @@ class ProtoPlayer:
             "Loaded log file with total runtime of {:.2f} seconds".format(self.end_time)
         )
 
-        # Start playing thread
+        self.error_bit_flag = ProtoPlayerFlags.NO_ERROR_FLAG
+
+        # Load the first chunk, so that a player that isn't started can also
+        # be played back from the start with play_until
         self.seek(0.0)
+
+        if not start_playback:
+            return
+
+        # Start playing thread
         self.thread = threading.Thread(
             target=self.__play_protobufs_wrapper, daemon=True
         )
         self.thread.start()
 
-        self.error_bit_flag = ProtoPlayerFlags.NO_ERROR_FLAG
-
     @staticmethod
     def sort_and_get_replay_files(log_folder_path: os.PathLike):
         """Sorting the replay files
@@ -172,6 +208,19 @@ class ProtoPlayer:
         if kwargs["protobuf_type"] == ReplayBookmark:
             self.bookmark_indices.append(kwargs["timestamp"])
 
+    def handle_log_line_for_summary(self, **kwargs) -> None:
+        """Add World and Referee protos in the replay log to the summary track
+        :param kwargs: a dictionary contains all the information about a line in the replay log.
+            e.g. {
+                "protobuf_type": type of proto
+                "timestamp": timestamp when the proto is logged
+                "data": data of the proto message
+                "line_no": line number
+                "chunk_name": file name of the chunk
+            }
+        """
+        self.summary_builder.add_proto(kwargs["timestamp"], kwargs["data"])
+
     def finish_preprocess_replay_file(self) -> None:
         """Finish off pre-processing and save all the pre-processing result to disk"""
         # save chunk indices
@@ -212,6 +261,18 @@ class ProtoPlayer:
                 f"Failed to build bookmark index for {self.log_folder_path} : No bookmark data found."
             )
 
+        # save the summary track
+        if self.summary_builder is not None:
+            self.summary = self.summary_builder.samples
+            try:
+                self.summary_builder.save(self.log_folder_path)
+                logging.info("Created summary index file successfully.")
+            except Exception as e:
+                logging.warning(
+                    f"Failed to build summary index for {self.log_folder_path}: {e}"
+                )
+            self.summary_builder = None
+
     def preprocess_replay_file(self, handlers: List[Callable[[...], None]]) -> None:
         """Start preprocessing replay files and build index according to the provided handlers
 
@@ -260,22 +321,34 @@ class ProtoPlayer:
     def load_chunk_index(self) -> None:
         """Loads the chunk index file."""
         try:
-            with open(
-                os.path.join(self.log_folder_path, ProtoPlayer.CHUNK_INDEX_FILENAME),
-                "r",
-            ) as index_file:
-                # skip the first timestamp line
-                index_file.readline()
-
-                for line in index_file:
-                    start_timestamp, chunk_name = line.split(",")
-                    start_timestamp = float(start_timestamp)
-                    chunk_name = chunk_name.strip()
-                    self.chunks_indices[chunk_name] = start_timestamp
+            self.chunks_indices.update(
+                ProtoPlayer.read_chunk_index(self.log_folder_path)
+            )
             logging.info("Pre-existing chunk index file found and loaded.")
         except Exception as e:
             logging.warning(f"An Exception occurred when loading chunk index file {e}")
 
+    @staticmethod
+    def read_chunk_index(log_folder_path: os.PathLike) -> dict[str, float]:
+        """Reads the chunk index file of a log folder
+
+        :param log_folder_path: the path to the log folder
+        :return: the start timestamp of each chunk, indexed by chunk file name
+        """
+        chunks_indices = dict()
+
+        with open(
+            os.path.join(log_folder_path, ProtoPlayer.CHUNK_INDEX_FILENAME), "r"
+        ) as index_file:
+            # skip the first timestamp line
+            index_file.readline()
+
+            for line in index_file:
+                start_timestamp, chunk_name = line.split(",")
+                chunks_indices[chunk_name.strip()] = float(start_timestamp)
+
+        return chunks_indices
+
     def load_bookmark_index(self) -> None:
         """Loads the bookmark file"""
         try:
@@ -288,8 +361,32 @@ class ProtoPlayer:
         except Exception as e:
             logging.warning(f"An Exception occurred when loading bookmark file {e}")
 
+    def is_summary_indexed(self) -> bool:
+        """Returns true if the summary index is already built.
+
+        :return: if the summary index exists
+        """
+        return os.path.exists(
+            os.path.join(
+                self.log_folder_path, ReplaySummaryBuilder.SUMMARY_INDEX_FILENAME
+            )
+        )
+
+    def load_summary_index(self) -> bool:
+        """Loads the summary index file
+
+        :return: True if it was loaded, False if it has to be rebuilt
+        """
+        try:
+            self.summary = ReplaySummaryBuilder.load(self.log_folder_path)
+            logging.info("Pre-existing summary index file found and loaded.")
+            return True
+        except Exception as e:
+            logging.warning(f"An Exception occurred when loading summary file {e}")
+            return False
+
     def load_or_build_index(self):
-        """Load bookmark index and chunk index. If none is found, build first then load."""
+        """Load bookmark index, chunk index and summary track. If any is not found, build it first."""
         # handler_list contains all the tasks to do when pre-processing the log data
         handler_list = list()
         if not self.is_chunk_indexed():
@@ -302,6 +399,10 @@ class ProtoPlayer:
         else:
             self.load_bookmark_index()
 
+        if not self.is_summary_indexed() or not self.load_summary_index():
+            self.summary_builder = ReplaySummaryBuilder()
+            handler_list.append(self.handle_log_line_for_summary)
+
         if handler_list:
             self.preprocess_replay_file(handler_list)
 
@@ -317,27 +418,22 @@ class ProtoPlayer:
         Note that the end time may not necessarily be the last message in the last chunks since there may be
         file corruptions. We also assume a chronological order in the chunks data!
 
+        Only the timestamps of the entries are needed, so the entries are split
+        without deserializing their protos.
+
         :return: the last end time, if no end time are found, return 0.0s
         """
-        # reverse iterating over the chunks (file)
-        for i in reversed(range(len(self.sorted_chunks))):
-            last_chunk_data = ProtoPlayer.load_replay_chunk(
-                self.sorted_chunks[i], self.version
-            )
-
-            # reverse iterating the protobufs message in each and every file
-            for j in reversed(range(len(last_chunk_data))):
-                try:
-                    end_time, _, _ = ProtoPlayer.unpack_log_entry(
-                        last_chunk_data[j], self.version
-                    )
-                    return end_time
-                except Exception:
-                    pass
+        # reverse iterating over the chunks (file), until one has an entry
+        for chunk_path in reversed(self.sorted_chunks):
+            entries = ProtoPlayer.load_replay_chunk_entries(chunk_path, self.version)
+            if entries:
+                end_time, _, _ = entries[-1]
+                return end_time
 
         return 0.0
 
     @staticmethod
+    @tracer.traced("ProtoPlayer.load_replay_chunk")
     def load_replay_chunk(replay_chunk_path: os.PathLike, version: int) -> list:
         """Reads a replay chunk.
 
@@ -348,34 +444,43 @@ class ProtoPlayer:
         cached_data = []
 
         # Load chunk into memory
-        with gzip.open(replay_chunk_path, "rb") as log_file:
-            # Starting version 2, the first line of the chunk contains
-            # the replay file version
-            if version >= 2:
-                log_file.readline()
-
-            while True:
-                try:
-                    line = log_file.readline()
-                    if not line:
-                        break
+        with ProtoPlayer.open_replay_chunk(replay_chunk_path) as log_file:
+            try:
+                # Starting version 2, the first line of the chunk contains
+                # the replay file version
+                if version >= 2:
+                    log_file.readline()
 
+                for line in log_file:
                     if not ProtoPlayer.is_log_entry_corrupt(line, version):
                         cached_data.append(line)
                     else:
                         logging.warning(
                             "There are log entries that are corrupted. Entries ignored!"
                         )
-                except EOFError:
-                    break
-
-                except Exception as e:
-                    logging.warning(
-                        f"An unknown exception has occurred while reading {replay_chunk_path}: {e}"
-                    )
+            except ProtoPlayer.CORRUPT_CHUNK_ERRORS as e:
+                # The entries read before the corruption are still played
+                logging.warning(f"{replay_chunk_path} is truncated or corrupted: {e}")
 
         return cached_data
 
+    @staticmethod
+    def open_replay_chunk(replay_chunk_path: os.PathLike) -> io.BufferedIOBase:
+        """Opens a replay chunk for reading. Chunks are written by the logger
+        compressed with gzip, but compacted logs may be compressed with xz, so
+        the compression format is detected from the start of the file.
+
+        :param replay_chunk_path: The path to the replay chunk.
+        :return: The decompressed chunk file
+        """
+        with open(replay_chunk_path, "rb") as chunk_file:
+            magic = chunk_file.read(len(ProtoPlayer.XZ_MAGIC))
+
+        if magic == ProtoPlayer.XZ_MAGIC:
+            return lzma.open(replay_chunk_path, "rb")
+
+        return gzip.open(replay_chunk_path, "rb")
+
     @staticmethod
     def get_replay_chunk_format_version(replay_chunk_path: os.PathLike) -> int:
         """Reads a replay chunk.
@@ -388,7 +493,7 @@ class ProtoPlayer:
 
         # Starting version 2, the first line of the chunk should be
         # the replay file version
-        with gzip.open(replay_chunk_path, "rb") as log_file:
+        with ProtoPlayer.open_replay_chunk(replay_chunk_path) as log_file:
             try:
                 line = log_file.readline()
                 file_version_prefix_bytes = bytes(
@@ -398,12 +503,82 @@ class ProtoPlayer:
                     file_version = int(line.split(file_version_prefix_bytes)[1])
                 else:
                     print(f"Could not find version in {replay_chunk_path}")
-            except EOFError:
+            except ProtoPlayer.CORRUPT_CHUNK_ERRORS:
                 pass
 
         return file_version
 
     @staticmethod
+    def load_replay_chunk_entries(
+        replay_chunk_path: os.PathLike, version: int
+    ) -> list[tuple[float, bytes, bytes]]:
+        """Reads the entries of a replay chunk without deserializing their protos,
+        to copy them to another log. Entries that can't be split into their
+        fields are skipped, as is the end of a truncated chunk.
+
+        :param replay_chunk_path: The path to the replay chunk.
+        :param version: The format version of the replay file
+        :return: The entries of the chunk, see split_log_entry
+        """
+        entries = []
+
+        with ProtoPlayer.open_replay_chunk(replay_chunk_path) as log_file:
+            try:
+                if version >= 2:
+                    log_file.readline()
+
+                for line in log_file:
+                    try:
+                        entries.append(ProtoPlayer.split_log_entry(line, version))
+                    except ValueError:
+                        logging.warning(
+                            f"Skipping corrupted log entry in {replay_chunk_path}"
+                        )
+            except ProtoPlayer.CORRUPT_CHUNK_ERRORS as e:
+                logging.warning(f"{replay_chunk_path} is truncated: {e}")
+
+        return entries
+
+    @staticmethod
+    def split_log_entry(log_entry: bytes, version: int) -> (float, bytes, bytes):
+        """Splits a log entry into its fields without deserializing its proto
+
+        :param log_entry: The log entry.
+        :param version: The format version of the replay file
+        :return: The timestamp, the full name of the proto type, and the base64
+                 encoded serialized proto
+        :raises ValueError: if the log entry is malformed
+        """
+        timestamp, protobuf_type, data = log_entry.split(
+            bytes(REPLAY_METADATA_DELIMITER, encoding="utf-8")
+        )
+
+        if not data.endswith(b"\n"):
+            raise ValueError("Log entry is truncated")
+
+        if version == 1:
+            data = data[len("b") : -len("\n")]
+        elif version == 2:
+            data = data[: -len("\n")]
+        else:
+            raise ValueError(f"Unknown replay file version: {version}")
+
+        return float(timestamp), protobuf_type, data
+
+    @staticmethod
+    def get_log_entry_timestamp(log_entry: bytes) -> float:
+        """Gets the timestamp of a log entry without deserializing its proto
+
+        :param log_entry: The log entry.
+        :return: The timestamp of the log entry
+        """
+        timestamp, _ = log_entry.split(
+            bytes(REPLAY_METADATA_DELIMITER, encoding="utf-8"), 1
+        )
+        return float(timestamp)
+
+    @staticmethod
+    @tracer.traced("ProtoPlayer.unpack_log_entry")
     def unpack_log_entry(
         log_entry: bytes, version: int
     ) -> (float, Type[Message], Message):
@@ -418,14 +593,13 @@ class ProtoPlayer:
             bytes(REPLAY_METADATA_DELIMITER, encoding="utf-8")
         )
 
-        # Convert string to type. eval is an order of magnitude
-        # faster than iterating over the protobuf library to find
-        # the type from the string.
+        # Convert string to type. The registry caches the class for each
+        # full name, so this is a dict lookup once the type has been seen.
         try:
             # The format of the protobuf type is:
             # package.proto_class (e.g. TbotsProto.Primitive)
-            proto_class = eval(str(protobuf_type.split(b".")[-1], encoding="utf-8"))
-        except NameError:
+            proto_class = proto_registry.lookup(str(protobuf_type, encoding="utf-8"))
+        except KeyError:
             raise TypeError(f"Unknown proto type in replay: '{protobuf_type}'")
 
         # Deserialize protobuf
@@ -442,79 +616,104 @@ class ProtoPlayer:
 
         return float(timestamp), proto_class, deserialized_proto
 
-    def save_clip(self, filename: str, start_time: float, end_time: float) -> None:
-        """Saves clip
+    def save_clip(
+        self, filename: str, start_time: float, end_time: float
+    ) -> threading.Thread | None:
+        """Saves a clip of the log in the background, see extract_clip
 
         :param filename: The file to save to
         :param start_time: the start time for the clip
         :param end_time: the end time for the clip
+        :return: the thread saving the clip, or None if the clip is invalid
         """
         if not filename:
             print("No filename selected")
-            return
+            return None
         if start_time >= end_time:
             print("Start time not less than end time")
-            return
+            return None
 
         logging.info(f"Saving clip from {start_time} to {end_time} to {filename}")
 
         directory = filename
         if "." in filename:
             directory = filename[: filename.rfind(".")]
-        try:
-            os.makedirs(directory)
-        except OSError:
-            pass
 
-        replay_index = 0
+        # Not a daemon thread, so the clip is finished if Thunderscope is closed
+        thread = threading.Thread(
+            target=ProtoPlayer.extract_clip,
+            args=(self.log_folder_path, directory, start_time, end_time),
+        )
+        thread.start()
+        return thread
+
+    @staticmethod
+    def extract_clip(
+        log_folder_path: os.PathLike,
+        clip_folder_path: os.PathLike,
+        start_time: float,
+        end_time: float,
+    ) -> None:
+        """Copies the entries of a log between two times to a new log folder.
+
+        The log is read independently of any player playing it. The chunk index
+        is used to start reading from the chunk containing the start time, and
+        the entries are copied without deserializing their protos, only
+        rewriting their timestamps so that the clip starts at 0.
 
-        self.seek(start_time)
+        :param log_folder_path: the path to the log folder to copy from
+        :param clip_folder_path: the path to the log folder to create
+        :param start_time: the start time for the clip
+        :param end_time: the end time for the clip
+        """
+        sorted_chunks = ProtoPlayer.sort_and_get_replay_files(log_folder_path)
+        version = ProtoPlayer.get_replay_chunk_format_version(sorted_chunks[0])
 
-        while True:
-            with gzip.open(
-                f"{directory}/{replay_index}.{REPLAY_FILE_EXTENSION}", "wb"
-            ) as log_file:
-                logging.info(
-                    f"Writing to {log_file.name} starting at {self.current_packet_time}"
+        try:
+            chunks_indices = ProtoPlayer.read_chunk_index(log_folder_path)
+        except Exception as e:
+            logging.warning(f"An Exception occurred when loading chunk index file {e}")
+            chunks_indices = dict()
+
+        # Start from the last chunk that starts before the clip
+        start_chunk_index = 0
+        if all(os.path.basename(chunk) in chunks_indices for chunk in sorted_chunks):
+            start_chunk_index = max(
+                bisect.bisect_right(
+                    sorted_chunks,
+                    start_time,
+                    key=lambda chunk: chunks_indices[os.path.basename(chunk)],
                 )
+                - 1,
+                0,
+            )
+        else:
+            logging.warning(
+                f"{log_folder_path} is not fully indexed, "
+                "reading the clip from the start of the log"
+            )
 
-                # Save all clips with the latest replay format version
-                log_file.write(
-                    bytes(
-                        REPLAY_FILE_VERSION_PREFIX + str(REPLAY_FILE_VERSION) + "\n",
-                        encoding="utf-8",
-                    )
+        with ReplayLogWriter(clip_folder_path) as writer:
+            for chunk_path in sorted_chunks[start_chunk_index:]:
+                entries = ProtoPlayer.load_replay_chunk_entries(chunk_path, version)
+
+                first_entry_index = bisect.bisect_left(
+                    entries, start_time, key=lambda entry: entry[0]
                 )
 
-                while self.current_entry_index < len(self.current_chunk):
-                    (
-                        self.current_packet_time,
-                        _,
-                        proto,
-                    ) = ProtoPlayer.unpack_log_entry(
-                        self.current_chunk[self.current_entry_index], self.version
-                    )
+                for timestamp, protobuf_type, data in entries[first_entry_index:]:
+                    if timestamp > end_time:
+                        break
 
-                    log_entry = tbots_cpp.ProtoLogger.createLogEntry(
-                        proto.DESCRIPTOR.full_name,
-                        proto.SerializeToString(),
-                        self.current_packet_time - start_time,
-                    )
-                    log_file.write(bytes(log_entry, encoding="utf-8"))
-                    self.current_entry_index += 1
-                    if self.current_packet_time >= end_time:
-                        logging.info("Clip saved!")
-                        self.build_chunk_index(directory)
-                        return
-                # Load the next chunk
-                self.current_chunk_index += 1
-                replay_index += 1
-
-                if self.current_chunk_index < len(self.sorted_chunks):
-                    self.current_chunk = ProtoPlayer.load_replay_chunk(
-                        self.sorted_chunks[self.current_chunk_index], self.version
-                    )
-                    self.current_entry_index = 0
+                    writer.write_entry(timestamp - start_time, protobuf_type, data)
+
+                if entries and entries[-1][0] > end_time:
+                    break
+
+                # Each chunk of the log is copied to its own chunk of the clip
+                writer.start_new_chunk()
+
+        logging.info(f"Clip saved to {clip_folder_path}!")
 
     def play(self) -> None:
         """Plays back the log file."""
@@ -577,6 +776,51 @@ class ProtoPlayer:
             )
         )
 
+    def play_until(self, end_time: float) -> int:
+        """Sends all the log entries from the current entry up to a time at
+        once, without waiting until their timestamps. The protos sent only
+        depend on the log and the times given, so a player that wasn't started
+        can use this to play back the log deterministically, e.g. to benchmark
+        the consumers of the protos.
+
+        :param end_time: the time to send the log entries up to, inclusive
+        :return: the number of log entries sent
+        """
+        num_entries_sent = 0
+
+        with self.replay_controls_mutex:
+            while self.current_chunk_index < len(self.sorted_chunks):
+                # Load the next chunk once the current chunk has been played
+                if self.current_entry_index >= len(self.current_chunk):
+                    self.current_chunk_index += 1
+                    if self.current_chunk_index < len(self.sorted_chunks):
+                        self.current_chunk = ProtoPlayer.load_replay_chunk(
+                            self.sorted_chunks[self.current_chunk_index], self.version
+                        )
+                        self.current_entry_index = 0
+                    continue
+
+                log_entry = self.current_chunk[self.current_entry_index]
+                if ProtoPlayer.get_log_entry_timestamp(log_entry) > end_time:
+                    break
+
+                self.current_entry_index += 1
+
+                try:
+                    (
+                        self.current_packet_time,
+                        proto_class,
+                        proto,
+                    ) = ProtoPlayer.unpack_log_entry(log_entry, self.version)
+                except Exception:
+                    logging.error("[ProtoPlayer] Error parsing log entry")
+                    continue
+
+                self.proto_unix_io.send_proto(proto_class, proto)
+                num_entries_sent += 1
+
+        return num_entries_sent
+
     def seek(self, seek_time: float) -> None:
         """Seeks to a specific time. We binary search through the chunks
         to find the chunk that would contain the data at the given time.
@@ -6,6 +6,7 @@ from functools import partial
 
 from software.thunderscope.replay.bookmark_marker import BookmarkMarker
 from software.thunderscope.replay.proto_player import ProtoPlayer
+from software.thunderscope.replay.replay_summary_strip import ReplaySummaryStrip
 from software.thunderscope.common import common_widgets
 from software.py_constants import *
 
@@ -98,6 +99,14 @@ class ReplayControls(QWidget):
         self.replay_slider.sliderReleased.connect(self.__on_replay_slider_released)
         self.replay_slider.sliderPressed.connect(self.__on_replay_slider_pressed)
 
+        # Setup the overview strip of the log under the slider
+        self.summary_strip = None
+        if self.player.summary:
+            self.summary_strip = ReplaySummaryStrip(
+                self.player.summary, self.player.end_time, self.seek_absolute
+            )
+            self.replay_layout.addWidget(self.summary_strip)
+
         self.controls_layout.addLayout(self.replay_layout)
         self.controls_layout.addLayout(self.buttons_layout)
         self.setLayout(self.controls_layout)
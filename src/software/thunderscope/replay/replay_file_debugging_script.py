@@ -19,7 +19,7 @@ def read_one_chunk(replay_file_name: str) -> int:
     version = ProtoPlayer.get_replay_chunk_format_version(replay_file_name)
 
     line_num = 0
-    with gzip.open(replay_file_name, "rb") as replay_file:
+    with ProtoPlayer.open_replay_chunk(replay_file_name) as replay_file:
         # Skip the metadata line
         if version >= 2:
             replay_file.readline()
@@ -0,0 +1,413 @@
+import argparse
+import base64
+import glob
+import logging
+import math
+import os
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Optional, Type
+
+from google.protobuf.descriptor import FieldDescriptor
+from google.protobuf.message import Message
+
+from proto.proto_registry import proto_registry
+from software.thunderscope.replay.proto_player import ProtoPlayer
+from software.thunderscope.replay.replay_log_writer import ReplayLogWriter
+
+# The rate to downsample each type to by default. These types are logged
+# continuously at a high rate, so a lower rate is enough to review them.
+# The visualizations are drawn over the field, so they're kept at a higher
+# rate to stay in step with the robots. Types that aren't listed, such as the
+# World and validation results, are kept at full rate.
+DEFAULT_DOWNSAMPLED_TYPE_RATES_HZ = {
+    "TbotsProto.RobotStatus": 10.0,
+    "RobotStatistic": 10.0,
+    "SensorProto": 10.0,
+    "SSLProto.SSL_WrapperPacket": 10.0,
+    "TbotsProto.PrimitiveSet": 10.0,
+    "TbotsProto.PlotJugglerValue": 10.0,
+    "TbotsProto.PathVisualization": 20.0,
+    "TbotsProto.ObstacleList": 20.0,
+    "TbotsProto.DebugShapes": 20.0,
+    "TbotsProto.CostVisualization": 20.0,
+    "TbotsProto.PassVisualization": 20.0,
+    "TbotsProto.AttackerVisualization": 20.0,
+    "TbotsProto.BallPlacementVisualization": 20.0,
+}
+
+# Types that are sent repeatedly but rarely change
+DEFAULT_DEDUPLICATED_TYPES = ["TbotsProto.Field", "TbotsProto.ThunderbotsConfig"]
+
+# Types that record events, which are never dropped
+EVENT_TYPES = [
+    "TbotsProto.RobotLog",
+    "TbotsProto.RobotCrash",
+    "TbotsProto.ReplayBookmark",
+]
+
+# Deduplicated types are still written this often, so their latest value is
+# received soon after seeking
+DEFAULT_DEDUPLICATION_REFRESH_PERIOD_S = 1.0
+
+DEFAULT_MAX_ENTRIES_PER_CHUNK = 50000
+
+
+@dataclass
+class ProtoTypeCompactionStats:
+    """The number and size of the entries of a proto type read and written"""
+
+    num_read: int = 0
+    num_written: int = 0
+    bytes_read: int = 0
+    bytes_written: int = 0
+
+
+class ReplayLogCompactor:
+    """Compacts replay logs for archiving, by dropping log entries that aren't
+    needed to review the log:
+
+        - Entries of the downsampled types are downsampled to their type's rate
+        - Entries of the deduplicated types are only kept when they differ from
+          the last entry of their stream kept, or the refresh period has passed
+          since it
+        - Entries of any other type are always kept, as are events (robot
+          logs, robot crashes and bookmarks), which can't be downsampled or
+          deduplicated
+
+    Entries are downsampled and deduplicated per stream. Protos with a robot_id
+    have a stream per robot, so that every robot is kept at the downsampled
+    rate, and other protos have one stream per type.
+
+    Entries are copied without deserializing their protos, except to read the
+    robot_id of the downsampled and deduplicated types that have one.
+    """
+
+    ROBOT_ID_FIELD_NAME = "robot_id"
+
+    def __init__(
+        self,
+        downsampled_type_rates_hz: dict[str, float] = DEFAULT_DOWNSAMPLED_TYPE_RATES_HZ,
+        deduplicated_types: list[str] = DEFAULT_DEDUPLICATED_TYPES,
+        deduplication_refresh_period_s: float = DEFAULT_DEDUPLICATION_REFRESH_PERIOD_S,
+    ) -> None:
+        """Creates a compactor
+
+        :param downsampled_type_rates_hz: the rate to downsample each proto type
+                                          to, by full name, 0 to only keep the
+                                          first entry of each stream
+        :param deduplicated_types: the full names of the proto types to deduplicate
+        :param deduplication_refresh_period_s: how often to keep entries of the
+                                               deduplicated types even if they
+                                               haven't changed
+        :raises ValueError: if an event type would be downsampled or deduplicated
+        """
+        dropped_event_types = set(EVENT_TYPES) & (
+            set(downsampled_type_rates_hz) | set(deduplicated_types)
+        )
+        if dropped_event_types:
+            raise ValueError(
+                f"Event types can't be downsampled or deduplicated: {dropped_event_types}"
+            )
+
+        self.downsampled_periods_s: dict[bytes, Optional[float]] = {
+            bytes(proto_type, encoding="utf-8"): (
+                1.0 / rate_hz if rate_hz > 0 else None
+            )
+            for proto_type, rate_hz in downsampled_type_rates_hz.items()
+        }
+        self.deduplicated_types = {
+            bytes(proto_type, encoding="utf-8") for proto_type in deduplicated_types
+        }
+        self.deduplication_refresh_period_s = deduplication_refresh_period_s
+
+        # The class of each type that has a robot_id, or None if it doesn't
+        self.robot_id_proto_classes: dict[bytes, Optional[Type[Message]]] = {}
+
+    def compact(
+        self,
+        input_log_folder_path: os.PathLike,
+        output_log_folder_path: os.PathLike,
+        codec: str = ReplayLogWriter.XZ_CODEC,
+        compression_level: int = ReplayLogWriter.DEFAULT_COMPRESSION_LEVEL,
+        max_entries_per_chunk: int = DEFAULT_MAX_ENTRIES_PER_CHUNK,
+    ) -> dict[str, ProtoTypeCompactionStats]:
+        """Writes a compacted copy of a log folder, with its chunk and bookmark indices
+
+        :param input_log_folder_path: the path to the log folder to compact
+        :param output_log_folder_path: the path to the log folder to create
+        :param codec: the compression format of the output chunks
+        :param compression_level: the compression level of the output chunks
+        :param max_entries_per_chunk: the number of entries in each output chunk
+        :return: the compaction stats of each proto type, by full name
+        """
+        if os.path.realpath(input_log_folder_path) == os.path.realpath(
+            output_log_folder_path
+        ):
+            raise ValueError("The compacted log can't replace the original log")
+
+        sorted_chunks = ProtoPlayer.sort_and_get_replay_files(input_log_folder_path)
+        version = ProtoPlayer.get_replay_chunk_format_version(sorted_chunks[0])
+
+        stats = defaultdict(ProtoTypeCompactionStats)
+
+        # The timestamp and data of the last entry written of each stream
+        last_written_timestamps: dict[tuple[bytes, Optional[int]], float] = {}
+        last_written_data: dict[tuple[bytes, Optional[int]], bytes] = {}
+
+        with ReplayLogWriter(
+            output_log_folder_path,
+            max_entries_per_chunk=max_entries_per_chunk,
+            codec=codec,
+            compression_level=compression_level,
+        ) as writer:
+            for chunk_path in sorted_chunks:
+                for (
+                    timestamp,
+                    protobuf_type,
+                    data,
+                ) in ProtoPlayer.load_replay_chunk_entries(chunk_path, version):
+                    type_stats = stats[str(protobuf_type, encoding="utf-8")]
+                    type_stats.num_read += 1
+                    type_stats.bytes_read += len(data)
+
+                    stream = self.__get_stream(protobuf_type, data)
+
+                    if not self.__should_keep(
+                        timestamp,
+                        protobuf_type,
+                        data,
+                        last_written_timestamps.get(stream),
+                        last_written_data.get(stream),
+                    ):
+                        continue
+
+                    writer.write_entry(timestamp, protobuf_type, data)
+                    last_written_timestamps[stream] = timestamp
+                    last_written_data[stream] = data
+
+                    type_stats.num_written += 1
+                    type_stats.bytes_written += len(data)
+
+        return dict(stats)
+
+    def __get_stream(
+        self, protobuf_type: bytes, data: bytes
+    ) -> tuple[bytes, Optional[int]]:
+        """Returns the stream of a log entry, which is its type and the robot it
+        is from. Only the entries of the downsampled and deduplicated types that
+        have a robot_id are deserialized to find the robot.
+
+        :param protobuf_type: the full name of the proto type of the entry
+        :param data: the base64 encoded serialized proto of the entry
+        :return: the type and the robot_id of the entry, or None as the
+                 robot_id if the entry isn't from a robot
+        """
+        if (
+            protobuf_type not in self.downsampled_periods_s
+            and protobuf_type not in self.deduplicated_types
+        ):
+            return protobuf_type, None
+
+        if protobuf_type not in self.robot_id_proto_classes:
+            self.robot_id_proto_classes[protobuf_type] = (
+                ReplayLogCompactor.__get_robot_id_proto_class(protobuf_type)
+            )
+
+        proto_class = self.robot_id_proto_classes[protobuf_type]
+        if proto_class is None:
+            return protobuf_type, None
+
+        try:
+            proto = proto_class.FromString(base64.b64decode(data))
+        except Exception:
+            logging.warning(f"Could not read the robot_id of a {protobuf_type} entry")
+            return protobuf_type, None
+
+        return protobuf_type, getattr(proto, ReplayLogCompactor.ROBOT_ID_FIELD_NAME)
+
+    @staticmethod
+    def __get_robot_id_proto_class(protobuf_type: bytes) -> Optional[Type[Message]]:
+        """Returns the class of a proto type if it has a robot_id
+
+        :param protobuf_type: the full name of the proto type
+        :return: the class of the proto type, or None if the type has no
+                 robot_id or is unknown
+        """
+        try:
+            proto_class = proto_registry.lookup(str(protobuf_type, encoding="utf-8"))
+        except KeyError:
+            return None
+
+        robot_id_field = proto_class.DESCRIPTOR.fields_by_name.get(
+            ReplayLogCompactor.ROBOT_ID_FIELD_NAME
+        )
+        if (
+            robot_id_field is None
+            or robot_id_field.type == FieldDescriptor.TYPE_MESSAGE
+        ):
+            return None
+
+        return proto_class
+
+    def __should_keep(
+        self,
+        timestamp: float,
+        protobuf_type: bytes,
+        data: bytes,
+        last_written_timestamp: float | None,
+        last_written_data: bytes | None,
+    ) -> bool:
+        """Returns whether to keep a log entry
+
+        :param timestamp: the timestamp of the entry
+        :param protobuf_type: the full name of the proto type of the entry
+        :param data: the base64 encoded serialized proto of the entry
+        :param last_written_timestamp: the timestamp of the last entry of the
+                                       entry's stream kept, or None if none
+                                       were kept
+        :param last_written_data: the data of the last entry of the entry's
+                                  stream kept, or None if none were kept
+        :return: True if the entry should be kept
+        """
+        if last_written_timestamp is None:
+            return True
+
+        if protobuf_type in self.deduplicated_types:
+            return (
+                data != last_written_data
+                or timestamp - last_written_timestamp
+                >= self.deduplication_refresh_period_s
+            )
+
+        # Events and types without a rate are never downsampled
+        if protobuf_type not in self.downsampled_periods_s:
+            return True
+
+        # Keep the first entry in each downsampled period, so entries are kept
+        # at the downsampled rate on average even if it doesn't divide the
+        # rate they were logged at
+        downsampled_period_s = self.downsampled_periods_s[protobuf_type]
+        return downsampled_period_s is not None and math.floor(
+            timestamp / downsampled_period_s
+        ) > math.floor(last_written_timestamp / downsampled_period_s)
+
+
+def parse_type_rate(type_rate: str) -> tuple[str, float]:
+    """Parses the rate to downsample a proto type to, given as TYPE=RATE_HZ
+
+    :param type_rate: the type and rate, e.g. TbotsProto.RobotStatus=10
+    :return: the full name of the proto type and the rate in Hz
+    """
+    proto_type, separator, rate_hz = type_rate.rpartition("=")
+    if not separator:
+        raise argparse.ArgumentTypeError(f"Expected TYPE=RATE_HZ, got {type_rate}")
+
+    return proto_type, float(rate_hz)
+
+
+def get_log_folder_size_bytes(log_folder_path: os.PathLike) -> int:
+    """Returns the total size of the files in a log folder
+
+    :param log_folder_path: the path to the log folder
+    :return: the size in bytes
+    """
+    return sum(
+        os.path.getsize(path) for path in glob.glob(os.path.join(log_folder_path, "*"))
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compacts a replay log for archiving by downsampling and "
+        "deduplicating its protos and compressing it more strongly"
+    )
+    parser.add_argument(
+        "--input_log",
+        action="store",
+        help="Replay folder to compact",
+        required=True,
+        type=os.path.abspath,
+    )
+    parser.add_argument(
+        "--output_log",
+        action="store",
+        help="Replay folder to write the compacted log to",
+        required=True,
+        type=os.path.abspath,
+    )
+    parser.add_argument(
+        "--downsampled_type_rates",
+        nargs="*",
+        help="Proto types to downsample and the rate to downsample them to, as "
+        "TYPE=RATE_HZ (e.g. TbotsProto.RobotStatus=10), 0 to only keep the first "
+        "of each stream. Other types are kept at full rate",
+        default=list(DEFAULT_DOWNSAMPLED_TYPE_RATES_HZ.items()),
+        type=parse_type_rate,
+    )
+    parser.add_argument(
+        "--deduplicated_types",
+        nargs="*",
+        help="Full names of the proto types to only keep when they change",
+        default=DEFAULT_DEDUPLICATED_TYPES,
+    )
+    parser.add_argument(
+        "--deduplication_refresh_period_s",
+        action="store",
+        help="How often to keep deduplicated protos even if they haven't changed",
+        default=DEFAULT_DEDUPLICATION_REFRESH_PERIOD_S,
+        type=float,
+    )
+    parser.add_argument(
+        "--codec",
+        action="store",
+        help="Compression format of the compacted log",
+        choices=[ReplayLogWriter.XZ_CODEC, ReplayLogWriter.GZIP_CODEC],
+        default=ReplayLogWriter.XZ_CODEC,
+    )
+    parser.add_argument(
+        "--compression_level",
+        action="store",
+        help="Compression level of the compacted log, from 1 (fastest) to 9 (smallest)",
+        default=ReplayLogWriter.DEFAULT_COMPRESSION_LEVEL,
+        type=int,
+    )
+    parser.add_argument(
+        "--max_entries_per_chunk",
+        action="store",
+        help="Number of log entries in each chunk of the compacted log",
+        default=DEFAULT_MAX_ENTRIES_PER_CHUNK,
+        type=int,
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    compactor = ReplayLogCompactor(
+        downsampled_type_rates_hz=dict(args.downsampled_type_rates),
+        deduplicated_types=args.deduplicated_types,
+        deduplication_refresh_period_s=args.deduplication_refresh_period_s,
+    )
+    stats = compactor.compact(
+        args.input_log,
+        args.output_log,
+        codec=args.codec,
+        compression_level=args.compression_level,
+        max_entries_per_chunk=args.max_entries_per_chunk,
+    )
+
+    print(f"{'Proto type':<50} {'Read':>10} {'Written':>10} {'Kept (%)':>10}")
+    for proto_type, type_stats in sorted(
+        stats.items(), key=lambda item: item[1].bytes_read, reverse=True
+    ):
+        print(
+            f"{proto_type:<50} {type_stats.num_read:>10} {type_stats.num_written:>10} "
+            f"{type_stats.bytes_written / max(type_stats.bytes_read, 1) * 100:>10.1f}"
+        )
+
+    input_size_bytes = get_log_folder_size_bytes(args.input_log)
+    output_size_bytes = get_log_folder_size_bytes(args.output_log)
+    print(
+        f"Compacted {input_size_bytes / 1e6:.1f} MB to {output_size_bytes / 1e6:.1f} MB "
+        f"({output_size_bytes / max(input_size_bytes, 1) * 100:.1f}%)"
+    )
@@ -0,0 +1,222 @@
+import argparse
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+
+from proto.import_all_protos import *
+from software.py_constants import *
+
+from software.thunderscope.replay.proto_player import ProtoPlayer
+from software.thunderscope.replay.replay_log_writer import ReplayLogWriter
+
+
+@dataclass
+class ChunkScanResult:
+    """The result of validating a replay chunk"""
+
+    chunk_path: str
+    version: int = REPLAY_FILE_VERSION
+    num_entries: int = 0
+
+    # The line numbers (not counting the version line) of the entries that
+    # couldn't be unpacked
+    corrupt_line_numbers: list[int] = field(default_factory=list)
+
+    # Whether the chunk ends before its end of stream, in which case the
+    # entries after the last complete line are lost
+    is_truncated: bool = False
+
+    # The error the chunk couldn't be read past, if any
+    error: Optional[str] = None
+
+    start_time: Optional[float] = None
+    end_time: Optional[float] = None
+
+    @property
+    def num_valid_entries(self) -> int:
+        """The number of entries that could be unpacked"""
+        return self.num_entries - len(self.corrupt_line_numbers)
+
+    @property
+    def is_corrupt(self) -> bool:
+        """Whether any of the chunk couldn't be read"""
+        return bool(self.corrupt_line_numbers) or self.is_truncated
+
+
+def scan_replay_chunk(chunk_path: str) -> ChunkScanResult:
+    """Validates every entry of a replay chunk by unpacking it, the same way
+    ProtoPlayer does when playing it back. Reading stops at the first
+    decompression error, so a truncated or corrupted end of the chunk is
+    reported instead of raised.
+
+    This is a module level function so it can be run in a worker process.
+
+    :param chunk_path: the path to the chunk
+    :return: the scan result
+    """
+    result = ChunkScanResult(chunk_path)
+
+    try:
+        result.version = ProtoPlayer.get_replay_chunk_format_version(chunk_path)
+    except OSError as e:
+        result.error = str(e)
+        return result
+
+    try:
+        with ProtoPlayer.open_replay_chunk(chunk_path) as log_file:
+            if result.version >= 2:
+                log_file.readline()
+
+            for line_number, line in enumerate(log_file):
+                result.num_entries += 1
+
+                try:
+                    # Splitting checks that the entry is complete, and
+                    # unpacking checks that its proto can be deserialized
+                    timestamp, _, _ = ProtoPlayer.split_log_entry(line, result.version)
+                    ProtoPlayer.unpack_log_entry(line, result.version)
+                except Exception:
+                    result.corrupt_line_numbers.append(line_number)
+                    continue
+
+                if result.start_time is None:
+                    result.start_time = timestamp
+                result.end_time = timestamp
+
+    except ProtoPlayer.CORRUPT_CHUNK_ERRORS as e:
+        result.is_truncated = True
+        result.error = str(e)
+    except OSError as e:
+        result.error = str(e)
+
+    return result
+
+
+def scan_replay_log(
+    log_folder_path: os.PathLike, max_workers: Optional[int] = None
+) -> list[ChunkScanResult]:
+    """Validates all the chunks of a log folder in parallel. Unpacking entries
+    is CPU bound, so each chunk is scanned in its own worker process.
+
+    :param log_folder_path: the path to the log folder
+    :param max_workers: the number of worker processes, or None for one per CPU
+    :return: the scan result of each chunk, in chunk order
+    """
+    sorted_chunks = ProtoPlayer.sort_and_get_replay_files(log_folder_path)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(scan_replay_chunk, sorted_chunks))
+
+
+def repair_replay_log(
+    scan_results: list[ChunkScanResult],
+    output_log_folder_path: os.PathLike,
+) -> int:
+    """Writes a copy of a scanned log without the entries that couldn't be
+    read, keeping its chunks, and with a fresh chunk index, bookmark index and
+    summary track. Chunks with no readable entries are left out.
+
+    :param scan_results: the scan results of the chunks of the log, in chunk order
+    :param output_log_folder_path: the path to the log folder to create
+    :return: the number of entries written
+    """
+    with ReplayLogWriter(output_log_folder_path) as writer:
+        for result in scan_results:
+            if result.num_valid_entries == 0:
+                continue
+
+            # Entries are copied without deserializing their protos again,
+            # since the scan has already found the ones that can't be
+            writer.start_new_chunk()
+            corrupt_line_numbers = set(result.corrupt_line_numbers)
+
+            with ProtoPlayer.open_replay_chunk(result.chunk_path) as log_file:
+                try:
+                    if result.version >= 2:
+                        log_file.readline()
+
+                    for line_number, line in enumerate(log_file):
+                        if line_number in corrupt_line_numbers:
+                            continue
+
+                        writer.write_entry(
+                            *ProtoPlayer.split_log_entry(line, result.version)
+                        )
+                except ProtoPlayer.CORRUPT_CHUNK_ERRORS:
+                    pass
+
+        return writer.num_entries
+
+
+def print_scan_results(scan_results: list[ChunkScanResult]) -> None:
+    """Prints the statistics of each chunk and of the whole log
+
+    :param scan_results: the scan results of the chunks of the log
+    """
+    print(
+        f"{'Chunk':<16} {'Entries':>10} {'Corrupt':>10} {'Truncated':>10} "
+        f"{'Start (s)':>12} {'End (s)':>12}  Error"
+    )
+    for result in scan_results:
+        print(
+            f"{os.path.basename(result.chunk_path):<16} {result.num_entries:>10} "
+            f"{len(result.corrupt_line_numbers):>10} {str(result.is_truncated):>10} "
+            f"{result.start_time if result.start_time is not None else '-':>12} "
+            f"{result.end_time if result.end_time is not None else '-':>12}  "
+            f"{result.error or ''}"
+        )
+
+    num_corrupt_chunks = sum(
+        result.is_corrupt or result.error is not None for result in scan_results
+    )
+    num_entries = sum(result.num_entries for result in scan_results)
+    num_corrupt_entries = sum(
+        len(result.corrupt_line_numbers) for result in scan_results
+    )
+    print(
+        f"{num_corrupt_chunks} of {len(scan_results)} chunks are corrupt, "
+        f"{num_corrupt_entries} of {num_entries} entries are corrupt"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Scans a replay log for truncated chunks and corrupt entries, "
+        "and writes a repaired copy of it"
+    )
+    parser.add_argument(
+        "--input_log",
+        action="store",
+        help="Replay folder to scan",
+        required=True,
+        type=os.path.abspath,
+    )
+    parser.add_argument(
+        "--output_log",
+        action="store",
+        help="Replay folder to write the repaired log to, if not given the log is only scanned",
+        default=None,
+        type=os.path.abspath,
+    )
+    parser.add_argument(
+        "--max_workers",
+        action="store",
+        help="Number of chunks to scan in parallel, defaults to the number of CPUs",
+        default=None,
+        type=int,
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    scan_results = scan_replay_log(args.input_log, args.max_workers)
+    print_scan_results(scan_results)
+
+    if args.output_log is not None:
+        if os.path.realpath(args.input_log) == os.path.realpath(args.output_log):
+            raise ValueError("The repaired log can't replace the original log")
+
+        num_entries = repair_replay_log(scan_results, args.output_log)
+        print(f"Wrote {num_entries} entries to {args.output_log}")
@@ -0,0 +1,212 @@
+import gzip
+import logging
+import lzma
+import os
+import pickle
+import time
+from typing import Optional
+
+from proto.replay_bookmark_pb2 import ReplayBookmark
+from software.py_constants import *
+from software.thunderscope.replay.replay_summary import ReplaySummaryBuilder
+
+
+class ReplayLogWriter:
+    """Writes log entries to a new replay log folder, in the latest replay file
+    format version, without going through protobuf.
+
+    Entries are written as they are given: the serialized proto is copied as
+    its base64 encoding, so entries read from another log can be copied
+    without being decoded and encoded again. Entries are split into numbered
+    chunks, and the chunk index, bookmark index and summary track that
+    ProtoPlayer uses are written for the new log when the writer is closed,
+    so the log can be opened and seeked without indexing it first.
+    """
+
+    # Must match ProtoPlayer, which reads the index files
+    CHUNK_INDEX_FILENAME = "chunks.index"
+    BOOKMARK_INDEX_FILENAME = "bookmarks.index"
+    CHUNK_INDEX_FILE_VERSION = 1
+
+    # Chunks are compressed with gzip like the logger's chunks, or with xz,
+    # which is slower to write but makes much smaller logs
+    GZIP_CODEC = "gzip"
+    XZ_CODEC = "xz"
+
+    DEFAULT_COMPRESSION_LEVEL = 9
+
+    REPLAY_BOOKMARK_TYPE = bytes(ReplayBookmark.DESCRIPTOR.full_name, encoding="utf-8")
+
+    def __init__(
+        self,
+        log_folder_path: os.PathLike,
+        max_entries_per_chunk: Optional[int] = None,
+        codec: str = GZIP_CODEC,
+        compression_level: int = DEFAULT_COMPRESSION_LEVEL,
+    ) -> None:
+        """Creates the log folder to write to
+
+        :param log_folder_path: the path of the log folder to create
+        :param max_entries_per_chunk: the number of entries after which a new
+                                      chunk is started, or None to only start
+                                      new chunks when start_new_chunk is called
+        :param codec: the compression format of the chunks, GZIP_CODEC or XZ_CODEC
+        :param compression_level: the compression level of the chunks, from
+                                  1 (fastest) to 9 (smallest)
+        """
+        if codec not in (ReplayLogWriter.GZIP_CODEC, ReplayLogWriter.XZ_CODEC):
+            raise ValueError(f"Unknown replay chunk codec: {codec}")
+
+        self.log_folder_path = log_folder_path
+        self.max_entries_per_chunk = max_entries_per_chunk
+        self.codec = codec
+        self.compression_level = compression_level
+
+        os.makedirs(log_folder_path, exist_ok=True)
+
+        self.chunk_file = None
+        self.chunk_path = None
+        self.num_chunks = 0
+        self.num_entries_in_chunk = 0
+        self.num_entries = 0
+
+        # The timestamp of the first entry of every chunk, and of every bookmark
+        self.chunks_indices: dict[str, float] = {}
+        self.bookmark_indices: list[float] = []
+        self.summary_builder = ReplaySummaryBuilder()
+
+        self.delimiter = bytes(REPLAY_METADATA_DELIMITER, encoding="utf-8")
+
+    def __enter__(self) -> "ReplayLogWriter":
+        """Returns the writer, which is closed when exiting the context
+
+        :return: the writer
+        """
+        return self
+
+    def __exit__(self, type, value, traceback) -> None:
+        """Closes the writer, writing the indices
+
+        :param type: The type of exception that was raised
+        :param value: The exception that was raised
+        :param traceback: The traceback of the exception
+        """
+        self.close()
+
+    def write_entry(
+        self, timestamp: float, protobuf_type: bytes, base64_data: bytes
+    ) -> None:
+        """Writes a log entry
+
+        :param timestamp: the timestamp of the entry, in seconds since the start
+                          of the log
+        :param protobuf_type: the full name of the proto type of the entry
+        :param base64_data: the base64 encoded serialized proto, without a
+                            trailing newline
+        """
+        if self.chunk_file is None or (
+            self.max_entries_per_chunk is not None
+            and self.num_entries_in_chunk >= self.max_entries_per_chunk
+        ):
+            self.start_new_chunk()
+
+        # Timestamps are written with microsecond resolution, and the indices
+        # use the timestamps as written so they match the entries exactly
+        timestamp_str = f"{timestamp:.6f}"
+        timestamp = float(timestamp_str)
+
+        if self.num_entries_in_chunk == 0:
+            self.chunks_indices[os.path.basename(self.chunk_path)] = timestamp
+
+        if protobuf_type == ReplayLogWriter.REPLAY_BOOKMARK_TYPE:
+            self.bookmark_indices.append(timestamp)
+
+        self.summary_builder.add_log_entry(timestamp, protobuf_type, base64_data)
+
+        self.chunk_file.write(
+            b"".join(
+                (
+                    bytes(timestamp_str, encoding="utf-8"),
+                    self.delimiter,
+                    protobuf_type,
+                    self.delimiter,
+                    base64_data,
+                    b"\n",
+                )
+            )
+        )
+
+        self.num_entries_in_chunk += 1
+        self.num_entries += 1
+
+    def start_new_chunk(self) -> None:
+        """Starts writing entries to a new chunk, if the current chunk has any
+        entries
+        """
+        if self.chunk_file is not None:
+            if self.num_entries_in_chunk == 0:
+                return
+
+            self.chunk_file.close()
+
+        chunk_path = os.path.join(
+            self.log_folder_path, f"{self.num_chunks}.{REPLAY_FILE_EXTENSION}"
+        )
+        if self.codec == ReplayLogWriter.XZ_CODEC:
+            self.chunk_file = lzma.open(chunk_path, "wb", preset=self.compression_level)
+        else:
+            self.chunk_file = gzip.open(
+                chunk_path, "wb", compresslevel=self.compression_level
+            )
+        self.chunk_path = chunk_path
+        self.chunk_file.write(
+            bytes(
+                REPLAY_FILE_VERSION_PREFIX + str(REPLAY_FILE_VERSION) + "\n",
+                encoding="utf-8",
+            )
+        )
+
+        self.num_chunks += 1
+        self.num_entries_in_chunk = 0
+
+    def close(self) -> None:
+        """Closes the current chunk and writes the chunk and bookmark indices
+        and the summary track
+        """
+        if self.chunk_file is None:
+            return
+
+        self.chunk_file.close()
+
+        # A chunk with no entries can't be seeked to, since it has no start time
+        if self.num_entries_in_chunk == 0:
+            os.remove(self.chunk_path)
+            self.num_chunks -= 1
+
+        self.chunk_file = None
+
+        with open(
+            os.path.join(self.log_folder_path, ReplayLogWriter.CHUNK_INDEX_FILENAME),
+            "w",
+        ) as index_file:
+            index_file.write(
+                f"Version: {ReplayLogWriter.CHUNK_INDEX_FILE_VERSION}, "
+                f"Generated on {time.time():.0f}\n"
+            )
+            for filename, start_timestamp in self.chunks_indices.items():
+                index_file.write(f"{start_timestamp}, {filename}\n")
+
+        # The bookmark index is written even if there are no bookmarks, so
+        # ProtoPlayer doesn't have to decode the whole log looking for them
+        with open(
+            os.path.join(self.log_folder_path, ReplayLogWriter.BOOKMARK_INDEX_FILENAME),
+            "wb",
+        ) as bookmark_file:
+            pickle.dump(self.bookmark_indices, bookmark_file)
+
+        self.summary_builder.save(self.log_folder_path)
+
+        logging.info(
+            f"Wrote {self.num_entries} entries in {self.num_chunks} chunks "
+            f"to {self.log_folder_path}"
+        )
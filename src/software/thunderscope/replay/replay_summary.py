@@ -0,0 +1,196 @@
+import base64
+import bisect
+import math
+import os
+import pickle
+from dataclasses import dataclass
+from typing import Optional
+
+from google.protobuf.message import Message
+from proto.ssl_gc_referee_message_pb2 import Referee
+from proto.world_pb2 import World
+
+
+@dataclass
+class ReplaySummarySample:
+    """A snapshot of the state of the game at a point in a log. Fields are None
+    until a proto containing them has been logged.
+    """
+
+    timestamp: float
+    ball_position: Optional[tuple[float, float]] = None
+    num_friendly_robots: Optional[int] = None
+    num_enemy_robots: Optional[int] = None
+    # GameState.PlayState of the World
+    play_state: Optional[int] = None
+    # Referee.Stage and Referee.Command of the Referee
+    referee_stage: Optional[int] = None
+    referee_command: Optional[int] = None
+    blue_score: Optional[int] = None
+    yellow_score: Optional[int] = None
+
+
+class ReplaySummaryBuilder:
+    """Builds the summary track of a log: a snapshot of the game state, taken
+    about once per sample period from the World and Referee protos logged.
+
+    The summary track is small enough to load with the log's indices, so the
+    replay controls can show an overview of the whole log without seeking
+    through it. It is stored next to the chunks in its own index file.
+
+    Protos can be added decoded, while indexing a log that is being decoded
+    anyway, or as raw log entries, while writing a log. Raw entries are only
+    decoded when a sample is taken, so only about one World and Referee are
+    decoded per sample period.
+    """
+
+    SUMMARY_INDEX_FILENAME = "summary.index"
+
+    # Incremented when ReplaySummarySample changes, so old summary indices
+    # are rebuilt instead of loaded
+    SUMMARY_INDEX_FILE_VERSION = 1
+
+    DEFAULT_SAMPLE_PERIOD_S = 1.0
+
+    WORLD_TYPE = bytes(World.DESCRIPTOR.full_name, encoding="utf-8")
+    REFEREE_TYPE = bytes(Referee.DESCRIPTOR.full_name, encoding="utf-8")
+
+    def __init__(self, sample_period_s: float = DEFAULT_SAMPLE_PERIOD_S) -> None:
+        """Creates a builder with no samples
+
+        :param sample_period_s: how often to take a sample
+        """
+        self.sample_period_s = sample_period_s
+        self.samples: list[ReplaySummarySample] = []
+
+        # The latest World and Referee, either decoded or as base64 encoded
+        # serialized protos still to be decoded
+        self.world: Optional[World] = None
+        self.world_data: Optional[bytes] = None
+        self.referee: Optional[Referee] = None
+        self.referee_data: Optional[bytes] = None
+
+        self.last_sample_period_index: Optional[int] = None
+
+    def add_proto(self, timestamp: float, proto: Message) -> None:
+        """Adds a decoded proto, ignoring protos that aren't summarized
+
+        :param timestamp: the timestamp of the proto in the log
+        :param proto: the proto
+        """
+        if isinstance(proto, World):
+            self.world = proto
+            self.world_data = None
+        elif isinstance(proto, Referee):
+            self.referee = proto
+            self.referee_data = None
+        else:
+            return
+
+        self.__sample(timestamp)
+
+    def add_log_entry(
+        self, timestamp: float, protobuf_type: bytes, base64_data: bytes
+    ) -> None:
+        """Adds a log entry without decoding it, ignoring entries of protos that
+        aren't summarized
+
+        :param timestamp: the timestamp of the entry
+        :param protobuf_type: the full name of the proto type of the entry
+        :param base64_data: the base64 encoded serialized proto
+        """
+        if protobuf_type == ReplaySummaryBuilder.WORLD_TYPE:
+            self.world_data = base64_data
+        elif protobuf_type == ReplaySummaryBuilder.REFEREE_TYPE:
+            self.referee_data = base64_data
+        else:
+            return
+
+        self.__sample(timestamp)
+
+    def save(self, log_folder_path: os.PathLike) -> None:
+        """Writes the summary index file of a log folder
+
+        :param log_folder_path: the path to the log folder
+        """
+        with open(
+            os.path.join(log_folder_path, ReplaySummaryBuilder.SUMMARY_INDEX_FILENAME),
+            "wb",
+        ) as summary_file:
+            pickle.dump(
+                (ReplaySummaryBuilder.SUMMARY_INDEX_FILE_VERSION, self.samples),
+                summary_file,
+            )
+
+    @staticmethod
+    def load(log_folder_path: os.PathLike) -> list[ReplaySummarySample]:
+        """Reads the summary index file of a log folder
+
+        :param log_folder_path: the path to the log folder
+        :return: the samples of the summary track, oldest first
+        :raises ValueError: if the summary index was written by another version
+        """
+        with open(
+            os.path.join(log_folder_path, ReplaySummaryBuilder.SUMMARY_INDEX_FILENAME),
+            "rb",
+        ) as summary_file:
+            version, samples = pickle.load(summary_file)
+
+        if version != ReplaySummaryBuilder.SUMMARY_INDEX_FILE_VERSION:
+            raise ValueError(f"Unsupported summary index version: {version}")
+
+        return samples
+
+    @staticmethod
+    def get_sample_at(
+        samples: list[ReplaySummarySample], timestamp: float
+    ) -> Optional[ReplaySummarySample]:
+        """Returns the latest sample taken at or before a time
+
+        :param samples: the samples of a summary track, oldest first
+        :param timestamp: the time in the log
+        :return: the sample, or None if there are no samples before the time
+        """
+        index = bisect.bisect_right(
+            samples, timestamp, key=lambda sample: sample.timestamp
+        )
+        return samples[index - 1] if index > 0 else None
+
+    def __sample(self, timestamp: float) -> None:
+        """Takes a sample if none has been taken in the current sample period
+
+        :param timestamp: the timestamp of the proto just added
+        """
+        period_index = math.floor(timestamp / self.sample_period_s)
+        if (
+            self.last_sample_period_index is not None
+            and period_index <= self.last_sample_period_index
+        ):
+            return
+
+        self.last_sample_period_index = period_index
+
+        if self.world_data is not None:
+            self.world = World.FromString(base64.b64decode(self.world_data))
+            self.world_data = None
+
+        if self.referee_data is not None:
+            self.referee = Referee.FromString(base64.b64decode(self.referee_data))
+            self.referee_data = None
+
+        sample = ReplaySummarySample(timestamp)
+
+        if self.world is not None:
+            ball_position = self.world.ball.current_state.global_position
+            sample.ball_position = (ball_position.x_meters, ball_position.y_meters)
+            sample.num_friendly_robots = len(self.world.friendly_team.team_robots)
+            sample.num_enemy_robots = len(self.world.enemy_team.team_robots)
+            sample.play_state = self.world.game_state.play_state
+
+        if self.referee is not None:
+            sample.referee_stage = self.referee.stage
+            sample.referee_command = self.referee.command
+            sample.blue_score = self.referee.blue.score
+            sample.yellow_score = self.referee.yellow.score
+
+        self.samples.append(sample)
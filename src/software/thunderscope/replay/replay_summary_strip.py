@@ -0,0 +1,267 @@
+import time
+from collections.abc import Callable
+from typing import Optional
+
+from pyqtgraph.Qt import QtCore, QtGui
+from pyqtgraph.Qt.QtWidgets import *
+
+from proto.game_state_pb2 import GameState
+from proto.ssl_gc_referee_message_pb2 import Referee
+from software.thunderscope.constants import Colors
+from software.thunderscope.replay.replay_summary import (
+    ReplaySummaryBuilder,
+    ReplaySummarySample,
+)
+
+
+class ReplaySummaryStrip(QWidget):
+    """An overview strip of a log, drawn under the replay slider from the log's
+    summary track. Its background shows the game state over the log, the ball's
+    position along the field is traced over it, and goals are marked with the
+    colour of the team that scored. Clicking the strip seeks to that time, and
+    hovering over it shows the summary at that time.
+
+    The strip only changes with its size, so it is drawn once into a pixmap
+    that is reused until the strip is resized.
+    """
+
+    STRIP_HEIGHT = 24
+
+    BACKGROUND_COLOR = QtGui.QColor(40, 40, 40)
+    HALTED_COLOR = QtGui.QColor(150, 30, 30)
+    STOPPED_COLOR = QtGui.QColor(170, 130, 20)
+    SET_PLAY_COLOR = QtGui.QColor(40, 90, 160)
+    PENALTY_COLOR = QtGui.QColor(170, 40, 170)
+    PLAYING_COLOR = QtGui.QColor(30, 120, 50)
+
+    BALL_TRACE_COLOR = Colors.BALL_COLOR
+    GOAL_MARKER_WIDTH = 3
+
+    REFEREE_COMMAND_COLORS = {
+        Referee.Command.HALT: HALTED_COLOR,
+        Referee.Command.STOP: STOPPED_COLOR,
+        Referee.Command.NORMAL_START: PLAYING_COLOR,
+        Referee.Command.FORCE_START: PLAYING_COLOR,
+        Referee.Command.PREPARE_PENALTY_YELLOW: PENALTY_COLOR,
+        Referee.Command.PREPARE_PENALTY_BLUE: PENALTY_COLOR,
+    }
+
+    PLAY_STATE_COLORS = {
+        GameState.PlayState.PLAY_STATE_HALT: HALTED_COLOR,
+        GameState.PlayState.PLAY_STATE_STOP: STOPPED_COLOR,
+        GameState.PlayState.PLAY_STATE_SETUP: SET_PLAY_COLOR,
+        GameState.PlayState.PLAY_STATE_READY: SET_PLAY_COLOR,
+        GameState.PlayState.PLAY_STATE_PLAYING: PLAYING_COLOR,
+    }
+
+    def __init__(
+        self,
+        summary: list[ReplaySummarySample],
+        end_time: float,
+        click_func: Callable[[float], None],
+        parent: Optional[QWidget] = None,
+    ) -> None:
+        """Creates the strip
+
+        :param summary: the summary track of the log, oldest sample first
+        :param end_time: the end time of the log
+        :param click_func: callback with the time clicked on the strip
+        :param parent: parent of the current qt widget
+        """
+        super().__init__(parent)
+
+        self.summary = summary
+        self.end_time = end_time
+        self.click_func = click_func
+        self.pixmap: Optional[QtGui.QPixmap] = None
+
+        # Ball positions are scaled to the furthest the ball got from the
+        # centre line, so the trace fills the strip
+        self.max_ball_x = max(
+            (
+                abs(sample.ball_position[0])
+                for sample in summary
+                if sample.ball_position is not None
+            ),
+            default=0.0,
+        )
+
+        self.setFixedHeight(ReplaySummaryStrip.STRIP_HEIGHT)
+        self.setMouseTracking(True)
+        self.setCursor(QtCore.Qt.CursorShape.PointingHandCursor)
+
+    def paintEvent(self, event: QtGui.QPaintEvent) -> None:
+        """Draws the strip, drawing it into the cached pixmap first if needed
+
+        :param event: the paint event
+        """
+        if self.pixmap is None or self.pixmap.size() != self.size():
+            self.pixmap = QtGui.QPixmap(self.size())
+            self.__draw(self.pixmap)
+
+        painter = QtGui.QPainter(self)
+        painter.drawPixmap(0, 0, self.pixmap)
+        painter.end()
+
+    def mousePressEvent(self, event: QtGui.QMouseEvent) -> None:
+        """Seeks to the time clicked
+
+        :param event: the mouse event
+        """
+        if event.button() == QtCore.Qt.MouseButton.LeftButton:
+            self.click_func(self.__get_time(event.position().x()))
+
+    def mouseMoveEvent(self, event: QtGui.QMouseEvent) -> None:
+        """Shows the summary at the time hovered over
+
+        :param event: the mouse event
+        """
+        timestamp = self.__get_time(event.position().x())
+        sample = ReplaySummaryBuilder.get_sample_at(self.summary, timestamp)
+        QToolTip.showText(
+            event.globalPosition().toPoint(),
+            self.__get_tooltip_text(timestamp, sample),
+            self,
+        )
+
+    def __get_x(self, timestamp: float, width: int) -> int:
+        """Returns the x coordinate of a time on the strip
+
+        :param timestamp: the time in the log
+        :param width: the width of the strip
+        :return: the x coordinate
+        """
+        if self.end_time <= 0:
+            return 0
+        return int(width * min(max(timestamp / self.end_time, 0.0), 1.0))
+
+    def __get_time(self, x: float) -> float:
+        """Returns the time at an x coordinate on the strip
+
+        :param x: the x coordinate
+        :return: the time in the log
+        """
+        return min(max(x / max(self.width(), 1), 0.0), 1.0) * self.end_time
+
+    def __get_state_color(self, sample: ReplaySummarySample) -> QtGui.QColor:
+        """Returns the colour of the game state of a sample, from the referee
+        command if the referee was logged, or from the play state otherwise
+
+        :param sample: the sample
+        :return: the colour
+        """
+        if sample.referee_command is not None:
+            return ReplaySummaryStrip.REFEREE_COMMAND_COLORS.get(
+                sample.referee_command, ReplaySummaryStrip.SET_PLAY_COLOR
+            )
+
+        return ReplaySummaryStrip.PLAY_STATE_COLORS.get(
+            sample.play_state, ReplaySummaryStrip.BACKGROUND_COLOR
+        )
+
+    def __draw(self, pixmap: QtGui.QPixmap) -> None:
+        """Draws the whole strip
+
+        :param pixmap: the pixmap to draw into
+        """
+        width = pixmap.width()
+        height = pixmap.height()
+
+        pixmap.fill(ReplaySummaryStrip.BACKGROUND_COLOR)
+        painter = QtGui.QPainter(pixmap)
+
+        # Each sample's game state lasts until the next sample
+        end_times = [sample.timestamp for sample in self.summary[1:]]
+        end_times.append(self.end_time)
+        for sample, end_time in zip(self.summary, end_times):
+            start_x = self.__get_x(sample.timestamp, width)
+            painter.fillRect(
+                start_x,
+                0,
+                max(self.__get_x(end_time, width) - start_x, 1),
+                height,
+                self.__get_state_color(sample),
+            )
+
+        # Trace the ball's position along the length of the field, with the
+        # positive half at the top
+        if self.max_ball_x > 0:
+            ball_trace = QtGui.QPolygonF(
+                [
+                    QtCore.QPointF(
+                        self.__get_x(sample.timestamp, width),
+                        height / 2
+                        - sample.ball_position[0] / self.max_ball_x * (height / 2 - 1),
+                    )
+                    for sample in self.summary
+                    if sample.ball_position is not None
+                ]
+            )
+            painter.setPen(QtGui.QPen(ReplaySummaryStrip.BALL_TRACE_COLOR, 1))
+            painter.drawPolyline(ball_trace)
+
+        # Mark the samples where a team's score went up
+        for previous_sample, sample in zip(self.summary, self.summary[1:]):
+            for score, previous_score, color in [
+                (
+                    sample.blue_score,
+                    previous_sample.blue_score,
+                    Colors.BLUE_ROBOT_COLOR,
+                ),
+                (
+                    sample.yellow_score,
+                    previous_sample.yellow_score,
+                    Colors.YELLOW_ROBOT_COLOR,
+                ),
+            ]:
+                if (
+                    score is not None
+                    and previous_score is not None
+                    and score > previous_score
+                ):
+                    painter.fillRect(
+                        self.__get_x(sample.timestamp, width)
+                        - ReplaySummaryStrip.GOAL_MARKER_WIDTH // 2,
+                        0,
+                        ReplaySummaryStrip.GOAL_MARKER_WIDTH,
+                        height,
+                        color,
+                    )
+
+        painter.end()
+
+    def __get_tooltip_text(
+        self, timestamp: float, sample: Optional[ReplaySummarySample]
+    ) -> str:
+        """Returns the text describing the summary at a time
+
+        :param timestamp: the time in the log
+        :param sample: the sample at the time, or None if there is none
+        :return: the tooltip text
+        """
+        lines = [time.strftime("%H:%M:%S", time.gmtime(timestamp))]
+
+        if sample is None:
+            return lines[0]
+
+        if sample.referee_stage is not None:
+            lines.append(f"Stage: {Referee.Stage.Name(sample.referee_stage)}")
+        if sample.referee_command is not None:
+            lines.append(f"Command: {Referee.Command.Name(sample.referee_command)}")
+        elif sample.play_state is not None:
+            lines.append(f"Play state: {GameState.PlayState.Name(sample.play_state)}")
+        if sample.blue_score is not None:
+            lines.append(
+                f"Score: blue {sample.blue_score} - {sample.yellow_score} yellow"
+            )
+        if sample.num_friendly_robots is not None:
+            lines.append(
+                f"Robots: {sample.num_friendly_robots} friendly, "
+                f"{sample.num_enemy_robots} enemy"
+            )
+        if sample.ball_position is not None:
+            lines.append(
+                f"Ball: ({sample.ball_position[0]:.2f}, {sample.ball_position[1]:.2f})"
+            )
+
+        return "\n".join(lines)
@@ -0,0 +1,208 @@
+"""Tests for playing back several logs on one shared timeline with the MultiProtoPlayer.
+
+Two logs with entries at the same timestamps are played back, one of them
+offset by half the time between entries, so their entries should be played
+alternately. The protos sent for each log are recorded in one shared list to
+check the order they were sent in across the logs.
+"""
+
+import base64
+import shutil
+import threading
+import time
+
+import pytest
+
+from proto.import_all_protos import *
+from software.thunderscope.constants import ProtoPlayerFlags
+from software.thunderscope.proto_unix_io import ProtoUnixIO
+from software.thunderscope.replay.multi_proto_player import (
+    MultiProtoPlayer,
+    ReplaySource,
+)
+from software.thunderscope.replay.replay_log_writer import ReplayLogWriter
+from software.simulated_tests.simulated_test_fixture import pytest_main
+
+# location to store the generated logs
+TMP_REPLAY_SAVE_PATH = "/tmp/test_multi_proto_player"
+
+NUM_ENTRIES_PER_LOG = 6
+SECONDS_BETWEEN_ENTRIES = 0.1
+
+# The offset of the second log, which puts its entries between the first log's
+YELLOW_TIME_OFFSET_S = SECONDS_BETWEEN_ENTRIES / 2
+
+# How long to wait for the logs to be played back
+PLAYBACK_TIMEOUT_S = 5
+
+
+class RecordingProtoUnixIO(ProtoUnixIO):
+    """A ProtoUnixIO that records the protos sent to it in a list shared with
+    other RecordingProtoUnixIOs
+    """
+
+    def __init__(self, name: str, sent_protos: list, lock: threading.Lock) -> None:
+        """Creates a ProtoUnixIO that records the protos sent to it
+
+        :param name: the name recorded with each proto sent to this ProtoUnixIO
+        :param sent_protos: the shared list to record (name, proto) to
+        :param lock: the lock guarding the shared list
+        """
+        super().__init__()
+        self.name = name
+        self.sent_protos = sent_protos
+        self.lock = lock
+
+        # Called after each proto is recorded, while it's being sent
+        self.on_send = None
+
+    def send_proto(self, proto_class, data, block=False, timeout=None) -> None:
+        """Records the proto sent
+
+        :param proto_class: The class to send
+        :param data: The data to send
+        :param block: unused
+        :param timeout: unused
+        """
+        with self.lock:
+            self.sent_protos.append((self.name, data.id))
+
+        if self.on_send:
+            self.on_send()
+
+
+@pytest.fixture
+def log_paths():
+    """Writes a blue and a yellow log, deleted after the test"""
+    shutil.rmtree(TMP_REPLAY_SAVE_PATH, ignore_errors=True)
+
+    log_paths = {}
+    for name in ["blue", "yellow"]:
+        log_paths[name] = f"{TMP_REPLAY_SAVE_PATH}/{name}"
+
+        # Two entries per chunk, so that playback has to load the next chunks
+        with ReplayLogWriter(log_paths[name], max_entries_per_chunk=2) as writer:
+            for index in range(NUM_ENTRIES_PER_LOG):
+                writer.write_entry(
+                    index * SECONDS_BETWEEN_ENTRIES,
+                    bytes(RobotId.DESCRIPTOR.full_name, encoding="utf-8"),
+                    base64.b64encode(RobotId(id=index).SerializeToString()),
+                )
+
+    yield log_paths
+
+    shutil.rmtree(TMP_REPLAY_SAVE_PATH, ignore_errors=True)
+
+
+@pytest.fixture
+def sent_protos() -> list:
+    """The (log name, robot id) of every proto sent, in the order they were sent"""
+    return []
+
+
+@pytest.fixture
+def player(log_paths, sent_protos):
+    """A player of the blue and yellow logs, which starts playing when created"""
+    lock = threading.Lock()
+    return MultiProtoPlayer(
+        [
+            ReplaySource(
+                log_paths["blue"], RecordingProtoUnixIO("blue", sent_protos, lock)
+            ),
+            ReplaySource(
+                log_paths["yellow"],
+                RecordingProtoUnixIO("yellow", sent_protos, lock),
+                time_offset_s=YELLOW_TIME_OFFSET_S,
+            ),
+        ]
+    )
+
+
+def wait_for_playback_to_end(player: MultiProtoPlayer) -> None:
+    """Waits until the player has played back all the logs
+
+    :param player: the player
+    """
+    deadline = time.time() + PLAYBACK_TIMEOUT_S
+    while player.is_proto_player_playing():
+        if time.time() > deadline:
+            pytest.fail("The logs were not played back")
+        time.sleep(0.01)
+
+
+def test_logs_merged_in_time_order(player, sent_protos):
+    assert player.end_time == pytest.approx(
+        (NUM_ENTRIES_PER_LOG - 1) * SECONDS_BETWEEN_ENTRIES + YELLOW_TIME_OFFSET_S
+    )
+
+    wait_for_playback_to_end(player)
+
+    # The yellow log's entries are played between the blue log's entries
+    assert sent_protos == [
+        (name, index)
+        for index in range(NUM_ENTRIES_PER_LOG)
+        for name in ["blue", "yellow"]
+    ]
+    assert player.get_error_bit_flag() == ProtoPlayerFlags.NO_ERROR_FLAG
+
+
+def test_seek(player, sent_protos):
+    wait_for_playback_to_end(player)
+    sent_protos.clear()
+
+    # Each log seeks to its last entry at or before the time on its own
+    # timeline: 0.32 s for blue and 0.27 s for yellow
+    player.seek(3.2 * SECONDS_BETWEEN_ENTRIES)
+
+    assert player.current_packet_time == pytest.approx(
+        2 * SECONDS_BETWEEN_ENTRIES + YELLOW_TIME_OFFSET_S
+    )
+
+    for _ in range(5):
+        player.single_step_forward()
+
+    assert sent_protos == [
+        ("yellow", 2),
+        ("blue", 3),
+        ("yellow", 3),
+        ("blue", 4),
+        ("yellow", 4),
+    ]
+
+    # Seeking back to the start plays both logs from their first entries
+    sent_protos.clear()
+    player.seek(0.0)
+    player.single_step_forward()
+    player.single_step_forward()
+
+    assert sent_protos == [("blue", 0), ("yellow", 0)]
+
+
+def test_seek_waits_for_entry_being_sent(player, sent_protos):
+    wait_for_playback_to_end(player)
+    player.seek(3.2 * SECONDS_BETWEEN_ENTRIES)
+    sent_protos.clear()
+
+    seek_thread = threading.Thread(target=player.seek, args=(0.0,))
+    seek_blocked = []
+
+    def seek_while_sending():
+        seek_thread.start()
+        seek_thread.join(timeout=0.1)
+        seek_blocked.append(seek_thread.is_alive())
+
+    # The next entry is yellow's, see test_seek
+    player.sources[1].proto_unix_io.on_send = seek_while_sending
+    player.single_step_forward()
+    player.sources[1].proto_unix_io.on_send = None
+    seek_thread.join()
+
+    # The seek only ran once the entry was sent, so the next entry is from
+    # the time seeked to, not the one after the entry sent before the seek
+    assert seek_blocked == [True]
+    player.single_step_forward()
+    assert sent_protos == [("yellow", 2), ("blue", 0)]
+
+
+if __name__ == "__main__":
+    pytest_main(__file__)
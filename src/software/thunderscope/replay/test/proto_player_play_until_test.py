@@ -0,0 +1,136 @@
+"""Tests for playing back a replay log up to a time with ProtoPlayer.play_until.
+
+The log has an entry every half second, split into chunks of a few entries,
+and the id of each entry's proto is its index, so the entries sent can be
+identified. Half seconds are written exactly, so entries can be played up to
+their exact timestamps.
+"""
+
+import base64
+import shutil
+
+import pytest
+
+from proto.import_all_protos import *
+from software.thunderscope.proto_unix_io import ProtoUnixIO
+from software.thunderscope.replay.proto_player import ProtoPlayer
+from software.thunderscope.replay.replay_log_writer import ReplayLogWriter
+from software.simulated_tests.simulated_test_fixture import pytest_main
+
+# location to store the generated log
+TMP_REPLAY_SAVE_PATH = "/tmp/test_proto_player_play_until"
+
+NUM_ENTRIES = 25
+ENTRIES_PER_CHUNK = 10
+SECONDS_BETWEEN_ENTRIES = 0.5
+
+
+class RecordingProtoUnixIO(ProtoUnixIO):
+    """A ProtoUnixIO that records the ids of the protos sent to it"""
+
+    def __init__(self) -> None:
+        """Creates a ProtoUnixIO that records the protos sent to it"""
+        super().__init__()
+        self.sent_ids = []
+
+    def send_proto(self, proto_class, data, block=False, timeout=None) -> None:
+        """Records the id of the proto sent
+
+        :param proto_class: The class to send
+        :param data: The data to send
+        :param block: unused
+        :param timeout: unused
+        """
+        self.sent_ids.append(data.id)
+
+
+def get_entry_time(index: int) -> float:
+    """Returns the timestamp of an entry of the log
+
+    :param index: the index of the entry
+    :return: the timestamp of the entry
+    """
+    return index * SECONDS_BETWEEN_ENTRIES
+
+
+@pytest.fixture(autouse=True)
+def log():
+    """Writes the log to play back, deleted after the test"""
+    shutil.rmtree(TMP_REPLAY_SAVE_PATH, ignore_errors=True)
+
+    with ReplayLogWriter(
+        TMP_REPLAY_SAVE_PATH, max_entries_per_chunk=ENTRIES_PER_CHUNK
+    ) as writer:
+        for index in range(NUM_ENTRIES):
+            writer.write_entry(
+                get_entry_time(index),
+                bytes(RobotId.DESCRIPTOR.full_name, encoding="utf-8"),
+                base64.b64encode(RobotId(id=index).SerializeToString()),
+            )
+
+    yield
+
+    shutil.rmtree(TMP_REPLAY_SAVE_PATH, ignore_errors=True)
+
+
+@pytest.fixture
+def proto_unix_io() -> RecordingProtoUnixIO:
+    """The ProtoUnixIO the player sends the protos to"""
+    return RecordingProtoUnixIO()
+
+
+@pytest.fixture
+def player(proto_unix_io) -> ProtoPlayer:
+    """A player of the log that isn't started"""
+    return ProtoPlayer(TMP_REPLAY_SAVE_PATH, proto_unix_io, start_playback=False)
+
+
+def test_end_time_inclusive(player, proto_unix_io):
+    # An entry at exactly the end time is sent, the entry after it isn't
+    assert player.play_until(get_entry_time(3)) == 4
+    assert proto_unix_io.sent_ids == [0, 1, 2, 3]
+    assert player.current_packet_time == pytest.approx(get_entry_time(3))
+
+    # Playing up to the same time again, or to a time before the next entry,
+    # sends nothing
+    assert player.play_until(get_entry_time(3)) == 0
+    assert player.play_until(get_entry_time(3) + SECONDS_BETWEEN_ENTRIES / 2) == 0
+    assert proto_unix_io.sent_ids == [0, 1, 2, 3]
+
+
+def test_chunk_boundaries(player, proto_unix_io):
+    # Up to the last entry of the first chunk
+    assert player.play_until(get_entry_time(ENTRIES_PER_CHUNK - 1)) == (
+        ENTRIES_PER_CHUNK
+    )
+
+    # Up to the first entry of the second chunk
+    assert player.play_until(get_entry_time(ENTRIES_PER_CHUNK)) == 1
+
+    # Across the rest of the second chunk and into the third
+    assert player.play_until(get_entry_time(2 * ENTRIES_PER_CHUNK + 2)) == (
+        ENTRIES_PER_CHUNK + 2
+    )
+
+    assert proto_unix_io.sent_ids == list(range(2 * ENTRIES_PER_CHUNK + 3))
+
+
+def test_play_past_end_of_log(player, proto_unix_io):
+    assert player.play_until(get_entry_time(NUM_ENTRIES) + 10.0) == NUM_ENTRIES
+    assert proto_unix_io.sent_ids == list(range(NUM_ENTRIES))
+
+    # Nothing is left to send once the whole log has been played
+    assert player.play_until(get_entry_time(NUM_ENTRIES) + 20.0) == 0
+
+
+def test_play_after_seek(player, proto_unix_io):
+    player.seek(get_entry_time(ENTRIES_PER_CHUNK + 5))
+
+    assert player.play_until(get_entry_time(2 * ENTRIES_PER_CHUNK)) == 6
+    assert proto_unix_io.sent_ids == list(
+        range(ENTRIES_PER_CHUNK + 5, 2 * ENTRIES_PER_CHUNK + 1)
+    )
+
+
+if __name__ == "__main__":
+    pytest_main(__file__)
@@ -0,0 +1,138 @@
+"""Tests for extracting a clip of a replay log with ProtoPlayer.extract_clip.
+
+The log has an entry every tenth of a second, and the id of each entry's proto
+is its index, so the entries copied to a clip can be identified.
+"""
+
+import base64
+import os
+import shutil
+
+import pytest
+
+from proto.import_all_protos import *
+from software.thunderscope.proto_unix_io import ProtoUnixIO
+from software.thunderscope.replay.proto_player import ProtoPlayer
+from software.thunderscope.replay.replay_log_writer import ReplayLogWriter
+from software.simulated_tests.simulated_test_fixture import pytest_main
+
+# location to store the generated logs
+TMP_REPLAY_SAVE_PATH = "/tmp/test_replay_clip"
+LOG_PATH = f"{TMP_REPLAY_SAVE_PATH}/log"
+CLIP_PATH = f"{TMP_REPLAY_SAVE_PATH}/clip"
+
+NUM_ENTRIES = 100
+ENTRIES_PER_CHUNK = 10
+SECONDS_BETWEEN_ENTRIES = 0.1
+
+# The clip is between entries, so it holds the entries from 2.4 s to 5.0 s
+CLIP_START_TIME_S = 2.35
+CLIP_END_TIME_S = 5.05
+CLIP_ENTRY_INDICES = list(range(24, 51))
+
+
+@pytest.fixture(autouse=True)
+def log():
+    """Writes the log to clip, deleted with the clip after the test"""
+    shutil.rmtree(TMP_REPLAY_SAVE_PATH, ignore_errors=True)
+
+    with ReplayLogWriter(LOG_PATH, max_entries_per_chunk=ENTRIES_PER_CHUNK) as writer:
+        for index in range(NUM_ENTRIES):
+            writer.write_entry(
+                index * SECONDS_BETWEEN_ENTRIES,
+                bytes(RobotId.DESCRIPTOR.full_name, encoding="utf-8"),
+                base64.b64encode(RobotId(id=index).SerializeToString()),
+            )
+
+    yield
+
+    shutil.rmtree(TMP_REPLAY_SAVE_PATH, ignore_errors=True)
+
+
+def read_log(log_folder_path: os.PathLike) -> list[tuple[float, int]]:
+    """Reads back every entry of a log, deserializing its proto
+
+    :param log_folder_path: the path to the log folder
+    :return: the timestamp and robot id of every entry, in order
+    """
+    sorted_chunks = ProtoPlayer.sort_and_get_replay_files(log_folder_path)
+    version = ProtoPlayer.get_replay_chunk_format_version(sorted_chunks[0])
+
+    entries = []
+    for chunk_path in sorted_chunks:
+        for log_entry in ProtoPlayer.load_replay_chunk(chunk_path, version):
+            timestamp, proto_class, proto = ProtoPlayer.unpack_log_entry(
+                log_entry, version
+            )
+            assert proto_class == RobotId
+            entries.append((timestamp, proto.id))
+
+    return entries
+
+
+def check_clip() -> None:
+    """Checks that the clip holds the entries between its start and end time,
+    with their timestamps starting from the start of the clip
+    """
+    entries = read_log(CLIP_PATH)
+
+    assert [robot_id for _, robot_id in entries] == CLIP_ENTRY_INDICES
+    for timestamp, robot_id in entries:
+        assert timestamp == pytest.approx(
+            robot_id * SECONDS_BETWEEN_ENTRIES - CLIP_START_TIME_S
+        )
+
+    # The clip can be played back and seeked like any other log
+    player = ProtoPlayer(CLIP_PATH, ProtoUnixIO(), start_playback=False)
+    assert player.end_time == pytest.approx(
+        CLIP_ENTRY_INDICES[-1] * SECONDS_BETWEEN_ENTRIES - CLIP_START_TIME_S
+    )
+    assert len(player.chunks_indices) == len(player.sorted_chunks)
+
+    player.seek(1.0)
+    _, _, proto = ProtoPlayer.unpack_log_entry(
+        player.current_chunk[player.current_entry_index], player.version
+    )
+    assert proto.id == 33
+
+
+def test_extract_clip():
+    ProtoPlayer.extract_clip(LOG_PATH, CLIP_PATH, CLIP_START_TIME_S, CLIP_END_TIME_S)
+
+    check_clip()
+
+    # Each chunk of the log the clip overlaps is copied to its own chunk
+    assert len(ProtoPlayer.sort_and_get_replay_files(CLIP_PATH)) == 4
+
+
+def test_extract_clip_from_unindexed_log():
+    os.remove(os.path.join(LOG_PATH, ProtoPlayer.CHUNK_INDEX_FILENAME))
+
+    ProtoPlayer.extract_clip(LOG_PATH, CLIP_PATH, CLIP_START_TIME_S, CLIP_END_TIME_S)
+
+    check_clip()
+
+
+def test_extract_clip_past_end_of_log():
+    ProtoPlayer.extract_clip(LOG_PATH, CLIP_PATH, 9.55, 20.0)
+
+    assert [robot_id for _, robot_id in read_log(CLIP_PATH)] == list(
+        range(96, NUM_ENTRIES)
+    )
+
+
+def test_save_clip():
+    player = ProtoPlayer(LOG_PATH, ProtoUnixIO(), start_playback=False)
+
+    # The clip is saved to a folder named after the file without its extension
+    thread = player.save_clip(f"{CLIP_PATH}.replay", CLIP_START_TIME_S, CLIP_END_TIME_S)
+    thread.join()
+
+    check_clip()
+
+    assert player.save_clip(CLIP_PATH, CLIP_END_TIME_S, CLIP_START_TIME_S) is None
+    assert player.save_clip("", CLIP_START_TIME_S, CLIP_END_TIME_S) is None
+
+
+if __name__ == "__main__":
+    pytest_main(__file__)
@@ -0,0 +1,161 @@
+"""Tests for compacting replay logs with the ReplayLogCompactor.
+
+The log has the statuses of several robots logged at a high rate, along with
+robot logs and crashes logged close together, to check that downsampling keeps
+every robot and never drops events.
+"""
+
+import base64
+import shutil
+from collections import Counter
+
+import pytest
+from google.protobuf.message import Message
+
+from proto.import_all_protos import *
+from software.thunderscope.replay.proto_player import ProtoPlayer
+from software.thunderscope.replay.replay_log_compactor import (
+    DEFAULT_DOWNSAMPLED_TYPE_RATES_HZ,
+    ReplayLogCompactor,
+)
+from software.thunderscope.replay.replay_log_writer import ReplayLogWriter
+from software.simulated_tests.simulated_test_fixture import pytest_main
+
+# location to store the generated logs
+TMP_REPLAY_SAVE_PATH = "/tmp/test_replay_log_compactor"
+LOG_PATH = f"{TMP_REPLAY_SAVE_PATH}/log"
+COMPACTED_LOG_PATH = f"{TMP_REPLAY_SAVE_PATH}/compacted_log"
+
+ROBOT_IDS = [0, 1, 2]
+
+# Robot statuses, path visualizations and validations are logged at 100 Hz
+# for a second
+NUM_ENTRIES_PER_STREAM = 100
+SECONDS_BETWEEN_ENTRIES = 0.01
+
+ROBOT_STATUS_RATE_HZ = DEFAULT_DOWNSAMPLED_TYPE_RATES_HZ["TbotsProto.RobotStatus"]
+PATH_VISUALIZATION_RATE_HZ = DEFAULT_DOWNSAMPLED_TYPE_RATES_HZ[
+    "TbotsProto.PathVisualization"
+]
+
+# Events logged within the same downsampled period
+EVENT_TIMES_S = [0.501, 0.502, 0.503]
+
+
+def write_entry(writer: ReplayLogWriter, timestamp: float, proto: Message) -> None:
+    """Writes a proto to a log
+
+    :param writer: the writer of the log
+    :param timestamp: the timestamp of the entry
+    :param proto: the proto to write
+    """
+    writer.write_entry(
+        timestamp,
+        bytes(proto.DESCRIPTOR.full_name, encoding="utf-8"),
+        base64.b64encode(proto.SerializeToString()),
+    )
+
+
+@pytest.fixture(autouse=True)
+def log():
+    """Writes the log to compact, deleted with the compacted log after the test"""
+    shutil.rmtree(TMP_REPLAY_SAVE_PATH, ignore_errors=True)
+
+    with ReplayLogWriter(LOG_PATH, max_entries_per_chunk=100) as writer:
+        for index in range(NUM_ENTRIES_PER_STREAM):
+            timestamp = index * SECONDS_BETWEEN_ENTRIES
+
+            write_entry(writer, timestamp, PathVisualization())
+            write_entry(
+                writer,
+                timestamp,
+                ValidationProtoSet(test_name="", validation_type=ALWAYS),
+            )
+            for robot_id in ROBOT_IDS:
+                write_entry(writer, timestamp, RobotStatus(robot_id=robot_id))
+
+            if index == NUM_ENTRIES_PER_STREAM // 2:
+                for robot_id, event_time_s in zip(ROBOT_IDS, EVENT_TIMES_S):
+                    write_entry(
+                        writer, event_time_s, RobotLog(robot_id=robot_id, log_msg="")
+                    )
+                    write_entry(writer, event_time_s, RobotCrash(robot_id=robot_id))
+
+    yield
+
+    shutil.rmtree(TMP_REPLAY_SAVE_PATH, ignore_errors=True)
+
+
+def count_entries(log_folder_path: str) -> Counter:
+    """Counts the entries of a log by proto type and robot
+
+    :param log_folder_path: the path to the log folder
+    :return: the number of entries of each (proto type, robot id), with a
+             robot id of None for protos without one
+    """
+    sorted_chunks = ProtoPlayer.sort_and_get_replay_files(log_folder_path)
+    version = ProtoPlayer.get_replay_chunk_format_version(sorted_chunks[0])
+
+    counts = Counter()
+    for chunk_path in sorted_chunks:
+        for log_entry in ProtoPlayer.load_replay_chunk(chunk_path, version):
+            _, proto_class, proto = ProtoPlayer.unpack_log_entry(log_entry, version)
+            counts[(proto_class, getattr(proto, "robot_id", None))] += 1
+
+    return counts
+
+
+def test_every_robot_downsampled():
+    stats = ReplayLogCompactor().compact(LOG_PATH, COMPACTED_LOG_PATH)
+    counts = count_entries(COMPACTED_LOG_PATH)
+
+    # Each robot's statuses are downsampled on their own, so no robot is lost
+    num_statuses_per_robot = int(
+        NUM_ENTRIES_PER_STREAM * SECONDS_BETWEEN_ENTRIES * ROBOT_STATUS_RATE_HZ
+    )
+    for robot_id in ROBOT_IDS:
+        assert counts[(RobotStatus, robot_id)] == num_statuses_per_robot
+
+    robot_status_stats = stats["TbotsProto.RobotStatus"]
+    assert robot_status_stats.num_read == NUM_ENTRIES_PER_STREAM * len(ROBOT_IDS)
+    assert robot_status_stats.num_written == num_statuses_per_robot * len(ROBOT_IDS)
+
+    # Visualizations aren't from a robot, so they're downsampled as one stream
+    assert counts[(PathVisualization, None)] == int(
+        NUM_ENTRIES_PER_STREAM * SECONDS_BETWEEN_ENTRIES * PATH_VISUALIZATION_RATE_HZ
+    )
+
+
+def test_events_and_unlisted_types_kept():
+    ReplayLogCompactor().compact(LOG_PATH, COMPACTED_LOG_PATH)
+    counts = count_entries(COMPACTED_LOG_PATH)
+
+    # The events are all in the same downsampled period, but none are dropped
+    for robot_id in ROBOT_IDS:
+        assert counts[(RobotLog, robot_id)] == 1
+        assert counts[(RobotCrash, robot_id)] == 1
+
+    # Validations aren't in the rate table, so they're kept at full rate
+    assert counts[(ValidationProtoSet, None)] == NUM_ENTRIES_PER_STREAM
+
+
+def test_zero_rate_keeps_first_entry_of_each_robot():
+    ReplayLogCompactor(
+        downsampled_type_rates_hz={"TbotsProto.RobotStatus": 0.0}
+    ).compact(LOG_PATH, COMPACTED_LOG_PATH)
+    counts = count_entries(COMPACTED_LOG_PATH)
+
+    for robot_id in ROBOT_IDS:
+        assert counts[(RobotStatus, robot_id)] == 1
+
+
+def test_events_cannot_be_downsampled():
+    with pytest.raises(ValueError):
+        ReplayLogCompactor(downsampled_type_rates_hz={"TbotsProto.RobotLog": 1.0})
+
+    with pytest.raises(ValueError):
+        ReplayLogCompactor(deduplicated_types=["TbotsProto.RobotCrash"])
+
+
+if __name__ == "__main__":
+    pytest_main(__file__)
@@ -0,0 +1,227 @@
+"""Tests for scanning replay logs for corruption and repairing them.
+
+The log is written with ReplayLogWriter and then damaged the way a crashed
+logger or a bad disk would: chunks are cut off partway through their gzip
+stream, and an entry is overwritten with garbage. The id of each entry's proto
+is its index in the log, so the entries kept by the repair can be identified.
+"""
+
+import base64
+import gzip
+import os
+import shutil
+import zlib
+
+import pytest
+
+from proto.import_all_protos import *
+from software.thunderscope.replay.proto_player import ProtoPlayer
+from software.thunderscope.replay.replay_log_repairer import (
+    repair_replay_log,
+    scan_replay_chunk,
+    scan_replay_log,
+)
+from software.thunderscope.replay.replay_log_writer import ReplayLogWriter
+from software.simulated_tests.simulated_test_fixture import pytest_main
+
+# location to store the generated logs
+TMP_REPLAY_SAVE_PATH = "/tmp/test_replay_log_repairer"
+LOG_PATH = f"{TMP_REPLAY_SAVE_PATH}/log"
+REPAIRED_LOG_PATH = f"{TMP_REPLAY_SAVE_PATH}/repaired_log"
+
+NUM_CHUNKS = 4
+ENTRIES_PER_CHUNK = 10
+SECONDS_BETWEEN_ENTRIES = 0.1
+
+# The chunk cut off after some of its entries, and the chunk cut off before any
+TRUNCATED_CHUNK_INDEX = 1
+NUM_INTACT_ENTRIES_IN_TRUNCATED_CHUNK = 4
+EMPTY_CHUNK_INDEX = 3
+
+# The entry overwritten with garbage, counting from the start of its chunk
+CORRUPT_CHUNK_INDEX = 2
+CORRUPT_LINE_NUMBER = 3
+
+
+def get_chunk_path(chunk_index: int) -> str:
+    """Returns the path to a chunk of the log
+
+    :param chunk_index: the index of the chunk
+    :return: the path to the chunk
+    """
+    return os.path.join(LOG_PATH, f"{chunk_index}.replay")
+
+
+def read_chunk_lines(chunk_path: str) -> list[bytes]:
+    """Reads the lines of an intact chunk, including its version line
+
+    :param chunk_path: the path to the chunk
+    :return: the lines of the chunk
+    """
+    with gzip.open(chunk_path, "rb") as chunk_file:
+        return chunk_file.readlines()
+
+
+def truncate_chunk(chunk_path: str, num_intact_entries: int) -> None:
+    """Rewrites a chunk so that its gzip stream ends right after the given
+    number of entries, as if the logger was killed while writing the rest
+
+    :param chunk_path: the path to the chunk
+    :param num_intact_entries: the number of entries that can still be read
+    """
+    lines = read_chunk_lines(chunk_path)
+
+    with open(chunk_path, "wb") as raw_file:
+        with gzip.GzipFile(fileobj=raw_file, mode="wb") as chunk_file:
+            # Flushing ends the compressed data of the intact entries on a byte
+            # boundary, so they can be decompressed without the rest of the file
+            chunk_file.writelines(lines[: 1 + num_intact_entries])
+            chunk_file.flush(zlib.Z_SYNC_FLUSH)
+            truncated_size = raw_file.tell()
+
+            chunk_file.writelines(lines[1 + num_intact_entries :])
+
+        raw_file.truncate(truncated_size)
+
+
+def corrupt_entry(chunk_path: str, line_number: int) -> None:
+    """Overwrites an entry of a chunk with an entry that can't be split
+
+    :param chunk_path: the path to the chunk
+    :param line_number: the line number of the entry, not counting the version line
+    """
+    lines = read_chunk_lines(chunk_path)
+    lines[1 + line_number] = b"not a log entry\n"
+
+    with gzip.open(chunk_path, "wb") as chunk_file:
+        chunk_file.writelines(lines)
+
+
+def get_intact_entry_ids() -> list[int]:
+    """Returns the ids of the entries the damaged log still has intact
+
+    :return: the ids, in log order
+    """
+    entry_ids = []
+    for chunk_index in range(NUM_CHUNKS):
+        chunk_entry_ids = list(
+            range(
+                chunk_index * ENTRIES_PER_CHUNK, (chunk_index + 1) * ENTRIES_PER_CHUNK
+            )
+        )
+
+        if chunk_index == TRUNCATED_CHUNK_INDEX:
+            chunk_entry_ids = chunk_entry_ids[:NUM_INTACT_ENTRIES_IN_TRUNCATED_CHUNK]
+        elif chunk_index == EMPTY_CHUNK_INDEX:
+            chunk_entry_ids = []
+        elif chunk_index == CORRUPT_CHUNK_INDEX:
+            del chunk_entry_ids[CORRUPT_LINE_NUMBER]
+
+        entry_ids += chunk_entry_ids
+
+    return entry_ids
+
+
+@pytest.fixture(autouse=True)
+def log():
+    """Writes the damaged log, deleted with the repaired log after the test"""
+    shutil.rmtree(TMP_REPLAY_SAVE_PATH, ignore_errors=True)
+
+    with ReplayLogWriter(LOG_PATH, max_entries_per_chunk=ENTRIES_PER_CHUNK) as writer:
+        for index in range(NUM_CHUNKS * ENTRIES_PER_CHUNK):
+            writer.write_entry(
+                index * SECONDS_BETWEEN_ENTRIES,
+                bytes(RobotId.DESCRIPTOR.full_name, encoding="utf-8"),
+                base64.b64encode(RobotId(id=index).SerializeToString()),
+            )
+
+    truncate_chunk(
+        get_chunk_path(TRUNCATED_CHUNK_INDEX), NUM_INTACT_ENTRIES_IN_TRUNCATED_CHUNK
+    )
+    truncate_chunk(get_chunk_path(EMPTY_CHUNK_INDEX), 0)
+    corrupt_entry(get_chunk_path(CORRUPT_CHUNK_INDEX), CORRUPT_LINE_NUMBER)
+
+    yield
+
+    shutil.rmtree(TMP_REPLAY_SAVE_PATH, ignore_errors=True)
+
+
+def test_intact_chunk_not_corrupt():
+    result = scan_replay_chunk(get_chunk_path(0))
+
+    assert not result.is_corrupt
+    assert result.error is None
+    assert result.num_entries == ENTRIES_PER_CHUNK
+    assert result.start_time == pytest.approx(0.0)
+    assert result.end_time == pytest.approx(
+        (ENTRIES_PER_CHUNK - 1) * SECONDS_BETWEEN_ENTRIES
+    )
+
+
+def test_truncated_chunk_detected():
+    result = scan_replay_chunk(get_chunk_path(TRUNCATED_CHUNK_INDEX))
+
+    assert result.is_truncated
+    assert result.is_corrupt
+    assert result.error is not None
+    assert result.corrupt_line_numbers == []
+
+    # The entries before the end of the compressed data are still read
+    assert result.num_valid_entries == NUM_INTACT_ENTRIES_IN_TRUNCATED_CHUNK
+    first_entry_index = TRUNCATED_CHUNK_INDEX * ENTRIES_PER_CHUNK
+    assert result.start_time == pytest.approx(
+        first_entry_index * SECONDS_BETWEEN_ENTRIES
+    )
+    assert result.end_time == pytest.approx(
+        (first_entry_index + NUM_INTACT_ENTRIES_IN_TRUNCATED_CHUNK - 1)
+        * SECONDS_BETWEEN_ENTRIES
+    )
+
+
+def test_corrupt_entry_detected():
+    result = scan_replay_chunk(get_chunk_path(CORRUPT_CHUNK_INDEX))
+
+    assert not result.is_truncated
+    assert result.is_corrupt
+    assert result.corrupt_line_numbers == [CORRUPT_LINE_NUMBER]
+    assert result.num_entries == ENTRIES_PER_CHUNK
+    assert result.num_valid_entries == ENTRIES_PER_CHUNK - 1
+
+
+def test_repair_keeps_intact_entries():
+    scan_results = scan_replay_log(LOG_PATH, max_workers=2)
+
+    assert [os.path.basename(result.chunk_path) for result in scan_results] == [
+        f"{chunk_index}.replay" for chunk_index in range(NUM_CHUNKS)
+    ]
+    assert [result.is_corrupt for result in scan_results] == [
+        False,
+        True,
+        True,
+        True,
+    ]
+
+    num_entries = repair_replay_log(scan_results, REPAIRED_LOG_PATH)
+
+    intact_entry_ids = get_intact_entry_ids()
+    assert num_entries == len(intact_entry_ids)
+
+    # The chunk with no intact entries is left out
+    sorted_chunks = ProtoPlayer.sort_and_get_replay_files(REPAIRED_LOG_PATH)
+    assert len(sorted_chunks) == NUM_CHUNKS - 1
+
+    entry_ids = []
+    for chunk_path in sorted_chunks:
+        assert not scan_replay_chunk(chunk_path).is_corrupt
+
+        version = ProtoPlayer.get_replay_chunk_format_version(chunk_path)
+        for log_entry in ProtoPlayer.load_replay_chunk(chunk_path, version):
+            timestamp, _, proto = ProtoPlayer.unpack_log_entry(log_entry, version)
+            assert timestamp == pytest.approx(proto.id * SECONDS_BETWEEN_ENTRIES)
+            entry_ids.append(proto.id)
+
+    assert entry_ids == intact_entry_ids
+
+
+if __name__ == "__main__":
+    pytest_main(__file__)
@@ -0,0 +1,169 @@
+"""Tests for the summary track of replay logs, built by the ReplaySummaryBuilder
+both while a log is written and while an existing log is indexed.
+
+The log has a World every eighth of a second for a few seconds, with the ball
+at x = timestamp and one more friendly robot every second, and a Referee in
+the middle of some seconds. Eighths of a second are written exactly, so the
+sample periods the entries fall in are known exactly.
+"""
+
+import base64
+import os
+import pickle
+import shutil
+
+import pytest
+from google.protobuf.message import Message
+
+from proto.import_all_protos import *
+from proto.game_state_pb2 import GameState
+from proto.ssl_gc_referee_message_pb2 import Referee
+from software.thunderscope.proto_unix_io import ProtoUnixIO
+from software.thunderscope.replay.proto_player import ProtoPlayer
+from software.thunderscope.replay.replay_log_writer import ReplayLogWriter
+from software.thunderscope.replay.replay_summary import (
+    ReplaySummaryBuilder,
+    ReplaySummarySample,
+)
+from software.simulated_tests.simulated_test_fixture import pytest_main
+
+# location to store the generated log
+TMP_REPLAY_SAVE_PATH = "/tmp/test_replay_summary"
+
+NUM_SECONDS = 5
+WORLDS_PER_SECOND = 8
+
+# The times of the Referees, the blue team scoring once before each
+REFEREE_TIMES_S = [1.5, 3.5]
+
+# Logged after the last World, and not summarized
+ROBOT_STATUS_TIME_S = NUM_SECONDS + 0.5
+
+
+def write_entry(writer: ReplayLogWriter, timestamp: float, proto: Message) -> None:
+    """Writes a proto to a log. Only the fields summarized are set, so the
+    proto is written without the rest of its required fields.
+
+    :param writer: the writer of the log
+    :param timestamp: the timestamp of the entry
+    :param proto: the proto to write
+    """
+    writer.write_entry(
+        timestamp,
+        bytes(proto.DESCRIPTOR.full_name, encoding="utf-8"),
+        base64.b64encode(proto.SerializePartialToString()),
+    )
+
+
+def create_world(timestamp: float) -> World:
+    """Creates the World logged at a time
+
+    :param timestamp: the time the World is logged at
+    :return: the World, with the ball at x = timestamp and one friendly robot
+             for every second since the start of the log
+    """
+    world = World()
+    world.ball.current_state.global_position.x_meters = timestamp
+    for robot_id in range(int(timestamp) + 1):
+        world.friendly_team.team_robots.add(id=robot_id)
+    world.enemy_team.team_robots.add(id=0)
+    world.game_state.play_state = GameState.PlayState.PLAY_STATE_PLAYING
+    return world
+
+
+@pytest.fixture(autouse=True)
+def log():
+    """Writes the log to summarize, deleted after the test"""
+    shutil.rmtree(TMP_REPLAY_SAVE_PATH, ignore_errors=True)
+
+    with ReplayLogWriter(TMP_REPLAY_SAVE_PATH, max_entries_per_chunk=10) as writer:
+        for index in range(NUM_SECONDS * WORLDS_PER_SECOND):
+            timestamp = index / WORLDS_PER_SECOND
+            write_entry(writer, timestamp, create_world(timestamp))
+
+            if timestamp in REFEREE_TIMES_S:
+                referee = Referee(
+                    stage=Referee.NORMAL_FIRST_HALF,
+                    command=Referee.NORMAL_START,
+                )
+                referee.blue.score = REFEREE_TIMES_S.index(timestamp) + 1
+                write_entry(writer, timestamp, referee)
+
+        write_entry(writer, ROBOT_STATUS_TIME_S, RobotStatus(robot_id=0))
+
+    yield
+
+    shutil.rmtree(TMP_REPLAY_SAVE_PATH, ignore_errors=True)
+
+
+def test_one_sample_per_period():
+    samples = ReplaySummaryBuilder.load(TMP_REPLAY_SAVE_PATH)
+
+    # A sample is taken at the first World of every second, and none for the
+    # Referees or the RobotStatus
+    assert [sample.timestamp for sample in samples] == list(range(NUM_SECONDS))
+
+    for second, sample in enumerate(samples):
+        assert sample.ball_position == (second, 0)
+        assert sample.num_friendly_robots == second + 1
+        assert sample.num_enemy_robots == 1
+        assert sample.play_state == GameState.PlayState.PLAY_STATE_PLAYING
+
+
+def test_referee_summarized_once_logged():
+    samples = ReplaySummaryBuilder.load(TMP_REPLAY_SAVE_PATH)
+
+    # Nothing is known about the referee before the first Referee is logged
+    assert samples[0].referee_stage is None
+    assert samples[1].blue_score is None
+
+    # Each sample has the latest Referee logged before it
+    assert [sample.blue_score for sample in samples[2:]] == [1, 1, 2]
+    assert samples[2].referee_stage == Referee.NORMAL_FIRST_HALF
+    assert samples[2].referee_command == Referee.NORMAL_START
+    assert samples[2].yellow_score == 0
+
+
+def test_indexed_summary_matches_written_summary():
+    written_samples = ReplaySummaryBuilder.load(TMP_REPLAY_SAVE_PATH)
+
+    # Without a summary index, the player decodes the log to build it
+    os.remove(
+        os.path.join(TMP_REPLAY_SAVE_PATH, ReplaySummaryBuilder.SUMMARY_INDEX_FILENAME)
+    )
+    player = ProtoPlayer(TMP_REPLAY_SAVE_PATH, ProtoUnixIO(), start_playback=False)
+
+    assert player.summary == written_samples
+    assert ReplaySummaryBuilder.load(TMP_REPLAY_SAVE_PATH) == written_samples
+
+
+def test_old_summary_index_rebuilt():
+    written_samples = ReplaySummaryBuilder.load(TMP_REPLAY_SAVE_PATH)
+
+    with open(
+        os.path.join(TMP_REPLAY_SAVE_PATH, ReplaySummaryBuilder.SUMMARY_INDEX_FILENAME),
+        "wb",
+    ) as summary_file:
+        pickle.dump(
+            (ReplaySummaryBuilder.SUMMARY_INDEX_FILE_VERSION - 1, []), summary_file
+        )
+
+    with pytest.raises(ValueError):
+        ReplaySummaryBuilder.load(TMP_REPLAY_SAVE_PATH)
+
+    player = ProtoPlayer(TMP_REPLAY_SAVE_PATH, ProtoUnixIO(), start_playback=False)
+    assert player.summary == written_samples
+
+
+def test_get_sample_at():
+    samples = [ReplaySummarySample(timestamp) for timestamp in [1.0, 2.0, 3.0]]
+
+    assert ReplaySummaryBuilder.get_sample_at(samples, 0.5) is None
+    assert ReplaySummaryBuilder.get_sample_at(samples, 1.0) is samples[0]
+    assert ReplaySummaryBuilder.get_sample_at(samples, 2.5) is samples[1]
+    assert ReplaySummaryBuilder.get_sample_at(samples, 10.0) is samples[2]
+    assert ReplaySummaryBuilder.get_sample_at([], 1.0) is None
+
+
+if __name__ == "__main__":
+    pytest_main(__file__)
@@ -1,5 +1,6 @@
 from typing import Self
 
+import queue
 import threading
 import time
 import os
@@ -10,9 +11,14 @@ from software.logger.logger import create_logger
 from software.thunderscope.thread_safe_buffer import ThreadSafeBuffer
 from software.thunderscope.proto_unix_io import ProtoUnixIO
 from software.thunderscope.wifi_communication_manager import WifiCommunicationManager
+from software.thunderscope.link_quality_tracker import LinkQualityTracker
+from software.networking.tracing import tracer
 from software.py_constants import *
 from software.thunderscope.constants import (
     ROBOT_COMMUNICATIONS_TIMEOUT_S,
+    LINK_STATISTICS_PUBLISH_PERIOD_S,
+    ESTOP_POLL_PERIOD_S,
+    ESTOP_HEARTBEAT_PERIOD_S,
     IndividualRobotMode,
     EstopMode,
 )
@@ -76,6 +82,16 @@ class RobotCommunication:
             PowerControl, self.power_control_primitive_buffer
         )
 
+        # Matches the primitives sent to the sequence numbers the robots
+        # acknowledge, to measure the quality of the link to each robot
+        self.link_quality_tracker = LinkQualityTracker()
+        self.robot_statistic_buffer = ThreadSafeBuffer(
+            MAX_ROBOT_IDS_PER_SIDE * 10, RobotStatistic
+        )
+        self.current_proto_unix_io.register_observer(
+            RobotStatistic, self.robot_statistic_buffer
+        )
+
         # dynamic map of robot id to the individual control mode
         self.robot_control_mode_map: dict[int, IndividualRobotMode] = {}
 
@@ -85,6 +101,22 @@ class RobotCommunication:
         self.run_primitive_set_thread = threading.Thread(
             target=self.__run_primitive_set, daemon=True
         )
+        self.publish_link_statistics_thread = threading.Thread(
+            target=self.__publish_link_statistics, daemon=True
+        )
+
+        # Each robot has its own thread sending its primitives, so that a slow
+        # send to one robot doesn't delay the primitives for the other robots.
+        # Each thread only sends the newest primitive dispatched to its robot.
+        self.robot_primitive_queues: list[queue.Queue] = [
+            queue.Queue(maxsize=1) for _ in range(MAX_ROBOT_IDS_PER_SIDE)
+        ]
+        self.send_primitive_threads = [
+            threading.Thread(
+                target=self.__send_primitives_to_robot, args=(robot_id,), daemon=True
+            )
+            for robot_id in range(MAX_ROBOT_IDS_PER_SIDE)
+        ]
 
         # load control mode and stop primitive maps with default values
         for robot_id in range(MAX_ROBOT_IDS_PER_SIDE):
@@ -102,6 +134,10 @@ class RobotCommunication:
         self.estop_reader = None
         self.estop_is_playing = False
 
+        # Set when the keyboard estop is toggled or we are exiting, to wake up
+        # the thread publishing the estop state right away
+        self.estop_state_changed = threading.Event()
+
         # only checks for estop if we are in physical estop mode
         if self.estop_mode == EstopMode.PHYSICAL_ESTOP:
             try:
@@ -129,6 +165,7 @@ class RobotCommunication:
                     else "\x1b[31;20mSTOP \x1b[0m"
                 )
             )
+            self.estop_state_changed.set()
 
     def toggle_individual_robot_control_mode(
         self, robot_id: int, mode: IndividualRobotMode
@@ -146,27 +183,54 @@ class RobotCommunication:
         )
 
     def __send_estop_state(self) -> None:
-        """Constant loop which sends the current estop status proto if estop is not disabled
-        Uses the keyboard estop value for keyboard estop mode
-        If we're in physical estop mode, uses the physical estop value
-        If estop has just changed from playing to stop, set flag to send stop primitive once to connected robots
+        """Publishes the estop state proto if estop is not disabled, whenever the
+        estop state changes and every ESTOP_HEARTBEAT_PERIOD_S otherwise.
+
+        Keyboard estop toggles wake this thread up right away. The physical estop
+        is read every ESTOP_POLL_PERIOD_S, since the estop reader has no way to
+        notify us of changes.
+
+        Whenever the estop changes state, the connected robots are flagged to be
+        sent stop primitives, so that they stop right away when the estop is
+        stopped and don't act on old primitives when it goes back to playing.
         """
-        previous_estop_is_playing = True
-        if self.estop_mode != EstopMode.DISABLE_ESTOP:
-            while True:
-                if self.estop_mode == EstopMode.PHYSICAL_ESTOP:
-                    self.estop_is_playing = self.estop_reader.isEstopPlay()
-
-                if not self.estop_is_playing:
-                    self.robot_stop_primitive_send_count = [
-                        NUM_TIMES_SEND_STOP
-                        for robot_id in range(MAX_ROBOT_IDS_PER_SIDE)
-                    ]
+        if self.estop_mode == EstopMode.DISABLE_ESTOP:
+            return
 
+        wait_period_s = (
+            ESTOP_POLL_PERIOD_S
+            if self.estop_mode == EstopMode.PHYSICAL_ESTOP
+            else ESTOP_HEARTBEAT_PERIOD_S
+        )
+
+        previous_estop_is_playing = None
+        next_heartbeat_time = time.monotonic()
+
+        while self.running:
+            if self.estop_mode == EstopMode.PHYSICAL_ESTOP:
+                self.estop_is_playing = self.estop_reader.isEstopPlay()
+
+            estop_is_playing = self.estop_is_playing
+            estop_state_changed = estop_is_playing != previous_estop_is_playing
+
+            if estop_state_changed:
+                self.robot_stop_primitive_send_count = [
+                    NUM_TIMES_SEND_STOP for robot_id in range(MAX_ROBOT_IDS_PER_SIDE)
+                ]
+                previous_estop_is_playing = estop_is_playing
+
+            if estop_state_changed or time.monotonic() >= next_heartbeat_time:
                 self.current_proto_unix_io.send_proto(
-                    EstopState, EstopState(is_playing=self.estop_is_playing)
+                    EstopState, EstopState(is_playing=estop_is_playing)
                 )
-                time.sleep(0.1)
+                next_heartbeat_time = time.monotonic() + ESTOP_HEARTBEAT_PERIOD_S
+
+            self.estop_state_changed.wait(
+                timeout=min(
+                    wait_period_s, max(next_heartbeat_time - time.monotonic(), 0)
+                )
+            )
+            self.estop_state_changed.clear()
 
     def __should_send_packet(self, robot_id) -> bool:
         """Returns True if the proto should be sent to the robot with the given id
@@ -190,82 +254,146 @@ class RobotCommunication:
         For Diagnostics protos, does not block and returns cached message if none available
         Sleeps for 10ms for diagnostics
 
+        Each robot's primitive is dispatched to the thread sending to that robot as
+        soon as the PrimitiveSet arrives, so all the robots are sent their
+        primitives concurrently.
+
         If the emergency stop is tripped, the PrimitiveSet will not be sent so
         that the robots timeout and stop.
         """
         while self.running:
-            self.communication_manager.poll()
+            # get the most recent fullsystem primitives
+            fullsystem_primitive_set = self.fullsystem_primitive_set_buffer.get(
+                block=True, timeout=ROBOT_COMMUNICATIONS_TIMEOUT_S
+            )
+
+            with tracer.zone("RobotCommunication.run_primitive_set"):
+                # map of robot id to diagnostics/fullsystem primitive map
+                robot_primitives_map = {}
+
+                # get the most recent diagnostics primitive
+                motor_control = self.motor_control_primitive_buffer.get(block=False)
+                power_control = self.power_control_primitive_buffer.get(block=False)
+
+                for robot_id, mode in self.robot_control_mode_map.items():
+                    if mode == IndividualRobotMode.MANUAL:
+                        robot_primitives_map[robot_id] = Primitive(
+                            direct_control=DirectControlPrimitive(
+                                motor_control=motor_control,
+                                power_control=power_control,
+                            )
+                        )
+                    elif mode == IndividualRobotMode.AI:
+                        robot_primitives_map[robot_id] = (
+                            fullsystem_primitive_set.robot_primitives[robot_id]
+                        )
+
+                # sends a final stop primitive to all disconnected robots and removes them from list
+                # in order to prevent robots acting on cached old primitives
+                for robot_id, num_times_to_send_stop in enumerate(
+                    self.robot_stop_primitive_send_count
+                ):
+                    if num_times_to_send_stop > 0:
+                        robot_primitives_map[robot_id] = Primitive(stop=StopPrimitive())
+                        self.robot_stop_primitive_send_count[robot_id] = (
+                            num_times_to_send_stop - 1
+                        )
+
+                for robot_id, primitive in robot_primitives_map.items():
+                    if not self.__should_send_packet(robot_id=robot_id):
+                        continue
+
+                    # The primitive is stamped here and by the thread sending it,
+                    # so each dispatch gets its own copy instead of sharing the
+                    # primitive with the cached PrimitiveSet or an earlier dispatch
+                    robot_primitive = Primitive()
+                    robot_primitive.CopyFrom(primitive)
+                    robot_primitive.sequence_number = self.sequence_number
+                    self.__dispatch_primitive(robot_id, robot_primitive)
+
+                self.sequence_number += 1
 
-            # map of robot id to diagnostics/fullsystem primitive map
-            robot_primitives_map = {}
+            # sleep if not running fullsystem
+            if IndividualRobotMode.AI not in self.robot_control_mode_map.values():
+                time.sleep(ROBOT_COMMUNICATIONS_TIMEOUT_S)
 
-            # get the most recent diagnostics primitive
-            motor_control = self.motor_control_primitive_buffer.get(block=False)
-            power_control = self.power_control_primitive_buffer.get(block=False)
+    def __dispatch_primitive(self, robot_id: int, primitive: Primitive) -> None:
+        """Hands a primitive to the thread sending to the given robot, replacing
+        any older primitive that hasn't been sent yet
 
-            diagnostics_primitive = Primitive(
-                direct_control=DirectControlPrimitive(
-                    motor_control=motor_control,
-                    power_control=power_control,
-                )
-            )
+        :param robot_id: the id of the robot to send the primitive to
+        :param primitive: the primitive to send
+        """
+        robot_primitive_queue = self.robot_primitive_queues[robot_id]
 
-            # filter for diagnostics controlled robots
-            diagnostics_robots = list(
-                robot_id
-                for robot_id, mode in self.robot_control_mode_map.items()
-                if mode == IndividualRobotMode.MANUAL
-            )
+        # This is the only thread adding to the queue, so once the older
+        # primitive is removed, there is always room for the new one
+        try:
+            robot_primitive_queue.get_nowait()
+        except queue.Empty:
+            pass
 
-            # set diagnostics primitives for diagnostics robots
-            for robot_id in diagnostics_robots:
-                robot_primitives_map[robot_id] = diagnostics_primitive
+        robot_primitive_queue.put_nowait(primitive)
 
-            # get the most recent fullsystem primitives
-            fullsystem_primitive_set = self.fullsystem_primitive_set_buffer.get(
-                block=True, timeout=ROBOT_COMMUNICATIONS_TIMEOUT_S
-            )
+    def __send_primitives_to_robot(self, robot_id: int) -> None:
+        """Sends the primitives dispatched to the given robot as they arrive
 
-            # filter for fullsystem controlled robots
-            fullsystem_robots = list(
-                robot_id
-                for robot_id, mode in self.robot_control_mode_map.items()
-                if mode == IndividualRobotMode.AI
-            )
+        :param robot_id: the id of the robot to send primitives to
+        """
+        robot_primitive_queue = self.robot_primitive_queues[robot_id]
 
-            # set fullsystem primitives for fullsystem robots
-            for robot_id in fullsystem_robots:
-                robot_primitives_map[robot_id] = (
-                    fullsystem_primitive_set.robot_primitives[robot_id]
+        while self.running:
+            try:
+                primitive = robot_primitive_queue.get(
+                    timeout=ROBOT_COMMUNICATIONS_TIMEOUT_S
                 )
+            except queue.Empty:
+                continue
+
+            sequence_number = primitive.sequence_number
+            time_sent = time.time()
+            primitive.time_sent.CopyFrom(Timestamp(epoch_timestamp_seconds=time_sent))
+            self.communication_manager.send_primitive(
+                robot_id=robot_id, primitive=primitive
+            )
+            self.link_quality_tracker.record_sent(robot_id, sequence_number, time_sent)
 
-            # sends a final stop primitive to all disconnected robots and removes them from list
-            # in order to prevent robots acting on cached old primitives
-            for robot_id, num_times_to_send_stop in enumerate(
-                self.robot_stop_primitive_send_count
-            ):
-                if num_times_to_send_stop > 0:
-                    robot_primitives_map[robot_id] = Primitive(stop=StopPrimitive())
-                    self.robot_stop_primitive_send_count[robot_id] = (
-                        num_times_to_send_stop - 1
-                    )
+    def __publish_link_statistics(self) -> None:
+        """Records the primitives acknowledged by the robots, and periodically
+        publishes the link statistics of every robot we have sent primitives to.
+        The statistics are also sent to full system so they are saved in the replay log.
+        """
+        next_publish_time = time.time() + LINK_STATISTICS_PUBLISH_PERIOD_S
 
-            for robot_id, primitive in robot_primitives_map.items():
-                if not self.__should_send_packet(robot_id=robot_id):
-                    continue
-                primitive.sequence_number = self.sequence_number
-                primitive.time_sent.CopyFrom(
-                    Timestamp(epoch_timestamp_seconds=time.time())
+        while self.running:
+            try:
+                robot_statistic = self.robot_statistic_buffer.get(
+                    block=True,
+                    timeout=max(next_publish_time - time.time(), 0),
+                    return_cached=False,
                 )
-                self.communication_manager.send_primitive(
-                    robot_id=robot_id, primitive=primitive
+                self.link_quality_tracker.record_acknowledged(
+                    robot_statistic.robot_id,
+                    robot_statistic.primitive_sequence_number,
+                    robot_statistic.round_trip_time_seconds,
+                    time.time(),
                 )
+            except queue.Empty:
+                pass
 
-            self.sequence_number += 1
+            if time.time() < next_publish_time:
+                continue
 
-            # sleep if not running fullsystem
-            if IndividualRobotMode.AI not in self.robot_control_mode_map.values():
-                time.sleep(ROBOT_COMMUNICATIONS_TIMEOUT_S)
+            next_publish_time += LINK_STATISTICS_PUBLISH_PERIOD_S
+
+            for robot_id in range(MAX_ROBOT_IDS_PER_SIDE):
+                link_statistics = self.link_quality_tracker.get_statistics(
+                    robot_id, time.time()
+                )
+                if link_statistics.num_primitives_sent > 0:
+                    self.current_proto_unix_io.send_proto(
+                        RobotLinkStatistics, link_statistics
+                    )
 
     def __enter__(self) -> Self:
         """Enter RobotCommunication context manager. Setup multicast listeners
@@ -275,6 +403,10 @@ class RobotCommunication:
 
         self.send_estop_state_thread.start()
         self.run_primitive_set_thread.start()
+        self.publish_link_statistics_thread.start()
+
+        for send_primitive_thread in self.send_primitive_threads:
+            send_primitive_thread.start()
 
         return self
 
@@ -284,5 +416,11 @@ class RobotCommunication:
         Ends all currently running loops and joins all currently active threads
         """
         self.running = False
+        self.estop_state_changed.set()
 
+        self.send_estop_state_thread.join()
         self.run_primitive_set_thread.join()
+        self.publish_link_statistics_thread.join()
+
+        for send_primitive_thread in self.send_primitive_threads:
+            send_primitive_thread.join()
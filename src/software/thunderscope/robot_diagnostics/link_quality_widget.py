@@ -0,0 +1,142 @@
+import pyqtgraph as pg
+from pyqtgraph.Qt import QtCore
+from pyqtgraph.Qt.QtWidgets import *
+from proto.import_all_protos import *
+from software.py_constants import *
+from software.thunderscope.thread_safe_buffer import ThreadSafeBuffer
+
+
+class LinkQualityWidget(QWidget):
+    """Shows the quality of the link used to send primitives to each robot:
+    a table of the round trip time percentiles, jitter and loss of every robot,
+    and a histogram of the round trip times of the selected robot
+    """
+
+    COLUMNS = [
+        "Robot",
+        "Sent",
+        "Loss (%)",
+        "p50 (ms)",
+        "p95 (ms)",
+        "p99 (ms)",
+        "Max (ms)",
+        "Jitter (ms)",
+    ]
+
+    def __init__(self) -> None:
+        """Initialize the link quality widget"""
+        super().__init__()
+
+        self.link_statistics_buffer = ThreadSafeBuffer(
+            MAX_ROBOT_IDS_PER_SIDE * 2, RobotLinkStatistics
+        )
+
+        # The latest link statistics of each robot we've received them for
+        self.link_statistics: dict[int, RobotLinkStatistics] = {}
+
+        self.table = QTableWidget(0, len(LinkQualityWidget.COLUMNS))
+        self.table.setHorizontalHeaderLabels(LinkQualityWidget.COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.itemSelectionChanged.connect(self.__update_histogram)
+
+        self.histogram_plot = pg.PlotWidget()
+        self.histogram_plot.setLabel("bottom", "Round trip time (ms)")
+        self.histogram_plot.setLabel("left", "Count")
+        self.histogram = pg.BarGraphItem(x0=[], x1=[], height=[])
+        self.histogram_plot.addItem(self.histogram)
+
+        self.layout = QVBoxLayout()
+        self.layout.addWidget(self.table)
+        self.layout.addWidget(self.histogram_plot)
+        self.setLayout(self.layout)
+
+    def refresh(self) -> None:
+        """Updates the table and histogram with the latest link statistics"""
+        updated_robot_ids = set()
+
+        while (
+            link_statistics := self.link_statistics_buffer.get(
+                block=False, return_cached=False
+            )
+        ) is not None:
+            self.link_statistics[link_statistics.robot_id] = link_statistics
+            updated_robot_ids.add(link_statistics.robot_id)
+
+        if not updated_robot_ids:
+            return
+
+        # A new robot shifts the rows of the robots after it, so every row is
+        # rewritten when the robots change
+        robot_ids = sorted(self.link_statistics.keys())
+        robots_changed = self.table.rowCount() != len(robot_ids)
+        self.table.setRowCount(len(robot_ids))
+
+        for row, robot_id in enumerate(robot_ids):
+            if robots_changed or robot_id in updated_robot_ids:
+                self.__update_row(row, self.link_statistics[robot_id])
+
+        if robots_changed or self.__get_selected_robot_id() in updated_robot_ids:
+            self.__update_histogram()
+
+    def __update_row(self, row: int, link_statistics: RobotLinkStatistics) -> None:
+        """Fills a row of the table with the given link statistics
+
+        :param row: the row to fill
+        :param link_statistics: the link statistics of the robot in the row
+        """
+        values = [
+            str(link_statistics.robot_id),
+            str(link_statistics.num_primitives_sent),
+            f"{link_statistics.loss_rate * 100:.1f}",
+        ]
+        if link_statistics.num_round_trip_times > 0:
+            values += [
+                f"{seconds * MILLISECONDS_PER_SECOND:.1f}"
+                for seconds in (
+                    link_statistics.round_trip_time_p50_seconds,
+                    link_statistics.round_trip_time_p95_seconds,
+                    link_statistics.round_trip_time_p99_seconds,
+                    link_statistics.round_trip_time_max_seconds,
+                    link_statistics.jitter_seconds,
+                )
+            ]
+        else:
+            values += ["-"] * 5
+
+        for column, value in enumerate(values):
+            item = QTableWidgetItem(value)
+            item.setTextAlignment(QtCore.Qt.AlignmentFlag.AlignHCenter)
+            self.table.setItem(row, column, item)
+
+    def __get_selected_robot_id(self) -> int | None:
+        """Returns the id of the robot selected in the table
+
+        :return: the id of the selected robot, or None if no robot is selected
+        """
+        selected_rows = self.table.selectionModel().selectedRows()
+        if not selected_rows:
+            return None
+
+        return int(self.table.item(selected_rows[0].row(), 0).text())
+
+    def __update_histogram(self) -> None:
+        """Shows the round trip time histogram of the selected robot"""
+        robot_id = self.__get_selected_robot_id()
+        if robot_id is None:
+            self.histogram.setOpts(x0=[], x1=[], height=[])
+            return
+
+        link_statistics = self.link_statistics[robot_id]
+        bin_width_ms = (
+            link_statistics.histogram_bin_width_seconds * MILLISECONDS_PER_SECOND
+        )
+        num_bins = len(link_statistics.round_trip_time_histogram)
+
+        self.histogram.setOpts(
+            x0=[bin_index * bin_width_ms for bin_index in range(num_bins)],
+            x1=[(bin_index + 1) * bin_width_ms for bin_index in range(num_bins)],
+            height=list(link_statistics.round_trip_time_histogram),
+        )
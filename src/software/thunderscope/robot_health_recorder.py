@@ -0,0 +1,516 @@
+from __future__ import annotations
+
+import os
+import queue
+import struct
+import threading
+import time
+from typing import Callable, Optional, Self
+
+import numpy as np
+
+from proto.import_all_protos import *
+from software.logger.logger import create_logger
+from software.thunderscope.proto_unix_io import ProtoUnixIO
+from software.thunderscope.thread_safe_buffer import ThreadSafeBuffer
+
+logger = create_logger(__name__)
+
+# The motors of a robot, in the order of the bits of the motors_enabled column
+MOTORS = ["front_left", "front_right", "back_left", "back_right", "dribbler"]
+
+
+def _bitmask(values) -> int:
+    """Packs small non negative integers, e.g. enum values, into a bitmask
+
+    :param values: the values to set the bits of
+    :return: the bitmask
+    """
+    mask = 0
+    for value in values:
+        mask |= 1 << value
+    return mask
+
+
+def _motors_enabled(robot_status: RobotStatus) -> int:
+    """Packs whether each motor is enabled into a bitmask, in the order of MOTORS
+
+    :param robot_status: the robot status
+    :return: the bitmask
+    """
+    motor_status = robot_status.motor_status
+    return sum(
+        getattr(motor_status, motor).enabled << bit for bit, motor in enumerate(MOTORS)
+    )
+
+
+# The columns recorded for every robot status, in the order they are laid out
+# in a segment file, with the function extracting each from a RobotStatus.
+# Error codes and motor faults are bitmasks of the ErrorCode and MotorFault values.
+COLUMNS: list[tuple[str, np.dtype, Callable[[RobotStatus], float | int]]] = [
+    (
+        "time_sent_s",
+        np.dtype(np.float64),
+        lambda status: status.time_sent.epoch_timestamp_seconds,
+    ),
+    (
+        "battery_voltage",
+        np.dtype(np.float32),
+        lambda status: status.power_status.battery_voltage,
+    ),
+    (
+        "capacitor_voltage",
+        np.dtype(np.float32),
+        lambda status: status.power_status.capacitor_voltage,
+    ),
+    (
+        "current_draw",
+        np.dtype(np.float32),
+        lambda status: status.power_status.current_draw,
+    ),
+    (
+        "cpu_temperature",
+        np.dtype(np.float32),
+        lambda status: status.jetson_status.cpu_temperature,
+    ),
+    (
+        "primitive_executor_step_time_ms",
+        np.dtype(np.float32),
+        lambda status: status.thunderloop_status.primitive_executor_step_time_ms,
+    ),
+    (
+        "error_codes",
+        np.dtype(np.uint32),
+        lambda status: _bitmask(status.error_code),
+    ),
+    (
+        "front_left_motor_faults",
+        np.dtype(np.uint32),
+        lambda status: _bitmask(status.motor_status.front_left.motor_faults),
+    ),
+    (
+        "front_right_motor_faults",
+        np.dtype(np.uint32),
+        lambda status: _bitmask(status.motor_status.front_right.motor_faults),
+    ),
+    (
+        "back_left_motor_faults",
+        np.dtype(np.uint32),
+        lambda status: _bitmask(status.motor_status.back_left.motor_faults),
+    ),
+    (
+        "back_right_motor_faults",
+        np.dtype(np.uint32),
+        lambda status: _bitmask(status.motor_status.back_right.motor_faults),
+    ),
+    (
+        "dribbler_motor_faults",
+        np.dtype(np.uint32),
+        lambda status: _bitmask(status.motor_status.dribbler.motor_faults),
+    ),
+    (
+        "motors_enabled",
+        np.dtype(np.uint8),
+        _motors_enabled,
+    ),
+    (
+        "breakbeam_tripped",
+        np.dtype(np.uint8),
+        lambda status: status.power_status.breakbeam_tripped,
+    ),
+    (
+        "primitive_packet_loss_percentage",
+        np.dtype(np.uint8),
+        lambda status: min(status.network_status.primitive_packet_loss_percentage, 255),
+    ),
+]
+
+# Columns that aren't read from the robot status
+TIME_RECEIVED_COLUMN = ("time_received_s", np.dtype(np.float64))
+CRASHED_COLUMN = ("crashed", np.dtype(np.uint8))
+
+COLUMN_DTYPES: dict[str, np.dtype] = dict(
+    [TIME_RECEIVED_COLUMN]
+    + [(name, dtype) for name, dtype, _ in COLUMNS]
+    + [CRASHED_COLUMN]
+)
+
+
+class RobotHealthSegment:
+    """A fixed capacity file of robot health time series for a single robot.
+
+    The file is a header followed by one contiguous block per column, in the
+    order of COLUMN_DTYPES, each with room for the segment's capacity of rows.
+    The file is memory mapped, so rows are appended by writing each column in
+    place, and then bumping the number of rows in the header so readers only
+    ever see complete rows.
+    """
+
+    MAGIC = b"TBHEALTH"
+    VERSION = 1
+
+    # magic, version, number of columns, capacity, number of rows
+    HEADER = struct.Struct("<8sIIQQ")
+    HEADER_SIZE = 64
+    NUM_ROWS_OFFSET = HEADER.size - 8
+
+    def __init__(self, path: os.PathLike, capacity: Optional[int] = None) -> None:
+        """Creates a new segment, or opens an existing one read only
+
+        :param path: the path to the segment file
+        :param capacity: the number of rows to make room for if creating a new
+                         segment, or None to open an existing segment
+        """
+        self.path = path
+        self.writable = capacity is not None
+
+        if self.writable:
+            file_size = RobotHealthSegment.HEADER_SIZE + capacity * sum(
+                dtype.itemsize for dtype in COLUMN_DTYPES.values()
+            )
+            self.data = np.memmap(path, dtype=np.uint8, mode="w+", shape=file_size)
+            self.data[: RobotHealthSegment.HEADER.size] = np.frombuffer(
+                RobotHealthSegment.HEADER.pack(
+                    RobotHealthSegment.MAGIC,
+                    RobotHealthSegment.VERSION,
+                    len(COLUMN_DTYPES),
+                    capacity,
+                    0,
+                ),
+                dtype=np.uint8,
+            )
+        else:
+            self.data = np.memmap(path, dtype=np.uint8, mode="r")
+            magic, version, num_columns, capacity, _ = (
+                RobotHealthSegment.HEADER.unpack_from(self.data)
+            )
+            if (
+                magic != RobotHealthSegment.MAGIC
+                or version != RobotHealthSegment.VERSION
+                or num_columns != len(COLUMN_DTYPES)
+            ):
+                raise ValueError(f"{path} is not a robot health segment")
+
+        self.capacity = capacity
+        self.num_rows_view = self.data[
+            RobotHealthSegment.NUM_ROWS_OFFSET : RobotHealthSegment.NUM_ROWS_OFFSET + 8
+        ].view(np.uint64)
+
+        self.columns: dict[str, np.ndarray] = {}
+        offset = RobotHealthSegment.HEADER_SIZE
+        for name, dtype in COLUMN_DTYPES.items():
+            column_size = capacity * dtype.itemsize
+            self.columns[name] = self.data[offset : offset + column_size].view(dtype)
+            offset += column_size
+
+    @property
+    def num_rows(self) -> int:
+        """The number of rows written to the segment"""
+        return int(self.num_rows_view[0])
+
+    def is_full(self) -> bool:
+        """Returns whether there is no room for more rows
+
+        :return: True if the segment is full
+        """
+        return self.num_rows >= self.capacity
+
+    def append(self, row: dict[str, float | int]) -> None:
+        """Appends a row to the segment, which must not be full
+
+        :param row: the value of every column
+        """
+        index = self.num_rows
+        for name, column in self.columns.items():
+            column[index] = row[name]
+
+        self.num_rows_view[0] = index + 1
+
+    def read(self, names: list[str]) -> dict[str, np.ndarray]:
+        """Returns views of the rows written to the given columns
+
+        :param names: the names of the columns to read
+        :return: a map of column name to the column's values
+        """
+        num_rows = self.num_rows
+        return {name: self.columns[name][:num_rows] for name in names}
+
+    def close(self) -> None:
+        """Flushes the segment to disk"""
+        if self.writable:
+            self.data.flush()
+
+        del self.data
+
+
+class RobotHealthRecorder:
+    """Records the health of each robot from its RobotStatus and RobotCrash
+    messages, for analysis after a match without replaying the whole log.
+
+    Each robot's data is written to its own directory as a series of fixed
+    capacity segment files (see RobotHealthSegment), starting a new segment
+    whenever the current one is full. Only the newest max_segments_per_robot
+    segments of each robot are kept. Segments are never appended to once they
+    are closed, including across runs.
+
+    The recorded data can be read while recording with RobotHealthLog.
+    """
+
+    SEGMENT_FILE_EXTENSION = ".tbhealth"
+
+    # How long to wait for a robot status before checking if we should stop
+    STATUS_TIMEOUT_S = 0.1
+
+    def __init__(
+        self,
+        proto_unix_io: ProtoUnixIO,
+        directory: os.PathLike,
+        segment_capacity: int = 65536,
+        max_segments_per_robot: int = 8,
+    ) -> None:
+        """Creates a recorder. Recording starts when entering the context manager.
+
+        :param proto_unix_io: the proto unix io to record the robot statuses from
+        :param directory: the directory to write the segments to
+        :param segment_capacity: the number of rows in each segment file
+        :param max_segments_per_robot: the number of segments to keep for each robot
+        """
+        self.proto_unix_io = proto_unix_io
+        self.directory = directory
+        self.segment_capacity = segment_capacity
+        self.max_segments_per_robot = max_segments_per_robot
+
+        self.robot_status_buffer = ThreadSafeBuffer(1000, RobotStatus)
+        self.robot_crash_buffer = ThreadSafeBuffer(100, RobotCrash)
+
+        # The segment being written for each robot
+        self.segments: dict[int, RobotHealthSegment] = {}
+
+        self.running = False
+        self.record_thread = threading.Thread(target=self.__record, daemon=True)
+
+    def __enter__(self) -> Self:
+        """Starts recording
+
+        :return: the recorder
+        """
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.proto_unix_io.register_observer(RobotStatus, self.robot_status_buffer)
+        self.proto_unix_io.register_observer(RobotCrash, self.robot_crash_buffer)
+
+        self.running = True
+        self.record_thread.start()
+        return self
+
+    def __exit__(self, type, value, traceback) -> None:
+        """Stops recording and flushes the segments to disk"""
+        self.running = False
+        self.record_thread.join()
+
+        self.proto_unix_io.unregister_observer(RobotStatus, self.robot_status_buffer)
+        self.proto_unix_io.unregister_observer(RobotCrash, self.robot_crash_buffer)
+
+        for segment in self.segments.values():
+            segment.close()
+
+        self.segments.clear()
+
+    def __record(self) -> None:
+        """Records the robot statuses and crashes received until stopped"""
+        while self.running:
+            try:
+                robot_status = self.robot_status_buffer.get(
+                    block=True,
+                    timeout=RobotHealthRecorder.STATUS_TIMEOUT_S,
+                    return_cached=False,
+                )
+                self.__record_row(robot_status.robot_id, robot_status, crashed=False)
+            except queue.Empty:
+                pass
+
+            while (
+                robot_crash := self.robot_crash_buffer.get(
+                    block=False, return_cached=False
+                )
+            ) is not None:
+                self.__record_row(
+                    robot_crash.robot_id, robot_crash.status, crashed=True
+                )
+
+    def __record_row(
+        self, robot_id: int, robot_status: RobotStatus, crashed: bool
+    ) -> None:
+        """Appends a row for the given robot status to the robot's segment
+
+        :param robot_id: the id of the robot
+        :param robot_status: the robot's status
+        :param crashed: whether the status was sent as part of a crash report
+        """
+        row = {name: extract(robot_status) for name, _, extract in COLUMNS}
+        row[TIME_RECEIVED_COLUMN[0]] = time.time()
+        row[CRASHED_COLUMN[0]] = crashed
+
+        segment = self.segments.get(robot_id)
+        if segment is None or segment.is_full():
+            segment = self.__start_segment(robot_id)
+
+        segment.append(row)
+
+    def __start_segment(self, robot_id: int) -> RobotHealthSegment:
+        """Closes the robot's current segment if there is one, starts a new
+        one and removes the oldest segments over the limit
+
+        :param robot_id: the id of the robot
+        :return: the new segment
+        """
+        if robot_id in self.segments:
+            self.segments.pop(robot_id).close()
+
+        robot_directory = RobotHealthLog.get_robot_directory(self.directory, robot_id)
+        os.makedirs(robot_directory, exist_ok=True)
+
+        segment_paths = RobotHealthLog.get_segment_paths(self.directory, robot_id)
+        next_index = (
+            int(os.path.basename(segment_paths[-1]).split(".")[0]) + 1
+            if segment_paths
+            else 0
+        )
+
+        for old_segment_path in segment_paths[
+            : max(len(segment_paths) - self.max_segments_per_robot + 1, 0)
+        ]:
+            os.remove(old_segment_path)
+
+        segment = RobotHealthSegment(
+            os.path.join(
+                robot_directory,
+                f"{next_index:06d}{RobotHealthRecorder.SEGMENT_FILE_EXTENSION}",
+            ),
+            capacity=self.segment_capacity,
+        )
+        self.segments[robot_id] = segment
+        return segment
+
+
+class RobotHealthLog:
+    """Reads the robot health recorded by RobotHealthRecorder"""
+
+    def __init__(self, directory: os.PathLike) -> None:
+        """Opens the robot health recorded in the given directory
+
+        :param directory: the directory the recorder wrote to
+        """
+        self.directory = directory
+
+    @staticmethod
+    def get_robot_directory(directory: os.PathLike, robot_id: int) -> str:
+        """Returns the directory the segments of a robot are written to
+
+        :param directory: the directory the recorder writes to
+        :param robot_id: the id of the robot
+        :return: the robot's directory
+        """
+        return os.path.join(directory, f"robot_{robot_id}")
+
+    @staticmethod
+    def get_segment_paths(directory: os.PathLike, robot_id: int) -> list[str]:
+        """Returns the paths of a robot's segments, oldest first
+
+        :param directory: the directory the recorder writes to
+        :param robot_id: the id of the robot
+        :return: the paths of the robot's segments
+        """
+        robot_directory = RobotHealthLog.get_robot_directory(directory, robot_id)
+        if not os.path.isdir(robot_directory):
+            return []
+
+        return sorted(
+            os.path.join(robot_directory, file_name)
+            for file_name in os.listdir(robot_directory)
+            if file_name.endswith(RobotHealthRecorder.SEGMENT_FILE_EXTENSION)
+        )
+
+    def get_robot_ids(self) -> list[int]:
+        """Returns the ids of the robots with recorded health
+
+        :return: the robot ids, in increasing order
+        """
+        return sorted(
+            int(entry.removeprefix("robot_"))
+            for entry in os.listdir(self.directory)
+            if entry.startswith("robot_")
+        )
+
+    def get_column_names(self) -> list[str]:
+        """Returns the names of the recorded columns
+
+        :return: the column names
+        """
+        return list(COLUMN_DTYPES.keys())
+
+    def query(
+        self,
+        robot_id: int,
+        columns: Optional[list[str]] = None,
+        start_time_s: Optional[float] = None,
+        end_time_s: Optional[float] = None,
+    ) -> dict[str, np.ndarray]:
+        """Returns the time series of a robot's health, oldest first
+
+        :param robot_id: the id of the robot
+        :param columns: the columns to return, or None for all of them.
+                        time_received_s is always returned.
+        :param start_time_s: if given, only rows received at or after this time,
+                             in seconds since epoch, are returned
+        :param end_time_s: if given, only rows received before this time are returned
+        :return: a map of column name to the column's values
+        """
+        time_column = TIME_RECEIVED_COLUMN[0]
+        names = [time_column] + [
+            name
+            for name in (columns if columns is not None else COLUMN_DTYPES)
+            if name != time_column
+        ]
+
+        for name in names:
+            if name not in COLUMN_DTYPES:
+                raise ValueError(f"Unknown robot health column {name}")
+
+        parts: dict[str, list[np.ndarray]] = {name: [] for name in names}
+
+        for segment_path in RobotHealthLog.get_segment_paths(self.directory, robot_id):
+            try:
+                segment = RobotHealthSegment(segment_path)
+            except (ValueError, struct.error):
+                logger.warning(
+                    f"Skipping unreadable robot health segment {segment_path}"
+                )
+                continue
+
+            segment_columns = segment.read(names)
+            times_s = segment_columns[time_column]
+
+            # Rows are appended in the order they're received
+            start = (
+                0 if start_time_s is None else np.searchsorted(times_s, start_time_s)
+            )
+            end = (
+                len(times_s)
+                if end_time_s is None
+                else np.searchsorted(times_s, end_time_s)
+            )
+
+            if start < end:
+                for name in names:
+                    # Copy the rows, so the segment can be unmapped
+                    parts[name].append(np.array(segment_columns[name][start:end]))
+
+            segment.close()
+
+        return {
+            name: np.concatenate(column_parts)
+            if column_parts
+            else np.empty(0, dtype=COLUMN_DTYPES[name])
+            for name, column_parts in parts.items()
+        }
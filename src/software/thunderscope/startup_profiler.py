@@ -0,0 +1,123 @@
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+# Captured when this module is first imported. thunderscope_main imports this
+# module before anything heavy so that import time is included in the trace.
+PROCESS_START_TIME_S = time.perf_counter()
+
+
+class StartupProfiler:
+    """Records how long the different stages of Thunderscope startup take:
+    importing modules, constructing each widget and GL layer, and getting the
+    first frame on screen.
+
+    The profiler is opt-in. While it is disabled, marks and spans are no-ops
+    so the calls can be left in the startup path.
+    """
+
+    def __init__(self) -> None:
+        """Creates a disabled startup profiler"""
+        self.enabled = False
+        self.trace_path: Optional[os.PathLike] = None
+        self.reported = False
+
+        # List of (name, start time, duration) tuples with times in seconds
+        # relative to PROCESS_START_TIME_S. Marks have a duration of 0.
+        self.events: list[tuple[str, float, float]] = []
+
+    def enable(self, trace_path: Optional[os.PathLike] = None) -> None:
+        """Starts recording startup events
+
+        :param trace_path: if provided, the recorded events are also written to
+                           this path as JSON when the report is generated
+        """
+        self.enabled = True
+        self.trace_path = trace_path
+
+    def mark(self, name: str) -> None:
+        """Records that a startup milestone was reached
+
+        :param name: the name of the milestone
+        """
+        if self.enabled:
+            self.events.append((name, time.perf_counter() - PROCESS_START_TIME_S, 0.0))
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Context manager that records how long the enclosed code takes
+
+        :param name: the name of the span
+        """
+        if not self.enabled:
+            yield
+            return
+
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            end_time = time.perf_counter()
+            event = (name, start_time - PROCESS_START_TIME_S, end_time - start_time)
+            self.events.append(event)
+
+            # Spans that finish after the report, like lazy layers constructed
+            # when they are first shown, are reported as they finish
+            if self.reported:
+                logging.info(
+                    f"Thunderscope startup trace: {event[2] * 1000:.1f} ms  {name}"
+                )
+                self.__write_trace()
+
+    def report(self) -> None:
+        """Logs a summary of the recorded startup events, slowest spans first,
+        and writes them to the trace file if one was given. Only the first call
+        generates a report. Spans that finish after it are logged and added to
+        the trace file when they finish.
+        """
+        if not self.enabled or self.reported:
+            return
+
+        self.reported = True
+
+        milestones = [event for event in self.events if event[2] == 0.0]
+        spans = sorted(
+            (event for event in self.events if event[2] != 0.0),
+            key=lambda event: event[2],
+            reverse=True,
+        )
+
+        lines = ["Thunderscope startup trace"]
+        lines += [f"  {start_s:8.3f} s  {name}" for name, start_s, _ in milestones]
+        lines.append("  Slowest steps:")
+        lines += [
+            f"  {duration_s * 1000:8.1f} ms  {name}" for name, _, duration_s in spans
+        ]
+        logging.info("\n".join(lines))
+
+        self.__write_trace()
+
+    def __write_trace(self) -> None:
+        """Writes all the recorded events to the trace file, if one was given"""
+        if self.trace_path:
+            try:
+                with open(self.trace_path, "w") as trace_file:
+                    json.dump(
+                        [
+                            {"name": name, "start_s": start_s, "duration_s": duration_s}
+                            for name, start_s, duration_s in self.events
+                        ],
+                        trace_file,
+                        indent=2,
+                    )
+            except OSError as e:
+                logging.warning(
+                    f"Could not write startup trace to {self.trace_path}: {e}"
+                )
+
+
+# The profiler shared by everything that takes part in Thunderscope startup
+startup_profiler = StartupProfiler()
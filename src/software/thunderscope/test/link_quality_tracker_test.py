@@ -0,0 +1,212 @@
+"""Tests for the LinkQualityTracker, which matches the primitives sent to each robot to the sequence numbers the robots
+acknowledge.
+
+Primitives are sent every SEND_PERIOD_S, and the statistics are computed long enough after the last one is sent that
+every primitive has either been acknowledged or timed out.
+"""
+
+import pytest
+
+from software.thunderscope.link_quality_tracker import LinkQualityTracker
+from software.simulated_tests.simulated_test_fixture import pytest_main
+
+ROBOT_ID = 3
+SEND_PERIOD_S = 0.01
+
+
+def send_primitives(
+    tracker: LinkQualityTracker, sequence_numbers: list[int]
+) -> dict[int, float]:
+    """Records the given primitives as sent to the robot, SEND_PERIOD_S apart starting from 0
+
+    :param tracker: the tracker to record the primitives in
+    :param sequence_numbers: the sequence numbers of the primitives, in the order sent
+    :return: the time each primitive was sent, by sequence number
+    """
+    sent_times_s = {}
+    for index, sequence_number in enumerate(sequence_numbers):
+        sent_times_s[sequence_number] = index * SEND_PERIOD_S
+        tracker.record_sent(ROBOT_ID, sequence_number, sent_times_s[sequence_number])
+    return sent_times_s
+
+
+def acknowledge(
+    tracker: LinkQualityTracker,
+    sent_times_s: dict[int, float],
+    sequence_number: int,
+    round_trip_time_s: float,
+) -> None:
+    """Records the robot acknowledging a primitive one round trip time after it was sent
+
+    :param tracker: the tracker to record the acknowledgement in
+    :param sent_times_s: the time each primitive was sent, by sequence number
+    :param sequence_number: the sequence number of the primitive acknowledged
+    :param round_trip_time_s: the round trip time the robot reports
+    """
+    tracker.record_acknowledged(
+        ROBOT_ID,
+        sequence_number,
+        round_trip_time_s,
+        sent_times_s[sequence_number] + round_trip_time_s,
+    )
+
+
+def get_statistics(tracker: LinkQualityTracker, sent_times_s: dict[int, float]):
+    """Computes the statistics once every primitive sent has been acknowledged or timed out
+
+    :param tracker: the tracker
+    :param sent_times_s: the time each primitive was sent, by sequence number
+    :return: the link statistics of the robot
+    """
+    return tracker.get_statistics(
+        ROBOT_ID, max(sent_times_s.values()) + LinkQualityTracker.ACK_TIMEOUT_S + 0.1
+    )
+
+
+def test_no_loss_when_every_primitive_acknowledged():
+    tracker = LinkQualityTracker()
+    sent_times_s = send_primitives(tracker, list(range(10)))
+    for sequence_number in range(10):
+        acknowledge(tracker, sent_times_s, sequence_number, 0.005)
+
+    statistics = get_statistics(tracker, sent_times_s)
+
+    assert statistics.robot_id == ROBOT_ID
+    assert statistics.num_primitives_sent == 10
+    assert statistics.loss_rate == 0
+    assert statistics.num_round_trip_times == 10
+
+
+def test_unacknowledged_primitives_lost():
+    tracker = LinkQualityTracker()
+    sent_times_s = send_primitives(tracker, list(range(10)))
+    for sequence_number in range(6):
+        acknowledge(tracker, sent_times_s, sequence_number, 0.005)
+
+    statistics = get_statistics(tracker, sent_times_s)
+
+    assert statistics.loss_rate == pytest.approx(0.4)
+
+
+def test_newer_acknowledgement_covers_older_primitives():
+    tracker = LinkQualityTracker()
+    sent_times_s = send_primitives(tracker, list(range(10)))
+
+    # Robots only report the last primitive they handled, so acknowledging
+    # the newest primitive means none were lost
+    acknowledge(tracker, sent_times_s, 9, 0.005)
+
+    statistics = get_statistics(tracker, sent_times_s)
+
+    assert statistics.loss_rate == 0
+    assert statistics.num_round_trip_times == 1
+
+
+def test_late_acknowledgement_counted_as_lost():
+    tracker = LinkQualityTracker()
+    sent_times_s = send_primitives(tracker, [0, 1])
+    acknowledge(tracker, sent_times_s, 0, 0.005)
+    acknowledge(tracker, sent_times_s, 1, LinkQualityTracker.ACK_TIMEOUT_S + 0.01)
+
+    statistics = get_statistics(tracker, sent_times_s)
+
+    assert statistics.loss_rate == pytest.approx(0.5)
+
+
+def test_primitives_within_ack_timeout_not_counted_as_lost():
+    tracker = LinkQualityTracker()
+    sent_times_s = send_primitives(tracker, list(range(10)))
+
+    # Nothing is acknowledged, but only the first primitive has timed out
+    statistics = tracker.get_statistics(
+        ROBOT_ID,
+        sent_times_s[0] + LinkQualityTracker.ACK_TIMEOUT_S + SEND_PERIOD_S / 2,
+    )
+
+    assert statistics.num_primitives_sent == 10
+    assert statistics.loss_rate == 1
+
+
+def test_sequence_gaps_not_counted_as_lost():
+    tracker = LinkQualityTracker()
+
+    # Sequence numbers are shared by all the robots, so a robot that isn't
+    # sent every primitive sees gaps in its sequence numbers
+    sent_times_s = send_primitives(tracker, [0, 3, 4, 8, 20])
+    for sequence_number in sent_times_s:
+        acknowledge(tracker, sent_times_s, sequence_number, 0.005)
+
+    statistics = get_statistics(tracker, sent_times_s)
+
+    assert statistics.num_primitives_sent == 5
+    assert statistics.loss_rate == 0
+    assert statistics.num_round_trip_times == 5
+
+
+def test_unsent_and_repeated_acknowledgements_ignored():
+    tracker = LinkQualityTracker()
+    sent_times_s = send_primitives(tracker, [0, 2, 4])
+
+    # Acknowledgements of primitives never sent to this robot, and repeated
+    # or older acknowledgements, don't count as round trips
+    acknowledge(tracker, sent_times_s, 2, 0.005)
+    acknowledge(tracker, sent_times_s, 2, 0.005)
+    acknowledge(tracker, sent_times_s, 0, 0.005)
+    tracker.record_acknowledged(ROBOT_ID, 3, 0.005, sent_times_s[2] + 0.01)
+
+    statistics = get_statistics(tracker, sent_times_s)
+
+    assert statistics.num_round_trip_times == 1
+    assert statistics.loss_rate == pytest.approx(1 / 3)
+
+
+def test_round_trip_time_statistics():
+    tracker = LinkQualityTracker()
+    round_trip_times_ms = list(range(1, 101))
+    sent_times_s = send_primitives(tracker, list(range(len(round_trip_times_ms))))
+    for sequence_number, round_trip_time_ms in enumerate(round_trip_times_ms):
+        acknowledge(tracker, sent_times_s, sequence_number, round_trip_time_ms / 1000)
+
+    statistics = get_statistics(tracker, sent_times_s)
+
+    assert statistics.num_round_trip_times == 100
+    assert statistics.round_trip_time_p50_seconds == pytest.approx(0.050)
+    assert statistics.round_trip_time_p95_seconds == pytest.approx(0.095)
+    assert statistics.round_trip_time_p99_seconds == pytest.approx(0.099)
+    assert statistics.round_trip_time_max_seconds == pytest.approx(0.100)
+    assert statistics.jitter_seconds == pytest.approx(0.001)
+
+    # Round trip times past the last bin are counted in the last bin
+    histogram = list(statistics.round_trip_time_histogram)
+    assert len(histogram) == LinkQualityTracker.NUM_HISTOGRAM_BINS
+    assert sum(histogram) == 100
+    assert histogram[0] == 1
+    assert histogram[-1] == 3
+
+
+def test_records_outside_window_removed():
+    tracker = LinkQualityTracker()
+    sent_times_s = send_primitives(tracker, list(range(10)))
+
+    statistics = tracker.get_statistics(
+        ROBOT_ID, max(sent_times_s.values()) + LinkQualityTracker.WINDOW_DURATION_S + 1
+    )
+
+    assert statistics.num_primitives_sent == 0
+    assert statistics.loss_rate == 0
+
+
+def test_robots_tracked_separately():
+    tracker = LinkQualityTracker()
+    sent_times_s = send_primitives(tracker, list(range(10)))
+    tracker.record_sent(ROBOT_ID + 1, 100, 0)
+
+    statistics = get_statistics(tracker, sent_times_s)
+    other_statistics = tracker.get_statistics(ROBOT_ID + 1, 0)
+
+    assert statistics.num_primitives_sent == 10
+    assert other_statistics.num_primitives_sent == 1
+
+
+if __name__ == "__main__":
+    pytest_main(__file__)
@@ -0,0 +1,218 @@
+"""Tests for recording robot health to segment files and reading it back.
+
+Segments are written directly with known receive times to test the time range queries, and the recorder is run
+against a ProtoUnixIO to test that it rotates segments and only keeps the newest ones.
+"""
+
+import os
+import shutil
+import time
+
+import numpy as np
+import pytest
+
+from proto.import_all_protos import *
+from software.thunderscope.proto_unix_io import ProtoUnixIO
+from software.thunderscope.robot_health_recorder import (
+    COLUMN_DTYPES,
+    RobotHealthLog,
+    RobotHealthRecorder,
+    RobotHealthSegment,
+)
+from software.simulated_tests.simulated_test_fixture import pytest_main
+
+# location to store the generated files
+TMP_ROBOT_HEALTH_PATH = "/tmp/test_robot_health"
+
+ROBOT_ID = 2
+
+# How long to wait for the recorder to record the statuses sent to it
+RECORD_TIMEOUT_S = 5
+
+
+@pytest.fixture
+def robot_health_dir():
+    """A fresh directory for the robot health, deleted after the test"""
+    shutil.rmtree(TMP_ROBOT_HEALTH_PATH, ignore_errors=True)
+    yield TMP_ROBOT_HEALTH_PATH
+    shutil.rmtree(TMP_ROBOT_HEALTH_PATH, ignore_errors=True)
+
+
+def create_row(time_received_s: float, battery_voltage: float) -> dict:
+    """Creates a row of robot health with every other column zeroed
+
+    :param time_received_s: the time the row was received
+    :param battery_voltage: the battery voltage of the row
+    :return: the value of every column
+    """
+    row = {name: 0 for name in COLUMN_DTYPES}
+    row["time_received_s"] = time_received_s
+    row["battery_voltage"] = battery_voltage
+    return row
+
+
+def write_segments(directory: str, rows_per_segment: list[list[dict]]) -> None:
+    """Writes a robot's segments the way the recorder lays them out
+
+    :param directory: the directory the recorder writes to
+    :param rows_per_segment: the rows of each segment, oldest segment first
+    """
+    robot_directory = RobotHealthLog.get_robot_directory(directory, ROBOT_ID)
+    os.makedirs(robot_directory)
+
+    for index, rows in enumerate(rows_per_segment):
+        segment = RobotHealthSegment(
+            os.path.join(
+                robot_directory,
+                f"{index:06d}{RobotHealthRecorder.SEGMENT_FILE_EXTENSION}",
+            ),
+            capacity=len(rows),
+        )
+        for row in rows:
+            segment.append(row)
+        segment.close()
+
+
+def wait_for_battery_voltage(log: RobotHealthLog, battery_voltage: float) -> None:
+    """Waits until a row with the given battery voltage has been recorded
+
+    :param log: the robot health being recorded
+    :param battery_voltage: the battery voltage to wait for
+    """
+    deadline = time.time() + RECORD_TIMEOUT_S
+    while time.time() < deadline:
+        if (
+            battery_voltage
+            in log.query(ROBOT_ID, ["battery_voltage"])["battery_voltage"]
+        ):
+            return
+        time.sleep(0.01)
+
+    pytest.fail(f"Battery voltage {battery_voltage} was not recorded")
+
+
+def test_segment_round_trip(robot_health_dir):
+    os.makedirs(robot_health_dir)
+    path = os.path.join(robot_health_dir, "segment.tbhealth")
+
+    segment = RobotHealthSegment(path, capacity=3)
+    for index in range(3):
+        assert not segment.is_full()
+        segment.append(create_row(time_received_s=index, battery_voltage=index + 20))
+    assert segment.is_full()
+    segment.close()
+
+    segment = RobotHealthSegment(path)
+    columns = segment.read(["time_received_s", "battery_voltage"])
+
+    assert segment.num_rows == 3
+    assert list(columns["time_received_s"]) == [0, 1, 2]
+    assert list(columns["battery_voltage"]) == [20, 21, 22]
+    segment.close()
+
+
+def test_query_time_range(robot_health_dir):
+    # Rows received every second from 0 s to 9 s, split over three segments
+    write_segments(
+        robot_health_dir,
+        [
+            [create_row(time_s, battery_voltage=time_s + 10) for time_s in times_s]
+            for times_s in [range(0, 4), range(4, 8), range(8, 10)]
+        ],
+    )
+    log = RobotHealthLog(robot_health_dir)
+
+    def query_battery_voltages(start_time_s, end_time_s):
+        return list(
+            log.query(ROBOT_ID, ["battery_voltage"], start_time_s, end_time_s)[
+                "battery_voltage"
+            ]
+        )
+
+    assert log.get_robot_ids() == [ROBOT_ID]
+    assert query_battery_voltages(None, None) == list(range(10, 20))
+
+    # The start time is inclusive and the end time is exclusive, across segments
+    assert query_battery_voltages(2, 6) == [12, 13, 14, 15]
+    assert query_battery_voltages(2.5, 8.5) == [13, 14, 15, 16, 17, 18]
+    assert query_battery_voltages(None, 3) == [10, 11, 12]
+    assert query_battery_voltages(7, None) == [17, 18, 19]
+    assert query_battery_voltages(20, None) == []
+
+
+def test_query_columns(robot_health_dir):
+    write_segments(robot_health_dir, [[create_row(1.0, 15.5), create_row(2.0, 15.0)]])
+    log = RobotHealthLog(robot_health_dir)
+
+    columns = log.query(ROBOT_ID, ["battery_voltage"])
+
+    # The receive time is always returned
+    assert set(columns.keys()) == {"time_received_s", "battery_voltage"}
+    assert columns["battery_voltage"].dtype == COLUMN_DTYPES["battery_voltage"]
+    assert set(log.query(ROBOT_ID).keys()) == set(COLUMN_DTYPES.keys())
+
+    empty_columns = log.query(ROBOT_ID + 1, ["battery_voltage"])
+    assert len(empty_columns["battery_voltage"]) == 0
+
+    with pytest.raises(ValueError):
+        log.query(ROBOT_ID, ["not_a_column"])
+
+
+def test_unreadable_segment_skipped(robot_health_dir):
+    write_segments(
+        robot_health_dir,
+        [[create_row(1.0, 15.0)], [create_row(2.0, 16.0)]],
+    )
+    with open(RobotHealthLog.get_segment_paths(robot_health_dir, ROBOT_ID)[0], "wb"):
+        pass
+    log = RobotHealthLog(robot_health_dir)
+
+    assert list(log.query(ROBOT_ID)["battery_voltage"]) == [16.0]
+
+
+def test_recorder_rotates_segments(robot_health_dir):
+    proto_unix_io = ProtoUnixIO()
+    log = RobotHealthLog(robot_health_dir)
+
+    with RobotHealthRecorder(
+        proto_unix_io,
+        robot_health_dir,
+        segment_capacity=4,
+        max_segments_per_robot=2,
+    ):
+        for battery_voltage in range(10):
+            proto_unix_io.send_proto(
+                RobotStatus,
+                RobotStatus(
+                    robot_id=ROBOT_ID,
+                    power_status=PowerStatus(battery_voltage=battery_voltage),
+                ),
+            )
+        wait_for_battery_voltage(log, 9)
+
+        proto_unix_io.send_proto(
+            RobotCrash,
+            RobotCrash(
+                robot_id=ROBOT_ID,
+                status=RobotStatus(
+                    robot_id=ROBOT_ID, power_status=PowerStatus(battery_voltage=10)
+                ),
+            ),
+        )
+        wait_for_battery_voltage(log, 10)
+
+    segment_paths = RobotHealthLog.get_segment_paths(robot_health_dir, ROBOT_ID)
+    assert [os.path.basename(path) for path in segment_paths] == [
+        f"000001{RobotHealthRecorder.SEGMENT_FILE_EXTENSION}",
+        f"000002{RobotHealthRecorder.SEGMENT_FILE_EXTENSION}",
+    ]
+
+    # The first segment was removed when the third was started
+    columns = log.query(ROBOT_ID, ["battery_voltage", "crashed"])
+    assert list(columns["battery_voltage"]) == list(range(4, 11))
+    assert list(columns["crashed"]) == [0] * 6 + [1]
+    assert np.all(np.diff(columns["time_received_s"]) >= 0)
+
+
+if __name__ == "__main__":
+    pytest_main(__file__)
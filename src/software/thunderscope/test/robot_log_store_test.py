@@ -0,0 +1,172 @@
+"""Tests for storing, filtering and evicting robot logs in the RobotLogStore."""
+
+import numpy as np
+
+from proto.import_all_protos import *
+from software.py_constants import MAX_ROBOT_IDS_PER_SIDE
+from software.thunderscope.log.robot_log_store import RobotLogStore
+from software.simulated_tests.simulated_test_fixture import pytest_main
+
+# Masks that match every log
+ALL_LEVELS = np.ones(RobotLogStore.NUM_LOG_LEVELS, dtype=bool)
+ALL_ROBOTS = np.ones(MAX_ROBOT_IDS_PER_SIDE + 1, dtype=bool)
+
+
+def create_log(
+    robot_id: int = 0,
+    log_level: LogLevel = LogLevel.INFO,
+    file_name: str = "primitive_executor.cpp",
+    log_msg: str = "",
+) -> RobotLog:
+    """Creates a robot log
+
+    :param robot_id: the id of the robot the log came from
+    :param log_level: the level of the log
+    :param file_name: the file the log came from
+    :param log_msg: the message of the log
+    :return: the log
+    """
+    log = RobotLog(
+        robot_id=robot_id,
+        log_level=log_level,
+        file_name=file_name,
+        line_number=42,
+        log_msg=log_msg,
+    )
+    log.created_timestamp.epoch_timestamp_seconds = 12.5
+    return log
+
+
+def create_mask(size: int, indices: list[int]) -> np.ndarray:
+    """Creates a boolean mask that is only True at the given indices
+
+    :param size: the size of the mask
+    :param indices: the indices to set
+    :return: the mask
+    """
+    mask = np.zeros(size, dtype=bool)
+    mask[indices] = True
+    return mask
+
+
+def test_logs_stored_in_order():
+    store = RobotLogStore(capacity=10)
+
+    assert store.add(create_log(robot_id=3, log_msg="kicking")) == 0
+    assert (
+        store.add(create_log(robot_id=4, log_level=LogLevel.WARNING, log_msg="low"))
+        == 1
+    )
+
+    assert store.num_added == 2
+    assert store.oldest_sequence_number == 0
+    assert store.get_text(0) == "R3 12.5 INFO [primitive_executor.cpp->42] kicking"
+    assert store.get_text(1) == "R4 12.5 WARNING [primitive_executor.cpp->42] low"
+    assert store.get_level(0) == LogLevel.INFO
+    assert store.get_level(1) == LogLevel.WARNING
+
+
+def test_oldest_logs_evicted_when_full():
+    store = RobotLogStore(capacity=3)
+    for index in range(5):
+        store.add(create_log(log_msg=f"log {index}"))
+
+    assert store.num_added == 5
+    assert store.oldest_sequence_number == 2
+    assert [store.get_text(sequence_number)[-5:] for sequence_number in [2, 3, 4]] == [
+        "log 2",
+        "log 3",
+        "log 4",
+    ]
+
+    # Evicted logs are skipped
+    assert list(store.filter_range(0, ALL_LEVELS, ALL_ROBOTS)) == [2, 3, 4]
+    assert list(store.filter_range(3, ALL_LEVELS, ALL_ROBOTS)) == [3, 4]
+    assert list(store.filter_range(5, ALL_LEVELS, ALL_ROBOTS)) == []
+
+
+def test_filter_by_level():
+    store = RobotLogStore()
+    for log_level in [LogLevel.DEBUG, LogLevel.WARNING, LogLevel.INFO, LogLevel.FATAL]:
+        store.add(create_log(log_level=log_level))
+
+    level_mask = create_mask(
+        RobotLogStore.NUM_LOG_LEVELS, [LogLevel.WARNING, LogLevel.FATAL]
+    )
+
+    assert list(store.filter_range(0, level_mask, ALL_ROBOTS)) == [1, 3]
+
+
+def test_filter_by_robot():
+    store = RobotLogStore()
+    for robot_id in [0, 5, 2, MAX_ROBOT_IDS_PER_SIDE + 3, 5]:
+        store.add(create_log(robot_id=robot_id))
+
+    robot_mask = create_mask(MAX_ROBOT_IDS_PER_SIDE + 1, [5])
+    assert list(store.filter_range(0, ALL_LEVELS, robot_mask)) == [1, 4]
+
+    # Robot ids out of range are matched by the other robot slot
+    other_robot_mask = create_mask(
+        MAX_ROBOT_IDS_PER_SIDE + 1, [RobotLogStore.OTHER_ROBOT_ID]
+    )
+    assert list(store.filter_range(0, ALL_LEVELS, other_robot_mask)) == [3]
+
+
+def test_filter_by_file():
+    store = RobotLogStore()
+    for file_name in ["motor.cpp", "thunderloop.cpp", "motor.cpp"]:
+        store.add(create_log(file_name=file_name))
+
+    assert store.file_names == ["motor.cpp", "thunderloop.cpp"]
+
+    motor_file_id = store.file_name_to_id["motor.cpp"]
+    assert list(
+        store.filter_range(0, ALL_LEVELS, ALL_ROBOTS, file_id=motor_file_id)
+    ) == [0, 2]
+
+
+def test_filter_by_search_text():
+    store = RobotLogStore()
+    for log_msg in ["Battery LOW", "kicking", "battery ok"]:
+        store.add(create_log(log_msg=log_msg))
+
+    # Search text is lower case, and matches logs case insensitively
+    assert list(
+        store.filter_range(0, ALL_LEVELS, ALL_ROBOTS, search_text="battery")
+    ) == [0, 2]
+    assert list(
+        store.filter_range(0, ALL_LEVELS, ALL_ROBOTS, search_text="r0 12.5 info")
+    ) == [0, 1, 2]
+    assert list(store.filter_range(0, ALL_LEVELS, ALL_ROBOTS, search_text="chip")) == []
+
+
+def test_filters_combined():
+    store = RobotLogStore()
+    store.add(create_log(robot_id=1, log_level=LogLevel.WARNING, log_msg="stall"))
+    store.add(create_log(robot_id=2, log_level=LogLevel.WARNING, log_msg="stall"))
+    store.add(create_log(robot_id=1, log_level=LogLevel.INFO, log_msg="stall"))
+    store.add(create_log(robot_id=1, log_level=LogLevel.WARNING, log_msg="fine"))
+
+    assert list(
+        store.filter_range(
+            0,
+            create_mask(RobotLogStore.NUM_LOG_LEVELS, [LogLevel.WARNING]),
+            create_mask(MAX_ROBOT_IDS_PER_SIDE + 1, [1]),
+            search_text="stall",
+        )
+    ) == [0]
+
+
+def test_filter_keeps_given_order():
+    store = RobotLogStore(capacity=4)
+    for robot_id in [1, 2, 1, 1, 2, 1]:
+        store.add(create_log(robot_id=robot_id))
+
+    robot_mask = create_mask(MAX_ROBOT_IDS_PER_SIDE + 1, [1])
+    sequence_numbers = np.array([5, 4, 3, 2], dtype=np.int64)
+
+    assert list(store.filter(sequence_numbers, ALL_LEVELS, robot_mask)) == [5, 3, 2]
+
+
+if __name__ == "__main__":
+    pytest_main(__file__)
@@ -14,6 +14,11 @@ from software.py_constants import *
 from software.thunderscope.constants import *
 
 from software.thunderscope.thunderscope_config import TScopeConfig
+from software.thunderscope.startup_profiler import startup_profiler
+from software.thunderscope.common.toast_msg_helper import warning_toast
+from software.thunderscope.binary_context_managers.process_supervisor import (
+    CrashStats,
+)
 
 
 class Thunderscope:
@@ -111,6 +116,8 @@ class Thunderscope:
             lambda: QMessageBox.information(self.window, "Help", THUNDERSCOPE_HELP_TEXT)
         )
 
+        startup_profiler.mark("Thunderscope constructed")
+
     def reset_layout(self) -> None:
         """Reset the layout to the default layout"""
         saved_layout_path = pathlib.Path(LAST_OPENED_LAYOUT_PATH)
@@ -204,11 +211,53 @@ class Thunderscope:
 
         self.refresh_timers.append(refresh_timer)
 
+    def watch_for_crashes(
+        self, name: str, get_crash_stats: Callable[[], CrashStats]
+    ) -> None:
+        """Shows a warning whenever a process launched by Thunderscope crashes
+
+        :param name: the name of the process to show in the warning
+        :param get_crash_stats: function that returns the crash statistics of
+                                the process
+        """
+        last_num_crashes = get_crash_stats().num_crashes
+
+        def __check_for_crashes() -> None:
+            """Shows a warning if the process crashed since the last check"""
+            nonlocal last_num_crashes
+
+            crash_stats = get_crash_stats()
+            if crash_stats.num_crashes == last_num_crashes:
+                return
+
+            last_num_crashes = crash_stats.num_crashes
+            warning_toast(
+                self.window,
+                f"{name} crashed with exit code {crash_stats.last_exit_code} "
+                f"after {crash_stats.last_uptime_s:.1f} s "
+                f"({crash_stats.num_crashes} crashes, {crash_stats.num_restarts} restarts)",
+                timeout_ms=CRASH_WARNING_TIMEOUT_MS,
+            )
+
+        self.register_refresh_function(__check_for_crashes)
+
     def show(self) -> None:
         """Show the main window"""
         self.window.showMaximized()
+
+        # Runs once the event loop has processed the show, i.e. after the
+        # first frame has been drawn
+        QtCore.QTimer.singleShot(0, self.__on_first_frame_shown)
+
         pyqtgraph.exec()
 
+    def __on_first_frame_shown(self) -> None:
+        """Records that the first frame is on screen and reports how long
+        startup took, if startup profiling is enabled
+        """
+        startup_profiler.mark("First frame shown")
+        startup_profiler.report()
+
     def is_open(self) -> bool:
         """Returns true if the window is open"""
         return self.window.isVisible()
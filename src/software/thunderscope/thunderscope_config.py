@@ -5,6 +5,7 @@ from software.thunderscope.proto_unix_io import ProtoUnixIO
 from software.thunderscope.robot_communication import RobotCommunication
 from typing import Sequence
 from dataclasses import dataclass
+from functools import partial
 from software.thunderscope.thunderscope_types import (
     TScopeTab,
     TScopeWidget,
@@ -109,10 +110,12 @@ def configure_base_fullsystem(
     sandbox_mode: bool = False,
     replay: bool = False,
     replay_log: os.PathLike = None,
+    replay_player: MultiProtoPlayer = None,
     visualization_buffer_size: int = 5,
     extra_widgets: list[TScopeWidget] = [],
     frame_swap_counter: FrameTimeCounter = None,
     refresh_counter: FrameTimeCounter = None,
+    lazy_widgets: bool = False,
 ) -> list:
     """Returns a list of widget data for a FullSystem tab
     along with any extra widgets passed in
@@ -123,31 +126,39 @@ def configure_base_fullsystem(
     :param sandbox_mode: if sandbox mode should be enabled
     :param replay: True if in replay mode, False if not
     :param replay_log: the file path of the replay protos
+    :param replay_player: the player playing back the replay logs, shared by
+                          all the tabs in the replay view
     :param visualization_buffer_size: The size of the visualization buffer.
             Increasing this will increase smoothness but will be less realtime.
     :param extra_widgets: a list of additional widget data to append
     :param frame_swap_counter: a FrameTimeCounter for the GLWidget to track
                                the time between frame swaps
     :param refresh_counter: a FrameTimeCounter for the refresh function
+    :param lazy_widgets: if GL layers that are hidden on startup should only be
+                         constructed when they are first made visible
     :return: list of widget data for FullSystem
     """
     return [
         TScopeWidget(
             name="Field",
-            widget=setup_gl_widget(
+            widget_factory=partial(
+                setup_gl_widget,
                 sandbox_mode=sandbox_mode,
                 replay=replay,
                 replay_log=replay_log,
+                player=replay_player,
                 full_system_proto_unix_io=full_system_proto_unix_io,
                 sim_proto_unix_io=sim_proto_unix_io,
                 friendly_colour_yellow=friendly_colour_yellow,
                 visualization_buffer_size=visualization_buffer_size,
                 frame_swap_counter=frame_swap_counter,
+                lazy_layers=lazy_widgets,
             ),
         ),
         TScopeWidget(
             name="Parameters",
-            widget=setup_parameter_widget(
+            widget_factory=partial(
+                setup_parameter_widget,
                 proto_unix_io=full_system_proto_unix_io,
                 friendly_colour_yellow=friendly_colour_yellow,
             ),
@@ -158,7 +169,8 @@ def configure_base_fullsystem(
         ),
         TScopeWidget(
             name="Error Log",
-            widget=setup_robot_error_log_view_widget(
+            widget_factory=partial(
+                setup_robot_error_log_view_widget,
                 proto_unix_io=full_system_proto_unix_io,
             ),
             anchor="Parameters",
@@ -167,21 +179,27 @@ def configure_base_fullsystem(
         ),
         TScopeWidget(
             name="Logs",
-            widget=setup_log_widget(proto_unix_io=full_system_proto_unix_io),
+            widget_factory=partial(
+                setup_log_widget, proto_unix_io=full_system_proto_unix_io
+            ),
             anchor="Parameters",
             position=WidgetPosition.ABOVE,
             stretch=WidgetStretchData(x=5),
         ),
         TScopeWidget(
             name="Referee Info",
-            widget=setup_referee_info(proto_unix_io=full_system_proto_unix_io),
+            widget_factory=partial(
+                setup_referee_info, proto_unix_io=full_system_proto_unix_io
+            ),
             anchor="Field",
             position=WidgetPosition.BOTTOM,
             stretch=WidgetStretchData(y=4),
         ),
         TScopeWidget(
             name="Performance",
-            widget=setup_performance_plot(proto_unix_io=full_system_proto_unix_io),
+            widget_factory=partial(
+                setup_performance_plot, proto_unix_io=full_system_proto_unix_io
+            ),
             # this is because this widget specifically has to be added like so:
             # dock.addWidget(widget.win) instead of dock.addWidget(widget)
             # otherwise, it opens in a new window
@@ -193,7 +211,8 @@ def configure_base_fullsystem(
         ),
         TScopeWidget(
             name="FPS Widget",
-            widget=setup_fps_widget(
+            widget_factory=partial(
+                setup_fps_widget,
                 frame_swap_counter=frame_swap_counter,
                 refresh_counter=refresh_counter,
             ),
@@ -203,7 +222,9 @@ def configure_base_fullsystem(
         ),
         TScopeWidget(
             name="Play Info",
-            widget=setup_play_info(proto_unix_io=full_system_proto_unix_io),
+            widget_factory=partial(
+                setup_play_info, proto_unix_io=full_system_proto_unix_io
+            ),
             anchor="Referee Info",
             position=WidgetPosition.ABOVE,
             stretch=WidgetStretchData(y=4),
@@ -227,19 +248,31 @@ def configure_base_diagnostics(
     return [
         TScopeWidget(
             name="Logs",
-            widget=setup_log_widget(proto_unix_io=diagnostics_proto_unix_io),
+            widget_factory=partial(
+                setup_log_widget, proto_unix_io=diagnostics_proto_unix_io
+            ),
         ),
         TScopeWidget(
             name="Error Log",
-            widget=setup_robot_error_log_view_widget(
-                proto_unix_io=current_proto_unix_io
+            widget_factory=partial(
+                setup_robot_error_log_view_widget, proto_unix_io=current_proto_unix_io
             ),
             position=WidgetPosition.BELOW,
             anchor="Logs",
         ),
+        TScopeWidget(
+            name="Link Quality",
+            widget_factory=partial(
+                setup_link_quality_widget, proto_unix_io=current_proto_unix_io
+            ),
+            position=WidgetPosition.BELOW,
+            anchor="Error Log",
+        ),
         TScopeWidget(
             name="Diagnostics",
-            widget=setup_diagnostics_widget(proto_unix_io=diagnostics_proto_unix_io),
+            widget_factory=partial(
+                setup_diagnostics_widget, proto_unix_io=diagnostics_proto_unix_io
+            ),
             anchor="Logs",
             position=WidgetPosition.RIGHT,
         ),
@@ -248,12 +281,15 @@ def configure_base_diagnostics(
 
 def configure_two_ai_gamecontroller_view(
     visualization_buffer_size: int = 5,
+    lazy_widgets: bool = False,
 ) -> TScopeConfig:
     """Constructs the Thunderscope Config for a view with 2 FullSystem tabs (Blue and Yellow)
     And 1 Gamecontroller tab
 
     :param visualization_buffer_size: The size of the visualization buffer.
             Increasing this will increase smoothness but will be less realtime.
+    :param lazy_widgets: if widgets should only be constructed once they are
+                         first visible, to speed up startup
     :return: the Thunderscope Config for this view
     """
     proto_unix_io_map = {
@@ -277,7 +313,9 @@ def configure_two_ai_gamecontroller_view(
         tabs=[
             TScopeTab(
                 name="Blue FullSystem",
+                lazy_widgets=lazy_widgets,
                 widgets=configure_base_fullsystem(
+                    lazy_widgets=lazy_widgets,
                     full_system_proto_unix_io=proto_unix_io_map[ProtoUnixIOTypes.BLUE],
                     sim_proto_unix_io=proto_unix_io_map[ProtoUnixIOTypes.SIM],
                     friendly_colour_yellow=False,
@@ -291,7 +329,9 @@ def configure_two_ai_gamecontroller_view(
             ),
             TScopeTab(
                 name="Yellow FullSystem",
+                lazy_widgets=lazy_widgets,
                 widgets=configure_base_fullsystem(
+                    lazy_widgets=lazy_widgets,
                     full_system_proto_unix_io=proto_unix_io_map[
                         ProtoUnixIOTypes.YELLOW
                     ],
@@ -429,15 +469,21 @@ def configure_replay_view(
     blue_replay_log: os.PathLike,
     yellow_replay_log: os.PathLike,
     visualization_buffer_size: int = 5,
+    lazy_widgets: bool = False,
 ) -> TScopeConfig:
     """Constructs the Thunderscope Config for a replay view
     Can have 1 or 2 FullSystem tabs but no GameController tab
     GLWidget will now have Player controls
 
+    The logs are played back on one shared timeline by a single player, so the
+    tabs stay in sync and the player controls in either tab control both logs
+
     :param blue_replay_log: the file path for the blue replay log
     :param yellow_replay_log: the file path for the yellow replay log
     :param visualization_buffer_size: The size of the visualization buffer.
             Increasing this will increase smoothness but will be less realtime.
+    :param lazy_widgets: if widgets should only be constructed once they are
+                         first visible, to speed up startup
     :return: the Thunderscope Config for this view
     """
     proto_unix_io_map = {ProtoUnixIOTypes.SIM: ProtoUnixIO()}
@@ -446,18 +492,34 @@ def configure_replay_view(
     # Must be called before widgets are initialized below
     initialize_application()
 
+    replay_sources = []
     if blue_replay_log:
-        blue_refresh_func_counter = FrameTimeCounter()
         proto_unix_io_map[ProtoUnixIOTypes.BLUE] = ProtoUnixIO()
+        replay_sources.append(
+            ReplaySource(blue_replay_log, proto_unix_io_map[ProtoUnixIOTypes.BLUE])
+        )
+    if yellow_replay_log:
+        proto_unix_io_map[ProtoUnixIOTypes.YELLOW] = ProtoUnixIO()
+        replay_sources.append(
+            ReplaySource(yellow_replay_log, proto_unix_io_map[ProtoUnixIOTypes.YELLOW])
+        )
+
+    replay_player = MultiProtoPlayer(replay_sources)
+
+    if blue_replay_log:
+        blue_refresh_func_counter = FrameTimeCounter()
         tabs.append(
             TScopeTab(
                 name="Blue FullSystem",
+                lazy_widgets=lazy_widgets,
                 widgets=configure_base_fullsystem(
+                    lazy_widgets=lazy_widgets,
                     full_system_proto_unix_io=proto_unix_io_map[ProtoUnixIOTypes.BLUE],
                     sim_proto_unix_io=proto_unix_io_map[ProtoUnixIOTypes.SIM],
                     friendly_colour_yellow=False,
                     replay=True,
                     replay_log=blue_replay_log,
+                    replay_player=replay_player,
                     visualization_buffer_size=visualization_buffer_size,
                     extra_widgets=[],
                     frame_swap_counter=FrameTimeCounter(),
@@ -469,11 +531,12 @@ def configure_replay_view(
 
     if yellow_replay_log:
         yellow_refresh_func_counter = FrameTimeCounter()
-        proto_unix_io_map[ProtoUnixIOTypes.YELLOW] = ProtoUnixIO()
         tabs.append(
             TScopeTab(
                 name="Yellow FullSystem",
+                lazy_widgets=lazy_widgets,
                 widgets=configure_base_fullsystem(
+                    lazy_widgets=lazy_widgets,
                     full_system_proto_unix_io=proto_unix_io_map[
                         ProtoUnixIOTypes.YELLOW
                     ],
@@ -481,6 +544,7 @@ def configure_replay_view(
                     friendly_colour_yellow=True,
                     replay=True,
                     replay_log=yellow_replay_log,
+                    replay_player=replay_player,
                     visualization_buffer_size=visualization_buffer_size,
                     extra_widgets=[],
                     frame_swap_counter=FrameTimeCounter(),
@@ -498,6 +562,7 @@ def configure_ai_or_diagnostics(
     load_yellow: bool,
     load_diagnostics: bool,
     visualization_buffer_size: int,
+    lazy_widgets: bool = False,
 ) -> (TScopeConfig, RobotView):
     """Constructs a view designed for when we are running with real robots.
 
@@ -514,6 +579,8 @@ def configure_ai_or_diagnostics(
     :param load_diagnostics: if diagnostics should be loaded
     :param visualization_buffer_size: The size of the visualization buffer.
             Increasing this will increase smoothness but will be less realtime.
+    :param lazy_widgets: if widgets should only be constructed once they are
+                         first visible, to speed up startup
     :return: the Thunderscope Config and RobotView widget for this view
     """
     proto_unix_io_map = {
@@ -545,7 +612,9 @@ def configure_ai_or_diagnostics(
         tabs.append(
             TScopeTab(
                 name="Blue Fullsystem",
+                lazy_widgets=lazy_widgets,
                 widgets=configure_base_fullsystem(
+                    lazy_widgets=lazy_widgets,
                     full_system_proto_unix_io=proto_unix_io_map[ProtoUnixIOTypes.BLUE],
                     sim_proto_unix_io=proto_unix_io_map[ProtoUnixIOTypes.SIM],
                     friendly_colour_yellow=False,
@@ -564,7 +633,9 @@ def configure_ai_or_diagnostics(
         tabs.append(
             TScopeTab(
                 name="Yellow Fullsystem",
+                lazy_widgets=lazy_widgets,
                 widgets=configure_base_fullsystem(
+                    lazy_widgets=lazy_widgets,
                     full_system_proto_unix_io=proto_unix_io_map[
                         ProtoUnixIOTypes.YELLOW
                     ],
@@ -593,6 +664,7 @@ def configure_ai_or_diagnostics(
         tabs.append(
             TScopeTab(
                 name="Robot Diagnostics",
+                lazy_widgets=lazy_widgets,
                 widgets=configure_base_diagnostics(
                     diagnostics_proto_unix_io=proto_unix_io_map[
                         ProtoUnixIOTypes.DIAGNOSTICS
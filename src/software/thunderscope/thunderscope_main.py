@@ -5,6 +5,10 @@ import os
 import sys
 import threading
 
+# Imported before everything else so that the startup trace includes the time
+# spent importing the rest of Thunderscope
+from software.thunderscope.startup_profiler import startup_profiler
+
 import google.protobuf
 from google.protobuf.internal import api_implementation
 
@@ -20,6 +24,7 @@ from software.thunderscope.binary_context_managers import *
 from proto.import_all_protos import *
 from software.py_constants import *
 from software.thunderscope.robot_communication import RobotCommunication
+from software.thunderscope.robot_health_recorder import RobotHealthRecorder
 from software.thunderscope.wifi_communication_manager import WifiCommunicationManager
 from software.thunderscope.constants import EstopMode, ProtoUnixIOTypes
 from software.thunderscope.estop_helpers import get_estop_config
@@ -72,6 +77,12 @@ if __name__ == "__main__":
         help="yellow full_system runtime directory",
         default="/tmp/tbots/yellow",
     )
+    parser.add_argument(
+        "--robot_health_dir",
+        type=str,
+        help="directory to record the health of the robots to when running with real robots",
+        default="/tmp/tbots/robot_health",
+    )
 
     # Debugging
     parser.add_argument(
@@ -227,8 +238,30 @@ if __name__ == "__main__":
         help="whether or not to launch the gamecontroller when --run_blue or --run_yellow is ran",
     )
 
+    parser.add_argument(
+        "--startup_trace",
+        nargs="?",
+        const=True,
+        default=None,
+        help="Log how long each stage of startup takes. "
+        "If a path is given, the trace is also written there as JSON",
+    )
+
+    parser.add_argument(
+        "--lazy_widgets",
+        action="store_true",
+        default=False,
+        help="Only construct widgets and hidden GL layers once they are first shown, to speed up startup",
+    )
+
     args = parser.parse_args()
 
+    if args.startup_trace:
+        startup_profiler.enable(
+            None if args.startup_trace is True else args.startup_trace
+        )
+        startup_profiler.mark("Imports finished")
+
     # we only have --launch_gc parameter but not args.run_yellow and args.run_blue
     if not args.run_blue and not args.run_yellow and args.launch_gc:
         parser.error(
@@ -249,7 +282,7 @@ if __name__ == "__main__":
 
         tscope = Thunderscope(
             config=config.configure_two_ai_gamecontroller_view(
-                args.visualization_buffer_size
+                args.visualization_buffer_size, lazy_widgets=args.lazy_widgets
             ),
             layout_path=args.layout,
         )
@@ -299,6 +332,7 @@ if __name__ == "__main__":
             args.run_yellow,
             args.run_diagnostics,
             args.visualization_buffer_size,
+            lazy_widgets=args.lazy_widgets,
         )
         tscope = Thunderscope(
             config=tscope_config,
@@ -342,7 +376,10 @@ if __name__ == "__main__":
             communication_manager=wifi_communication_manager,
             estop_mode=estop_mode,
             estop_path=estop_path,
-        ) as robot_communication:
+        ) as robot_communication, RobotHealthRecorder(
+            proto_unix_io=current_proto_unix_io,
+            directory=args.robot_health_dir,
+        ):
             if estop_mode == EstopMode.KEYBOARD_ESTOP:
                 tscope.keyboard_estop_shortcut.activated.connect(
                     robot_communication.toggle_keyboard_estop
@@ -366,6 +403,7 @@ if __name__ == "__main__":
                     run_sudo=args.sudo,
                 ) as full_system:
                     full_system.setup_proto_unix_io(current_proto_unix_io)
+                    tscope.watch_for_crashes("FullSystem", full_system.get_crash_stats)
 
                     tscope.show()
             else:
@@ -382,6 +420,7 @@ if __name__ == "__main__":
                 args.blue_log,
                 args.yellow_log,
                 args.visualization_buffer_size,
+                lazy_widgets=args.lazy_widgets,
             ),
             layout_path=args.layout,
         )
@@ -398,7 +437,7 @@ if __name__ == "__main__":
     else:
         tscope = Thunderscope(
             config=config.configure_two_ai_gamecontroller_view(
-                args.visualization_buffer_size
+                args.visualization_buffer_size, lazy_widgets=args.lazy_widgets
             ),
             layout_path=args.layout,
         )
@@ -461,6 +500,9 @@ if __name__ == "__main__":
             else contextlib.nullcontext()
         ) as autoref:
             tscope.register_refresh_function(gamecontroller.refresh)
+            tscope.watch_for_crashes("Simulator", simulator.get_crash_stats)
+            tscope.watch_for_crashes("Blue FullSystem", blue_fs.get_crash_stats)
+            tscope.watch_for_crashes("Yellow FullSystem", yellow_fs.get_crash_stats)
 
             autoref_proto_unix_io = ProtoUnixIO()
 
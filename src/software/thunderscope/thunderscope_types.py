@@ -1,5 +1,7 @@
-from typing import Optional, Sequence, Any
+from typing import Callable, Optional, Sequence, Any
 from software.thunderscope.common.frametime_counter import FrameTimeCounter
+from software.thunderscope.startup_profiler import startup_profiler
+from software.networking.tracing import tracer
 
 from pyqtgraph.Qt.QtWidgets import *
 from pyqtgraph.dockarea import *
@@ -37,8 +39,8 @@ class TScopeWidget:
     name: str
     """Name of widget (must be unique)"""
 
-    widget: Any
-    """The widget object"""
+    widget: Any = None
+    """The widget object, or None if it is built by the widget_factory"""
 
     anchor: Optional[str] = None
     """Name of widget to position this relative to"""
@@ -55,6 +57,10 @@ class TScopeWidget:
     in_window: Optional[bool] = False
     """If this widget should be added in window or not"""
 
+    widget_factory: Optional[Callable[[], Any]] = None
+    """Function that builds the widget object when widget is None. The tab calls
+    it immediately, or the first time the dock is visible if the tab is lazy"""
+
 
 class TScopeTab:
     """Data that describes a tab with Qt Widgets in Thunderscope"""
@@ -64,6 +70,7 @@ class TScopeTab:
         name: str,
         widgets: Sequence[TScopeWidget],
         refresh_counter: Optional[FrameTimeCounter] = None,
+        lazy_widgets: bool = False,
     ) -> None:
         """Constructor
 
@@ -71,8 +78,14 @@ class TScopeTab:
         :param widgets: a list of widgets that is going to be displayed in the tab
         :param refresh_counter: a FrameTimeCounter to track the time between calls
                                 to the refresh function
+        :param lazy_widgets: if True, widgets that have a widget_factory are only
+                             built the first time their dock becomes visible
         """
         self.name = name
+        self.lazy_widgets = lazy_widgets
+
+        # Widgets whose docks have been added but haven't been built yet
+        self.unbuilt_widgets: list[TScopeWidget] = []
 
         # Mapping of widget names to widget objects
         self.widgets_map: dict[str, TScopeWidget] = {}
@@ -102,9 +115,13 @@ class TScopeTab:
         """
         self.widgets_map[data.name] = data
         new_dock = Dock(data.name)
-        new_dock.addWidget(data.widget.win if data.in_window else data.widget)
         self.dock_map[data.name] = new_dock
 
+        if data.widget is None and self.lazy_widgets:
+            self.unbuilt_widgets.append(data)
+        else:
+            self.__build_widget(data)
+
         if data.stretch:
             stretch_data = data.stretch
             if stretch_data.y:
@@ -119,6 +136,27 @@ class TScopeTab:
         else:
             self.dock_area.addDock(new_dock)
 
+    def __build_widget(self, data: TScopeWidget) -> None:
+        """Builds the widget from its factory if it hasn't been built yet, and
+        adds it to its dock
+
+        :param data: the data describing the widget of type TScopeWidget
+        """
+        if data.widget is None:
+            with startup_profiler.span(f"Construct {self.name} / {data.name}"):
+                data.widget = data.widget_factory()
+
+        self.dock_map[data.name].addWidget(
+            data.widget.win if data.in_window else data.widget
+        )
+
+    def __build_visible_widgets(self) -> None:
+        """Builds the lazy widgets whose docks have become visible"""
+        for data in list(self.unbuilt_widgets):
+            if self.dock_map[data.name].isVisible():
+                self.unbuilt_widgets.remove(data)
+                self.__build_widget(data)
+
     def refresh(self) -> None:
         """Refreshes all the widgets belonging to this tab, and not refresh widget that are not visible."""
         if not self.dock_area.isVisible():
@@ -126,7 +164,15 @@ class TScopeTab:
 
         self.refresh_counter.add_one_datapoint()
 
+        if self.unbuilt_widgets:
+            self.__build_visible_widgets()
+
         for widget_data in self.widgets_map.values():
             # only refresh widget inside the dock that are visible
-            if widget_data.has_refresh_func and widget_data.widget.isVisible():
-                widget_data.widget.refresh()
+            if (
+                widget_data.has_refresh_func
+                and widget_data.widget is not None
+                and widget_data.widget.isVisible()
+            ):
+                with tracer.zone(widget_data.name):
+                    widget_data.widget.refresh()
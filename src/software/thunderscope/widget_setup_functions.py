@@ -1,6 +1,6 @@
 import os
 
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 from software.py_constants import *
 from proto.import_all_protos import *
@@ -11,6 +11,7 @@ from software.thunderscope.gl.layers.gl_draw_polygon_obstacle import (
     GLDrawPolygonObstacleLayer,
 )
 from software.thunderscope.proto_unix_io import ProtoUnixIO
+from software.thunderscope.startup_profiler import startup_profiler
 from proto.robot_log_msg_pb2 import RobotLog
 from extlibs.er_force_sim.src.protobuf.world_pb2 import *
 from software.thunderscope.dock_style import *
@@ -46,7 +47,11 @@ from software.thunderscope.robot_diagnostics.diagnostics_widget import Diagnosti
 from software.thunderscope.robot_diagnostics.robot_view import RobotView
 from software.thunderscope.robot_diagnostics.robot_error_log import RobotErrorLog
 from software.thunderscope.robot_diagnostics.estop_view import EstopView
+from software.thunderscope.robot_diagnostics.link_quality_widget import (
+    LinkQualityWidget,
+)
 from software.thunderscope.replay.proto_player import ProtoPlayer
+from software.thunderscope.replay.multi_proto_player import MultiProtoPlayer
 
 
 ################################
@@ -62,8 +67,10 @@ def setup_gl_widget(
     sandbox_mode: bool = False,
     replay: bool = False,
     replay_log: os.PathLike = None,
+    player: Optional[MultiProtoPlayer] = None,
     frame_swap_counter: Optional[FrameTimeCounter] = None,
     send_sync_message: bool = False,
+    lazy_layers: bool = False,
 ) -> Field:
     """Setup the GLWidget with its constituent layers
 
@@ -74,13 +81,19 @@ def setup_gl_widget(
     :param sandbox_mode: if sandbox mode should be enabled
     :param replay: Whether replay mode is currently enabled
     :param replay_log: The file path of the replay log
+    :param player: The player playing back the replay logs, shared with other
+                   GLWidgets. If not provided in replay mode, a player is
+                   created for replay_log.
     :param frame_swap_counter: FrameTimeCounter to keep track of the time between
                                frame swaps in the GLWidget
     :param send_sync_message: Whether to synchronize Thunderscope with a listener
+    :param lazy_layers: Whether layers that are hidden on startup should only be
+                        constructed the first time they are made visible
     :return: The GLWidget
     """
-    # Create ProtoPlayer if replay is enabled
-    player = ProtoPlayer(replay_log, full_system_proto_unix_io) if replay else None
+    # Create ProtoPlayer if replay is enabled and no player was provided
+    if replay and player is None:
+        player = ProtoPlayer(replay_log, full_system_proto_unix_io)
 
     # Create widget
     gl_widget = GLWidget(
@@ -91,74 +104,136 @@ def setup_gl_widget(
         sandbox_mode=sandbox_mode,
     )
 
-    # Create layers
-    validation_layer = gl_validation_layer.GLValidationLayer(
-        "Validation", visualization_buffer_size
-    )
-    path_layer = gl_path_layer.GLPathLayer("Paths", visualization_buffer_size)
+    def construct_layer(name: str, layer_factory: Callable[[], Any]) -> Any:
+        with startup_profiler.span(f"Construct layer {name}"):
+            return layer_factory()
 
-    obstacle_layer = gl_obstacle_layer.GLObstacleLayer(
-        "Obstacles", visualization_buffer_size
+    # Create layers
+    validation_layer = construct_layer(
+        "Validation",
+        lambda: gl_validation_layer.GLValidationLayer(
+            "Validation", visualization_buffer_size
+        ),
     )
-    debug_shapes_layer = gl_debug_shapes_layer.GLDebugShapesLayer(
-        "Debug Shapes", visualization_buffer_size
+    path_layer = construct_layer(
+        "Paths", lambda: gl_path_layer.GLPathLayer("Paths", visualization_buffer_size)
     )
-    passing_layer = gl_passing_layer.GLPassingLayer(
-        "Passing", visualization_buffer_size
+    obstacle_layer = construct_layer(
+        "Obstacles",
+        lambda: gl_obstacle_layer.GLObstacleLayer(
+            "Obstacles", visualization_buffer_size
+        ),
     )
-    attacker_layer = gl_attacker_layer.GLAttackerLayer(
-        "Attacker Tactic", visualization_buffer_size
+    debug_shapes_layer = construct_layer(
+        "Debug Shapes",
+        lambda: gl_debug_shapes_layer.GLDebugShapesLayer(
+            "Debug Shapes", visualization_buffer_size
+        ),
     )
-    cost_vis_layer = gl_cost_vis_layer.GLCostVisLayer(
-        "Passing Cost", visualization_buffer_size
+    passing_layer = construct_layer(
+        "Passing",
+        lambda: gl_passing_layer.GLPassingLayer("Passing", visualization_buffer_size),
     )
-    world_layer = (
-        gl_sandbox_world_layer.GLSandboxWorldLayer(
-            "Vision",
-            sim_proto_unix_io,
-            friendly_colour_yellow,
-            visualization_buffer_size,
-        )
-        if sandbox_mode
-        else gl_world_layer.GLWorldLayer(
-            "Vision",
-            sim_proto_unix_io,
-            friendly_colour_yellow,
-            visualization_buffer_size,
-        )
+    attacker_layer = construct_layer(
+        "Attacker Tactic",
+        lambda: gl_attacker_layer.GLAttackerLayer(
+            "Attacker Tactic", visualization_buffer_size
+        ),
     )
-    field_movement_layer = gl_movement_field_test_layer.GLMovementFieldTestLayer(
-        "Field Movement Layer", full_system_proto_unix_io
+    cost_vis_layer = construct_layer(
+        "Passing Cost",
+        lambda: gl_cost_vis_layer.GLCostVisLayer(
+            "Passing Cost", visualization_buffer_size
+        ),
     )
-    simulator_layer = gl_simulator_layer.GLSimulatorLayer(
-        "Simulator", friendly_colour_yellow, visualization_buffer_size
+    world_layer = construct_layer(
+        "Vision",
+        lambda: (
+            gl_sandbox_world_layer.GLSandboxWorldLayer(
+                "Vision",
+                sim_proto_unix_io,
+                friendly_colour_yellow,
+                visualization_buffer_size,
+            )
+            if sandbox_mode
+            else gl_world_layer.GLWorldLayer(
+                "Vision",
+                sim_proto_unix_io,
+                friendly_colour_yellow,
+                visualization_buffer_size,
+            )
+        ),
     )
-    tactic_layer = gl_tactic_layer.GLTacticLayer("Tactics", visualization_buffer_size)
-    trail_layer = gl_trail_layer.GLTrailLayer("Trail", visualization_buffer_size)
-    max_dribble_layer = gl_max_dribble_layer.GLMaxDribbleLayer(
-        "Dribble Tracking", visualization_buffer_size
+    max_dribble_layer = construct_layer(
+        "Dribble Tracking",
+        lambda: gl_max_dribble_layer.GLMaxDribbleLayer(
+            "Dribble Tracking", visualization_buffer_size
+        ),
     )
-    referee_layer = gl_referee_info_layer.GLRefereeInfoLayer(
-        "Referee Info", visualization_buffer_size
+    referee_layer = construct_layer(
+        "Referee Info",
+        lambda: gl_referee_info_layer.GLRefereeInfoLayer(
+            "Referee Info", visualization_buffer_size
+        ),
     )
 
-    draw_obstacle_layer = GLDrawPolygonObstacleLayer(
-        "Draw Obstacle Layer", full_system_proto_unix_io
-    )
+    # Layers that are hidden on startup. Each factory constructs the layer and
+    # registers its buffers, so that the layer can be constructed on demand.
+    def create_simulator_layer() -> gl_simulator_layer.GLSimulatorLayer:
+        return gl_simulator_layer.GLSimulatorLayer(
+            "Simulator", friendly_colour_yellow, visualization_buffer_size
+        )
+
+    def create_draw_obstacle_layer() -> GLDrawPolygonObstacleLayer:
+        return GLDrawPolygonObstacleLayer(
+            "Draw Obstacle Layer", full_system_proto_unix_io
+        )
+
+    def create_tactic_layer() -> gl_tactic_layer.GLTacticLayer:
+        tactic_layer = gl_tactic_layer.GLTacticLayer(
+            "Tactics", visualization_buffer_size
+        )
+        full_system_proto_unix_io.register_observer(World, tactic_layer.world_buffer)
+        full_system_proto_unix_io.register_observer(
+            PlayInfo, tactic_layer.play_info_buffer
+        )
+        return tactic_layer
+
+    def create_trail_layer() -> gl_trail_layer.GLTrailLayer:
+        trail_layer = gl_trail_layer.GLTrailLayer("Trail", visualization_buffer_size)
+        full_system_proto_unix_io.register_observer(World, trail_layer.world_buffer)
+        return trail_layer
+
+    def create_field_movement_layer() -> (
+        gl_movement_field_test_layer.GLMovementFieldTestLayer
+    ):
+        field_movement_layer = gl_movement_field_test_layer.GLMovementFieldTestLayer(
+            "Field Movement Layer", full_system_proto_unix_io
+        )
+        full_system_proto_unix_io.register_observer(
+            World, field_movement_layer.world_buffer
+        )
+        return field_movement_layer
+
+    def add_hidden_layer(name: str, layer_factory: Callable[[], Any]) -> None:
+        if lazy_layers:
+            gl_widget.add_lazy_layer(name, layer_factory)
+        else:
+            gl_widget.add_layer(construct_layer(name, layer_factory), False)
 
     gl_widget.add_layer(world_layer)
-    gl_widget.add_layer(simulator_layer, False)
+    add_hidden_layer("Simulator", create_simulator_layer)
     gl_widget.add_layer(path_layer)
     gl_widget.add_layer(obstacle_layer)
-    gl_widget.add_layer(draw_obstacle_layer, False)
+    add_hidden_layer("Draw Obstacle Layer", create_draw_obstacle_layer)
     gl_widget.add_layer(passing_layer)
     gl_widget.add_layer(attacker_layer)
     gl_widget.add_layer(cost_vis_layer, True)
-    gl_widget.add_layer(tactic_layer, False)
+    add_hidden_layer("Tactics", create_tactic_layer)
     gl_widget.add_layer(validation_layer)
-    gl_widget.add_layer(trail_layer, False)
+    add_hidden_layer("Trail", create_trail_layer)
     gl_widget.add_layer(debug_shapes_layer, True)
-    gl_widget.add_layer(field_movement_layer, False)
+    add_hidden_layer("Field Movement Layer", create_field_movement_layer)
     gl_widget.add_layer(max_dribble_layer, True)
     gl_widget.add_layer(referee_layer)
 
@@ -194,7 +269,6 @@ def setup_gl_widget(
     for arg in [
         (World, world_layer.world_buffer),
         (World, cost_vis_layer.world_buffer),
-        (World, field_movement_layer.world_buffer),
         (World, max_dribble_layer.world_buffer),
         (RobotStatus, world_layer.robot_status_buffer),
         (Referee, world_layer.referee_buffer),
@@ -204,12 +278,9 @@ def setup_gl_widget(
         (PathVisualization, path_layer.path_visualization_buffer),
         (PassVisualization, passing_layer.pass_visualization_buffer),
         (AttackerVisualization, attacker_layer.attacker_vis_buffer),
-        (World, tactic_layer.world_buffer),
-        (PlayInfo, tactic_layer.play_info_buffer),
         (ValidationProtoSet, validation_layer.validation_set_buffer),
         (SimulationState, simulation_control_toolbar.simulation_state_buffer),
         (CostVisualization, cost_vis_layer.cost_visualization_buffer),
-        (World, trail_layer.world_buffer),
         (DebugShapes, debug_shapes_layer.debug_shapes_buffer),
         (Referee, referee_layer.referee_vis_buffer),
         (BallPlacementVisualization, referee_layer.ball_placement_vis_buffer),
@@ -363,6 +434,19 @@ def setup_estop_view(proto_unix_io: ProtoUnixIO) -> EstopView:
     return estop_view
 
 
+def setup_link_quality_widget(proto_unix_io: ProtoUnixIO) -> LinkQualityWidget:
+    """Setup the link quality widget and connect its buffer to the proto unix io
+
+    :param proto_unix_io: The proto unix io object for the full system
+    :return: The link quality widget
+    """
+    link_quality_widget = LinkQualityWidget()
+    proto_unix_io.register_observer(
+        RobotLinkStatistics, link_quality_widget.link_statistics_buffer
+    )
+    return link_quality_widget
+
+
 def setup_diagnostics_widget(proto_unix_io: ProtoUnixIO) -> DiagnosticsWidget:
     """Set up the diagnostics widget that provides an interface for manually
     controlling our robots
@@ -11,6 +11,7 @@ from google.protobuf.message import Message
 
 from colorama import Fore, Style
 import logging
+import queue
 from threading import Lock, Thread
 import time
 
@@ -26,6 +27,9 @@ class WifiCommunicationManager:
     BROADCAST_HZ = 1.0
     """The frequency at which to broadcast the full system IP address"""
 
+    NETWORK_CONFIG_TIMEOUT_S = 0.5
+    """How long to wait for a new network configuration before checking if we should stop"""
+
     def __init__(
         self,
         current_proto_unix_io: ProtoUnixIO,
@@ -92,6 +96,7 @@ class WifiCommunicationManager:
         ## Thread Management ##
         self.running = True
         self.broadcast_ip: Thread | None = None
+        self.update_network_config: Thread | None = None
 
         logger.debug("[WifiCommunicationManager] Initialized")
         self.__print_current_network_config()
@@ -99,11 +104,19 @@ class WifiCommunicationManager:
     def __enter__(self) -> Self:
         self.broadcast_ip = Thread(target=self.__broadcast_fullsystem_ip, daemon=True)
         self.broadcast_ip.start()
+
+        # Network reconfiguration can take a while, so it is done on its own
+        # thread instead of on the thread sending primitives
+        self.update_network_config = Thread(
+            target=self.__update_network_config, daemon=True
+        )
+        self.update_network_config.start()
         return self
 
     def __exit__(self, type, value, traceback) -> None:
         self.running = False
         self.broadcast_ip.join()
+        self.update_network_config.join()
 
     def __broadcast_fullsystem_ip(self) -> None:
         """Notify the robots of this computer's IP address"""
@@ -204,6 +217,7 @@ class WifiCommunicationManager:
             RobotStatistic(
                 robot_id=robot_status.robot_id,
                 round_trip_time_seconds=round_trip_time_seconds,
+                primitive_sequence_number=robot_status.last_handled_primitive_set,
             ),
         )
         self.__forward_to_proto_unix_io(RobotStatus, robot_status)
@@ -371,14 +385,38 @@ class WifiCommunicationManager:
         if should_reconnect:
             self.__connect_to_robot(robot_ip_notification.robot_id)
 
+    def __update_network_config(self) -> None:
+        """Applies new network configurations as soon as they are available"""
+        while self.running:
+            try:
+                network_config = self.network_config_buffer.get(
+                    block=True,
+                    timeout=WifiCommunicationManager.NETWORK_CONFIG_TIMEOUT_S,
+                    return_cached=False,
+                )
+            except queue.Empty:
+                continue
+
+            self.__apply_network_config(network_config)
+
     def poll(self) -> None:
-        """Polls and updates the network senders and listeners if a new network configuration is available"""
+        """Polls and updates the network senders and listeners if a new network configuration is available.
+        Only needed when not using this as a context manager, which applies new configurations on its own thread.
+        """
         # Set up the network on the next tick
         network_config = self.network_config_buffer.get(
             block=False, return_cached=False
         )
 
-        if network_config is not None and self.accept_next_network_config:
+        if network_config is not None:
+            self.__apply_network_config(network_config)
+
+    def __apply_network_config(self, network_config: NetworkConfig) -> None:
+        """Updates the network senders and listeners to use the given network configuration
+
+        :param network_config: the new network configuration
+        """
+        if self.accept_next_network_config:
             logging.info("Updating network configuration")
 
             if self.should_setup_full_system:
@@ -389,7 +427,7 @@ class WifiCommunicationManager:
                 network_config.robot_communication_interface
             )
             self.__print_current_network_config()
-        elif network_config is not None:
+        else:
             logger.warning(
                 "[RobotCommunication] We received a proto configuration update with a newer network "
                 "configuration. We will ignore this update, likely because the interface was provided at "
@@ -8,6 +8,7 @@
 #include "proto/message_translation/ssl_wrapper.h"
 #include "proto/parameters.pb.h"
 #include "proto/play_info_msg.pb.h"
+#include "proto/replay_bookmark.pb.h"
 #include "software/ai/threaded_ai.h"
 #include "software/backend/backend.h"
 #include "software/backend/unix_simulator_backend.h"
@@ -141,6 +142,13 @@ int main(int argc, char** argv)
             args.runtime_dir + PLAY_OVERRIDE_PATH,
             [&ai](TbotsProto::Play input_play) { ai->overridePlay(input_play); });
 
+        // Replay logs
+        auto start_replay_log_listener =
+            ThreadedProtoUnixListener<TbotsProto::StartReplayLog>(
+                args.runtime_dir + START_REPLAY_LOG_PATH,
+                [](TbotsProto::StartReplayLog input)
+                { proto_logger->startNewLog(input.log_path()); });
+
         // Connect observers
         ai->Subject<TbotsProto::PrimitiveSet>::registerObserver(backend);
         sensor_fusion->Subject<World>::registerObserver(ai);
@@ -2,8 +2,11 @@
 
 import os
 import sys
+import fcntl
+import hashlib
+import json
 import iterfzf
-import itertools
+import subprocess
 from subprocess import PIPE, run
 import argparse
 from thefuzz import process
@@ -17,7 +20,290 @@ from thefuzz import process
 THEFUZZ_MATCH_RATIO_THRESHOLD = 50
 NUM_FILTERED_MATCHES_TO_SHOW = 10
 
+# The categories of targets that each action can be run on
+ACTION_TARGET_CATEGORIES = {
+    "test": ["test"],
+    "run": ["test", "binary"],
+    "build": ["library", "test", "binary"],
+}
+
+# Passed to tbots.py to refresh the target index in the background
+REFRESH_TARGET_INDEX_ARG = "--refresh_target_index"
+
+# The exit codes of a bazel query that listed targets: success, and partial
+# success with --keep_going when some packages failed to load
+BAZEL_QUERY_SUCCESS_EXIT_CODES = [0, 3]
+
+
+class TargetIndex:
+    """An on disk index of the bazel targets in the workspace, so that targets
+    can be resolved without running bazel query on every invocation.
+
+    The targets are stored per package, along with the hash of the package's
+    BUILD file. Only the packages whose BUILD files were added or changed since
+    they were indexed need to be queried again to bring the index up to date.
+    """
+
+    VERSION = 1
+
+    # Past this many stale packages, querying the whole workspace is faster
+    # than querying each stale package
+    MAX_PACKAGES_TO_QUERY = 50
+
+    BUILD_FILE_NAMES = ["BUILD", "BUILD.bazel"]
+
+    def __init__(self, workspace_dir: str) -> None:
+        """Loads the index of the given workspace, if it has been indexed before
+
+        :param workspace_dir: the root directory of the bazel workspace
+        """
+        self.workspace_dir = workspace_dir
+
+        # Each workspace gets its own index, so multiple checkouts don't clash
+        cache_dir = os.path.join(
+            os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "tbots"
+        )
+        workspace_hash = hashlib.sha1(workspace_dir.encode()).hexdigest()[:12]
+        self.path = os.path.join(cache_dir, f"target_index_{workspace_hash}.json")
+
+        # Map of package name to a dict with the stat and hash of the package's
+        # BUILD file and the package's targets in each category
+        self.packages: dict[str, dict] = {}
+
+        try:
+            with open(self.path) as index_file:
+                index = json.load(index_file)
+            if index.get("version") == TargetIndex.VERSION:
+                self.packages = index["packages"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def save(self) -> None:
+        """Writes the index to disk"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        # Write to a temporary file first so that readers never see a partial index
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as index_file:
+            json.dump(
+                {"version": TargetIndex.VERSION, "packages": self.packages}, index_file
+            )
+        os.replace(temporary_path, self.path)
+
+    def get_targets(self, categories: list[str]) -> list[str]:
+        """Returns the indexed targets in the given categories
+
+        :param categories: the categories of targets, out of "library", "test" and "binary"
+        :return: the labels of the targets
+        """
+        return [
+            target
+            for package in self.packages.values()
+            for category in categories
+            for target in package["targets"].get(category, [])
+        ]
+
+    def update_stale_packages(self) -> list[str]:
+        """Removes the packages whose BUILD files were deleted, and finds the
+        packages whose BUILD files were added or changed since they were indexed.
+        BUILD files are only hashed if their size or modification time changed.
+
+        :return: the names of the packages that need to be queried
+        """
+        build_files = self.__find_build_files()
+
+        for package in set(self.packages) - set(build_files):
+            del self.packages[package]
+
+        stale_packages = []
+        for package, build_file in build_files.items():
+            stat = os.stat(build_file)
+            indexed_package = self.packages.get(package)
+
+            if indexed_package is not None and (
+                indexed_package["mtime_ns"] == stat.st_mtime_ns
+                and indexed_package["size"] == stat.st_size
+            ):
+                continue
+
+            build_file_hash = TargetIndex.__hash_file(build_file)
+
+            if (
+                indexed_package is not None
+                and indexed_package["hash"] == build_file_hash
+            ):
+                indexed_package["mtime_ns"] = stat.st_mtime_ns
+                indexed_package["size"] = stat.st_size
+            else:
+                stale_packages.append(package)
+
+        return stale_packages
+
+    def refresh(self, packages: list[str]) -> bool:
+        """Queries the targets of the given packages and updates the index.
+        If the query fails, the packages are left stale so they are queried
+        again next time.
+
+        :param packages: the names of the packages to query
+        :return: whether the query succeeded
+        """
+        if not packages:
+            return True
+
+        if len(packages) > TargetIndex.MAX_PACKAGES_TO_QUERY:
+            query = "//..."
+        else:
+            query = " + ".join(f"//{package}:all" for package in packages)
+
+        # Stat the BUILD files before querying, so that a BUILD file changed
+        # during the query is seen as stale next time
+        build_files = self.__find_build_files()
+        refreshed_packages = {}
+        for package in packages if query != "//..." else build_files:
+            build_file = build_files.get(package)
+            if build_file is None:
+                continue
+
+            stat = os.stat(build_file)
+            refreshed_packages[package] = {
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "hash": TargetIndex.__hash_file(build_file),
+                "targets": {"library": [], "test": [], "binary": []},
+            }
+
+        # With --keep_going, a package that fails to load doesn't stop the
+        # targets of the other packages from being listed
+        try:
+            result = run(
+                ["bazel", "query", "--keep_going", "--output=label_kind", query],
+                stdout=PIPE,
+                stderr=PIPE,
+                cwd=self.workspace_dir,
+            )
+        except FileNotFoundError:
+            print("Could not index bazel targets: bazel was not found", file=sys.stderr)
+            return False
+
+        if result.returncode not in BAZEL_QUERY_SUCCESS_EXIT_CODES:
+            print(
+                "Could not index bazel targets, bazel query exited with code "
+                f"{result.returncode}:\n{result.stderr.decode()}",
+                file=sys.stderr,
+            )
+            return False
+
+        for line in result.stdout.decode().splitlines():
+            # Each line looks like "py_binary rule //software/thunderscope:thunderscope_main"
+            fields = line.split(" ")
+            if len(fields) != 3:
+                continue
+
+            kind, _, label = fields
+            package = label[2:].split(":")[0]
+
+            if kind.endswith("_test") or kind == "test_suite":
+                category = "test"
+            elif kind.endswith("_binary"):
+                category = "binary"
+            elif kind.endswith("_library"):
+                category = "library"
+            else:
+                continue
+
+            if package in refreshed_packages:
+                refreshed_packages[package]["targets"][category].append(label)
+
+        self.packages.update(refreshed_packages)
+        return True
+
+    def refresh_in_background(self) -> None:
+        """Refreshes the stale packages of the index in a detached process"""
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), REFRESH_TARGET_INDEX_ARG],
+            cwd=self.workspace_dir,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+
+    def refresh_stale_packages(self) -> None:
+        """Refreshes the stale packages of the index and saves it, unless
+        another process is already refreshing the index
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(f"{self.path}.lock", "w") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return
+
+            self.refresh(self.update_stale_packages())
+            self.save()
+
+    def __find_build_files(self) -> dict[str, str]:
+        """Finds the BUILD files in the workspace
+
+        :return: a map of package name to the path of the package's BUILD file
+        """
+        build_files = {}
+        for directory, subdirectories, file_names in os.walk(self.workspace_dir):
+            # Skip bazel's output symlinks and hidden directories
+            subdirectories[:] = [
+                subdirectory
+                for subdirectory in subdirectories
+                if not subdirectory.startswith(("bazel-", "."))
+            ]
+
+            for build_file_name in TargetIndex.BUILD_FILE_NAMES:
+                if build_file_name in file_names:
+                    package = os.path.relpath(directory, self.workspace_dir)
+                    build_files["" if package == "." else package] = os.path.join(
+                        directory, build_file_name
+                    )
+                    break
+
+        return build_files
+
+    @staticmethod
+    def __hash_file(path: str) -> str:
+        """Returns the hash of a file's contents
+
+        :param path: the path to the file
+        :return: the hex digest of the hash
+        """
+        with open(path, "rb") as file:
+            return hashlib.sha1(file.read()).hexdigest()
+
+
+def find_target(
+    target_index: TargetIndex, categories: list[str], search_query: str
+) -> tuple[dict[str, str], str, int]:
+    """Finds the indexed target that best matches the search query
+
+    :param target_index: the index to search
+    :param categories: the categories of targets to search, out of "library", "test" and "binary"
+    :param search_query: the name of the target to search for
+    :return: a tuple of a map of target names to complete bazel targets,
+             the best matching target, and the confidence of the match
+    """
+    target_dict = {
+        target.split(":")[-1]: target for target in target_index.get_targets(categories)
+    }
+
+    # Use thefuzz to find the best matching target name, gauranteed to
+    # return 1 result because we set limit=1
+    most_similar_target_name, confidence = process.extract(
+        search_query, list(target_dict.keys()), limit=1
+    )[0]
+    return target_dict, target_dict[most_similar_target_name], confidence
+
+
 if __name__ == "__main__":
+    if sys.argv[1:] == [REFRESH_TARGET_INDEX_ARG]:
+        TargetIndex(os.path.dirname(os.path.abspath(__file__))).refresh_stale_packages()
+        sys.exit(0)
+
     parser = argparse.ArgumentParser(description="Run stuff", add_help=False)
 
     parser.add_argument("action", choices=["build", "run", "test"])
@@ -74,7 +360,7 @@ if __name__ == "__main__":
     )
     parser.add_argument(
         "--tracy",
-        help="Run the binary with the TRACY_ENABLE macro defined",
+        help="Run the binary with the TRACY_ENABLE macro defined, and trace the instrumented Python code",
         action="store_true",
     )
     parser.add_argument(
@@ -109,35 +395,34 @@ if __name__ == "__main__":
         print(100 * "=")
         unknown_args += ["--help"]
 
-    test_query = ["bazel", "query", "tests(//...)"]
-    binary_query = ["bazel", "query", "kind(.*_binary,//...)"]
-    library_query = ["bazel", "query", "kind(.*_library,//...)"]
+    workspace_dir = os.path.dirname(os.path.abspath(__file__))
+    target_index = TargetIndex(workspace_dir)
+    stale_packages = target_index.update_stale_packages()
 
-    bazel_queries = {
-        "test": [test_query],
-        "run": [test_query, binary_query],
-        "build": [library_query, test_query, binary_query],
-    }
+    if not target_index.packages:
+        print("Indexing bazel targets, this only happens once...")
+        if not target_index.refresh(stale_packages):
+            sys.exit(1)
+        target_index.save()
+        stale_packages = []
 
-    # Run the appropriate bazel query and ask thefuzz to find the best matching
-    # target, gauranteed to return 1 result because we set limit=1
-    # Combine results of multiple queries with itertools.chain
-    targets = list(
-        itertools.chain.from_iterable(
-            [
-                run(query, stdout=PIPE).stdout.rstrip(b"\n").split(b"\n")
-                for query in bazel_queries[args.action]
-            ]
-        )
+    target_dict, target, confidence = find_target(
+        target_index, ACTION_TARGET_CATEGORIES[args.action], args.search_query
     )
-    # Create a dictionary to map target names to complete bazel targets
-    target_dict = {target.split(b":")[-1]: target for target in targets}
 
-    # Use thefuzz to find the best matching target name
-    most_similar_target_name, confidence = process.extract(
-        args.search_query, list(target_dict.keys()), limit=1
-    )[0]
-    target = str(target_dict[most_similar_target_name], encoding="utf-8")
+    # The target we're looking for might have just been added, so don't
+    # settle for a poor match until the index is up to date
+    if stale_packages and confidence < THEFUZZ_MATCH_RATIO_THRESHOLD:
+        target_index.refresh(stale_packages)
+        target_index.save()
+        stale_packages = []
+        target_dict, target, confidence = find_target(
+            target_index, ACTION_TARGET_CATEGORIES[args.action], args.search_query
+        )
+
+    # Bring the index up to date once the command is done, so that the query
+    # doesn't hold up the command waiting for the bazel server
+    should_refresh_target_index = bool(stale_packages)
 
     print("Found target {} with confidence {}".format(target, confidence))
 
@@ -151,7 +436,7 @@ if __name__ == "__main__":
             target_dict[filtered_target_name[0]]
             for filtered_target_name in filtered_targets
         ]
-        target = str(iterfzf.iterfzf(iter(targets)), encoding="utf-8")
+        target = iterfzf.iterfzf(iter(targets))
         print("User selected {}".format(target))
 
     command = ["bazel", args.action, target]
@@ -178,9 +463,13 @@ if __name__ == "__main__":
         if "yellow" in args.select_debug_binaries:
             unknown_args += ["--debug_yellow_full_system"]
 
-    # To run the Tracy profile, enable the TRACY_ENABLE macro
+    # To run the Tracy profile, enable the TRACY_ENABLE macro, and trace the
+    # instrumented Python code too
     if args.tracy:
         command += ["--cxxopt=-DTRACY_ENABLE"]
+        os.environ["TBOTS_PYTHON_TRACE"] = "tracy"
+        if args.action in "test":
+            command += ["--test_env=TBOTS_PYTHON_TRACE=tracy"]
 
     if args.platform:
         command += ["--//software/embedded:host_platform=" + args.platform]
@@ -228,10 +517,17 @@ if __name__ == "__main__":
     if args.print_command:
         print(" ".join(command))
 
+        if should_refresh_target_index:
+            target_index.refresh_in_background()
+
     # Otherwise, run the command! We use os.system here because we don't
     # care about the output and subprocess doesn't seem to run qt for somereason
     else:
         print(" ".join(command))
         code = os.system(" ".join(command))
+
+        if should_refresh_target_index:
+            target_index.refresh_in_background()
+
         # propagate exit code
         sys.exit(1 if code != 0 else 0)
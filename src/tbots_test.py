@@ -0,0 +1,320 @@
+"""Tests for resolving tbots.py targets from the TargetIndex.
+
+bazel query is replaced by a fake that reads the targets of each queried
+package straight out of its BUILD file. Each line of the fake BUILD files is a
+line of `bazel query --output=label_kind` output, so changing a BUILD file
+changes the targets that are queried.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import tbots
+from tbots import TargetIndex, find_target
+
+
+class FakeBazel:
+    """Answers bazel queries from the BUILD files of a workspace"""
+
+    def __init__(self, workspace_dir: str) -> None:
+        """Creates a fake bazel for the given workspace
+
+        :param workspace_dir: the root directory of the workspace
+        """
+        self.workspace_dir = workspace_dir
+        self.queries: list[str] = []
+
+        # The exit code and error of the following queries
+        self.exit_code = 0
+        self.stderr = ""
+
+    def run(self, command: list[str], **kwargs) -> subprocess.CompletedProcess:
+        """Runs a bazel query, listing the targets of the queried packages
+
+        :param command: the bazel query command
+        :param kwargs: the other arguments to subprocess.run
+        :return: the completed query, with its output in stdout
+        """
+        query = command[-1]
+        self.queries.append(query)
+
+        if query == "//...":
+            build_files = [
+                os.path.join(directory, "BUILD")
+                for directory, _, file_names in os.walk(self.workspace_dir)
+                if "BUILD" in file_names
+            ]
+        else:
+            build_files = [
+                os.path.join(self.workspace_dir, package[2:].split(":")[0], "BUILD")
+                for package in query.split(" + ")
+            ]
+
+        output = ""
+        for build_file in build_files:
+            with open(build_file) as file:
+                output += file.read()
+
+        return subprocess.CompletedProcess(
+            command,
+            self.exit_code,
+            stdout=output.encode(),
+            stderr=self.stderr.encode(),
+        )
+
+
+@pytest.fixture
+def workspace_dir(tmp_path) -> str:
+    """An empty workspace"""
+    workspace_dir = tmp_path / "workspace"
+    workspace_dir.mkdir()
+    return str(workspace_dir)
+
+
+@pytest.fixture
+def bazel(workspace_dir, tmp_path, monkeypatch) -> FakeBazel:
+    """A fake bazel for the workspace, with the index cached under tmp_path"""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+    fake_bazel = FakeBazel(workspace_dir)
+    monkeypatch.setattr(tbots, "run", fake_bazel.run)
+    return fake_bazel
+
+
+def write_build_file(workspace_dir: str, package: str, targets: list[str]) -> None:
+    """Writes the BUILD file of a package with the given targets
+
+    :param workspace_dir: the root directory of the workspace
+    :param package: the name of the package
+    :param targets: the targets of the package, as "<kind> <name>"
+    """
+    package_dir = os.path.join(workspace_dir, package)
+    os.makedirs(package_dir, exist_ok=True)
+
+    with open(os.path.join(package_dir, "BUILD"), "w") as build_file:
+        for target in targets:
+            kind, name = target.split(" ")
+            build_file.write(f"{kind} rule //{package}:{name}\n")
+
+
+def create_index(workspace_dir: str) -> TargetIndex:
+    """Loads the index of the workspace and refreshes its stale packages
+
+    :param workspace_dir: the root directory of the workspace
+    :return: the up to date index
+    """
+    target_index = TargetIndex(workspace_dir)
+    target_index.refresh(target_index.update_stale_packages())
+    return target_index
+
+
+def test_targets_indexed_by_category(workspace_dir, bazel):
+    write_build_file(
+        workspace_dir,
+        "software/ai",
+        ["cc_library ai", "cc_test ai_test", "py_test ai_py_test"],
+    )
+    write_build_file(
+        workspace_dir,
+        "software/thunderscope",
+        ["py_binary thunderscope_main", "test_suite all_tests", "genrule gen"],
+    )
+
+    target_index = create_index(workspace_dir)
+
+    assert sorted(target_index.get_targets(["library"])) == ["//software/ai:ai"]
+    assert sorted(target_index.get_targets(["test"])) == [
+        "//software/ai:ai_py_test",
+        "//software/ai:ai_test",
+        "//software/thunderscope:all_tests",
+    ]
+    assert target_index.get_targets(["binary"]) == [
+        "//software/thunderscope:thunderscope_main"
+    ]
+
+    # Only the stale packages are queried, all in one query
+    assert bazel.queries == ["//software/ai:all + //software/thunderscope:all"]
+
+
+def test_find_target_resolves_name(workspace_dir, bazel):
+    write_build_file(
+        workspace_dir,
+        "software/thunderscope",
+        ["py_library thunderscope", "py_binary thunderscope_main"],
+    )
+    write_build_file(
+        workspace_dir, "software/simulated_tests", ["py_test simulated_test_ball_model"]
+    )
+
+    target_index = create_index(workspace_dir)
+
+    target_dict, target, confidence = find_target(
+        target_index, tbots.ACTION_TARGET_CATEGORIES["run"], "thunderscope_main"
+    )
+    assert target == "//software/thunderscope:thunderscope_main"
+    assert confidence == 100
+
+    # The library isn't one of the targets that can be run
+    assert target_dict == {
+        "thunderscope_main": "//software/thunderscope:thunderscope_main",
+        "simulated_test_ball_model": "//software/simulated_tests:simulated_test_ball_model",
+    }
+
+    _, target, confidence = find_target(
+        target_index, tbots.ACTION_TARGET_CATEGORIES["test"], "ball_model"
+    )
+    assert target == "//software/simulated_tests:simulated_test_ball_model"
+    assert confidence >= tbots.THEFUZZ_MATCH_RATIO_THRESHOLD
+
+
+def test_index_loaded_without_querying(workspace_dir, bazel):
+    write_build_file(workspace_dir, "software/ai", ["cc_test ai_test"])
+    create_index(workspace_dir).save()
+    bazel.queries.clear()
+
+    target_index = TargetIndex(workspace_dir)
+
+    assert target_index.update_stale_packages() == []
+    assert target_index.get_targets(["test"]) == ["//software/ai:ai_test"]
+    assert bazel.queries == []
+
+
+def test_index_of_other_version_discarded(workspace_dir, bazel):
+    write_build_file(workspace_dir, "software/ai", ["cc_test ai_test"])
+    target_index = create_index(workspace_dir)
+    target_index.save()
+
+    with open(target_index.path, "w") as index_file:
+        json.dump(
+            {"version": TargetIndex.VERSION + 1, "packages": target_index.packages},
+            index_file,
+        )
+
+    assert TargetIndex(workspace_dir).packages == {}
+
+
+def test_changed_build_file_is_stale(workspace_dir, bazel):
+    write_build_file(workspace_dir, "software/ai", ["cc_test ai_test"])
+    write_build_file(workspace_dir, "software/gui", ["cc_test gui_test"])
+    target_index = create_index(workspace_dir)
+
+    write_build_file(workspace_dir, "software/ai", ["cc_test ai_test", "cc_test b"])
+
+    assert target_index.update_stale_packages() == ["software/ai"]
+
+
+def test_touched_build_file_is_not_stale(workspace_dir, bazel):
+    write_build_file(workspace_dir, "software/ai", ["cc_test ai_test"])
+    target_index = create_index(workspace_dir)
+
+    build_file = os.path.join(workspace_dir, "software/ai", "BUILD")
+    os.utime(build_file, ns=(0, 0))
+
+    # The BUILD file is hashed since it was touched, but its contents haven't
+    # changed, so the package doesn't need to be queried
+    assert target_index.update_stale_packages() == []
+    assert target_index.packages["software/ai"]["mtime_ns"] == 0
+
+
+def test_deleted_package_removed(workspace_dir, bazel):
+    write_build_file(workspace_dir, "software/ai", ["cc_test ai_test"])
+    write_build_file(workspace_dir, "software/gui", ["cc_test gui_test"])
+    target_index = create_index(workspace_dir)
+
+    os.remove(os.path.join(workspace_dir, "software/gui", "BUILD"))
+
+    assert target_index.update_stale_packages() == []
+    assert target_index.get_targets(["test"]) == ["//software/ai:ai_test"]
+
+
+def test_added_target_resolved_after_refresh(workspace_dir, bazel):
+    write_build_file(workspace_dir, "software/ai", ["cc_test ai_test"])
+    target_index = create_index(workspace_dir)
+
+    write_build_file(workspace_dir, "software/field_tests", ["py_test pivot_kick"])
+    stale_packages = target_index.update_stale_packages()
+    assert stale_packages == ["software/field_tests"]
+
+    _, target, _ = find_target(target_index, ["test"], "pivot_kick")
+    assert target == "//software/ai:ai_test"
+
+    target_index.refresh(stale_packages)
+
+    _, target, confidence = find_target(target_index, ["test"], "pivot_kick")
+    assert target == "//software/field_tests:pivot_kick"
+    assert confidence == 100
+
+
+def test_failed_query_leaves_packages_stale(workspace_dir, bazel, capsys):
+    write_build_file(workspace_dir, "software/ai", ["cc_test ai_test"])
+    target_index = TargetIndex(workspace_dir)
+
+    bazel.exit_code = 2
+    bazel.stderr = "ERROR: broken BUILD file"
+
+    assert not target_index.refresh(target_index.update_stale_packages())
+    assert target_index.packages == {}
+    assert "ERROR: broken BUILD file" in capsys.readouterr().err
+
+    # The package is queried again once bazel works
+    bazel.exit_code = 0
+    assert target_index.update_stale_packages() == ["software/ai"]
+    assert target_index.refresh(["software/ai"])
+    assert target_index.get_targets(["test"]) == ["//software/ai:ai_test"]
+
+
+def test_partially_failed_query_indexes_packages(workspace_dir, bazel):
+    write_build_file(workspace_dir, "software/ai", ["cc_test ai_test"])
+    target_index = TargetIndex(workspace_dir)
+
+    # bazel query --keep_going exits with 3 when only some packages failed
+    bazel.exit_code = 3
+
+    assert target_index.refresh(target_index.update_stale_packages())
+    assert target_index.get_targets(["test"]) == ["//software/ai:ai_test"]
+
+
+def test_missing_bazel_leaves_packages_stale(workspace_dir, bazel, monkeypatch):
+    write_build_file(workspace_dir, "software/ai", ["cc_test ai_test"])
+    target_index = TargetIndex(workspace_dir)
+
+    def run_missing_bazel(command, **kwargs):
+        raise FileNotFoundError(command[0])
+
+    monkeypatch.setattr(tbots, "run", run_missing_bazel)
+
+    assert not target_index.refresh(target_index.update_stale_packages())
+    assert target_index.packages == {}
+
+
+def test_many_stale_packages_query_whole_workspace(workspace_dir, bazel, monkeypatch):
+    monkeypatch.setattr(TargetIndex, "MAX_PACKAGES_TO_QUERY", 1)
+    write_build_file(workspace_dir, "software/ai", ["cc_test ai_test"])
+    write_build_file(workspace_dir, "software/gui", ["cc_test gui_test"])
+
+    target_index = create_index(workspace_dir)
+
+    assert bazel.queries == ["//..."]
+    assert sorted(target_index.get_targets(["test"])) == [
+        "//software/ai:ai_test",
+        "//software/gui:gui_test",
+    ]
+
+
+def test_bazel_output_and_hidden_directories_skipped(workspace_dir, bazel):
+    write_build_file(workspace_dir, "software/ai", ["cc_test ai_test"])
+    write_build_file(workspace_dir, "bazel-out/software/ai", ["cc_test ai_test"])
+    write_build_file(workspace_dir, ".git/hooks", ["cc_test hook_test"])
+
+    target_index = create_index(workspace_dir)
+
+    assert list(target_index.packages.keys()) == ["software/ai"]
+
+
+if __name__ == "__main__":
+    # Run the test, -s disables all capturing at -vv increases verbosity
+    sys.exit(pytest.main([__file__, "-svv"]))